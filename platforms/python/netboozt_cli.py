@@ -622,9 +622,10 @@ def action_diagnose():
     try:
         # Importar módulo de diagnóstico
         sys.path.insert(0, str(Path(__file__).parent))
-        from src.monitoring.network_diagnostics import NetworkDiagnostics
+        from src.monitoring.network_diagnostics import get_diagnostics
         
-        diag = NetworkDiagnostics()
+        # Instancia compartida: las capas vigentes se responden desde la caché
+        diag = get_diagnostics()
         print(diag.get_diagnostic_report())
         
     except ImportError as e:
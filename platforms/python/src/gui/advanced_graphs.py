@@ -9,7 +9,7 @@ import customtkinter as ctk
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 import matplotlib.pyplot as plt
 from matplotlib.dates import DateFormatter, HourLocator, MinuteLocator
 
@@ -37,7 +37,11 @@ class TimeRange:
 class AdvancedGraph(ctk.CTkFrame):
     """Gráfica avanzada con zoom temporal"""
     
-    def __init__(self, parent, title: str, ylabel: str, color: str = PRIMARY):
+    # Puntos pedidos al motor de rollups para rangos largos
+    ROLLUP_MAX_POINTS = 500
+    
+    def __init__(self, parent, title: str, ylabel: str, color: str = PRIMARY,
+                 rollups=None, metric: Optional[str] = None):
         super().__init__(parent, fg_color=BG_CARD, corner_radius=10)
         
         self.title_text = title
@@ -50,6 +54,12 @@ class AdvancedGraph(ctk.CTkFrame):
         self.values: List[float] = []
         self.max_data_points = 1000
         
+        # Historia agregada (RollupEngine) para rangos que exceden la memoria
+        self.rollups = rollups
+        self.metric = metric
+        self.adapter = "default"
+        self._band = None
+        
         # Setup UI
         self.setup_ui()
     
@@ -71,7 +81,7 @@ class AdvancedGraph(ctk.CTkFrame):
         # Selector de rango
         self.range_menu = ctk.CTkOptionMenu(
             header,
-            values=["5 min", "15 min", "30 min", "1 hora", "6 horas", "24 horas", "7 días"],
+            values=["5 min", "15 min", "30 min", "1 hora", "6 horas", "24 horas", "7 días", "30 días"],
             command=self.on_range_changed,
             width=120,
             font=ctk.CTkFont(size=12)
@@ -123,12 +133,23 @@ class AdvancedGraph(ctk.CTkFrame):
             "1 hora": TimeRange.LAST_1_HOUR,
             "6 horas": TimeRange.LAST_6_HOURS,
             "24 horas": TimeRange.LAST_24_HOURS,
-            "7 días": TimeRange.LAST_7_DAYS
+            "7 días": TimeRange.LAST_7_DAYS,
+            "30 días": TimeRange.LAST_30_DAYS
         }
         
         self.current_range = range_map.get(selected, TimeRange.LAST_30_MIN)
         self.update_plot()
     
+    def _rollup_series(self, cutoff: datetime, now: datetime):
+        """Media y banda min/máx del nivel de rollup adecuado (o None)"""
+        if not self.rollups or not self.metric:
+            return None
+        _, points = self.rollups.query(self.metric, cutoff, now, self.ROLLUP_MAX_POINTS, self.adapter)
+        if not points:
+            return None
+        return ([p.timestamp for p in points], [p.mean for p in points],
+                [p.min for p in points], [p.max for p in points])
+    
     def update_plot(self):
         """Actualizar gráfica con datos filtrados por rango"""
         if not self.timestamps:
@@ -140,14 +161,30 @@ class AdvancedGraph(ctk.CTkFrame):
         
         filtered_times = []
         filtered_values = []
+        band = None
         
-        for ts, val in zip(self.timestamps, self.values):
-            if ts >= cutoff:
-                filtered_times.append(ts)
-                filtered_values.append(val)
+        # Los puntos en memoria cubren ~max_data_points segundos; más allá, rollups
+        rollup = None
+        if self.current_range > TimeRange.LAST_15_MIN:
+            rollup = self._rollup_series(cutoff, now)
+        if rollup:
+            filtered_times, filtered_values, band_min, band_max = rollup
+            band = (band_min, band_max)
+        else:
+            for ts, val in zip(self.timestamps, self.values):
+                if ts >= cutoff:
+                    filtered_times.append(ts)
+                    filtered_values.append(val)
         
-        # Actualizar línea
+        # Actualizar línea (y banda min/máx de los rollups)
         self.line.set_data(filtered_times, filtered_values)
+        if self._band is not None:
+            self._band.remove()
+            self._band = None
+        if band:
+            self._band = self.ax.fill_between(filtered_times, band[0], band[1],
+                                              color=self.color, alpha=0.15, linewidth=0)
+            filtered_values = band[0] + band[1]
         
         # Ajustar ejes
         if filtered_times:
@@ -189,8 +226,9 @@ class AdvancedGraph(ctk.CTkFrame):
 class AdvancedGraphsTab(ctk.CTkScrollableFrame):
     """Tab con gráficas avanzadas"""
     
-    def __init__(self, parent):
+    def __init__(self, parent, rollups=None):
         super().__init__(parent, fg_color="transparent")
+        self.adapter = "default"
         
         # Título
         title = ctk.CTkLabel(
@@ -215,7 +253,9 @@ class AdvancedGraphsTab(ctk.CTkScrollableFrame):
             graphs_container,
             "Velocidad de Descarga",
             "Mbps",
-            color="#00d4aa"
+            color="#00d4aa",
+            rollups=rollups,
+            metric="download_mbps"
         )
         self.download_graph.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
         
@@ -224,7 +264,9 @@ class AdvancedGraphsTab(ctk.CTkScrollableFrame):
             graphs_container,
             "Velocidad de Subida",
             "Mbps",
-            color="#6c5ce7"
+            color="#6c5ce7",
+            rollups=rollups,
+            metric="upload_mbps"
         )
         self.upload_graph.grid(row=0, column=1, padx=10, pady=10, sticky="nsew")
         
@@ -233,7 +275,9 @@ class AdvancedGraphsTab(ctk.CTkScrollableFrame):
             graphs_container,
             "Latencia",
             "ms",
-            color="#fdcb6e"
+            color="#fdcb6e",
+            rollups=rollups,
+            metric="latency_ms"
         )
         self.latency_graph.grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
         
@@ -246,6 +290,12 @@ class AdvancedGraphsTab(ctk.CTkScrollableFrame):
         )
         self.packet_loss_graph.grid(row=1, column=1, padx=10, pady=10, sticky="nsew")
     
+    def set_adapter(self, adapter: str):
+        """Adaptador cuyos rollups se grafican (el snapshot.adapter del monitor)"""
+        self.adapter = adapter
+        for graph in (self.download_graph, self.upload_graph, self.latency_graph):
+            graph.adapter = adapter
+    
     def update_graphs(self, timestamp: datetime, metrics: Dict):
         """Actualizar todas las gráficas"""
         if 'download_mbps' in metrics:
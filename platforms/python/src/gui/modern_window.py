@@ -17,9 +17,15 @@ try:
     from ..monitoring.realtime_monitor import NetworkMonitor, NetworkSnapshot
     from ..monitoring.adapter_manager import AdapterManager, get_adapter_manager
     from ..monitoring.alert_system import get_alert_system, AlertType
+    from ..monitoring.network_diagnostics import get_diagnostics
+    from ..monitoring.windows_events import get_event_monitor
+    from ..monitoring.correlation import get_correlation_engine
     from ..optimizations.detection import OptimizationDetector
     from ..optimizations.optimizer import NetworkOptimizer, ApplyResult, OptimizationResult
-    from ..storage.db_manager import NetBooztStorage
+    from ..storage.db_manager import NetBooztStorage, open_storage
+    from ..storage.metric_writer import MetricWriter
+    from ..storage.rollups import get_rollup_engine
+    from ..storage.metric_archive import get_metric_archive
     from ..storage.backup_system import get_backup_system
     from ..utils.logger import log_info, log_warning, log_error
     from .dashboard import NetworkDashboard
@@ -37,8 +43,15 @@ except ImportError:
     get_adapter_manager = None
     get_alert_system = None
     AlertType = None
+    get_diagnostics = None
+    get_event_monitor = None
+    get_correlation_engine = None
     OptimizationDetector = None
     NetBooztStorage = None
+    open_storage = None
+    MetricWriter = None
+    get_rollup_engine = None
+    get_metric_archive = None
     get_backup_system = None
     NetworkDashboard = None
     AboutTab = None
@@ -77,15 +90,29 @@ class ModernNetBoozt(ctk.CTk):
         self.is_admin = self.check_admin()
         
         # Inicializar módulos
-        self.storage = NetBooztStorage() if NetBooztStorage else None
+        self.storage = open_storage() if open_storage else None
+        # Métricas por segundo: se encolan y se escriben por lotes
+        self.metric_writer = MetricWriter(self.storage) if self.storage and MetricWriter else None
+        if self.metric_writer:
+            self.metric_writer.start()
+        # Agregados 1s/1m/15m/1h para las gráficas de rangos largos
+        self.rollups = get_rollup_engine() if get_rollup_engine else None
+        # Contadores crudos por segundo (archivo binario por día)
+        self.metric_archive = get_metric_archive() if get_metric_archive else None
+        self.correlation = get_correlation_engine() if get_correlation_engine else None
+        if self.metric_archive:
+            self.metric_archive.prune()
         self.detector = OptimizationDetector() if OptimizationDetector else None
         self.optimizer = NetworkOptimizer() if NetworkOptimizer else None
         self.adapter_manager = get_adapter_manager() if get_adapter_manager else None
         self.network_monitor: Optional[NetworkMonitor] = None
         self.current_adapter = "Ethernet"  # Default
         
-        # Auto-Failover components
-        self.dns_health_checker = None
+        self.interface_watcher = None
+        self.event_monitor = None
+        self._adapters_refresh_pending = False
+        
+        # Auto-Failover por adaptador (MultiAdapterFailoverManager)
         self.auto_failover_manager = None
         
         # Alert and Backup systems
@@ -95,6 +122,7 @@ class ModernNetBoozt(ctk.CTk):
         # Registrar callback de alertas
         if self.alert_system:
             self.alert_system.on_alert(self._on_alert_triggered)
+            self.alert_system.on_incident(self._on_incident_triggered)
         
         # Control de loops
         self._dashboard_update_id = None
@@ -113,6 +141,12 @@ class ModernNetBoozt(ctk.CTk):
         
         # Iniciar monitor de red
         self.start_network_monitoring()
+        
+        # Cambios de interfaces (cable, WiFi, rutas) sin redetectar
+        self.start_interface_watcher()
+        
+        # Eventos de red del Event Log (invalidan la caché de diagnóstico)
+        self.start_event_monitor()
     
     def _detect_state_background(self):
         """Detectar estado de optimizaciones en background thread."""
@@ -127,6 +161,12 @@ class ModernNetBoozt(ctk.CTk):
         if NetworkMonitor:
             self.network_monitor = NetworkMonitor(self.current_adapter, interval=1.0)
             self.network_monitor.register_callback(self.on_network_update)
+            if self.rollups:
+                self.network_monitor.register_callback(self.rollups.add_snapshot)
+            if self.metric_archive:
+                self.network_monitor.register_callback(self.metric_archive.append_snapshot)
+            if self.correlation:
+                self.correlation.attach(network_monitor=self.network_monitor)
             self.network_monitor.start()
             
             # Marcar dashboard como activo
@@ -136,8 +176,8 @@ class ModernNetBoozt(ctk.CTk):
     
     def on_network_update(self, snapshot: 'NetworkSnapshot'):
         """Callback cuando hay nueva data de red"""
-        if self.storage:
-            # Guardar métrica en DB
+        if self.metric_writer:
+            # Encolar métrica (write-behind, sin tocar el disco aquí)
             metric_data = {
                 'adapter': snapshot.adapter,
                 'bytes_sent': snapshot.bytes_sent,
@@ -149,7 +189,7 @@ class ModernNetBoozt(ctk.CTk):
                 'drops_in': snapshot.drops_in,
                 'drops_out': snapshot.drops_out
             }
-            self.storage.save_metric(metric_data)
+            self.metric_writer.submit(metric_data)
     
     def update_dashboard_loop(self):
         """Loop de actualización del dashboard"""
@@ -182,6 +222,10 @@ class ModernNetBoozt(ctk.CTk):
                 
                 # Actualizar gráficas avanzadas si existen
                 if hasattr(self, 'graphs_tab'):
+                    # Los rollups se indexan por el adaptador realmente medido
+                    # (coincidencia parcial o "All"), no por current_adapter
+                    if snapshot.adapter != self.graphs_tab.adapter:
+                        self.graphs_tab.set_adapter(snapshot.adapter)
                     from datetime import datetime
                     self.graphs_tab.update_graphs(
                         datetime.now(),
@@ -189,19 +233,24 @@ class ModernNetBoozt(ctk.CTk):
                             'download_mbps': snapshot.download_rate_mbps,
                             'upload_mbps': snapshot.upload_rate_mbps,
                             'latency_ms': self.network_monitor.get_current_latency(),
-                            'packet_loss': 0  # TODO: calcular packet loss real
+                            'packet_loss': snapshot.packet_loss
                         }
                     )
                 
                 # Verificar alertas
-                if self.alert_system and AlertType:
-                    latency = self.network_monitor.get_current_latency()
-                    if latency > 0:
-                        self.alert_system.check_metric(AlertType.LATENCY_HIGH, latency)
-                    
-                    # Verificar velocidad
-                    if snapshot.download_rate_mbps < 10:
-                        self.alert_system.check_metric(AlertType.SPEED_LOW, snapshot.download_rate_mbps)
+                if self.alert_system:
+                    # Reglas con ventana (p95, thresholds) y líneas base por adaptador medido
+                    samples = {
+                        'packet_loss': snapshot.packet_loss,
+                        'download_mbps': snapshot.download_rate_mbps,
+                        'upload_mbps': snapshot.upload_rate_mbps,
+                    }
+                    if snapshot.latency_ms > 0:
+                        samples['latency_ms'] = snapshot.latency_ms
+                        samples['jitter_ms'] = snapshot.jitter_ms
+                    timestamp = snapshot.timestamp.timestamp()
+                    for metric, value in samples.items():
+                        self.alert_system.record_sample(metric, value, timestamp, adapter=snapshot.adapter)
                 
                 # Actualizar estadísticas
                 avg_rates = self.network_monitor.get_average_rates(10)
@@ -213,7 +262,7 @@ class ModernNetBoozt(ctk.CTk):
                     'peak_download_mbps': peak_rates['peak_download_mbps'],
                     'peak_upload_mbps': peak_rates['peak_upload_mbps'],
                     'avg_latency_ms': self.network_monitor.get_average_latency(10),
-                    'packet_loss_percent': 0,
+                    'packet_loss_percent': snapshot.packet_loss,
                     'total_errors': snapshot.errors_in + snapshot.errors_out
                 })
         
@@ -423,7 +472,7 @@ class ModernNetBoozt(ctk.CTk):
         
         # Tab Gráficas Avanzadas (NUEVO)
         if AdvancedGraphsTab:
-            self.graphs_tab = AdvancedGraphsTab(self.tabs_container)
+            self.graphs_tab = AdvancedGraphsTab(self.tabs_container, rollups=self.rollups)
             self.tab_frames["graphs"] = self.graphs_tab
         
         # Tab Alertas (NUEVO)
@@ -644,7 +693,57 @@ class ModernNetBoozt(ctk.CTk):
         
         return frame
     
-    def refresh_adapters_display(self):
+    def start_interface_watcher(self):
+        """Mantener los adaptadores al día con avisos de cambio del sistema"""
+        if not self.adapter_manager:
+            return
+        try:
+            from ..monitoring.interface_watcher import InterfaceWatcher
+            
+            self.interface_watcher = InterfaceWatcher(self.adapter_manager)
+            self.interface_watcher.on_change(self._on_interface_change)
+            if get_diagnostics:
+                get_diagnostics().attach_interface_watcher(self.interface_watcher)
+            if self.correlation:
+                self.correlation.attach(interface_watcher=self.interface_watcher)
+            self.interface_watcher.start()
+        except Exception as e:
+            log_error(f"Error iniciando interface watcher: {e}")
+            self.interface_watcher = None
+    
+    def start_event_monitor(self):
+        """Seguir el Event Log de Windows y conectarlo al diagnóstico"""
+        if not get_event_monitor or sys.platform != 'win32':
+            return
+        try:
+            self.event_monitor = get_event_monitor()
+            if get_diagnostics:
+                get_diagnostics().attach_event_monitor(self.event_monitor)
+            if self.correlation:
+                self.correlation.attach(event_monitor=self.event_monitor)
+            # start() lee el historial reciente: fuera del hilo de la UI
+            threading.Thread(target=self.event_monitor.start, daemon=True).start()
+        except Exception as e:
+            log_error(f"Error iniciando event monitor: {e}")
+            self.event_monitor = None
+    
+    def _on_interface_change(self, change):
+        """Callback del interface watcher (thread del watcher)"""
+        # Altas, bajas o roaming: ajustar los managers de failover por adaptador
+        if self.auto_failover_manager:
+            self.auto_failover_manager.on_interface_change(change)
+        
+        if self._adapters_refresh_pending:
+            return
+        # Un cambio llega como ráfaga de avisos: un solo redibujado
+        self._adapters_refresh_pending = True
+        self.after(0, self._refresh_adapters_from_watcher)
+    
+    def _refresh_adapters_from_watcher(self):
+        self._adapters_refresh_pending = False
+        self.refresh_adapters_display(redetect=False)
+    
+    def refresh_adapters_display(self, redetect: bool = True):
         """Actualizar display de adaptadores"""
         if not self.adapter_manager:
             return
@@ -653,8 +752,9 @@ class ModernNetBoozt(ctk.CTk):
         for widget in self.adapters_container.winfo_children():
             widget.destroy()
         
-        # Redetectar adaptadores
-        self.adapter_manager._detect_adapters()
+        # Redetectar adaptadores (el watcher ya los mantiene al día)
+        if redetect and not (self.interface_watcher and self.interface_watcher.is_running):
+            self.adapter_manager._detect_adapters()
         adapters = self.adapter_manager.get_adapters_sorted_by_priority()
         
         if not adapters:
@@ -1041,7 +1141,11 @@ class ModernNetBoozt(ctk.CTk):
             ("Velocidad Baja", "Mbps", "speed_low", 10.0),
         ]
         
+        self.threshold_entries = {}
         for label, unit, key, default in thresholds:
+            if self.alert_system and AlertType:
+                default = self.alert_system.thresholds[AlertType(key)].threshold_value
+            
             row = ctk.CTkFrame(config_frame, fg_color="transparent")
             row.pack(fill="x", padx=20, pady=10)
             
@@ -1059,6 +1163,7 @@ class ModernNetBoozt(ctk.CTk):
             )
             entry.pack(side="left", padx=10)
             entry.insert(0, str(default))
+            self.threshold_entries[key] = entry
             
             ctk.CTkLabel(
                 row,
@@ -1452,15 +1557,17 @@ class ModernNetBoozt(ctk.CTk):
         # TODO: Implementar toast notification con CTkMessagebox o similar
     
     def _on_alert_triggered(self, alert):
-        """Callback cuando se dispara una alerta"""
+        """Callback cuando se dispara una alerta (hilo del dispatcher)"""
         log_warning(f"Alerta: {alert.message}")
         
-        # Actualizar UI de alertas si estamos en ese tab
-        self.refresh_active_alerts()
-        
-        # Mostrar toast
-        icon = "🔴" if alert.severity.value == "critical" else "⚠️"
-        self.show_toast(f"{icon} Alerta", alert.message)
+        # Actualizar UI de alertas en el hilo de Tk
+        self.after(0, self.refresh_active_alerts)
+    
+    def _on_incident_triggered(self, incident, summary):
+        """Callback por incidente agrupado (una toast por incidente, no por alerta)"""
+        icon = "🔴" if incident.severity.value == "critical" else "⚠️"
+        title = f"{icon} Incidente (resumen)" if summary else f"{icon} Alerta"
+        self.after(0, lambda: self.show_toast(title, incident.message))
     
     def refresh_active_alerts(self):
         """Actualizar display de alertas activas"""
@@ -1511,6 +1618,17 @@ class ModernNetBoozt(ctk.CTk):
                     command=lambda a=alert: self.resolve_alert(a)
                 )
                 resolve_btn.pack(side="right", padx=10)
+            
+            # Latencia alta: eventos que acompañan a los picos más que por azar
+            if self.correlation and any(a.alert_type == AlertType.LATENCY_HIGH for a in active_alerts):
+                for hint in self.correlation.root_cause_hints('latency_ms'):
+                    ctk.CTkLabel(
+                        self.active_alerts_container,
+                        text=f"🔎 {hint}",
+                        font=ctk.CTkFont(size=11),
+                        text_color="gray",
+                        anchor="w"
+                    ).pack(fill="x", padx=15, pady=2)
         
         except Exception as e:
             log_error(f"Error refrescando alertas: {e}")
@@ -1524,8 +1642,23 @@ class ModernNetBoozt(ctk.CTk):
     
     def apply_alert_thresholds(self):
         """Aplicar configuración de thresholds"""
-        # TODO: Leer valores de los entries y aplicar
-        self.show_toast("💾 Guardado", "Thresholds actualizados")
+        if not self.alert_system or not AlertType:
+            self.show_toast("Error", "Sistema de alertas no disponible")
+            return
+        
+        invalid = []
+        for key, entry in getattr(self, 'threshold_entries', {}).items():
+            try:
+                value = float(entry.get())
+            except ValueError:
+                invalid.append(key)
+                continue
+            self.alert_system.set_threshold(AlertType(key), value)
+        
+        if invalid:
+            self.show_toast("⚠️ Valores inválidos", ", ".join(invalid))
+        else:
+            self.show_toast("💾 Guardado", "Thresholds actualizados")
     
     def create_backup_now(self):
         """Crear backup inmediatamente"""
@@ -1674,39 +1807,25 @@ class ModernNetBoozt(ctk.CTk):
         try:
             if self.autofailover_switch.get():
                 # Habilitar
-                from ..monitoring.dns_health import DNSHealthChecker
-                from ..monitoring.auto_failover import AutoFailoverManager
-                
-                # Crear health checker
-                self.dns_health_checker = DNSHealthChecker(check_interval=15)
+                from ..monitoring.auto_failover import MultiAdapterFailoverManager
                 
-                # Agregar todos los DNS servers de los tiers
-                if self.adapter_manager:
-                    tiers = self.adapter_manager.dns_fallback_tiers
-                    for tier in tiers:
-                        self.dns_health_checker.add_dns_server(tier.primary_dns)
-                        if tier.secondary_dns:
-                            self.dns_health_checker.add_dns_server(tier.secondary_dns)
-                
-                # Iniciar health checking
-                self.dns_health_checker.start()
-                
-                # Crear auto-failover manager
-                self.auto_failover_manager = AutoFailoverManager(
-                    health_checker=self.dns_health_checker,
-                    adapter_manager=self.adapter_manager,
-                    cooldown_seconds=60
+                # Un health checker + failover por adaptador activo (multi-homed)
+                self.auto_failover_manager = MultiAdapterFailoverManager(
+                    self.adapter_manager,
+                    check_interval=15
                 )
                 
                 # Registrar callback para notificaciones
                 self.auto_failover_manager.on_failover(self._on_dns_failover)
                 
                 # Iniciar auto-failover
+                self.auto_failover_manager.enable()
                 self.auto_failover_manager.start()
                 
                 # Actualizar UI
+                adapters = len(self.auto_failover_manager.managers)
                 self.health_status_label.configure(
-                    text="Estado: ✅ Activo - Monitoreando DNS cada 15s",
+                    text=f"Estado: ✅ Activo - {adapters} adaptador(es), DNS cada 15s",
                     text_color=TEXT_SUCCESS
                 )
                 
@@ -1723,10 +1842,6 @@ class ModernNetBoozt(ctk.CTk):
                     self.auto_failover_manager.stop()
                     self.auto_failover_manager = None
                 
-                if self.dns_health_checker:
-                    self.dns_health_checker.stop()
-                    self.dns_health_checker = None
-                
                 # Actualizar UI
                 self.health_status_label.configure(
                     text="Estado: Deshabilitado",
@@ -1747,23 +1862,41 @@ class ModernNetBoozt(ctk.CTk):
             self.autofailover_switch.toggle()
     
     def _on_dns_failover(self, event):
-        """Callback cuando ocurre un failover de DNS"""
+        """Callback cuando ocurre un failover o failback de DNS (hilo del manager)"""
+        # Los servidores DNS cambiaron: el próximo diagnóstico re-verifica DNS
+        if get_diagnostics:
+            get_diagnostics().invalidate('dns')
+        
         from ..utils.notifications import get_notification_manager
         
+        tier_name = self._dns_tier_name(event.to_tier)
+        adapter = f" [{event.adapter}]" if event.adapter else ""
+        
         # Notificación del sistema
         notif_mgr = get_notification_manager()
-        if notif_mgr:
-            notif_mgr.notify_dns_failover(
+        if notif_mgr and event.success:
+            notify = notif_mgr.notify_dns_failback if event.kind == "failback" else notif_mgr.notify_dns_failover
+            notify(
                 from_tier=event.from_tier,
                 to_tier=event.to_tier,
-                tier_name=event.tier_name
+                tier_name=tier_name,
+                adapter=event.adapter
             )
         
-        # Actualizar display de DNS tiers
-        self.refresh_dns_display()
+        # Actualizar display de DNS tiers (Tk solo desde el hilo principal)
+        self.after(0, self.refresh_dns_display)
         
         # Log
-        log_info(f"DNS Failover: Tier {event.from_tier} → Tier {event.to_tier} ({event.tier_name})")
+        label = "DNS Failback" if event.kind == "failback" else "DNS Failover"
+        status = "" if event.success else " (fallido)"
+        log_info(f"{label}{adapter}: Tier {event.from_tier} → Tier {event.to_tier} ({tier_name}){status}")
+    
+    def _dns_tier_name(self, tier_number: int) -> str:
+        """Proveedor de un tier de fallback DNS por número"""
+        for tier in self.adapter_manager.DNS_FALLBACK_TIERS:
+            if tier.tier == tier_number:
+                return tier.provider
+        return f"Tier {tier_number}"
     
     def apply_all_optimizations(self):
         """Aplicar todas las optimizaciones"""
@@ -1834,12 +1967,19 @@ class ModernNetBoozt(ctk.CTk):
                 except Exception as e:
                     log_error(f"Error deteniendo auto-failover: {e}")
             
-            # Detener DNS health checker
-            if self.dns_health_checker:
+            # Detener event monitor
+            if self.event_monitor:
+                try:
+                    self.event_monitor.stop()
+                except Exception as e:
+                    log_error(f"Error deteniendo event monitor: {e}")
+            
+            # Detener interface watcher
+            if self.interface_watcher:
                 try:
-                    self.dns_health_checker.stop()
+                    self.interface_watcher.stop()
                 except Exception as e:
-                    log_error(f"Error deteniendo DNS health checker: {e}")
+                    log_error(f"Error deteniendo interface watcher: {e}")
             
             # Detener monitor de red
             if self.network_monitor:
@@ -1848,6 +1988,27 @@ class ModernNetBoozt(ctk.CTk):
                 except Exception as e:
                     log_error(f"Error deteniendo network monitor: {e}")
             
+            # Persistir métricas pendientes
+            if self.metric_writer:
+                try:
+                    self.metric_writer.stop()
+                except Exception as e:
+                    log_error(f"Error deteniendo metric writer: {e}")
+            
+            # Guardar rollups
+            if self.rollups:
+                try:
+                    self.rollups.save()
+                except Exception as e:
+                    log_error(f"Error guardando rollups: {e}")
+            
+            # Cerrar archivo de métricas
+            if self.metric_archive:
+                try:
+                    self.metric_archive.close()
+                except Exception as e:
+                    log_error(f"Error cerrando archivo de métricas: {e}")
+            
             # Cerrar storage
             if self.storage:
                 try:
@@ -223,9 +223,26 @@ class SystemTrayIcon:
         print(f"Quick optimize: {profile}")
     
     def _handle_quick_diagnostic(self):
-        """Ejecuta diagnóstico rápido."""
-        # TODO: Implementar diagnóstico
-        print("Quick diagnostic")
+        """Ejecuta diagnóstico rápido (capas vigentes desde la caché)."""
+        threading.Thread(target=self._run_quick_diagnostic, daemon=True).start()
+    
+    def _run_quick_diagnostic(self):
+        """Diagnóstico en background y resultado como notificación."""
+        try:
+            from ..monitoring.network_diagnostics import get_diagnostics, NetworkHealth
+        except ImportError:
+            from src.monitoring.network_diagnostics import get_diagnostics, NetworkHealth
+        
+        result = get_diagnostics().run_full_diagnostic()
+        
+        if result.health == NetworkHealth.DOWN:
+            status = "error"
+        elif result.health in (NetworkHealth.POOR, NetworkHealth.BAD):
+            status = "warning"
+        else:
+            status = "normal"
+        self.set_status(status, f"{self.title} - {result.message}")
+        self.show_notification("Diagnóstico rápido", f"{result.message}\n{result.recommendation}")
     
     def _toggle_autostart(self):
         """Toggle iniciar con Windows."""
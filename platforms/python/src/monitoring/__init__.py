@@ -8,18 +8,36 @@ Includes:
 - DNS health checking
 - DNS Intelligence (parallel analysis)
 - Auto-failover system
+- Failover policy simulator
 - Windows event log integration
 - Network diagnostics
+- Event/metric correlation timeline
+- Interface change watcher (rtnetlink / polling)
 """
 
 from .realtime_monitor import NetworkMonitor, NetworkSnapshot, MultiAdapterMonitor
 from .adapter_manager import AdapterManager, NetworkAdapter, DNSFallbackTier, get_adapter_manager
+from .interface_watcher import InterfaceWatcher, InterfaceChange, get_interface_watcher
 from .dns_health import DNSHealthChecker, DNSHealth, DNSStatus
 from .dns_intelligence import DNSIntelligence, DNSMetrics, get_dns_intelligence
 from .alert_system import AlertSystem, Alert, AlertType, AlertSeverity, get_alert_system
-from .auto_failover import AutoFailoverManager, FailoverEvent
+from .alert_store import AlertStore
+from .alert_dispatch import AlertDispatcher, Incident
+from .anomaly_detector import AnomalyDetector
+from .alert_rules import AlertRule, RuleEngine, Last, RateOfChange, WindowMean, Percentile, Ratio
+from .auto_failover import AutoFailoverManager, MultiAdapterFailoverManager, FailoverEvent
+from .failover_simulator import FailoverSimulator, HealthTrace, HealthTraceRecorder, generate_synthetic_trace
 from .windows_events import WindowsEventMonitor, WindowsNetworkEvent, NetworkEventType, get_event_monitor
+from .event_log_reader import EventLogReader, EventBookmark, EventRecord, WevtutilEventSource, RecordedEventSource
 from .network_diagnostics import NetworkDiagnostics, DiagnosticResult, FailurePoint, NetworkHealth, get_diagnostics
+from .diagnostic_cache import DiagnosticCache
+from .correlation import CorrelationEngine, CoOccurrence, TimelineEntry, IntervalIndex, get_correlation_engine
+from .probe_backends import ProbeBackend, ProbeReply, SimulatedHop, SimulatedPathBackend, get_default_backend
+from .path_analyzer import PathAnalyzer, PathReport, HopDegradation
+from .mtu_discovery import MtuDiscovery, MtuResult, recommend_mtu
+from .bufferbloat import BufferbloatTest, BufferbloatConfig, BufferbloatResult
+from .speed_test import SpeedTestEngine, ThroughputConfig, ThroughputReport, StreamLoad
+from .speed_test_server import LocalSpeedTestServer
 
 __all__ = [
     # Real-time monitoring
@@ -32,6 +50,9 @@ __all__ = [
     'NetworkAdapter',
     'DNSFallbackTier',
     'get_adapter_manager',
+    'InterfaceWatcher',
+    'InterfaceChange',
+    'get_interface_watcher',
     
     # DNS health
     'DNSHealthChecker',
@@ -49,16 +70,39 @@ __all__ = [
     'AlertType',
     'AlertSeverity',
     'get_alert_system',
+    'AlertStore',
+    'AlertDispatcher',
+    'Incident',
+    'AnomalyDetector',
+    'AlertRule',
+    'RuleEngine',
+    'Last',
+    'RateOfChange',
+    'WindowMean',
+    'Percentile',
+    'Ratio',
     
     # Auto-failover
     'AutoFailoverManager',
+    'MultiAdapterFailoverManager',
     'FailoverEvent',
     
+    # Failover simulator
+    'FailoverSimulator',
+    'HealthTrace',
+    'HealthTraceRecorder',
+    'generate_synthetic_trace',
+    
     # Windows events
     'WindowsEventMonitor',
     'WindowsNetworkEvent',
     'NetworkEventType',
     'get_event_monitor',
+    'EventLogReader',
+    'EventBookmark',
+    'EventRecord',
+    'WevtutilEventSource',
+    'RecordedEventSource',
     
     # Network diagnostics
     'NetworkDiagnostics',
@@ -66,4 +110,39 @@ __all__ = [
     'FailurePoint',
     'NetworkHealth',
     'get_diagnostics',
+    'DiagnosticCache',
+    
+    # Event/metric correlation
+    'CorrelationEngine',
+    'CoOccurrence',
+    'TimelineEntry',
+    'IntervalIndex',
+    'get_correlation_engine',
+    
+    # Path analysis (MTR-style)
+    'ProbeBackend',
+    'ProbeReply',
+    'SimulatedHop',
+    'SimulatedPathBackend',
+    'get_default_backend',
+    'PathAnalyzer',
+    'PathReport',
+    'HopDegradation',
+    
+    # Path MTU
+    'MtuDiscovery',
+    'MtuResult',
+    'recommend_mtu',
+    
+    # Latency under load
+    'BufferbloatTest',
+    'BufferbloatConfig',
+    'BufferbloatResult',
+    
+    # Throughput
+    'SpeedTestEngine',
+    'ThroughputConfig',
+    'ThroughputReport',
+    'StreamLoad',
+    'LocalSpeedTestServer',
 ]
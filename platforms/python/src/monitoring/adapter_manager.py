@@ -5,12 +5,19 @@ Gestión avanzada de adaptadores de red con detección de prioridades y DNS fall
 By LOUST (www.loust.pro)
 """
 
-import subprocess
 import re
+import json
+import sys
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+try:
+    from ..utils.shell_host import get_shell_runner
+except ImportError:
+    # Fallback con src/ en sys.path (ejecución directa)
+    from utils.shell_host import get_shell_runner
+
 # Importar logger para debugging
 try:
     from ..utils.logger import log_info, log_warning, log_error
@@ -111,33 +118,165 @@ class AdapterManager:
         DNSFallbackTier(7, "Router DHCP", "Auto", "Auto"),
     ]
     
-    def __init__(self):
+    # Detección en una sola consulta PowerShell (adaptadores + IP + DNS +
+    # MTU + gateways). False: una consulta por adaptador (modo anterior)
+    BATCHED_DETECTION = True
+    
+    # Cada cmdlet se ejecuta una vez y se indexa por ifIndex; el resultado
+    # es un único documento JSON {"Adapters": [...]}
+    BATCH_DETECTION_QUERY = r"""
+    $ErrorActionPreference = 'SilentlyContinue'
+    function Index($items) {
+        $table = @{}
+        foreach ($item in $items) {
+            $key = [string]$item.InterfaceIndex
+            if (-not $table.ContainsKey($key)) { $table[$key] = @() }
+            $table[$key] += $item
+        }
+        return $table
+    }
+    $ipv4 = Index (Get-NetIPAddress -AddressFamily IPv4)
+    $ipv6 = Index (Get-NetIPAddress -AddressFamily IPv6 | Where-Object { $_.PrefixOrigin -ne 'WellKnown' })
+    $routes = Index (Get-NetRoute -DestinationPrefix '0.0.0.0/0' | Sort-Object RouteMetric)
+    $dns = Index (Get-DnsClientServerAddress -AddressFamily IPv4)
+    $interfaces = Index (Get-NetIPInterface -AddressFamily IPv4)
+    $adapters = @(Get-NetAdapter | ForEach-Object {
+        $key = [string]$_.ifIndex
+        $interface = $interfaces[$key] | Select-Object -First 1
+        [ordered]@{
+            Name = $_.Name
+            InterfaceDescription = $_.InterfaceDescription
+            Status = [string]$_.Status
+            MacAddress = $_.MacAddress
+            LinkSpeed = $_.LinkSpeed
+            InterfaceMetric = $interface.InterfaceMetric
+            Mtu = $interface.NlMtu
+            Dhcp = ([string]$interface.Dhcp -eq 'Enabled')
+            IPv4 = @($ipv4[$key] | ForEach-Object { $_.IPAddress })
+            IPv6 = @($ipv6[$key] | ForEach-Object { $_.IPAddress })
+            Gateways = @($routes[$key] | ForEach-Object { $_.NextHop })
+            DNS = @($dns[$key] | ForEach-Object { $_.ServerAddresses })
+        }
+    })
+    @{ Adapters = $adapters } | ConvertTo-Json -Depth 4 -Compress
+    """
+    
+    def __init__(self, backend=None):
+        """
+        Args:
+            backend: Fuente alternativa de adaptadores con detect() -> List[NetworkAdapter]
+                (default en Linux: LinuxAdapterBackend; en Windows: PowerShell)
+        """
+        if backend is None and sys.platform.startswith('linux'):
+            from .linux_adapters import LinuxAdapterBackend
+            backend = LinuxAdapterBackend()
+        self.backend = backend
         self.adapters: List[NetworkAdapter] = []
         self._detect_adapters()
     
     def _run_powershell(self, command: str) -> str:
-        """Ejecutar comando PowerShell sin ventana visible"""
-        try:
-            log_info(f"Executing PowerShell command: {command[:100]}...")
-            result = subprocess.run(
-                ["powershell", "-Command", command],
-                capture_output=True,
-                text=True,
-                timeout=10,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
-            log_info(f"PowerShell stdout length: {len(result.stdout)}")
-            if result.stderr:
-                log_warning(f"PowerShell stderr: {result.stderr}")
-            return result.stdout.strip()
-        except Exception as e:
-            log_error(f"Error ejecutando PowerShell: {e}")
-            return ""
+        """Ejecutar comando PowerShell en el host persistente compartido"""
+        log_info(f"Executing PowerShell command: {command[:100]}...")
+        result = get_shell_runner().run(command, timeout=10)
+        log_info(f"PowerShell stdout length: {len(result.stdout)} ({result.duration_ms:.0f}ms)")
+        if result.stderr:
+            log_warning(f"PowerShell stderr: {result.stderr}")
+        return result.stdout.strip()
     
     def _detect_adapters(self):
         """Detectar todos los adaptadores de red"""
         log_info("Starting adapter detection...")
         
+        if self.backend is not None:
+            self.adapters = self.backend.detect()
+            log_info(f"✓ Detected {len(self.adapters)} adapter(s) via {type(self.backend).__name__}")
+            return
+        
+        if self.BATCHED_DETECTION:
+            output = self._run_powershell(self.BATCH_DETECTION_QUERY)
+            if output:
+                try:
+                    # Reemplazo atómico, igual que en la detección por adaptador
+                    self.adapters = self.parse_adapter_batch(output)
+                    log_info(f"✓ Detected {len(self.adapters)} adapter(s) in one query")
+                    return
+                except (ValueError, TypeError, AttributeError) as e:
+                    log_warning(f"Batched adapter detection failed, falling back: {e}")
+        
+        self._detect_adapters_per_adapter()
+    
+    @classmethod
+    def parse_adapter_batch(cls, output: str) -> List[NetworkAdapter]:
+        """
+        Parsear el documento JSON de BATCH_DETECTION_QUERY.
+        
+        Independiente de PowerShell: se puede verificar con salidas grabadas
+        en cualquier plataforma.
+        """
+        data = json.loads(output)
+        entries = data.get('Adapters') if isinstance(data, dict) else data
+        if entries is None:
+            raise ValueError("JSON sin clave 'Adapters'")
+        if isinstance(entries, dict):
+            entries = [entries]
+        
+        adapters: List[NetworkAdapter] = []
+        for entry in entries:
+            ipv4_list = [ip for ip in cls._as_list(entry.get('IPv4')) if ip]
+            # Preferir una dirección real a una APIPA (169.254.x.x)
+            ipv4 = next((ip for ip in ipv4_list if not ip.startswith('169.254.')),
+                        ipv4_list[0] if ipv4_list else None)
+            ipv6 = next(iter(cls._as_list(entry.get('IPv6'))), None)
+            gateway = next((gw for gw in cls._as_list(entry.get('Gateways')) if gw and gw != '0.0.0.0'), None)
+            
+            metric = entry.get('InterfaceMetric')
+            mtu = entry.get('Mtu')
+            
+            adapters.append(NetworkAdapter(
+                name=entry['Name'],
+                interface_description=entry.get('InterfaceDescription') or '',
+                status=cls._parse_status(entry.get('Status')),
+                metric=int(metric) if metric is not None else 100,
+                mac_address=entry.get('MacAddress') or '',
+                speed_mbps=cls._parse_link_speed(entry.get('LinkSpeed')),
+                mtu=int(mtu) if mtu else 1500,
+                dns_servers=[dns for dns in cls._as_list(entry.get('DNS')) if dns],
+                ipv4_address=ipv4,
+                ipv6_address=ipv6,
+                default_gateway=gateway,
+                dhcp_enabled=bool(entry.get('Dhcp', True))
+            ))
+        
+        return adapters
+    
+    @staticmethod
+    def _as_list(value) -> List:
+        """ConvertTo-Json serializa arrays de un elemento como escalar"""
+        if value is None:
+            return []
+        return value if isinstance(value, list) else [value]
+    
+    @staticmethod
+    def _parse_status(value) -> AdapterStatus:
+        """Estados desconocidos ('Not Present', 'Testing'...) cuentan como Down"""
+        try:
+            return AdapterStatus(value)
+        except ValueError:
+            return AdapterStatus.DOWN
+    
+    @staticmethod
+    def _parse_link_speed(speed_str) -> int:
+        """'1 Gbps' / '866.7 Mbps' → Mbps (default 1000)"""
+        speed_match = re.search(r'(\d+(?:\.\d+)?)\s*([GM]?bps)', speed_str or '')
+        if not speed_match:
+            return 1000
+        value = float(speed_match.group(1))
+        if speed_match.group(2) == 'Gbps':
+            return int(value * 1000)
+        return int(value)
+    
+    def _detect_adapters_per_adapter(self):
+        """Detección con una consulta por adaptador (N+1 procesos)"""
         # Obtener adaptadores con Get-NetAdapter
         cmd = """
         Get-NetAdapter | Select-Object Name, InterfaceDescription, Status, 
@@ -149,8 +288,9 @@ class AdapterManager:
             log_warning("No output from Get-NetAdapter command")
             return
         
+        adapters: List[NetworkAdapter] = []
+        
         try:
-            import json
             adapters_data = json.loads(output)
             log_info(f"Parsed {len(adapters_data) if isinstance(adapters_data, list) else 1} adapter(s)")
             
@@ -165,17 +305,7 @@ class AdapterManager:
                 ip_config = self._get_adapter_ip_config(data['Name'])
                 
                 # Parsear velocidad
-                speed_str = data.get('LinkSpeed', '0 Mbps')
-                speed_match = re.search(r'(\d+(?:\.\d+)?)\s*([GM]?bps)', speed_str)
-                if speed_match:
-                    value = float(speed_match.group(1))
-                    unit = speed_match.group(2)
-                    if unit == 'Gbps':
-                        speed_mbps = int(value * 1000)
-                    else:
-                        speed_mbps = int(value)
-                else:
-                    speed_mbps = 1000
+                speed_mbps = self._parse_link_speed(data.get('LinkSpeed', '0 Mbps'))
                 
                 # Crear adaptador
                 # Fix: Asegurar que InterfaceMetric no sea None
@@ -198,9 +328,12 @@ class AdapterManager:
                     dhcp_enabled=ip_config.get('dhcp', True)
                 )
                 
-                self.adapters.append(adapter)
+                adapters.append(adapter)
                 log_info(f"✓ Added adapter: {adapter.name} (Metric: {adapter.metric}, Speed: {adapter.speed_mbps} Mbps)")
         
+            # Reemplazo atómico: lectores concurrentes nunca ven la lista a medias
+            self.adapters = adapters
+        
         except Exception as e:
             log_error(f"Error parseando adaptadores: {e}", e)
     
@@ -226,7 +359,6 @@ class AdapterManager:
             return {'mtu': 1500, 'dns': [], 'dhcp': True}
         
         try:
-            import json
             data = json.loads(output)
             
             # Parsear DNS (puede ser string único o array)
@@ -305,19 +437,23 @@ class AdapterManager:
         
         return tiers
     
+    def _apply_powershell(self, command: str, adapter_name: str) -> bool:
+        """Ejecutar un cambio de configuración y redetectar si se aplicó"""
+        result = get_shell_runner().run(command, timeout=10)
+        if not result.ok:
+            # Sin PowerShell (Linux sin pwsh) o el cmdlet falló
+            log_warning(f"No se pudo aplicar el cambio en {adapter_name}: {result.stderr.strip()}")
+            return False
+        # Redetectar
+        self._detect_adapters()
+        return True
+    
     def set_adapter_metric(self, adapter_name: str, metric: int) -> bool:
         """Cambiar métrica de un adaptador"""
         cmd = f"""
         Set-NetIPInterface -InterfaceAlias '{adapter_name}' -InterfaceMetric {metric}
         """
-        try:
-            self._run_powershell(cmd)
-            # Redetectar
-            self._detect_adapters()
-            return True
-        except Exception:
-            # PowerShell command failed
-            return False
+        return self._apply_powershell(cmd, adapter_name)
     
     def set_dns_servers(self, adapter_name: str, dns_servers: List[str]) -> bool:
         """Configurar servidores DNS de un adaptador"""
@@ -326,22 +462,24 @@ class AdapterManager:
         cmd = f"""
         Set-DnsClientServerAddress -InterfaceAlias '{adapter_name}' -ServerAddresses {dns_list}
         """
-        try:
-            self._run_powershell(cmd)
-            # Redetectar
-            self._detect_adapters()
-            return True
-        except Exception:
-            # PowerShell command failed
-            return False
+        return self._apply_powershell(cmd, adapter_name)
     
-    def apply_dns_tier(self, tier_number: int) -> bool:
-        """Aplicar un tier de DNS al adaptador prioritario"""
+    def apply_dns_tier(self, tier_number: int, adapter_name: Optional[str] = None) -> bool:
+        """
+        Aplicar un tier de DNS a un adaptador
+        
+        Args:
+            tier_number: Tier a aplicar (1-7)
+            adapter_name: Adaptador destino (default: adaptador prioritario)
+        """
         if tier_number < 1 or tier_number > len(self.DNS_FALLBACK_TIERS):
             return False
         
-        priority_adapter = self.get_priority_adapter()
-        if not priority_adapter:
+        if adapter_name:
+            adapter = self.get_adapter_by_name(adapter_name)
+        else:
+            adapter = self.get_priority_adapter()
+        if not adapter:
             return False
         
         tier = self.DNS_FALLBACK_TIERS[tier_number - 1]
@@ -349,19 +487,13 @@ class AdapterManager:
         if tier.tier == 7:  # DHCP
             # Configurar DHCP
             cmd = f"""
-            Set-DnsClientServerAddress -InterfaceAlias '{priority_adapter.name}' -ResetServerAddresses
+            Set-DnsClientServerAddress -InterfaceAlias '{adapter.name}' -ResetServerAddresses
             """
-            try:
-                self._run_powershell(cmd)
-                self._detect_adapters()
-                return True
-            except Exception:
-                # PowerShell command failed
-                return False
+            return self._apply_powershell(cmd, adapter.name)
         else:
             # Configurar DNS estático
             return self.set_dns_servers(
-                priority_adapter.name,
+                adapter.name,
                 [tier.primary, tier.secondary]
             )
     
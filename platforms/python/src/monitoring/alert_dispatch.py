@@ -0,0 +1,268 @@
+"""
+NetBoozt - Agregación de Alertas y Entrega de Notificaciones
+Durante un corte, latencia, velocidad y DNS disparan alertas a la vez.
+Este módulo agrupa las alertas cercanas en el tiempo en un incidente y
+entrega las notificaciones desde un hilo propio con límite de tasa,
+de modo que la ruta de verificación de métricas nunca espera a la UI
+ni a las notificaciones del sistema operativo.
+
+Política por incidente:
+- Primera alerta: notificación inmediata (si hay tokens)
+- Alertas siguientes dentro de la ventana: se acumulan
+- Al cerrarse el incidente (ventana sin alertas nuevas): un resumen,
+  solo si se acumularon alertas después de la primera notificación
+
+By LOUST (www.loust.pro)
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from ..utils.logger import log_error
+except ImportError:
+    def log_error(msg): print(f"[ERROR] {msg}")
+
+
+@dataclass
+class Incident:
+    """Grupo de alertas relacionadas (misma ventana de tiempo)"""
+    incident_id: int
+    opened_at: datetime
+    alerts: List[Any] = field(default_factory=list)
+    closed: bool = False
+
+    # Estado de entrega
+    notified_count: int = 0  # Alertas incluidas en la última notificación
+
+    @property
+    def last_alert_at(self) -> datetime:
+        return self.alerts[-1].timestamp
+
+    @property
+    def severity(self):
+        """Severidad más alta del incidente"""
+        critical = [a.severity for a in self.alerts if a.severity.value == "critical"]
+        return critical[0] if critical else self.alerts[-1].severity
+
+    @property
+    def alert_types(self) -> List[str]:
+        """Tipos de alerta en orden de aparición"""
+        seen: Dict[str, None] = {}
+        for alert in self.alerts:
+            seen.setdefault(alert.alert_type.value, None)
+        return list(seen)
+
+    @property
+    def message(self) -> str:
+        """Mensaje resumen: la última alerta de cada tipo"""
+        if len(self.alerts) == 1:
+            return self.alerts[0].message
+
+        latest: Dict[str, str] = {}
+        for alert in self.alerts:
+            latest[alert.alert_type.value] = alert.message
+        return f"{len(self.alerts)} alertas relacionadas:\n" + "\n".join(latest.values())
+
+
+class TokenBucket:
+    """Limitador de tasa: `rate_per_minute` sostenido con ráfagas de `burst`"""
+
+    def __init__(self, rate_per_minute: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self) -> bool:
+        self._refill()
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        """Segundos hasta el próximo token"""
+        self._refill()
+        if self._tokens >= 1.0 or self.rate <= 0:
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+
+class AlertDispatcher:
+    """
+    Cola de entrega asíncrona.
+
+    submit() es no bloqueante y puede llamarse con el lock de AlertSystem
+    tomado; los callbacks por alerta y las notificaciones por incidente se
+    ejecutan en el hilo del dispatcher.
+    """
+
+    INCIDENT_WINDOW_SECONDS = 60     # Alertas a menos de esto se agrupan
+    NOTIFY_RATE_PER_MINUTE = 4       # Notificaciones sostenidas por minuto
+    NOTIFY_BURST = 2                 # Ráfaga permitida
+    MAX_QUEUE = 1000                 # Alertas en cola antes de descartar
+
+    def __init__(self,
+                 on_alert: Optional[Callable[[Any], None]] = None,
+                 on_incident: Optional[Callable[[Incident, bool], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            on_alert: Llamado por cada alerta (sin límite de tasa)
+            on_incident: Llamado con (incidente, es_resumen) respetando el límite
+            clock: Reloj monótono (inyectable)
+        """
+        self._on_alert = on_alert
+        self._on_incident = on_incident
+        self._clock = clock
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=self.MAX_QUEUE)
+        self._bucket = TokenBucket(self.NOTIFY_RATE_PER_MINUTE, self.NOTIFY_BURST, clock)
+
+        self._current: Optional[Incident] = None
+        self._current_deadline = 0.0
+        self._pending: Dict[int, Incident] = {}  # Incidentes con notificación pendiente
+        self._next_id = 1
+        self.incidents: List[Incident] = []
+        self.dropped = 0
+
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._running = False
+        self._idle = threading.Event()
+        self._idle.set()
+        self._unprocessed = 0  # Alertas encoladas aún no procesadas (bajo _idle_lock)
+        self._idle_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def submit(self, alert):
+        """Encolar alerta (no bloquea)"""
+        self._ensure_thread()
+        # Marcar ocupado antes de encolar: flush() no puede ver la cola
+        # vacía con la alerta ya entregada al hilo
+        with self._idle_lock:
+            self._unprocessed += 1
+            self._idle.clear()
+        try:
+            self._queue.put_nowait(alert)
+        except queue.Full:
+            self.dropped += 1
+            self._processed()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Esperar a que la cola de alertas se procese (no espera a los resúmenes)"""
+        return self._idle.wait(timeout)
+
+    def stop(self):
+        """Detener hilo de entrega"""
+        self._running = False
+        if self._thread:
+            self._queue.put(None)
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    # ------------------------------------------------------------------
+    # Hilo de entrega
+    # ------------------------------------------------------------------
+
+    def _ensure_thread(self):
+        if self._thread:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._running = True
+                self._thread = threading.Thread(target=self._run, daemon=True, name="AlertDispatcher")
+                self._thread.start()
+
+    def _run(self):
+        while self._running:
+            try:
+                alert = self._queue.get(timeout=self._next_timeout())
+            except queue.Empty:
+                alert = None
+
+            if alert is not None:
+                self._handle_alert(alert)
+
+            self._close_expired()
+            self._deliver_pending()
+
+            if alert is not None:
+                self._processed()
+
+    def _processed(self):
+        with self._idle_lock:
+            self._unprocessed -= 1
+            if self._unprocessed == 0:
+                self._idle.set()
+
+    def _next_timeout(self) -> float:
+        """Dormir hasta el cierre del incidente o el próximo token (máx 1s)"""
+        timeout = 1.0
+        now = self._clock()
+        if self._current:
+            timeout = min(timeout, max(0.0, self._current_deadline - now))
+        if self._pending:
+            timeout = min(timeout, self._bucket.wait_time())
+        return max(timeout, 0.01)
+
+    def _handle_alert(self, alert):
+        if self._on_alert:
+            try:
+                self._on_alert(alert)
+            except Exception as e:
+                log_error(f"Error en alert callback: {e}")
+
+        now = self._clock()
+        if self._current is None or now > self._current_deadline:
+            self._close_current()
+            self._current = Incident(incident_id=self._next_id, opened_at=alert.timestamp)
+            self._next_id += 1
+            self.incidents.append(self._current)
+            if len(self.incidents) > 100:
+                self.incidents.pop(0)
+            # Primera alerta del incidente: notificar en cuanto haya token
+            self._pending[self._current.incident_id] = self._current
+
+        self._current.alerts.append(alert)
+        self._current_deadline = now + self.INCIDENT_WINDOW_SECONDS
+
+    def _close_expired(self):
+        if self._current and self._clock() > self._current_deadline:
+            self._close_current()
+
+    def _close_current(self):
+        incident = self._current
+        if incident is None:
+            return
+        incident.closed = True
+        self._current = None
+        # Resumen solo si llegaron alertas después de la última notificación
+        if incident.notified_count and len(incident.alerts) > incident.notified_count:
+            self._pending[incident.incident_id] = incident
+
+    def _deliver_pending(self):
+        while self._pending and self._bucket.try_take():
+            incident_id = next(iter(self._pending))
+            incident = self._pending.pop(incident_id)
+            summary = incident.notified_count > 0
+            incident.notified_count = len(incident.alerts)
+
+            if self._on_incident:
+                try:
+                    self._on_incident(incident, summary)
+                except Exception as e:
+                    log_error(f"Error notificando incidente: {e}")
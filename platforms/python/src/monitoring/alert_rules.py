@@ -0,0 +1,326 @@
+"""
+NetBoozt - Motor de Reglas con Ventanas para Alertas
+Evalúa expresiones sobre ventanas de tiempo de forma incremental:
+valor sostenido N segundos, tasa de cambio, percentil en ventana y
+ratio entre métricas.
+
+Cada muestra cuesta O(1) amortizado por regla: las ventanas son deques
+con sumas acumuladas y los percentiles usan un histograma logarítmico
+con cursor, sin reordenar la ventana.
+
+Ejemplo: "p95 de latencia > 80ms durante 2 minutos"
+
+    AlertRule(
+        name="latency_p95_high",
+        alert_type=AlertType.LATENCY_HIGH,
+        expression=Percentile('latency_ms', 95, window_s=120),
+        op='>', threshold=80.0, for_seconds=120
+    )
+
+By LOUST (www.loust.pro)
+"""
+
+import math
+import operator
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Callable, Deque
+
+
+OPERATORS: Dict[str, Callable[[float, float], bool]] = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+}
+
+
+# ============================================================================
+# Expresiones (agregados incrementales)
+# ============================================================================
+
+class Expression:
+    """Agregado incremental sobre una o más métricas"""
+
+    metrics: Tuple[str, ...] = ()
+    label: str = ""
+
+    def update(self, metric: str, timestamp: float, value: float) -> Optional[float]:
+        """Incorporar una muestra y devolver el valor actual (None si no hay datos)"""
+        raise NotImplementedError
+
+
+class Last(Expression):
+    """Último valor (combinado con for_seconds = "sostenido N segundos")"""
+
+    def __init__(self, metric: str):
+        self.metrics = (metric,)
+        self.label = metric
+
+    def update(self, metric: str, timestamp: float, value: float) -> Optional[float]:
+        return value
+
+
+class RateOfChange(Expression):
+    """Tasa de cambio (unidades/segundo) entre la muestra más antigua y la actual de la ventana"""
+
+    def __init__(self, metric: str, window_s: float):
+        self.metrics = (metric,)
+        self.window_s = window_s
+        self.label = f"Δ{metric}/s ({window_s:.0f}s)"
+        self._samples: Deque[Tuple[float, float]] = deque()
+
+    def update(self, metric: str, timestamp: float, value: float) -> Optional[float]:
+        samples = self._samples
+        samples.append((timestamp, value))
+        cutoff = timestamp - self.window_s
+        # Conservar una muestra en o antes del inicio de la ventana como base
+        while len(samples) > 1 and samples[1][0] <= cutoff:
+            samples.popleft()
+
+        first_ts, first_value = samples[0]
+        elapsed = timestamp - first_ts
+        if elapsed <= 0:
+            return None
+        return (value - first_value) / elapsed
+
+
+class WindowMean(Expression):
+    """Media móvil en ventana de tiempo"""
+
+    def __init__(self, metric: str, window_s: float):
+        self.metrics = (metric,)
+        self.window_s = window_s
+        self.label = f"avg({metric}, {window_s:.0f}s)"
+        self._samples: Deque[Tuple[float, float]] = deque()
+        self._sum = 0.0
+
+    def update(self, metric: str, timestamp: float, value: float) -> Optional[float]:
+        self._samples.append((timestamp, value))
+        self._sum += value
+        cutoff = timestamp - self.window_s
+        while self._samples[0][0] < cutoff:
+            self._sum -= self._samples.popleft()[1]
+        return self._sum / len(self._samples)
+
+
+class _SlidingLogHistogram:
+    """
+    Histograma de bins logarítmicos con cursor de cuantil.
+
+    Insertar/eliminar es O(1); mover el cursor al cuantil es O(1)
+    amortizado porque solo se desplaza lo que cambió el rango objetivo.
+    Resolución: ~growth-1 (10% por defecto) del valor.
+    """
+
+    def __init__(self, quantile: float, min_value: float = 0.1, max_value: float = 1e6, growth: float = 1.1):
+        self.quantile = quantile
+        self.min_value = min_value
+        self._log_min = math.log(min_value)
+        self._log_growth = math.log(growth)
+        self._growth = growth
+        self.n_bins = int(math.ceil(math.log(max_value / min_value) / self._log_growth)) + 2
+        self.counts = [0] * self.n_bins
+        self.total = 0
+
+        # Cursor: bin del cuantil y cantidad de muestras en bins inferiores
+        self._cursor = 0
+        self._below = 0
+
+    def bin_of(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        index = int((math.log(value) - self._log_min) / self._log_growth) + 1
+        return min(index, self.n_bins - 1)
+
+    def bin_value(self, index: int) -> float:
+        """Límite superior del bin (estimación conservadora)"""
+        return self.min_value * self._growth ** index
+
+    def add(self, index: int):
+        self.counts[index] += 1
+        self.total += 1
+        if index < self._cursor:
+            self._below += 1
+
+    def remove(self, index: int):
+        self.counts[index] -= 1
+        self.total -= 1
+        if index < self._cursor:
+            self._below -= 1
+
+    def value(self) -> Optional[float]:
+        if self.total == 0:
+            return None
+
+        rank = max(1, math.ceil(self.quantile * self.total))
+        counts = self.counts
+        # Avanzar mientras el bin actual no alcance el rango
+        while self._below + counts[self._cursor] < rank:
+            self._below += counts[self._cursor]
+            self._cursor += 1
+        # Retroceder mientras los bins inferiores ya lo alcancen
+        while self._cursor > 0 and self._below >= rank:
+            self._cursor -= 1
+            self._below -= counts[self._cursor]
+
+        return self.bin_value(self._cursor)
+
+
+class Percentile(Expression):
+    """Percentil en ventana de tiempo (histograma logarítmico, ~10% de resolución)"""
+
+    def __init__(self, metric: str, percentile: float, window_s: float):
+        self.metrics = (metric,)
+        self.percentile = percentile
+        self.window_s = window_s
+        self.label = f"p{percentile:g}({metric}, {window_s:.0f}s)"
+        self._histogram = _SlidingLogHistogram(percentile / 100.0)
+        self._samples: Deque[Tuple[float, int]] = deque()
+
+    def update(self, metric: str, timestamp: float, value: float) -> Optional[float]:
+        histogram = self._histogram
+        index = histogram.bin_of(value)
+        histogram.add(index)
+        self._samples.append((timestamp, index))
+
+        cutoff = timestamp - self.window_s
+        while self._samples[0][0] < cutoff:
+            histogram.remove(self._samples.popleft()[1])
+
+        return histogram.value()
+
+
+class Ratio(Expression):
+    """Ratio entre las medias en ventana de dos métricas (numerador / denominador)"""
+
+    def __init__(self, numerator: str, denominator: str, window_s: float = 0.0):
+        self.metrics = (numerator, denominator)
+        self.numerator = numerator
+        self.denominator = denominator
+        self.label = f"{numerator}/{denominator}"
+        # window_s=0: últimos valores
+        self._num = WindowMean(numerator, window_s)
+        self._den = WindowMean(denominator, window_s)
+        self._num_value: Optional[float] = None
+        self._den_value: Optional[float] = None
+
+    def update(self, metric: str, timestamp: float, value: float) -> Optional[float]:
+        if metric == self.numerator:
+            self._num_value = self._num.update(metric, timestamp, value)
+        if metric == self.denominator:
+            self._den_value = self._den.update(metric, timestamp, value)
+
+        if self._num_value is None or not self._den_value:
+            return None
+        return self._num_value / self._den_value
+
+
+# ============================================================================
+# Reglas
+# ============================================================================
+
+@dataclass
+class AlertRule:
+    """
+    Regla: expresión <op> threshold, sostenida al menos for_seconds.
+
+    alert_type/severity son los de AlertSystem (AlertType/AlertSeverity);
+    si severity es None se usa la del threshold configurado para ese tipo.
+    """
+    name: str
+    alert_type: object              # AlertType
+    expression: Expression
+    op: str
+    threshold: float
+    for_seconds: float = 0.0
+    severity: object = None         # AlertSeverity
+    message: Optional[str] = None   # Formato con {value}, {threshold}, {for_seconds}
+    enabled: bool = True
+
+    # Estado de evaluación
+    pending_since: Optional[float] = field(default=None, repr=False)
+    firing: bool = field(default=False, repr=False)
+    last_value: Optional[float] = field(default=None, repr=False)
+
+    def __post_init__(self):
+        if self.op not in OPERATORS:
+            raise ValueError(f"Operador no soportado: {self.op}")
+        self._compare = OPERATORS[self.op]
+
+    def evaluate(self, metric: str, timestamp: float, value: float) -> Optional[str]:
+        """
+        Incorporar muestra y avanzar la máquina de estados.
+
+        Returns:
+            "fire" al cumplirse la condición durante for_seconds,
+            "clear" cuando deja de cumplirse estando activa, o None
+        """
+        current = self.expression.update(metric, timestamp, value)
+        self.last_value = current
+
+        if current is None or not self._compare(current, self.threshold):
+            self.pending_since = None
+            if self.firing:
+                self.firing = False
+                return "clear"
+            return None
+
+        if self.pending_since is None:
+            self.pending_since = timestamp
+
+        if not self.firing and timestamp - self.pending_since >= self.for_seconds:
+            self.firing = True
+            return "fire"
+
+        return None
+
+    def format_message(self) -> str:
+        """Mensaje legible del disparo actual"""
+        value = self.last_value if self.last_value is not None else float('nan')
+        if self.message:
+            return self.message.format(value=value, threshold=self.threshold, for_seconds=self.for_seconds)
+
+        sustained = f" durante {self.for_seconds:.0f}s" if self.for_seconds else ""
+        return f"{self.expression.label} = {value:.1f} {self.op} {self.threshold:.1f}{sustained}"
+
+
+class RuleEngine:
+    """Índice métrica → reglas; cada muestra solo toca las reglas que la usan"""
+
+    def __init__(self):
+        self.rules: Dict[str, AlertRule] = {}
+        self._by_metric: Dict[str, List[AlertRule]] = {}
+
+    def add_rule(self, rule: AlertRule):
+        """Añadir (o reemplazar) regla"""
+        if rule.name in self.rules:
+            self.remove_rule(rule.name)
+
+        self.rules[rule.name] = rule
+        for metric in rule.expression.metrics:
+            self._by_metric.setdefault(metric, []).append(rule)
+
+    def remove_rule(self, name: str) -> Optional[AlertRule]:
+        """Eliminar regla por nombre"""
+        rule = self.rules.pop(name, None)
+        if rule:
+            for metric in rule.expression.metrics:
+                self._by_metric[metric].remove(rule)
+        return rule
+
+    def record(self, metric: str, timestamp: float, value: float) -> List[Tuple[AlertRule, str]]:
+        """
+        Procesar una muestra.
+
+        Returns:
+            Lista de (regla, "fire" | "clear") con transiciones
+        """
+        transitions = []
+        for rule in self._by_metric.get(metric, ()):
+            if not rule.enabled:
+                continue
+            transition = rule.evaluate(metric, timestamp, value)
+            if transition:
+                transitions.append((rule, transition))
+        return transitions
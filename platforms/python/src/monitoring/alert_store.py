@@ -0,0 +1,380 @@
+"""
+NetBoozt - Almacén Indexado de Alertas
+Historial acotado de alertas con índices para las consultas del GUI:
+
+- Anillo ordenado por tiempo: consultas de ventana reciente por bisección
+- Mapa de alertas activas por tipo y por regla: O(1) al resolver
+- Índice de alertas retenidas por tipo
+- Contadores de estadísticas mantenidos al insertar/resolver/expirar
+- Journal JSONL en disco, escrito desde un hilo propio: el historial
+  sobrevive reinicios sin hacer I/O con el lock de AlertSystem tomado
+
+By LOUST (www.loust.pro)
+"""
+
+import json
+import os
+import queue
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from ..utils.logger import log_warning
+except ImportError:
+    def log_warning(msg): print(f"[WARN] {msg}")
+
+
+class AlertStore:
+    """
+    Historial de alertas indexado.
+
+    Las alertas son objetos con alert_id, alert_type, severity, timestamp,
+    resolved, resolved_at y rule_name (ver Alert en alert_system). El store
+    asigna alert_id al insertar; la resolución debe pasar por resolve() para
+    mantener los índices.
+
+    El journal registra una línea por alta y por resolución; se compacta
+    reescribiendo el anillo cuando crece al doble de la capacidad. Las
+    escrituras se encolan (add/resolve no bloquean) y las hace el hilo
+    escritor en orden; flush() espera a que terminen.
+    """
+
+    JOURNAL_COMPACT_FACTOR = 2
+
+    def __init__(self, capacity: int = 1000,
+                 journal_path: Optional[Path] = None,
+                 to_dict: Optional[Callable[[Any], Dict]] = None,
+                 from_dict: Optional[Callable[[Dict], Any]] = None):
+        self.capacity = capacity
+        self.journal_path = Path(journal_path) if journal_path else None
+        self._to_dict = to_dict
+        self._from_dict = from_dict
+
+        # Anillo: listas paralelas con inicio lógico (compactación amortizada)
+        self._alerts: List[Any] = []
+        self._times: List[float] = []   # Clave monótona para bisect
+        self._ids: List[int] = []
+        self._start = 0
+        self._next_id = 1
+
+        # Índices (dicts conservan orden de inserción)
+        self._active_by_type: Dict[Any, Dict[int, Any]] = {}
+        self._active_by_rule: Dict[str, Dict[int, Any]] = {}
+        self._retained_by_type: Dict[Any, Dict[int, Any]] = {}
+        self._by_id: Dict[int, Any] = {}
+
+        # Contadores
+        self._active_count = 0
+        self._by_type: Dict[str, int] = {}
+        self._by_severity: Dict[str, int] = {}
+
+        # Hilo escritor del journal
+        self._writes: "queue.Queue[Any]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._pending_writes = 0
+        self._writes_done = threading.Event()
+        self._writes_done.set()
+
+        self._journal_lines = 0
+        if self.journal_path:
+            self._load()
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def add(self, alert) -> int:
+        """Insertar alerta; devuelve su id"""
+        alert_id = self._insert(alert, self._next_id)
+        self._journal({'op': 'add', 'id': alert_id, 'alert': self._to_dict(alert)} if self._to_dict else None)
+        return alert_id
+
+    def resolve(self, alert, resolved_at: Optional[datetime] = None) -> bool:
+        """Marcar alerta como resuelta; False si ya lo estaba"""
+        # Por id estable: también vale una copia de la alerta (ej: desde la UI)
+        alert = self._by_id.get(alert.alert_id, alert)
+        if alert.resolved:
+            return False
+
+        alert.resolved = True
+        alert.resolved_at = resolved_at or datetime.now()
+
+        alert_id = alert.alert_id
+        if alert_id in self._by_id:
+            self._deactivate(alert_id, alert)
+            self._journal({'op': 'resolve', 'id': alert_id, 'at': alert.resolved_at.isoformat()})
+        return True
+
+    def resolve_latest(self, alert_type=None, rule_name: Optional[str] = None,
+                       resolved_at: Optional[datetime] = None):
+        """
+        Resolver la alerta activa más reciente de una regla, o la más reciente
+        de un tipo que no provenga de una regla. Devuelve la alerta o None.
+        """
+        if rule_name is not None:
+            candidates = self._active_by_rule.get(rule_name)
+        else:
+            candidates = self._active_by_type.get(alert_type)
+
+        if not candidates:
+            return None
+
+        for alert in reversed(list(candidates.values())):
+            if rule_name is not None or alert.rule_name is None:
+                self.resolve(alert, resolved_at)
+                return alert
+        return None
+
+    def clear(self):
+        """Vaciar historial e índices (incluido el journal)"""
+        self._alerts.clear()
+        self._times.clear()
+        self._ids.clear()
+        self._start = 0
+        self._active_by_type.clear()
+        self._active_by_rule.clear()
+        self._retained_by_type.clear()
+        self._by_id.clear()
+        self._active_count = 0
+        self._by_type.clear()
+        self._by_severity.clear()
+        if self.journal_path:
+            self._schedule_rewrite()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Esperar a que el journal tenga todas las escrituras encoladas"""
+        return self._writes_done.wait(timeout)
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._alerts) - self._start
+
+    def all(self) -> List[Any]:
+        """Alertas retenidas, de la más antigua a la más reciente"""
+        return self._alerts[self._start:]
+
+    def active(self) -> List[Any]:
+        """Alertas no resueltas en orden de llegada"""
+        active = [item for alerts in self._active_by_type.values() for item in alerts.items()]
+        active.sort(key=lambda item: item[0])
+        return [alert for _, alert in active]
+
+    def active_by_type(self, alert_type) -> List[Any]:
+        """Alertas no resueltas de un tipo"""
+        return list(self._active_by_type.get(alert_type, {}).values())
+
+    def by_type(self, alert_type) -> List[Any]:
+        """Todas las alertas retenidas de un tipo"""
+        return list(self._retained_by_type.get(alert_type, {}).values())
+
+    def since(self, cutoff: datetime) -> List[Any]:
+        """Alertas con timestamp >= cutoff (bisección sobre el anillo)"""
+        index = bisect_left(self._times, cutoff.timestamp(), lo=self._start)
+        return self._alerts[index:]
+
+    def stats(self) -> Dict:
+        """Estadísticas mantenidas incrementalmente"""
+        total = len(self)
+        return {
+            'total_alerts': total,
+            'active_alerts': self._active_count,
+            'resolved_alerts': total - self._active_count,
+            'by_type': {k: v for k, v in self._by_type.items() if v},
+            'by_severity': {k: v for k, v in self._by_severity.items() if v}
+        }
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _insert(self, alert, alert_id: int) -> int:
+        self._next_id = max(self._next_id, alert_id + 1)
+
+        # Las alertas de reglas llevan el timestamp de la muestra: forzar
+        # una clave monótona para que la bisección siga siendo válida
+        key = alert.timestamp.timestamp()
+        if len(self) and key < self._times[-1]:
+            key = self._times[-1]
+
+        self._alerts.append(alert)
+        self._times.append(key)
+        self._ids.append(alert_id)
+        alert.alert_id = alert_id
+        self._by_id[alert_id] = alert
+        self._retained_by_type.setdefault(alert.alert_type, {})[alert_id] = alert
+
+        type_key = alert.alert_type.value
+        sev_key = alert.severity.value
+        self._by_type[type_key] = self._by_type.get(type_key, 0) + 1
+        self._by_severity[sev_key] = self._by_severity.get(sev_key, 0) + 1
+
+        if not alert.resolved:
+            self._active_by_type.setdefault(alert.alert_type, {})[alert_id] = alert
+            if alert.rule_name:
+                self._active_by_rule.setdefault(alert.rule_name, {})[alert_id] = alert
+            self._active_count += 1
+
+        while len(self) > self.capacity:
+            self._evict_oldest()
+
+        return alert_id
+
+    def _deactivate(self, alert_id: int, alert):
+        active = self._active_by_type.get(alert.alert_type)
+        if active and active.pop(alert_id, None) is not None:
+            self._active_count -= 1
+        if alert.rule_name:
+            by_rule = self._active_by_rule.get(alert.rule_name)
+            if by_rule:
+                by_rule.pop(alert_id, None)
+
+    def _evict_oldest(self):
+        alert = self._alerts[self._start]
+        alert_id = self._ids[self._start]
+        self._start += 1
+
+        if not alert.resolved:
+            self._deactivate(alert_id, alert)
+        self._by_type[alert.alert_type.value] -= 1
+        self._by_severity[alert.severity.value] -= 1
+        del self._by_id[alert_id]
+        del self._retained_by_type[alert.alert_type][alert_id]
+
+        # Compactar cuando la parte muerta supera la capacidad
+        if self._start > self.capacity:
+            del self._alerts[:self._start]
+            del self._times[:self._start]
+            del self._ids[:self._start]
+            self._start = 0
+
+    def _journal(self, record: Optional[Dict]):
+        if not self.journal_path or record is None:
+            return
+
+        self._journal_lines += 1
+        if self._journal_lines > self.capacity * self.JOURNAL_COMPACT_FACTOR:
+            self._schedule_rewrite()
+        else:
+            self._enqueue_write(('append', [record]))
+
+    def _snapshot_records(self) -> List[Dict]:
+        """Registros 'add' del contenido actual del anillo"""
+        return [
+            {'op': 'add', 'id': alert_id, 'alert': self._to_dict(alert)}
+            for alert_id, alert in zip(self._ids[self._start:], self.all())
+        ]
+
+    def _schedule_rewrite(self):
+        """Encolar la compactación con una copia del anillo actual"""
+        if not self._to_dict:
+            return
+        records = self._snapshot_records()
+        self._journal_lines = len(records)
+        self._enqueue_write(('rewrite', records))
+
+    # ------------------------------------------------------------------
+    # Hilo escritor
+    # ------------------------------------------------------------------
+
+    def _enqueue_write(self, job):
+        with self._writer_lock:
+            self._pending_writes += 1
+            self._writes_done.clear()
+            self._writes.put(job)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, daemon=True, name="AlertJournal")
+                self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            jobs = []
+            try:
+                jobs.append(self._writes.get(timeout=1.0))
+                while True:
+                    jobs.append(self._writes.get_nowait())
+            except queue.Empty:
+                pass
+
+            if not jobs:
+                # Salir solo si nadie encoló entre el timeout y el lock
+                with self._writer_lock:
+                    if self._writes.empty():
+                        self._writer = None
+                        return
+                continue
+
+            # Agrupar appends consecutivos en una sola apertura del archivo
+            pending: List[Dict] = []
+            for kind, records in jobs:
+                if kind == 'append':
+                    pending.extend(records)
+                    continue
+                self._append_lines(pending)
+                pending = []
+                self._write_file(records)
+            self._append_lines(pending)
+
+            with self._writer_lock:
+                self._pending_writes -= len(jobs)
+                if not self._pending_writes:
+                    self._writes_done.set()
+
+    def _append_lines(self, records: List[Dict]):
+        if not records:
+            return
+        try:
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records))
+        except OSError as e:
+            log_warning(f"No se pudo escribir journal de alertas: {e}")
+
+    def _write_file(self, records: List[Dict]):
+        """Reescribir el journal completo (atómico)"""
+        tmp_path = self.journal_path.with_suffix('.tmp')
+        try:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records))
+            os.replace(tmp_path, self.journal_path)
+        except OSError as e:
+            log_warning(f"No se pudo compactar journal de alertas: {e}")
+
+    def _load(self):
+        """Reconstruir anillo e índices reproduciendo el journal"""
+        if not self._from_dict or not self.journal_path.exists():
+            return
+
+        lines = 0
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        record = json.loads(line)
+                        if record['op'] == 'add':
+                            self._insert(self._from_dict(record['alert']), record['id'])
+                        elif record['op'] == 'resolve':
+                            alert = self._by_id.get(record['id'])
+                            if alert is not None and not alert.resolved:
+                                alert.resolved = True
+                                alert.resolved_at = datetime.fromisoformat(record['at'])
+                                self._deactivate(record['id'], alert)
+                    except (ValueError, KeyError, TypeError):
+                        # Línea truncada (cierre abrupto): ignorar
+                        continue
+        except OSError as e:
+            log_warning(f"No se pudo leer journal de alertas: {e}")
+
+        self._journal_lines = lines
+        if lines > self.capacity * self.JOURNAL_COMPACT_FACTOR and self._to_dict:
+            # En el constructor no hay lock que proteger: compactar en línea
+            records = self._snapshot_records()
+            self._write_file(records)
+            self._journal_lines = len(records)
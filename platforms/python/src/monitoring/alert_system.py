@@ -6,12 +6,18 @@ By LOUST (www.loust.pro)
 """
 
 from typing import Dict, List, Callable, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, replace
 from datetime import datetime, timedelta
 from enum import Enum
+from pathlib import Path
 import threading
 import time
 
+from .alert_rules import AlertRule, RuleEngine, Percentile, WindowMean
+from .alert_store import AlertStore
+from .alert_dispatch import AlertDispatcher, Incident
+from .anomaly_detector import AnomalyDetector
+
 try:
     from ..utils.logger import log_info, log_warning, log_error
     from ..utils.notifications import get_notification_manager
@@ -60,11 +66,61 @@ class Alert:
     threshold_value: float
     resolved: bool = False
     resolved_at: Optional[datetime] = None
+    rule_name: Optional[str] = None  # Regla con ventana que la disparó (si aplica)
+    alert_id: Optional[int] = None   # Id estable asignado por AlertStore
+    
+    def to_dict(self) -> Dict:
+        """Serializar para el journal de alertas"""
+        data = asdict(self)
+        data['alert_type'] = self.alert_type.value
+        data['severity'] = self.severity.value
+        data['timestamp'] = self.timestamp.isoformat()
+        data['resolved_at'] = self.resolved_at.isoformat() if self.resolved_at else None
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Alert':
+        """Reconstruir desde el journal de alertas"""
+        data = dict(data)
+        data['alert_type'] = AlertType(data['alert_type'])
+        data['severity'] = AlertSeverity(data['severity'])
+        data['timestamp'] = datetime.fromisoformat(data['timestamp'])
+        if data.get('resolved_at'):
+            data['resolved_at'] = datetime.fromisoformat(data['resolved_at'])
+        return cls(**data)
 
 
 class AlertSystem:
     """Sistema de alertas configurable"""
     
+    # Tipo de alerta para anomalías por métrica
+    ANOMALY_ALERT_TYPES = {
+        'latency_ms': AlertType.LATENCY_HIGH,
+        'jitter_ms': AlertType.LATENCY_HIGH,
+        'packet_loss': AlertType.PACKET_LOSS_HIGH,
+        'download_mbps': AlertType.SPEED_LOW,
+        'upload_mbps': AlertType.SPEED_LOW,
+    }
+    BASELINE_SAVE_INTERVAL = 600  # Segundos entre guardados de líneas base
+    
+    # Thresholds configurables evaluados como reglas con ventana:
+    # tipo → (métrica, operador, ventana en s, mensaje). La media de la
+    # ventana debe cruzar el límite durante toda la ventana
+    THRESHOLD_RULES = {
+        AlertType.LATENCY_HIGH: (
+            'latency_ms', '>', 30,
+            "Latencia alta: {value:.1f}ms (límite: {threshold:.1f}ms)"
+        ),
+        AlertType.PACKET_LOSS_HIGH: (
+            'packet_loss', '>', 60,
+            "Pérdida de paquetes: {value:.1f}% (límite: {threshold:.1f}%)"
+        ),
+        AlertType.SPEED_LOW: (
+            'download_mbps', '<', 60,
+            "Velocidad baja: {value:.1f} Mbps (mínimo: {threshold:.1f} Mbps)"
+        ),
+    }
+    
     DEFAULT_THRESHOLDS = {
         AlertType.LATENCY_HIGH: AlertThreshold(
             alert_type=AlertType.LATENCY_HIGH,
@@ -104,16 +160,229 @@ class AlertSystem:
         )
     }
     
-    def __init__(self):
-        self.thresholds: Dict[AlertType, AlertThreshold] = self.DEFAULT_THRESHOLDS.copy()
-        self.alerts_history: List[Alert] = []
+    def __init__(self, data_dir: Optional[Path] = None, persist: bool = True):
+        """
+        Args:
+            data_dir: Directorio del journal de alertas (default: ~/.netboozt)
+            persist: False para mantener el historial solo en memoria
+        """
+        # Copia por instancia: set_threshold no modifica los valores por defecto
+        self.thresholds: Dict[AlertType, AlertThreshold] = {
+            alert_type: replace(threshold) for alert_type, threshold in self.DEFAULT_THRESHOLDS.items()
+        }
         self.last_alert_time: Dict[AlertType, datetime] = {}
         self._callbacks: List[Callable] = []
+        self._incident_callbacks: List[Callable] = []
         self._lock = threading.Lock()
         
+        # Entrega asíncrona: agrupa alertas en incidentes y limita notificaciones
+        self.dispatcher = AlertDispatcher(
+            on_alert=self._deliver_alert,
+            on_incident=self._deliver_incident
+        )
+        
         # Configuración
         self.max_history_size = 1000
         self.auto_resolve_after_minutes = 30
+        
+        # Historial indexado (persistido como journal JSONL)
+        journal_path = None
+        self._baselines_path: Optional[Path] = None
+        if persist:
+            data_dir = data_dir or Path.home() / ".netboozt"
+            try:
+                data_dir.mkdir(parents=True, exist_ok=True)
+                journal_path = data_dir / "alerts.jsonl"
+                self._baselines_path = data_dir / "alert_baselines.json"
+            except OSError as e:
+                log_warning(f"Historial de alertas solo en memoria: {e}")
+        
+        self.store = AlertStore(
+            capacity=self.max_history_size,
+            journal_path=journal_path,
+            to_dict=Alert.to_dict,
+            from_dict=Alert.from_dict
+        )
+        
+        # Reglas con ventanas (evaluación incremental por muestra)
+        self.rule_engine = RuleEngine()
+        self._rule_last_fired: Dict[str, datetime] = {}
+        for rule in self.default_rules():
+            self.rule_engine.add_rule(rule)
+        for alert_type in self.THRESHOLD_RULES:
+            self.rule_engine.add_rule(self._threshold_rule(alert_type))
+        
+        # Anomalías respecto a la línea base aprendida (por métrica y adaptador)
+        self.anomaly_detector = AnomalyDetector()
+        self.anomaly_detection_enabled = True
+        self._baselines_saved_at = time.time()
+        self._baselines_write_lock = threading.Lock()  # Escrituras fuera de _lock
+        if self._baselines_path:
+            self.anomaly_detector.load(self._baselines_path)
+        
+        # Restaurar cooldowns desde el historial cargado
+        for alert in self.store.all():
+            if alert.rule_name:
+                self._rule_last_fired[alert.rule_name] = alert.timestamp
+            else:
+                self.last_alert_time[alert.alert_type] = alert.timestamp
+    
+    @property
+    def alerts_history(self) -> List[Alert]:
+        """Historial retenido (copia, de más antigua a más reciente)"""
+        return self.store.all()
+    
+    @staticmethod
+    def default_rules() -> List[AlertRule]:
+        """Reglas por defecto: ignoran picos aislados"""
+        return [
+            AlertRule(
+                name="latency_p95_high",
+                alert_type=AlertType.LATENCY_HIGH,
+                expression=Percentile('latency_ms', 95, window_s=120),
+                op='>',
+                threshold=80.0,
+                for_seconds=120,
+                message="Latencia p95 alta: {value:.1f}ms (límite: {threshold:.1f}ms durante {for_seconds:.0f}s)"
+            ),
+        ]
+    
+    @staticmethod
+    def threshold_rule_name(alert_type: AlertType) -> str:
+        """Nombre de la regla que evalúa el threshold de un tipo"""
+        return f"threshold:{alert_type.value}"
+    
+    def _threshold_rule(self, alert_type: AlertType) -> AlertRule:
+        """Regla con ventana para un threshold configurable"""
+        metric, op, window_s, message = self.THRESHOLD_RULES[alert_type]
+        return AlertRule(
+            name=self.threshold_rule_name(alert_type),
+            alert_type=alert_type,
+            expression=WindowMean(metric, window_s),
+            op=op,
+            threshold=self.thresholds[alert_type].threshold_value,
+            for_seconds=window_s,
+            message=message
+        )
+    
+    def add_rule(self, rule: AlertRule):
+        """Añadir (o reemplazar) una regla con ventana"""
+        with self._lock:
+            self.rule_engine.add_rule(rule)
+            log_info(f"Regla de alerta añadida: {rule.name}")
+    
+    def remove_rule(self, name: str):
+        """Eliminar regla con ventana por nombre"""
+        with self._lock:
+            self.rule_engine.remove_rule(name)
+    
+    def record_sample(self, metric: str, value: float, timestamp: Optional[float] = None,
+                      adapter: Optional[str] = None) -> List[Alert]:
+        """
+        Registrar una muestra de métrica y evaluar las reglas que la usan
+        y su línea base aprendida.
+        
+        Args:
+            metric: Nombre de la métrica (ej: 'latency_ms', 'download_mbps')
+            value: Valor medido
+            timestamp: Epoch en segundos (default: ahora)
+            adapter: Adaptador de la muestra (líneas base separadas por adaptador)
+        
+        Returns:
+            Alertas disparadas por esta muestra
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        now = datetime.fromtimestamp(timestamp)
+        triggered = []
+        baselines = None
+        
+        with self._lock:
+            for rule, transition in self.rule_engine.record(metric, timestamp, value):
+                if transition == "clear":
+                    self._resolve_rule_alert(rule.name)
+                    continue
+                
+                alert = self._raise_alert(
+                    rule.name, rule.alert_type, rule.severity,
+                    rule.format_message(), rule.last_value, rule.threshold, now
+                )
+                if alert:
+                    triggered.append(alert)
+            
+            alert_type = self.ANOMALY_ALERT_TYPES.get(metric)
+            if self.anomaly_detection_enabled and alert_type:
+                alert = self._check_anomaly(metric, value, timestamp, adapter or "default", alert_type, now)
+                if alert:
+                    triggered.append(alert)
+                
+                # Copia bajo el lock; el disco se escribe sin bloquear a otros hilos
+                if self._baselines_path and timestamp - self._baselines_saved_at >= self.BASELINE_SAVE_INTERVAL:
+                    self._baselines_saved_at = timestamp
+                    baselines = self.anomaly_detector.snapshot()
+        
+        if baselines is not None:
+            with self._baselines_write_lock:
+                AnomalyDetector.write_snapshot(baselines, self._baselines_path)
+        
+        return triggered
+    
+    def _check_anomaly(self, metric: str, value: float, timestamp: float, adapter: str,
+                       alert_type: AlertType, now: datetime) -> Optional[Alert]:
+        """Evaluar muestra contra la línea base y disparar/resolver su alerta"""
+        detector = self.anomaly_detector
+        transition = detector.record(metric, value, timestamp, adapter)
+        name = f"anomaly:{metric}:{adapter}"
+        alert = None
+        
+        if transition == "fire":
+            expected = detector.expected(metric, adapter, timestamp)
+            alert = self._raise_alert(
+                name, alert_type, AlertSeverity.WARNING,
+                detector.describe(metric, value, adapter, timestamp),
+                value, expected[0] if expected else 0.0, now
+            )
+        elif transition == "clear":
+            self._resolve_rule_alert(name)
+        
+        return alert
+    
+    def _raise_alert(self, name: str, alert_type: AlertType, severity: Optional[AlertSeverity],
+                     message: str, value: float, threshold_value: float, now: datetime) -> Optional[Alert]:
+        """Crear alerta para una regla (o línea base) que pasó a activa"""
+        threshold = self.thresholds.get(alert_type)
+        
+        # Los tipos deshabilitados silencian también sus reglas
+        if threshold and not threshold.enabled:
+            return None
+        
+        # Cooldown por regla (el del tipo de alerta)
+        cooldown_minutes = threshold.cooldown_minutes if threshold else 5
+        last = self._rule_last_fired.get(name)
+        if last and now - last < timedelta(minutes=cooldown_minutes):
+            return None
+        
+        alert = Alert(
+            alert_type=alert_type,
+            severity=severity or (threshold.severity if threshold else AlertSeverity.WARNING),
+            timestamp=now,
+            message=message,
+            current_value=value,
+            threshold_value=threshold_value,
+            rule_name=name
+        )
+        
+        self.store.add(alert)
+        self._rule_last_fired[name] = now
+        
+        self._notify_alert(alert)
+        log_warning(f"Alerta disparada: {alert.message}")
+        
+        return alert
+    
+    def _resolve_rule_alert(self, name: str):
+        """Resolver la alerta activa de una regla cuando su condición deja de cumplirse"""
+        if self.store.resolve_latest(rule_name=name):
+            log_info(f"Alerta auto-resuelta: {name}")
     
     def set_threshold(self, alert_type: AlertType, threshold_value: float, 
                      severity: AlertSeverity = None, cooldown_minutes: int = None):
@@ -128,6 +397,11 @@ class AlertSystem:
                 if cooldown_minutes is not None:
                     threshold.cooldown_minutes = cooldown_minutes
                 
+                # La regla conserva su ventana; el próximo valor se compara con el límite nuevo
+                rule = self.rule_engine.rules.get(self.threshold_rule_name(alert_type))
+                if rule:
+                    rule.threshold = threshold_value
+                
                 log_info(f"Threshold actualizado: {alert_type.value} = {threshold_value}")
     
     def enable_alert(self, alert_type: AlertType, enabled: bool = True):
@@ -150,8 +424,13 @@ class AlertSystem:
             if not threshold.enabled:
                 return None
             
-            # Verificar si supera threshold
-            if current_value <= threshold.threshold_value:
+            # Verificar si supera threshold (SPEED_LOW es un mínimo)
+            spec = self.THRESHOLD_RULES.get(alert_type)
+            if spec and spec[1] == '<':
+                exceeded = current_value < threshold.threshold_value
+            else:
+                exceeded = current_value > threshold.threshold_value
+            if not exceeded:
                 # Valor OK - resolver alerta si existe
                 self._auto_resolve_alert(alert_type)
                 return None
@@ -171,8 +450,7 @@ class AlertSystem:
             )
             
             # Guardar en historial
-            self.alerts_history.append(alert)
-            self._trim_history()
+            self.store.add(alert)
             
             # Actualizar último trigger
             self.last_alert_time[alert_type] = alert.timestamp
@@ -197,14 +475,8 @@ class AlertSystem:
     
     def _auto_resolve_alert(self, alert_type: AlertType):
         """Auto-resolver alerta cuando valor vuelve a la normalidad"""
-        now = datetime.now()
-        
-        for alert in reversed(self.alerts_history):
-            if alert.alert_type == alert_type and not alert.resolved:
-                alert.resolved = True
-                alert.resolved_at = now
-                log_info(f"Alerta auto-resuelta: {alert_type.value}")
-                break
+        if self.store.resolve_latest(alert_type=alert_type):
+            log_info(f"Alerta auto-resuelta: {alert_type.value}")
     
     def _generate_message(self, alert_type: AlertType, current: float, threshold: float) -> str:
         """Generar mensaje de alerta"""
@@ -220,91 +492,90 @@ class AlertSystem:
         return messages.get(alert_type, f"{alert_type.value}: {current} > {threshold}")
     
     def _notify_alert(self, alert: Alert):
-        """Enviar notificación de alerta"""
+        """Encolar alerta para entrega (no bloquea; se llama con el lock tomado)"""
+        self.dispatcher.submit(alert)
+    
+    def _deliver_alert(self, alert: Alert):
+        """Callbacks por alerta (hilo del dispatcher, fuera del lock)"""
+        for callback in list(self._callbacks):
+            try:
+                callback(alert)
+            except Exception as e:
+                log_error(f"Error en alert callback: {e}")
+    
+    def _deliver_incident(self, incident: Incident, summary: bool):
+        """Notificación por incidente (hilo del dispatcher, con límite de tasa)"""
         # Notificación del sistema
         if get_notification_manager:
             notif = get_notification_manager()
             if notif:
-                icon = "🔴" if alert.severity == AlertSeverity.CRITICAL else "⚠️"
                 notif.notify_alert(
-                    alert_type=alert.alert_type.value,
-                    details=alert.message
+                    alert_type=incident.alert_types[0],
+                    details=incident.message
                 )
         
-        # Callbacks personalizados
-        for callback in self._callbacks:
+        for callback in list(self._incident_callbacks):
             try:
-                callback(alert)
+                callback(incident, summary)
             except Exception as e:
-                log_error(f"Error en alert callback: {e}")
+                log_error(f"Error en incident callback: {e}")
     
     def on_alert(self, callback: Callable):
-        """Registrar callback para alertas"""
+        """Registrar callback para alertas (llamado por cada alerta, en segundo plano)"""
         self._callbacks.append(callback)
     
+    def on_incident(self, callback: Callable):
+        """Registrar callback(incident, summary) para incidentes agrupados"""
+        self._incident_callbacks.append(callback)
+    
+    def flush_notifications(self, timeout: float = 5.0) -> bool:
+        """Esperar a que se entreguen las alertas encoladas"""
+        return self.dispatcher.flush(timeout)
+    
+    def flush_journal(self, timeout: float = 5.0) -> bool:
+        """Esperar a que el historial quede escrito en disco"""
+        return self.store.flush(timeout)
+    
     def get_active_alerts(self) -> List[Alert]:
         """Obtener alertas activas (no resueltas)"""
         with self._lock:
-            return [a for a in self.alerts_history if not a.resolved]
+            return self.store.active()
     
     def get_recent_alerts(self, hours: int = 24) -> List[Alert]:
         """Obtener alertas recientes"""
         cutoff = datetime.now() - timedelta(hours=hours)
         
         with self._lock:
-            return [a for a in self.alerts_history if a.timestamp >= cutoff]
+            return self.store.since(cutoff)
     
     def get_alerts_by_type(self, alert_type: AlertType) -> List[Alert]:
         """Obtener alertas por tipo"""
         with self._lock:
-            return [a for a in self.alerts_history if a.alert_type == alert_type]
+            return self.store.by_type(alert_type)
+    
+    def get_active_alerts_by_type(self, alert_type: AlertType) -> List[Alert]:
+        """Obtener alertas activas de un tipo"""
+        with self._lock:
+            return self.store.active_by_type(alert_type)
     
     def resolve_alert(self, alert: Alert):
         """Marcar alerta como resuelta manualmente"""
         with self._lock:
-            if not alert.resolved:
-                alert.resolved = True
-                alert.resolved_at = datetime.now()
+            if self.store.resolve(alert):
                 log_info(f"Alerta resuelta manualmente: {alert.alert_type.value}")
     
     def clear_history(self):
         """Limpiar historial de alertas"""
         with self._lock:
-            self.alerts_history.clear()
+            self.store.clear()
             self.last_alert_time.clear()
+            self._rule_last_fired.clear()
             log_info("Historial de alertas limpiado")
     
-    def _trim_history(self):
-        """Mantener tamaño del historial bajo control"""
-        if len(self.alerts_history) > self.max_history_size:
-            # Mantener solo las más recientes
-            self.alerts_history = self.alerts_history[-self.max_history_size:]
-    
     def get_stats(self) -> Dict:
         """Obtener estadísticas de alertas"""
         with self._lock:
-            total = len(self.alerts_history)
-            active = len([a for a in self.alerts_history if not a.resolved])
-            
-            by_type = {}
-            by_severity = {}
-            
-            for alert in self.alerts_history:
-                # Por tipo
-                type_key = alert.alert_type.value
-                by_type[type_key] = by_type.get(type_key, 0) + 1
-                
-                # Por severidad
-                sev_key = alert.severity.value
-                by_severity[sev_key] = by_severity.get(sev_key, 0) + 1
-            
-            return {
-                'total_alerts': total,
-                'active_alerts': active,
-                'resolved_alerts': total - active,
-                'by_type': by_type,
-                'by_severity': by_severity
-            }
+            return self.store.stats()
 
 
 # Singleton global
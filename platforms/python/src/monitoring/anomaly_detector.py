@@ -0,0 +1,260 @@
+"""
+NetBoozt - Detección de Anomalías con Línea Base Aprendida
+Los thresholds fijos (100ms, 10 Mbps) no sirven para todos los enlaces:
+un enlace de fibra con 8ms está degradado a 40ms, uno satelital vive en 600ms.
+
+Por cada (métrica, adaptador) se aprende:
+- Media EWMA y desviación absoluta media EWMA (de |residuo| con residuos
+  recortados; no es la MAD, que necesitaría una mediana en streaming)
+- Estacionalidad: una línea base por hora del día + una global de respaldo
+
+El estado es de tamaño constante (25 buckets de 3 floats) y cada muestra
+cuesta O(1), así que puede correr a 1 Hz en todos los adaptadores.
+
+By LOUST (www.loust.pro)
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from ..utils.logger import log_warning
+except ImportError:
+    def log_warning(msg): print(f"[WARN] {msg}")
+
+
+# Desviación absoluta media -> sigma (distribución normal)
+MEAN_ABS_DEV_TO_SIGMA = 1.2533
+
+
+class EwmaBaseline:
+    """Media EWMA + desviación absoluta media EWMA con residuos recortados"""
+
+    __slots__ = ('mean', 'dev', 'count')
+
+    def __init__(self, mean: float = 0.0, dev: float = 0.0, count: int = 0):
+        self.mean = mean
+        self.dev = dev
+        self.count = count
+
+    def update(self, value: float, alpha: float, clip_sigmas: float, min_scale: float):
+        self.count += 1
+        if self.count == 1:
+            self.mean = value
+            return
+
+        # Pesos iguales al inicio (media exacta), luego EWMA
+        alpha = max(alpha, 1.0 / self.count)
+
+        residual = value - self.mean
+        # Recortar outliers para que un pico no arrastre la línea base
+        limit = clip_sigmas * max(self.dev * MEAN_ABS_DEV_TO_SIGMA, min_scale)
+        if residual > limit:
+            residual = limit
+        elif residual < -limit:
+            residual = -limit
+
+        self.mean += alpha * residual
+        self.dev += alpha * (abs(residual) - self.dev)
+
+    def score(self, value: float, min_scale: float) -> float:
+        """Desviación en sigmas robustas"""
+        scale = max(self.dev * MEAN_ABS_DEV_TO_SIGMA, min_scale)
+        return (value - self.mean) / scale
+
+
+class MetricBaseline:
+    """Línea base de una métrica en un adaptador: 24 buckets horarios + global"""
+
+    __slots__ = ('hourly', 'overall', 'anomalous_run', 'normal_run', 'active', 'last_score')
+
+    def __init__(self):
+        self.hourly = [EwmaBaseline() for _ in range(24)]
+        self.overall = EwmaBaseline()
+        self.anomalous_run = 0
+        self.normal_run = 0
+        self.active = False
+        self.last_score: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'hourly': [[b.mean, b.dev, b.count] for b in self.hourly],
+            'overall': [self.overall.mean, self.overall.dev, self.overall.count]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MetricBaseline':
+        baseline = cls()
+        baseline.hourly = [EwmaBaseline(*values) for values in data['hourly']]
+        baseline.overall = EwmaBaseline(*data['overall'])
+        return baseline
+
+
+class AnomalyDetector:
+    """
+    Detector de anomalías por métrica y adaptador.
+
+    record() devuelve "fire" cuando la métrica se desvía de su línea base
+    durante SUSTAIN_SAMPLES muestras seguidas, "clear" cuando vuelve a lo
+    normal durante CLEAR_SAMPLES, o None.
+    """
+
+    ALPHA = 0.002                # ~500 muestras de memoria por bucket
+    ANOMALY_LEARN_FACTOR = 0.05  # Peso de muestras anómalas (un cambio permanente se asimila lento)
+    CLIP_SIGMAS = 3.0            # Recorte de residuos al aprender
+    Z_THRESHOLD = 4.0            # Sigmas para considerar anómala una muestra
+    SUSTAIN_SAMPLES = 30         # Muestras anómalas seguidas para disparar (~30s a 1 Hz)
+    CLEAR_SAMPLES = 10           # Muestras normales seguidas para resolver
+    MIN_SAMPLES_OVERALL = 120    # Aprendizaje mínimo antes de alertar
+    MIN_SAMPLES_HOURLY = 300     # Aprendizaje mínimo para usar el bucket horario
+
+    # Dirección "mala" por métrica (+1: subir es malo, -1: bajar es malo)
+    # y escala mínima absoluta (evita dividir por ~0 en enlaces muy estables)
+    METRICS: Dict[str, Tuple[int, float]] = {
+        'latency_ms': (1, 2.0),
+        'jitter_ms': (1, 1.0),
+        'packet_loss': (1, 0.5),
+        'download_mbps': (-1, 1.0),
+        'upload_mbps': (-1, 0.5),
+    }
+    RELATIVE_MIN_SCALE = 0.05    # Escala mínima relativa a la media (5%)
+
+    def __init__(self):
+        self.baselines: Dict[Tuple[str, str], MetricBaseline] = {}
+
+    def _min_scale(self, metric: str, mean: float) -> float:
+        absolute = self.METRICS.get(metric, (1, 1.0))[1]
+        return max(absolute, abs(mean) * self.RELATIVE_MIN_SCALE)
+
+    def expected(self, metric: str, adapter: str = "default", timestamp: Optional[float] = None) -> Optional[Tuple[float, float]]:
+        """(media, sigma) esperadas para la hora del timestamp, o None si aún aprende"""
+        state = self.baselines.get((metric, adapter))
+        if state is None:
+            return None
+
+        hour = datetime.fromtimestamp(timestamp).hour if timestamp is not None else datetime.now().hour
+        baseline = self._reference(state, hour)
+        if baseline is None:
+            return None
+        return baseline.mean, max(baseline.dev * MEAN_ABS_DEV_TO_SIGMA, self._min_scale(metric, baseline.mean))
+
+    def _reference(self, state: MetricBaseline, hour: int) -> Optional[EwmaBaseline]:
+        """Bucket horario si ya aprendió lo suficiente, si no el global"""
+        hourly = state.hourly[hour]
+        if hourly.count >= self.MIN_SAMPLES_HOURLY:
+            return hourly
+        if state.overall.count >= self.MIN_SAMPLES_OVERALL:
+            return state.overall
+        return None
+
+    def record(self, metric: str, value: float, timestamp: float, adapter: str = "default") -> Optional[str]:
+        """Incorporar muestra y devolver la transición de alerta (si hay)"""
+        key = (metric, adapter)
+        state = self.baselines.get(key)
+        if state is None:
+            state = self.baselines[key] = MetricBaseline()
+
+        hour = datetime.fromtimestamp(timestamp).hour
+        hourly = state.hourly[hour]
+        direction = self.METRICS.get(metric, (1, 1.0))[0]
+
+        # Puntuar contra la línea base antes de aprender la muestra
+        reference = self._reference(state, hour)
+
+        transition = None
+        alpha = self.ALPHA
+        if reference is not None:
+            score = direction * reference.score(value, self._min_scale(metric, reference.mean))
+            state.last_score = score
+
+            if score >= self.Z_THRESHOLD:
+                alpha *= self.ANOMALY_LEARN_FACTOR
+                state.anomalous_run += 1
+                state.normal_run = 0
+                if not state.active and state.anomalous_run >= self.SUSTAIN_SAMPLES:
+                    state.active = True
+                    transition = "fire"
+            else:
+                state.normal_run += 1
+                state.anomalous_run = 0
+                if state.active and state.normal_run >= self.CLEAR_SAMPLES:
+                    state.active = False
+                    transition = "clear"
+
+        hourly.update(value, alpha, self.CLIP_SIGMAS, self._min_scale(metric, hourly.mean))
+        state.overall.update(value, alpha, self.CLIP_SIGMAS, self._min_scale(metric, state.overall.mean))
+
+        return transition
+
+    def describe(self, metric: str, value: float, adapter: str = "default", timestamp: Optional[float] = None) -> str:
+        """Mensaje legible de la desviación actual"""
+        expected = self.expected(metric, adapter, timestamp)
+        where = f" en {adapter}" if adapter != "default" else ""
+        if expected is None:
+            return f"{metric}{where} = {value:.1f} (línea base en aprendizaje)"
+
+        mean, sigma = expected
+        state = self.baselines[(metric, adapter)]
+        return (f"{metric}{where} anómalo: {value:.1f} (esperado {mean:.1f} ± {sigma:.1f}, "
+                f"{state.last_score:.1f}σ)")
+
+    def reset(self, metric: Optional[str] = None, adapter: Optional[str] = None):
+        """Olvidar líneas base (ej: tras cambiar de ISP)"""
+        for key in list(self.baselines):
+            if (metric is None or key[0] == metric) and (adapter is None or key[1] == adapter):
+                del self.baselines[key]
+
+    # ------------------------------------------------------------------
+    # Persistencia (aprender una estacionalidad diaria lleva días)
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> List[Dict]:
+        """Copia serializable de las líneas base (para escribirla sin bloquear)"""
+        return [
+            {'metric': metric, 'adapter': adapter, 'baseline': state.to_dict()}
+            for (metric, adapter), state in self.baselines.items()
+        ]
+
+    @staticmethod
+    def write_snapshot(data: List[Dict], path: Path):
+        """Escribir una copia de snapshot() a disco (JSON, reemplazo atómico)"""
+        try:
+            tmp_path = Path(path).with_suffix('.tmp')
+            tmp_path.write_text(json.dumps(data))
+            tmp_path.replace(path)
+        except OSError as e:
+            log_warning(f"No se pudieron guardar líneas base: {e}")
+
+    def save(self, path: Path):
+        """Guardar líneas base a disco (JSON)"""
+        self.write_snapshot(self.snapshot(), path)
+
+    def load(self, path: Path):
+        """Cargar líneas base desde disco"""
+        path = Path(path)
+        if not path.exists():
+            return
+        try:
+            for entry in json.loads(path.read_text()):
+                key = (entry['metric'], entry['adapter'])
+                self.baselines[key] = MetricBaseline.from_dict(entry['baseline'])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            log_warning(f"Líneas base descartadas: {e}")
+
+    def get_baselines(self) -> List[Dict]:
+        """Resumen para UI: media/sigma actuales por métrica y adaptador"""
+        summary = []
+        for (metric, adapter), state in self.baselines.items():
+            expected = self.expected(metric, adapter)
+            summary.append({
+                'metric': metric,
+                'adapter': adapter,
+                'samples': state.overall.count,
+                'learning': expected is None,
+                'mean': expected[0] if expected else state.overall.mean,
+                'sigma': expected[1] if expected else None,
+                'anomalous': state.active
+            })
+        return summary
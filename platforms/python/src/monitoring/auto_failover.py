@@ -7,9 +7,10 @@ By LOUST (www.loust.pro)
 
 import time
 import threading
-from typing import Optional, List, Callable
+from typing import TYPE_CHECKING, Optional, List, Callable, Tuple, Dict, Set
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     from .dns_health import DNSHealthChecker, DNSHealth, DNSStatus
@@ -23,15 +24,30 @@ except ImportError:
     def log_warning(msg): print(f"[WARN] {msg}")
     def log_error(msg): print(f"[ERROR] {msg}")
 
+if TYPE_CHECKING:
+    from .adapter_manager import NetworkAdapter
+    from .interface_watcher import InterfaceChange
+
 
 @dataclass
 class FailoverEvent:
-    """Evento de failover"""
+    """Evento de failover (o failback al tier preferido)"""
     timestamp: datetime
     from_tier: int
     to_tier: int
     reason: str
     success: bool
+    kind: str = "failover"                      # "failover" | "failback"
+    adapter: Optional[str] = None               # Adaptador gestionado (None = prioritario)
+    latency_before_ms: Optional[float] = None   # DNS primario del tier origen al cambiar
+    latency_after_ms: Optional[float] = None    # DNS primario del tier destino tras el cambio
+    
+    @property
+    def latency_saved_ms(self) -> Optional[float]:
+        """Latencia ahorrada por el cambio (negativo = costo)"""
+        if self.latency_before_ms is None or self.latency_after_ms is None:
+            return None
+        return self.latency_before_ms - self.latency_after_ms
 
 
 class AutoFailoverManager:
@@ -41,24 +57,72 @@ class AutoFailoverManager:
     CHECK_INTERVAL = 10     # Reducido de 15s - verificar más seguido
     MAX_FAILURES_BEFORE_SWITCH = 2  # Solo 2 fallos para cambiar (antes 3)
     
+    # Ranking de candidatos: latencia esperada = latencia medida + penalizaciones
+    TIMEOUT_PENALTY_MS = 2000.0          # Costo de un timeout (ponderado por 1 - uptime)
+    SECONDARY_DOWN_PENALTY_MS = 50.0     # Sin respaldo si el secundario está caído
+    
+    # Pre-calentamiento del tier destino antes de aplicarlo
+    PREWARM_ENABLED = True
+    PREWARM_DOMAINS = ['google.com', 'microsoft.com', 'cloudflare.com', 'youtube.com', 'github.com']
+    PREWARM_WORKERS = 4
+    
+    # Failback: volver a un tier preferido (número menor) cuando lleva
+    # FAILBACK_DWELL_SECONDS sano de forma continua. Solo al tier que dejó
+    # un failover, o a uno cuyo score mejore el actual en FAILBACK_SCORE_MARGIN_MS
+    FAILBACK_ENABLED = True
+    FAILBACK_DWELL_SECONDS = 180
+    FAILBACK_SCORE_MARGIN_MS = 20.0
+    
+    DHCP_TIER = 7
+    
     def __init__(
         self,
         health_checker: 'DNSHealthChecker',
         adapter_manager: 'AdapterManager',
-        tiers: List['DNSFallbackTier']
+        tiers: List['DNSFallbackTier'],
+        clock: Optional[Callable[[], datetime]] = None,
+        adapter_name: Optional[str] = None
     ):
+        """
+        Args:
+            health_checker: Checker con el estado de cada DNS
+            adapter_manager: Gestor de adaptadores donde se aplican los tiers
+            tiers: Tiers de fallback disponibles
+            clock: Reloj inyectable (default: datetime.now). El simulador
+                de failover lo reemplaza por tiempo virtual.
+            adapter_name: Adaptador a gestionar (default: el prioritario)
+        """
         self.health_checker = health_checker
         self.adapter_manager = adapter_manager
         self.tiers = tiers
+        self.adapter_name = adapter_name
+        self._now = clock or datetime.now
         
         self.enabled = False
         self.is_running = False
         self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()  # Adelanta la próxima verificación
+        self._interface_changed = False  # El hilo del loop reinicia el seguimiento
         
         self.current_tier_number: Optional[int] = None
         self.last_failover: Optional[datetime] = None
         self.failover_history: List[FailoverEvent] = []
         
+        # Último tier aplicado por este manager (DHCP no se detecta por DNS)
+        self._applied_tier_number: Optional[int] = None
+        
+        # Failback: desde cuándo está sano cada tier preferido
+        self._healthy_since: Dict[int, datetime] = {}
+        
+        # Tiers abandonados por failover (candidatos a failback sin margen)
+        self._failover_origins: Set[int] = set()
+        
+        # Eventos esperando medición de latencia posterior al cambio
+        self._unsettled_events: List[FailoverEvent] = []
+        
+        # Pool reutilizado para pre-calentar tiers (se crea al primer uso)
+        self._prewarm_executor: Optional[ThreadPoolExecutor] = None
+        
         self._callbacks: List[Callable[[FailoverEvent], None]] = []
     
     def enable(self):
@@ -88,23 +152,56 @@ class AutoFailoverManager:
     def stop(self):
         """Detener monitoreo"""
         self.is_running = False
+        self._wake.set()
         if self._thread:
             self._thread.join(timeout=2.0)
+        if self._prewarm_executor:
+            self._prewarm_executor.shutdown(wait=False)
+            self._prewarm_executor = None
         log_info("Auto-Failover Manager detenido")
     
     def _failover_loop(self):
         """Loop principal de verificación"""
         while self.is_running:
             try:
+                if self._interface_changed:
+                    self._interface_changed = False
+                    self._reset_tracking()
+                
                 if self.enabled:
                     self._check_and_failover()
                 
-                time.sleep(self.CHECK_INTERVAL)
+                self._wake.wait(self.CHECK_INTERVAL)
+                self._wake.clear()
                 
             except Exception as e:
                 log_error(f"Error en failover loop: {e}")
                 time.sleep(5)
     
+    def on_interface_change(self, change: 'InterfaceChange'):
+        """
+        Callback de InterfaceWatcher: si cambió el adaptador gestionado
+        (enlace, IP, DNS), olvidar el seguimiento de salud y latencia
+        medido con la configuración anterior y verificar ya, sin esperar
+        a CHECK_INTERVAL.
+        """
+        # Sin adaptador fijo gestiona el prioritario: cualquier cambio puede afectarle
+        if self.adapter_name and change.name != self.adapter_name:
+            return
+        
+        self._interface_changed = True
+        self._wake.set()
+    
+    def _reset_tracking(self):
+        """Olvidar salud y latencias medidas con la configuración anterior"""
+        self._healthy_since.clear()
+        self._unsettled_events.clear()
+        self.current_tier_number = None
+    
+    def attach_interface_watcher(self, interface_watcher):
+        """Seguir los cambios de adaptadores de un InterfaceWatcher"""
+        interface_watcher.on_change(self.on_interface_change)
+    
     def _check_and_failover(self):
         """Verificar si necesita hacer failover"""
         try:
@@ -117,9 +214,17 @@ class AutoFailoverManager:
             
             self.current_tier_number = current_tier.tier
             
+            # Completar contabilidad de latencia de cambios anteriores
+            self._settle_latency_accounting()
+            
+            # Seguir salud de tiers preferidos (para failback)
+            self._update_failback_tracking(current_tier)
+            
             # Verificar salud del tier actual
             if self._is_tier_healthy(current_tier):
-                # Todo OK
+                # Todo OK - ¿podemos volver a un tier preferido?
+                if self.FAILBACK_ENABLED:
+                    self._check_failback(current_tier)
                 return
             
             # Tier actual está fallando
@@ -138,36 +243,157 @@ class AutoFailoverManager:
                 return
             
             # Ejecutar failover
-            log_warning(f"🔄 FAILOVER: Tier {current_tier.tier} → Tier {next_tier.tier}")
-            success = self._execute_failover(current_tier, next_tier)
-            
-            # Registrar evento
-            event = FailoverEvent(
-                timestamp=datetime.now(),
-                from_tier=current_tier.tier,
-                to_tier=next_tier.tier,
-                reason="DNS tier unhealthy",
-                success=success
-            )
-            
-            self.failover_history.append(event)
-            self.last_failover = datetime.now()
-            
-            # Notificar callbacks
-            self._notify_callbacks(event)
+            log_warning(f"🔄 FAILOVER{self._adapter_label}: Tier {current_tier.tier} → Tier {next_tier.tier}")
+            event = self._switch_tier(current_tier, next_tier, "DNS tier unhealthy", "failover")
+            if event.success:
+                self._failover_origins.add(current_tier.tier)
             
         except Exception as e:
             log_error(f"Error en check_and_failover: {e}")
     
+    def _switch_tier(
+        self,
+        from_tier: 'DNSFallbackTier',
+        to_tier: 'DNSFallbackTier',
+        reason: str,
+        kind: str
+    ) -> FailoverEvent:
+        """Aplicar cambio de tier, registrar evento y notificar"""
+        latency_before = self._tier_latency_ms(from_tier)
+        success = self._execute_failover(from_tier, to_tier)
+        
+        event = FailoverEvent(
+            timestamp=self._now(),
+            from_tier=from_tier.tier,
+            to_tier=to_tier.tier,
+            reason=reason,
+            success=success,
+            kind=kind,
+            adapter=self.adapter_name,
+            latency_before_ms=latency_before
+        )
+        
+        self.failover_history.append(event)
+        self.last_failover = event.timestamp
+        
+        if success:
+            self._applied_tier_number = to_tier.tier
+            self.current_tier_number = to_tier.tier
+            if latency_before is not None:
+                self._unsettled_events.append(event)
+        
+        # Notificar callbacks
+        self._notify_callbacks(event)
+        return event
+    
+    def _tier_latency_ms(self, tier: 'DNSFallbackTier') -> Optional[float]:
+        """Latencia medida del primario (timeout si está caído, None si DHCP/desconocido)"""
+        if tier.tier == self.DHCP_TIER:
+            return None
+        
+        health = self.health_checker.get_status(tier.primary)
+        if health is None or health.status == DNSStatus.UNKNOWN:
+            return None
+        
+        timeout = float(getattr(self.health_checker, 'THRESHOLD_TIMEOUT', 2000))
+        if health.status == DNSStatus.DOWN:
+            return timeout
+        return min(health.latency_ms, timeout)
+    
+    def _settle_latency_accounting(self):
+        """Registrar latencia posterior en eventos del ciclo anterior"""
+        if not self._unsettled_events:
+            return
+        
+        tiers_by_number = {t.tier: t for t in self.tiers}
+        pending = []
+        for event in self._unsettled_events:
+            tier = tiers_by_number.get(event.to_tier)
+            latency_after = self._tier_latency_ms(tier) if tier else None
+            if latency_after is None and tier is not None and tier.tier != self.DHCP_TIER:
+                pending.append(event)  # Aún sin medición
+                continue
+            event.latency_after_ms = latency_after
+        
+        self._unsettled_events = pending
+    
+    def _update_failback_tracking(self, current_tier: 'DNSFallbackTier'):
+        """Actualizar desde cuándo está sano cada tier preferido al actual"""
+        now = self._now()
+        for tier in self.tiers:
+            if tier.tier >= current_tier.tier or tier.tier == self.DHCP_TIER:
+                self._healthy_since.pop(tier.tier, None)
+            elif self._is_tier_healthy(tier):
+                self._healthy_since.setdefault(tier.tier, now)
+            else:
+                self._healthy_since.pop(tier.tier, None)
+    
+    def _check_failback(self, current_tier: 'DNSFallbackTier'):
+        """
+        Volver al tier preferido más alto que superó la ventana de estabilidad.
+        
+        Solo son elegibles los tiers que dejó un failover y los que mejoran
+        el score del actual en FAILBACK_SCORE_MARGIN_MS: un failover por
+        score que saltó un tier sano no se deshace volviendo a él.
+        """
+        if not self._healthy_since or not self._can_failover():
+            return
+        
+        now = self._now()
+        stable = [
+            tier_number for tier_number, since in self._healthy_since.items()
+            if (now - since).total_seconds() >= self.FAILBACK_DWELL_SECONDS
+        ]
+        if not stable:
+            return
+        
+        tiers_by_number = {t.tier: t for t in self.tiers}
+        current_score = self._score_tier(current_tier) if current_tier.tier != self.DHCP_TIER else None
+        
+        def eligible(tier_number: int) -> bool:
+            if tier_number in self._failover_origins or current_score is None:
+                return True
+            score = self._score_tier(tiers_by_number[tier_number])
+            return score is not None and score < current_score - self.FAILBACK_SCORE_MARGIN_MS
+        
+        candidates = [t for t in stable if eligible(t)]
+        if not candidates:
+            return
+        
+        target = tiers_by_number[min(candidates)]
+        
+        if self.PREWARM_ENABLED and not self._prewarm_tier(target):
+            log_warning(f"Failback a Tier {target.tier} cancelado: no resolvió durante pre-calentamiento")
+            self._healthy_since.pop(target.tier, None)
+            return
+        
+        log_info(f"↩️ FAILBACK{self._adapter_label}: Tier {current_tier.tier} → Tier {target.tier}")
+        event = self._switch_tier(current_tier, target, "Preferred tier stable", "failback")
+        if event.success:
+            self._failover_origins = {t for t in self._failover_origins if t < target.tier}
+        self._healthy_since.clear()
+    
+    @property
+    def _adapter_label(self) -> str:
+        """Sufijo para logs cuando se gestiona un adaptador concreto"""
+        return f" [{self.adapter_name}]" if self.adapter_name else ""
+    
+    def _get_managed_adapter(self):
+        """Adaptador gestionado: el nombrado o, si no hay, el prioritario"""
+        if self.adapter_name:
+            adapter = self.adapter_manager.get_adapter_by_name(self.adapter_name)
+            return adapter if adapter and adapter.is_active else None
+        return self.adapter_manager.get_priority_adapter()
+    
     def _detect_current_tier(self) -> Optional['DNSFallbackTier']:
         """Detectar qué tier está actualmente configurado"""
         try:
             # Obtener DNS actual del adaptador
-            priority_adapter = self.adapter_manager.get_priority_adapter()
-            if not priority_adapter:
+            managed_adapter = self._get_managed_adapter()
+            if not managed_adapter:
                 return None
             
-            current_dns = priority_adapter.dns_servers
+            current_dns = managed_adapter.dns_servers
             if not current_dns:
                 return None
             
@@ -178,6 +404,12 @@ class AutoFailoverManager:
                 if tier.primary == primary_dns:
                     return tier
             
+            # No coincide con ningún tier estático: si aplicamos DHCP, es DHCP
+            if self._applied_tier_number == self.DHCP_TIER:
+                dhcp_tier = next((t for t in self.tiers if t.tier == self.DHCP_TIER), None)
+                if dhcp_tier:
+                    return dhcp_tier
+            
             # No encontrado, asumir tier 1
             return self.tiers[0] if self.tiers else None
             
@@ -188,7 +420,7 @@ class AutoFailoverManager:
     def _is_tier_healthy(self, tier: 'DNSFallbackTier') -> bool:
         """Verificar si un tier está saludable"""
         try:
-            if tier.tier == 7:  # DHCP tier
+            if tier.tier == self.DHCP_TIER:
                 return True  # Siempre saludable (usa DNS del router)
             
             # Verificar salud del DNS primario
@@ -215,30 +447,90 @@ class AutoFailoverManager:
         if self.last_failover is None:
             return True
         
-        elapsed = (datetime.now() - self.last_failover).total_seconds()
+        elapsed = (self._now() - self.last_failover).total_seconds()
         return elapsed >= self.COOLDOWN_SECONDS
     
-    def _find_next_healthy_tier(self, current_tier_number: int) -> Optional['DNSFallbackTier']:
-        """Encontrar siguiente tier saludable"""
-        # Ordenar tiers por número
-        sorted_tiers = sorted(self.tiers, key=lambda t: t.tier)
+    def _is_server_healthy(self, dns_server: str) -> bool:
+        """Verificar salud de un servidor individual (misma regla que el tier)"""
+        health = self.health_checker.get_status(dns_server)
+        return (
+            health is not None and
+            health.status in (DNSStatus.UP, DNSStatus.SLOW) and
+            health.consecutive_failures < 3
+        )
+    
+    def _score_tier(self, tier: 'DNSFallbackTier') -> Optional[float]:
+        """
+        Latencia esperada de un tier en ms (menor = mejor).
+        
+        Combina latencia viva y uptime reciente del primario, y penaliza
+        tiers sin secundario sano. None si el primario no es utilizable.
+        """
+        if not self._is_server_healthy(tier.primary):
+            return None
         
-        # Buscar tiers después del actual
-        candidates = [t for t in sorted_tiers if t.tier > current_tier_number]
+        primary = self.health_checker.get_status(tier.primary)
+        score = primary.latency_ms + (100.0 - primary.uptime_pct) / 100.0 * self.TIMEOUT_PENALTY_MS
         
-        # Si no hay después, buscar desde el principio
-        if not candidates:
-            candidates = [t for t in sorted_tiers if t.tier < current_tier_number]
+        if tier.secondary and not self._is_server_healthy(tier.secondary):
+            score += self.SECONDARY_DOWN_PENALTY_MS
+        
+        return score
+    
+    def _rank_candidate_tiers(self, current_tier_number: int) -> List[Tuple[float, 'DNSFallbackTier']]:
+        """Candidatos sanos (excepto actual y DHCP) ordenados por score"""
+        ranked = []
+        for tier in self.tiers:
+            if tier.tier in (current_tier_number, self.DHCP_TIER):
+                continue
+            score = self._score_tier(tier)
+            if score is not None:
+                ranked.append((score, tier))
+        
+        # Empate: respetar orden de prioridad de tiers
+        ranked.sort(key=lambda item: (item[0], item[1].tier))
+        return ranked
+    
+    def _prewarm_tier(self, tier: 'DNSFallbackTier') -> bool:
+        """
+        Resolver dominios comunes a través del tier antes de aplicarlo, para
+        que las primeras consultas tras el cambio no paguen caché fría.
         
-        # Verificar cada candidato
-        for tier in candidates:
-            if self._is_tier_healthy(tier):
-                log_info(f"Tier saludable encontrado: {tier.tier} ({tier.name})")
-                return tier
+        Returns:
+            True si el primario resolvió al menos un dominio
+        """
+        servers = [s for s in (tier.primary, tier.secondary) if s]
+        jobs = [(server, domain) for server in servers for domain in self.PREWARM_DOMAINS]
+        
+        def resolve(job):
+            server, domain = job
+            return server, self.health_checker.verify_dns_resolution(server, domain)[0]
+        
+        if self.PREWARM_WORKERS <= 1:
+            results = [resolve(job) for job in jobs]
+        else:
+            if self._prewarm_executor is None:
+                self._prewarm_executor = ThreadPoolExecutor(
+                    max_workers=self.PREWARM_WORKERS,
+                    thread_name_prefix="failover-prewarm"
+                )
+            results = list(self._prewarm_executor.map(resolve, jobs))
+        
+        return any(ok for server, ok in results if server == tier.primary)
+    
+    def _find_next_healthy_tier(self, current_tier_number: int) -> Optional['DNSFallbackTier']:
+        """Encontrar el tier sano más rápido (score), pre-calentado"""
+        for score, tier in self._rank_candidate_tiers(current_tier_number):
+            if self.PREWARM_ENABLED and not self._prewarm_tier(tier):
+                log_warning(f"Tier {tier.tier} ({tier.provider}) no resolvió durante pre-calentamiento")
+                continue
+            
+            log_info(f"Tier saludable encontrado: {tier.tier} ({tier.provider}, ~{score:.0f}ms)")
+            return tier
         
         # Si ninguno está saludable, usar DHCP (tier 7) como último recurso
-        dhcp_tier = next((t for t in self.tiers if t.tier == 7), None)
-        if dhcp_tier:
+        dhcp_tier = next((t for t in self.tiers if t.tier == self.DHCP_TIER), None)
+        if dhcp_tier and dhcp_tier.tier != current_tier_number:
             log_warning("Usando DHCP como último recurso")
             return dhcp_tier
         
@@ -247,7 +539,10 @@ class AutoFailoverManager:
     def _execute_failover(self, from_tier: 'DNSFallbackTier', to_tier: 'DNSFallbackTier') -> bool:
         """Ejecutar cambio de tier"""
         try:
-            success = self.adapter_manager.apply_dns_tier(to_tier.tier)
+            if self.adapter_name:
+                success = self.adapter_manager.apply_dns_tier(to_tier.tier, adapter_name=self.adapter_name)
+            else:
+                success = self.adapter_manager.apply_dns_tier(to_tier.tier)
             
             if success:
                 log_info(f"✅ Failover exitoso: Tier {to_tier.tier}")
@@ -276,16 +571,197 @@ class AutoFailoverManager:
         """Obtener estadísticas de failover"""
         total = len(self.failover_history)
         successful = sum(1 for e in self.failover_history if e.success)
+        failbacks = sum(1 for e in self.failover_history if e.kind == "failback")
+        
+        # Latencia ahorrada (positivo) o costada (negativo) por tipo de cambio
+        saved = {"failover": [], "failback": []}
+        for event in self.failover_history:
+            if event.success and event.latency_saved_ms is not None:
+                saved.setdefault(event.kind, []).append(event.latency_saved_ms)
+        all_saved = saved["failover"] + saved["failback"]
         
         return {
             'total_failovers': total,
             'successful': successful,
             'failed': total - successful,
+            'failbacks': failbacks,
             'last_failover': self.last_failover,
+            'latency_saved_ms': sum(all_saved),
+            'failover_latency_saved_ms': sum(saved["failover"]),
+            'failback_latency_saved_ms': sum(saved["failback"]),
+            'avg_latency_saved_ms': sum(all_saved) / len(all_saved) if all_saved else None,
             'enabled': self.enabled
         }
 
 
+
+class MultiAdapterFailoverManager:
+    """
+    Failover independiente por adaptador (equipos multi-homed).
+    
+    Cada adaptador activo con IPv4 tiene su propio DNSHealthChecker, con
+    pruebas que salen desde la IP del adaptador, y su propio
+    AutoFailoverManager con hilo propio. Así Wi-Fi, LTE, VPN o una segunda
+    NIC se mantienen rápidos por separado.
+    """
+    
+    # Campos de NetworkAdapter que cambian qué adaptadores se gestionan
+    RESYNC_FIELDS = ('status', 'ipv4_address')
+    
+    def __init__(
+        self,
+        adapter_manager: 'AdapterManager',
+        tiers: Optional[List['DNSFallbackTier']] = None,
+        check_interval: int = 10
+    ):
+        self.adapter_manager = adapter_manager
+        self.tiers = tiers or adapter_manager.DNS_FALLBACK_TIERS
+        self.check_interval = check_interval
+        
+        self.enabled = False
+        self.is_running = False
+        
+        self.managers: Dict[str, AutoFailoverManager] = {}
+        self.checkers: Dict[str, 'DNSHealthChecker'] = {}
+        
+        self._callbacks: List[Callable[[FailoverEvent], None]] = []
+        self._lock = threading.Lock()
+        
+        self.detect_adapters()
+    
+    def detect_adapters(self):
+        """Sincronizar managers con los adaptadores activos actuales"""
+        active = {
+            adapter.name: adapter
+            for adapter in self.adapter_manager.get_active_adapters()
+            if adapter.ipv4_address
+        }
+        
+        with self._lock:
+            for name in list(self.managers):
+                checker = self.checkers[name]
+                adapter = active.get(name)
+                # Desaparecido o con IP nueva (roaming): recrear
+                if adapter is None or checker.source_address != adapter.ipv4_address:
+                    self._remove_adapter(name)
+            
+            for name, adapter in active.items():
+                if name not in self.managers:
+                    self._add_adapter(adapter)
+    
+    def on_interface_change(self, change: 'InterfaceChange'):
+        """Callback de InterfaceWatcher: resincronizar ante altas, bajas, enlace o IP nueva"""
+        if change.change != 'changed' or set(change.changed_fields) & set(self.RESYNC_FIELDS):
+            self.detect_adapters()
+        
+        # El manager que sigue (o el recién creado) verifica ya
+        manager = self.get_manager(change.name)
+        if manager:
+            manager.on_interface_change(change)
+    
+    def attach_interface_watcher(self, interface_watcher):
+        """Seguir los cambios de adaptadores de un InterfaceWatcher"""
+        interface_watcher.on_change(self.on_interface_change)
+    
+    def _add_adapter(self, adapter: 'NetworkAdapter'):
+        """Crear checker + manager para un adaptador"""
+        checker = DNSHealthChecker(
+            check_interval=self.check_interval,
+            source_address=adapter.ipv4_address
+        )
+        for tier in self.tiers:
+            for server in (tier.primary, tier.secondary):
+                if server and server != "Auto":
+                    checker.add_dns_server(server)
+        
+        manager = AutoFailoverManager(
+            checker,
+            self.adapter_manager,
+            self.tiers,
+            adapter_name=adapter.name
+        )
+        manager.on_failover(self._notify_callbacks)
+        
+        if self.enabled:
+            manager.enable()
+        if self.is_running:
+            checker.start()
+            manager.start()
+        
+        self.checkers[adapter.name] = checker
+        self.managers[adapter.name] = manager
+        log_info(f"Failover por adaptador: {adapter.name} ({adapter.ipv4_address})")
+    
+    def _remove_adapter(self, name: str):
+        """Detener y eliminar checker + manager de un adaptador"""
+        manager = self.managers.pop(name, None)
+        checker = self.checkers.pop(name, None)
+        if manager:
+            manager.stop()
+        if checker:
+            checker.stop()
+    
+    def enable(self):
+        """Activar auto-failover en todos los adaptadores"""
+        self.enabled = True
+        with self._lock:
+            for manager in self.managers.values():
+                manager.enable()
+    
+    def disable(self):
+        """Desactivar auto-failover en todos los adaptadores"""
+        self.enabled = False
+        with self._lock:
+            for manager in self.managers.values():
+                manager.disable()
+    
+    def start(self):
+        """Iniciar checkers y managers de todos los adaptadores"""
+        if self.is_running:
+            return
+        
+        self.is_running = True
+        with self._lock:
+            for name, manager in self.managers.items():
+                self.checkers[name].start()
+                manager.start()
+    
+    def stop(self):
+        """Detener todos los adaptadores"""
+        self.is_running = False
+        with self._lock:
+            for name, manager in self.managers.items():
+                manager.stop()
+                self.checkers[name].stop()
+    
+    def on_failover(self, callback: Callable[[FailoverEvent], None]):
+        """Registrar callback (FailoverEvent.adapter indica el adaptador)"""
+        self._callbacks.append(callback)
+    
+    def _notify_callbacks(self, event: FailoverEvent):
+        for callback in self._callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                log_error(f"Error en callback de failover: {e}")
+    
+    def get_manager(self, adapter_name: str) -> Optional[AutoFailoverManager]:
+        """Obtener manager de un adaptador específico"""
+        with self._lock:
+            return self.managers.get(adapter_name)
+    
+    def get_history(self, limit: int = 20) -> List[FailoverEvent]:
+        """Historial combinado de todos los adaptadores, en orden temporal"""
+        with self._lock:
+            events = [e for m in self.managers.values() for e in m.failover_history]
+        events.sort(key=lambda e: e.timestamp)
+        return events[-limit:]
+    
+    def get_stats(self) -> dict:
+        """Estadísticas por adaptador"""
+        with self._lock:
+            return {name: manager.get_stats() for name, manager in self.managers.items()}
+
 if __name__ == "__main__":
     # Test (mock)
     print("Auto-Failover Manager - Test Mode")
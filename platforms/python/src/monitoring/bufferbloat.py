@@ -0,0 +1,241 @@
+"""
+NetBoozt - Prueba de Latencia Bajo Carga (Bufferbloat)
+Mide el RTT en reposo y luego satura la descarga y la subida con varios
+streams TCP en paralelo mientras sondea el RTT a alta frecuencia. El
+aumento de latencia bajo carga es el "lag" que se nota en juegos y
+videollamadas aunque la velocidad sea buena.
+
+Los destinos de carga son URLs HTTP configurables (por defecto los
+endpoints públicos de speed.cloudflare.com), así que la prueba funciona
+igual contra un servidor local de pruebas.
+
+By LOUST (www.loust.pro)
+"""
+
+import statistics
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from .speed_test import DEFAULT_DOWNLOAD_URL, DEFAULT_UPLOAD_URL, StreamLoad, tcp_connect_rtt
+
+try:
+    from ..utils.logger import log_info, log_warning
+except ImportError:
+    def log_info(msg): print(f"[INFO] {msg}")
+    def log_warning(msg): print(f"[WARN] {msg}")
+
+
+# Escala de calificación por aumento de latencia (ms), como Waveform/DSLReports
+GRADES = [
+    (5, "A+"),
+    (30, "A"),
+    (60, "B"),
+    (200, "C"),
+    (400, "D"),
+]
+
+
+def grade_for_increase(increase_ms: Optional[float]) -> str:
+    """Calificación A+..F para un aumento de latencia bajo carga"""
+    if increase_ms is None:
+        return "?"
+    for limit, grade in GRADES:
+        if increase_ms < limit:
+            return grade
+    return "F"
+
+
+@dataclass
+class BufferbloatConfig:
+    """Configuración de la prueba"""
+    download_url: str = DEFAULT_DOWNLOAD_URL
+    upload_url: str = DEFAULT_UPLOAD_URL
+    probe_host: Optional[str] = None     # Default: host de download_url
+    probe_port: Optional[int] = None     # Default: puerto de download_url
+    streams: int = 4                     # Streams TCP paralelos por dirección
+    idle_seconds: float = 5.0
+    load_seconds: float = 10.0
+    warmup_seconds: float = 1.5          # RTT ignorado mientras la carga arranca
+    probe_interval: float = 0.1          # 10 sondas/s
+    probe_timeout: float = 2.0
+    upload_request_bytes: int = 25_000_000
+
+
+@dataclass
+class PhaseStats:
+    """RTT y throughput de una fase"""
+    rtt_samples: List[float] = field(default_factory=list)
+    lost_probes: int = 0
+    throughput_mbps: Optional[float] = None
+
+    @property
+    def median_ms(self) -> Optional[float]:
+        return statistics.median(self.rtt_samples) if self.rtt_samples else None
+
+    @property
+    def mean_ms(self) -> Optional[float]:
+        return statistics.fmean(self.rtt_samples) if self.rtt_samples else None
+
+    @property
+    def p95_ms(self) -> Optional[float]:
+        if not self.rtt_samples:
+            return None
+        ordered = sorted(self.rtt_samples)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+
+@dataclass
+class BufferbloatResult:
+    """Resultado de la prueba de bufferbloat"""
+    timestamp: datetime
+    idle_rtt_ms: Optional[float]
+    download_rtt_ms: Optional[float]         # Media bajo carga de descarga
+    upload_rtt_ms: Optional[float]           # Media bajo carga de subida
+    download_increase_ms: Optional[float]
+    upload_increase_ms: Optional[float]
+    download_mbps: Optional[float]
+    upload_mbps: Optional[float]
+    grade: str
+    phases: Dict[str, PhaseStats] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        def ms(value):
+            return f"{value:.0f}ms" if value is not None else "N/A"
+
+        def mbps(value):
+            return f"{value:.1f} Mbps" if value is not None else "N/A"
+
+        return (
+            f"Bufferbloat: {self.grade}\n"
+            f"  Reposo:  {ms(self.idle_rtt_ms)}\n"
+            f"  Descarga: {ms(self.download_rtt_ms)} (+{ms(self.download_increase_ms)}) @ {mbps(self.download_mbps)}\n"
+            f"  Subida:   {ms(self.upload_rtt_ms)} (+{ms(self.upload_increase_ms)}) @ {mbps(self.upload_mbps)}"
+        )
+
+
+class BufferbloatTest:
+    """
+    Prueba de latencia bajo carga.
+
+    rtt_probe es inyectable: por defecto mide el tiempo de conexión TCP al
+    host de la prueba (no requiere ICMP ni privilegios).
+    """
+
+    def __init__(self, config: Optional[BufferbloatConfig] = None,
+                 rtt_probe: Optional[Callable[[], Optional[float]]] = None):
+        self.config = config or BufferbloatConfig()
+        self.rtt_probe = rtt_probe or self._tcp_connect_rtt
+
+        parts = urlsplit(self.config.download_url)
+        self._probe_host = self.config.probe_host or parts.hostname
+        self._probe_port = self.config.probe_port or parts.port or (443 if parts.scheme == "https" else 80)
+
+    # ------------------------------------------------------------------
+    # Sondas de RTT
+    # ------------------------------------------------------------------
+
+    def _tcp_connect_rtt(self) -> Optional[float]:
+        """RTT aproximado: tiempo del handshake TCP"""
+        return tcp_connect_rtt(self._probe_host, self._probe_port, self.config.probe_timeout)
+
+    def _sample_rtt(self, duration: float, stats: PhaseStats):
+        """Sondear RTT cada probe_interval durante duration"""
+        start = time.monotonic()
+        next_probe = start
+        while True:
+            now = time.monotonic()
+            if now - start >= duration:
+                break
+
+            rtt = self.rtt_probe()
+            if rtt is None:
+                stats.lost_probes += 1
+            else:
+                stats.rtt_samples.append(rtt)
+
+            next_probe += self.config.probe_interval
+            time.sleep(max(0.0, next_probe - time.monotonic()))
+
+    # ------------------------------------------------------------------
+    # Carga
+    # ------------------------------------------------------------------
+
+    def _loaded_phase(self, direction: str) -> PhaseStats:
+        """Saturar una dirección con N streams mientras se sondea el RTT"""
+        config = self.config
+        stats = PhaseStats()
+        url = config.download_url if direction == "download" else config.upload_url
+        load = StreamLoad(direction, url, config.streams, config.upload_request_bytes).start()
+
+        try:
+            # RTT y throughput se miden solo tras el arranque (slow start)
+            self._sample_rtt(config.warmup_seconds, PhaseStats())
+            bytes_start = load.bytes_transferred
+            measure_start = time.monotonic()
+
+            self._sample_rtt(config.load_seconds, stats)
+
+            transferred = load.bytes_transferred - bytes_start
+            elapsed = time.monotonic() - measure_start
+        finally:
+            load.stop()
+
+        if elapsed > 0 and transferred:
+            stats.throughput_mbps = transferred * 8 / elapsed / 1_000_000
+        return stats
+
+    # ------------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------------
+
+    def run(self, progress: Optional[Callable[[str], None]] = None) -> BufferbloatResult:
+        """Ejecutar reposo → descarga → subida"""
+        def report(phase: str):
+            log_info(f"Bufferbloat: fase {phase}")
+            if progress:
+                progress(phase)
+
+        report("idle")
+        idle = PhaseStats()
+        self._sample_rtt(self.config.idle_seconds, idle)
+
+        report("download")
+        download = self._loaded_phase("download")
+
+        report("upload")
+        upload = self._loaded_phase("upload")
+
+        idle_rtt = idle.median_ms
+
+        def increase(phase: PhaseStats) -> Optional[float]:
+            if idle_rtt is None or phase.mean_ms is None:
+                return None
+            return max(0.0, phase.mean_ms - idle_rtt)
+
+        download_increase = increase(download)
+        upload_increase = increase(upload)
+        increases = [i for i in (download_increase, upload_increase) if i is not None]
+
+        if idle_rtt is None:
+            log_warning("Bufferbloat: sin respuesta del host de sondeo")
+
+        return BufferbloatResult(
+            timestamp=datetime.now(),
+            idle_rtt_ms=idle_rtt,
+            download_rtt_ms=download.mean_ms,
+            upload_rtt_ms=upload.mean_ms,
+            download_increase_ms=download_increase,
+            upload_increase_ms=upload_increase,
+            download_mbps=download.throughput_mbps,
+            upload_mbps=upload.throughput_mbps,
+            grade=grade_for_increase(max(increases)) if increases else "?",
+            phases={'idle': idle, 'download': download, 'upload': upload}
+        )
+
+
+if __name__ == "__main__":
+    print("Ejecutando prueba de bufferbloat (~30s)...\n")
+    print(BufferbloatTest().run().summary())
@@ -0,0 +1,477 @@
+"""
+NetBoozt - Correlación de Eventos y Métricas
+Una línea de tiempo común para los eventos del sistema (timeouts DNS,
+desconexiones WiFi, cambios de interfaz, failovers) y los picos de las
+métricas (latencia, errores, drops), con un índice de intervalos para
+responder rápido sobre días de datos:
+
+- ¿Qué pasó en ±10s de cada pico de latencia?
+- ¿Qué tipos de evento acompañan a los picos más de lo que explica el azar?
+
+By LOUST (www.loust.pro)
+"""
+
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .anomaly_detector import EwmaBaseline
+
+try:
+    from ..utils.logger import log_info
+except ImportError:
+    def log_info(msg): print(f"[INFO] {msg}")
+
+
+def _ts(value) -> float:
+    """datetime o epoch → epoch"""
+    return value.timestamp() if isinstance(value, datetime) else float(value)
+
+
+@dataclass
+class TimelineEntry:
+    """Intervalo de la línea de tiempo (un evento puntual tiene start == end)"""
+    start: float
+    end: float
+    kind: str                       # Tipo de evento o "spike:<métrica>"
+    label: str = ""
+    value: Optional[float] = None   # Pico de la métrica
+    payload: Any = field(default=None, repr=False, compare=False)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    @property
+    def is_spike(self) -> bool:
+        return self.kind.startswith("spike:")
+
+
+@dataclass
+class CoOccurrence:
+    """Frecuencia con que un tipo de evento acompaña a los picos de una métrica"""
+    event_kind: str
+    metric: str
+    spikes_with_event: int
+    total_spikes: int
+    baseline_rate: float            # Probabilidad de coincidir por azar
+    events: int
+
+    @property
+    def support(self) -> float:
+        return self.spikes_with_event / self.total_spikes if self.total_spikes else 0.0
+
+    @property
+    def lift(self) -> float:
+        """Cuántas veces más frecuente que el azar"""
+        if self.baseline_rate <= 0:
+            return float('inf') if self.spikes_with_event else 0.0
+        return self.support / self.baseline_rate
+
+    def summary(self) -> str:
+        lift = "∞" if self.lift == float('inf') else f"x{self.lift:.1f}"
+        return (f"{self.event_kind} cerca de {self.spikes_with_event}/{self.total_spikes} picos de "
+                f"{self.metric} ({self.support:.0%}, {lift} sobre el azar)")
+
+
+class IntervalIndex:
+    """
+    Intervalos ordenados por inicio.
+
+    Una consulta [a, b] busca por bisección los que empiezan en
+    [a - duración máxima, b] y filtra por el final: O(log n + k). Los
+    intervalos largos (una caída de horas) van a una lista aparte para
+    no ensanchar la búsqueda de todos los demás.
+    """
+
+    LONG_INTERVAL = 300.0
+
+    def __init__(self):
+        self._starts: List[float] = []
+        self._entries: List[TimelineEntry] = []
+        self._long: List[TimelineEntry] = []
+        self.max_duration = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._long)
+
+    def add(self, entry: TimelineEntry):
+        if entry.duration > self.LONG_INTERVAL:
+            self._long.append(entry)
+            return
+        self.max_duration = max(self.max_duration, entry.duration)
+        if not self._starts or entry.start >= self._starts[-1]:
+            # Caso normal: los datos llegan en orden
+            self._starts.append(entry.start)
+            self._entries.append(entry)
+        else:
+            index = bisect_right(self._starts, entry.start)
+            self._starts.insert(index, entry.start)
+            self._entries.insert(index, entry)
+
+    def overlapping(self, start: float, end: float) -> List[TimelineEntry]:
+        """Intervalos que se solapan con [start, end]"""
+        lo = bisect_left(self._starts, start - self.max_duration)
+        hi = bisect_right(self._starts, end)
+        found = [e for e in self._entries[lo:hi] if e.end >= start]
+        found += [e for e in self._long if e.start <= end and e.end >= start]
+        return found
+
+    def any_overlapping(self, start: float, end: float) -> bool:
+        lo = bisect_left(self._starts, start - self.max_duration)
+        hi = bisect_right(self._starts, end)
+        if any(e.end >= start for e in self._entries[lo:hi]):
+            return True
+        return any(e.start <= end and e.end >= start for e in self._long)
+
+    def between(self, start: float, end: float) -> List[TimelineEntry]:
+        """Intervalos que empiezan en [start, end]"""
+        lo = bisect_left(self._starts, start)
+        hi = bisect_right(self._starts, end)
+        found = self._entries[lo:hi] + [e for e in self._long if start <= e.start <= end]
+        return sorted(found, key=lambda e: e.start) if self._long else found
+
+    def covered_time(self, start: float, end: float, pad_before: float, pad_after: float) -> float:
+        """Segundos de [start, end] cubiertos por los intervalos ensanchados"""
+        intervals = sorted(
+            (max(e.start - pad_before, start), min(e.end + pad_after, end))
+            for e in self.overlapping(start - pad_after, end + pad_before)
+        )
+        covered = 0.0
+        current_start = current_end = None
+        for a, b in intervals:
+            if b <= a:
+                continue
+            if current_end is None or a > current_end:
+                if current_end is not None:
+                    covered += current_end - current_start
+                current_start, current_end = a, b
+            else:
+                current_end = max(current_end, b)
+        if current_end is not None:
+            covered += current_end - current_start
+        return covered
+
+    def prune(self, before: float) -> int:
+        """Eliminar intervalos que terminaron antes de `before`"""
+        cut = bisect_left(self._starts, before - self.max_duration)
+        keep = [e for e in self._entries[:cut] if e.end >= before]
+        removed = cut - len(keep)
+        self._entries = keep + self._entries[cut:]
+        self._starts = [e.start for e in keep] + self._starts[cut:]
+        long_before = len(self._long)
+        self._long = [e for e in self._long if e.end >= before]
+        return removed + long_before - len(self._long)
+
+
+class SpikeDetector:
+    """
+    Picos de una métrica contra su línea base EWMA robusta (la misma de
+    AnomalyDetector). Las muestras anómalas consecutivas forman un solo
+    pico: un intervalo con su valor máximo.
+    """
+
+    ALPHA = 0.02                # Memoria corta: interesan picos, no tendencias
+    CLIP_SIGMAS = 3.0
+    Z_THRESHOLD = 3.0
+    MIN_SAMPLES = 30
+    MAX_GAP = 5.0               # Segundos sin muestras que cierran un pico
+
+    def __init__(self, direction: int = 1, min_scale: float = 1.0):
+        self.direction = direction
+        self.min_scale = min_scale
+        self.baseline = EwmaBaseline()
+        self._open: Optional[Tuple[float, float, float]] = None     # inicio, último, pico
+
+    def _scale(self) -> float:
+        return max(self.min_scale, abs(self.baseline.mean) * 0.05)
+
+    def update(self, value: float, timestamp: float) -> Optional[Tuple[float, float, float]]:
+        """
+        Returns:
+            (inicio, fin, pico) cuando se cierra un pico
+        """
+        closed = None
+        if self._open and timestamp - self._open[1] > self.MAX_GAP:
+            closed, self._open = self._open, None
+
+        spiking = (self.baseline.count >= self.MIN_SAMPLES and
+                   self.direction * self.baseline.score(value, self._scale()) >= self.Z_THRESHOLD)
+        alpha = self.ALPHA
+        if spiking:
+            alpha *= 0.1
+            if self._open:
+                start, _, peak = self._open
+                worse = value if self.direction * (value - peak) > 0 else peak
+                self._open = (start, timestamp, worse)
+            else:
+                self._open = (timestamp, timestamp, value)
+        elif self._open:
+            closed, self._open = self._open, None
+
+        self.baseline.update(value, alpha, self.CLIP_SIGMAS, self._scale())
+        return closed
+
+    def flush(self) -> Optional[Tuple[float, float, float]]:
+        closed, self._open = self._open, None
+        return closed
+
+
+class CorrelationEngine:
+    """
+    Línea de tiempo de eventos y picos con consultas de correlación.
+
+    Fuentes: WindowsEventMonitor (on_event), NetworkMonitor
+    (register_callback) e InterfaceWatcher (on_change); o add_event /
+    add_interval / add_sample directamente.
+
+    Los picos se detectan por (métrica, adaptador): cada adaptador tiene su
+    propia línea base. Las consultas por métrica incluyen todos; el adaptador
+    del pico va en su payload.
+    """
+
+    WINDOW = 10.0               # ± segundos por defecto alrededor de un pico
+    RETENTION_HOURS = 72
+    MIN_SPIKES = 3              # Picos mínimos para dar estadísticas
+    MIN_LIFT = 2.0              # Lift mínimo para sugerir una causa
+
+    # Métricas de NetworkSnapshot vigiladas: (dirección mala, escala mínima)
+    METRICS: Dict[str, Tuple[int, float]] = {
+        'latency_ms': (1, 2.0),
+        'errors_per_sec': (1, 1.0),
+        'drops_per_sec': (1, 1.0),
+    }
+
+    def __init__(self):
+        self._events: Dict[str, IntervalIndex] = {}
+        self._spikes: Dict[str, IntervalIndex] = {}
+        self._detectors: Dict[Tuple[str, str], SpikeDetector] = {}
+        self._lock = threading.Lock()
+        self._first: Optional[float] = None
+        self._last: Optional[float] = None
+        self._last_prune = 0.0
+
+    def _touch(self, *timestamps: float):
+        for ts in timestamps:
+            self._first = ts if self._first is None else min(self._first, ts)
+            self._last = ts if self._last is None else max(self._last, ts)
+
+    # ------------------------------------------------------------------
+    # Ingesta
+    # ------------------------------------------------------------------
+
+    def add_interval(self, kind: str, start, end=None, label: str = "",
+                     value: Optional[float] = None, payload: Any = None) -> TimelineEntry:
+        """Añadir un evento (puntual si end es None)"""
+        start = _ts(start)
+        end = start if end is None else _ts(end)
+        entry = TimelineEntry(start, end, kind, label, value, payload)
+        target = self._spikes if entry.is_spike else self._events
+        with self._lock:
+            target.setdefault(kind, IntervalIndex()).add(entry)
+            self._touch(start, end)
+        return entry
+
+    def add_event(self, event):
+        """Callback para WindowsEventMonitor.on_event"""
+        self.add_interval(event.event_type.value, event.timestamp,
+                          label=f"{event.provider} {event.event_id}", payload=event)
+
+    def add_interface_change(self, change):
+        """Callback para InterfaceWatcher.on_change"""
+        if change.status_changed:
+            state = change.adapter.status.value if change.adapter else change.change
+            self.add_interval(f"interface_{change.change}", change.timestamp,
+                              label=f"{change.name}: {state}", payload=change)
+
+    def add_sample(self, metric: str, value: float, timestamp,
+                   adapter: str = "default") -> Optional[TimelineEntry]:
+        """Muestra de una métrica; devuelve el pico si se acaba de cerrar uno"""
+        timestamp = _ts(timestamp)
+        key = (metric, adapter)
+        with self._lock:
+            detector = self._detectors.get(key)
+            if detector is None:
+                direction, min_scale = self.METRICS.get(metric, (1, 1.0))
+                detector = self._detectors[key] = SpikeDetector(direction, min_scale)
+
+            self._touch(timestamp)
+            closed = detector.update(value, timestamp)
+
+        if closed:
+            return self._add_spike(key, closed)
+        return None
+
+    def _add_spike(self, key: Tuple[str, str], spike: Tuple[float, float, float]) -> TimelineEntry:
+        metric, adapter = key
+        start, end, peak = spike
+        where = f" ({adapter})" if adapter != "default" else ""
+        return self.add_interval(f"spike:{metric}", start, end, label=f"{metric} {peak:.1f}{where}",
+                                 value=peak, payload=adapter)
+
+    def add_snapshot(self, snapshot):
+        """Callback para NetworkMonitor.register_callback"""
+        for metric in self.METRICS:
+            value = getattr(snapshot, metric, None)
+            if value is not None:
+                self.add_sample(metric, value, snapshot.timestamp, snapshot.adapter)
+
+        # Retención: podar como mucho una vez por minuto
+        now = _ts(snapshot.timestamp)
+        with self._lock:
+            due = now - self._last_prune > 60
+            if due:
+                self._last_prune = now
+        if due:
+            self.prune(now - self.RETENTION_HOURS * 3600)
+
+    def flush(self):
+        """Cerrar los picos en curso (para consultar sin esperar a que acaben)"""
+        with self._lock:
+            closed = [(key, detector.flush()) for key, detector in self._detectors.items()]
+        for key, spike in closed:
+            if spike:
+                self._add_spike(key, spike)
+
+    def attach(self, event_monitor=None, network_monitor=None, interface_watcher=None):
+        """Suscribirse a las fuentes disponibles"""
+        if event_monitor is not None:
+            event_monitor.on_event(self.add_event)
+        if network_monitor is not None:
+            network_monitor.register_callback(self.add_snapshot)
+        if interface_watcher is not None:
+            interface_watcher.on_change(self.add_interface_change)
+
+    def prune(self, before) -> int:
+        """Eliminar todo lo anterior a `before`"""
+        before = _ts(before)
+        with self._lock:
+            removed = sum(index.prune(before) for index in (*self._events.values(), *self._spikes.values()))
+            if self._first is not None and self._first < before:
+                self._first = before
+        if removed:
+            log_info(f"Correlación: {removed} entradas fuera de retención eliminadas")
+        return removed
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def spikes(self, metric: str = 'latency_ms', since=None, until=None) -> List[TimelineEntry]:
+        with self._lock:
+            index = self._spikes.get(f"spike:{metric}")
+            if index is None:
+                return []
+            return index.between(_ts(since) if since is not None else float('-inf'),
+                                 _ts(until) if until is not None else float('inf'))
+
+    def around(self, start, end=None, window: Optional[float] = None) -> List[TimelineEntry]:
+        """Eventos en ±window de un instante o intervalo, ordenados por tiempo"""
+        window = self.WINDOW if window is None else window
+        start = _ts(start)
+        end = start if end is None else _ts(end)
+        with self._lock:
+            found = [entry for index in self._events.values()
+                     for entry in index.overlapping(start - window, end + window)]
+        return sorted(found, key=lambda e: e.start)
+
+    def explain_spikes(self, metric: str = 'latency_ms', window: Optional[float] = None,
+                       since=None) -> List[Tuple[TimelineEntry, List[TimelineEntry]]]:
+        """Cada pico con los eventos de su entorno"""
+        return [(spike, self.around(spike.start, spike.end, window))
+                for spike in self.spikes(metric, since)]
+
+    def co_occurrence(self, metric: str = 'latency_ms', window: Optional[float] = None,
+                      since=None) -> List[CoOccurrence]:
+        """
+        Tipos de evento ordenados por lift: soporte (picos con el evento
+        cerca) dividido por la probabilidad de que un instante cualquiera
+        del periodo caiga igual de cerca del evento.
+        """
+        window = self.WINDOW if window is None else window
+        spikes = self.spikes(metric, since)
+        if not spikes:
+            return []
+
+        results = []
+        with self._lock:
+            if self._first is None:
+                return []
+            period_start = _ts(since) if since is not None else self._first
+            period_end = max(self._last, period_start + 1)
+            period = period_end - period_start
+            mean_spike = sum(s.duration for s in spikes) / len(spikes)
+
+            for kind, index in self._events.items():
+                hits = sum(1 for s in spikes if index.any_overlapping(s.start - window, s.end + window))
+                if not hits:
+                    continue
+                covered = index.covered_time(period_start, period_end, window + mean_spike, window)
+                results.append(CoOccurrence(
+                    event_kind=kind,
+                    metric=metric,
+                    spikes_with_event=hits,
+                    total_spikes=len(spikes),
+                    baseline_rate=covered / period,
+                    events=len(index.between(period_start, period_end)),
+                ))
+
+        results.sort(key=lambda r: (r.lift, r.spikes_with_event), reverse=True)
+        return results
+
+    def root_cause_hints(self, metric: str = 'latency_ms', limit: int = 3,
+                         window: Optional[float] = None, since=None) -> List[str]:
+        """Frases para la UI con las causas probables de los picos"""
+        stats = self.co_occurrence(metric, window, since)
+        if not stats or stats[0].total_spikes < self.MIN_SPIKES:
+            return []
+        return [s.summary() for s in stats if s.lift >= self.MIN_LIFT][:limit]
+
+    def get_summary(self) -> Dict:
+        with self._lock:
+            return {
+                'events': {kind: len(index) for kind, index in self._events.items()},
+                'spikes': {kind[6:]: len(index) for kind, index in self._spikes.items()},
+                'span_hours': ((self._last - self._first) / 3600) if self._first is not None else 0.0,
+            }
+
+
+# Singleton
+_correlation_engine_instance = None
+
+def get_correlation_engine() -> CorrelationEngine:
+    """Obtener instancia única del motor de correlación"""
+    global _correlation_engine_instance
+    if _correlation_engine_instance is None:
+        _correlation_engine_instance = CorrelationEngine()
+    return _correlation_engine_instance
+
+
+if __name__ == "__main__":
+    import random
+
+    # Tres días a 1 Hz: picos de latencia que siguen a timeouts DNS
+    engine = CorrelationEngine()
+    random.seed(7)
+    start = time.time() - 3 * 86400
+    dns_times = set(random.sample(range(60, 3 * 86400, 30), 400))
+    t0 = time.perf_counter()
+    for second in range(3 * 86400):
+        ts = start + second
+        if second in dns_times:
+            engine.add_interval("dns_timeout", ts)
+        if second % 977 == 0:
+            engine.add_interval("tcp_reset", ts)
+        spike = (second - 2) in dns_times or (second - 3) in dns_times
+        engine.add_sample("latency_ms", 20 + random.random() * 3 + (180 if spike else 0), ts)
+    engine.flush()
+    print(f"Ingesta: {time.perf_counter() - t0:.1f}s, {engine.get_summary()}")
+
+    t0 = time.perf_counter()
+    hints = engine.root_cause_hints()
+    print(f"Consulta: {(time.perf_counter() - t0) * 1000:.1f}ms")
+    for hint in hints:
+        print(f"  → {hint}")
@@ -0,0 +1,159 @@
+"""
+NetBoozt - Caché de Resultados de Diagnóstico
+Guarda el resultado de cada capa del diagnóstico (info del adaptador,
+adaptador, router, ISP, DNS) con su propio TTL. Un diagnóstico repetido
+solo vuelve a verificar las capas vencidas o invalidadas por eventos del
+monitor en vivo (desconexión WiFi, timeouts DNS, failover...).
+
+Las capas forman una cadena: invalidar una capa invalida también las que
+dependen de ella (un cambio de adaptador obliga a revisar router, ISP y
+DNS; un timeout DNS solo a DNS).
+
+By LOUST (www.loust.pro)
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+from .windows_events import NetworkEventType
+
+try:
+    from ..utils.logger import log_info
+except ImportError:
+    def log_info(msg): print(f"[INFO] {msg}")
+
+
+# Orden de la cadena de diagnóstico
+LAYERS = ('adapter_info', 'adapter', 'router', 'isp', 'dns')
+
+# Capas de las que depende cada capa (invalidación en cascada)
+LAYER_DEPENDENCIES = {
+    'adapter_info': (),
+    'adapter': ('adapter_info',),
+    'router': ('adapter_info', 'adapter'),
+    'isp': ('adapter',),
+    'dns': ('adapter_info', 'isp'),
+}
+
+# Capa afectada por cada tipo de evento del monitor
+EVENT_LAYERS = {
+    NetworkEventType.WLAN_DISCONNECT: 'adapter_info',
+    NetworkEventType.WLAN_CONNECT: 'adapter_info',
+    NetworkEventType.WLAN_LIMITED: 'adapter_info',
+    NetworkEventType.ADAPTER_ERROR: 'adapter_info',
+    NetworkEventType.DHCP_FAILURE: 'adapter_info',
+    NetworkEventType.NCSI_FAILURE: 'isp',
+    NetworkEventType.TCP_RESET: 'isp',
+    NetworkEventType.DNS_TIMEOUT: 'dns',
+    NetworkEventType.DNS_FAILURE: 'dns',
+}
+
+
+class DiagnosticCache:
+    """
+    Resultados por capa con TTL.
+
+    Cada entrada se indexa por (capa, clave): la clave identifica contra
+    qué se verificó (nombre del adaptador, IP del gateway, servidores DNS),
+    así que un cambio de gateway o de DNS es un fallo de caché sin
+    necesidad de invalidar.
+    """
+
+    # TTL por capa (segundos) para resultados OK
+    LAYER_TTLS = {
+        'adapter_info': 300,    # Consulta PowerShell: la más cara y la más estable
+        'adapter': 60,
+        'router': 15,
+        'isp': 30,
+        'dns': 60,
+    }
+
+    # Un fallo se vuelve a verificar pronto (la red puede haber vuelto)
+    FAILURE_TTL = 5
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            clock: Reloj monótono (inyectable)
+        """
+        self._clock = clock
+        self._entries: Dict[Tuple[str, Hashable], Tuple[Any, float, bool]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, layer: str, key: Hashable = '') -> Tuple[bool, Any]:
+        """
+        Returns:
+            (encontrado y vigente, valor)
+        """
+        with self._lock:
+            entry = self._entries.get((layer, key))
+            if entry is not None:
+                value, expires, _ = entry
+                if self._clock() < expires:
+                    self.hits += 1
+                    return True, value
+                del self._entries[(layer, key)]
+            self.misses += 1
+            return False, None
+
+    def put(self, layer: str, value: Any, ok: bool, key: Hashable = ''):
+        """Guardar el resultado de una capa"""
+        ttl = self.LAYER_TTLS.get(layer, 0) if ok else self.FAILURE_TTL
+        with self._lock:
+            self._entries[(layer, key)] = (value, self._clock() + ttl, ok)
+
+    def invalidate(self, *layers: str) -> List[str]:
+        """
+        Invalidar capas y las que dependen de ellas.
+
+        Returns:
+            Capas invalidadas (sin argumentos: todas)
+        """
+        affected = set(layers or LAYERS)
+        changed = True
+        while changed:
+            changed = False
+            for layer, dependencies in LAYER_DEPENDENCIES.items():
+                if layer not in affected and affected.intersection(dependencies):
+                    affected.add(layer)
+                    changed = True
+
+        with self._lock:
+            for entry_key in [k for k in self._entries if k[0] in affected]:
+                del self._entries[entry_key]
+
+        return [layer for layer in LAYERS if layer in affected]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def fresh_layers(self) -> List[str]:
+        """Capas con algún resultado vigente"""
+        now = self._clock()
+        with self._lock:
+            fresh = {layer for (layer, _), (_, expires, _) in self._entries.items() if now < expires}
+        return [layer for layer in LAYERS if layer in fresh]
+
+    # ------------------------------------------------------------------
+    # Eventos en vivo
+    # ------------------------------------------------------------------
+
+    def on_network_event(self, event):
+        """Callback para WindowsEventMonitor.on_event"""
+        layer = EVENT_LAYERS.get(event.event_type)
+        if layer:
+            invalidated = self.invalidate(layer)
+            log_info(f"Caché de diagnóstico: {event.event_type.value} invalida {', '.join(invalidated)}")
+
+    def on_interface_change(self, change):
+        """Callback para InterfaceWatcher.on_change"""
+        invalidated = self.invalidate('adapter_info')
+        log_info(f"Caché de diagnóstico: cambio en {change.name} invalida {', '.join(invalidated)}")
+
+    def attach(self, event_monitor):
+        """Suscribirse a los eventos de un WindowsEventMonitor"""
+        event_monitor.on_event(self.on_network_event)
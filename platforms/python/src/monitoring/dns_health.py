@@ -9,6 +9,9 @@ import subprocess
 import threading
 import time
 import re
+import socket
+import struct
+import random
 from typing import Dict, List, Optional, Callable
 from dataclasses import dataclass
 from enum import Enum
@@ -39,6 +42,7 @@ class DNSHealth:
     packet_loss: float
     last_check: datetime
     consecutive_failures: int = 0
+    uptime_pct: float = 100.0  # Disponibilidad reciente (EWMA de checks)
 
 
 class DNSHealthChecker:
@@ -49,16 +53,20 @@ class DNSHealthChecker:
     THRESHOLD_SLOW = 80      # ms - antes era 150
     THRESHOLD_TIMEOUT = 2000 # ms (timeout) - antes era 3000
     MAX_CONSECUTIVE_FAILURES = 2  # antes era 3 - reacciona más rápido
+    UPTIME_EWMA_ALPHA = 0.1  # Peso de cada check en uptime_pct (~10 checks de memoria)
     
     # Test domains para verificar resolución DNS real
     TEST_DOMAINS = ['google.com', 'microsoft.com', 'cloudflare.com']
     
-    def __init__(self, check_interval: int = 10):  # Más frecuente: 10s vs 15s
+    def __init__(self, check_interval: int = 10, source_address: Optional[str] = None):  # Más frecuente: 10s vs 15s
         """
         Args:
             check_interval: Intervalo entre checks en segundos (default: 10)
+            source_address: IP local desde la que salen las pruebas. Permite
+                medir cada interfaz por separado en equipos multi-homed.
         """
         self.check_interval = check_interval
+        self.source_address = source_address
         self.dns_servers: Dict[str, DNSHealth] = {}
         self.is_running = False
         self._thread: Optional[threading.Thread] = None
@@ -159,6 +167,10 @@ class DNSHealthChecker:
                 else:
                     consecutive_failures = 0
                 
+                # Uptime reciente (EWMA)
+                check_up = 0.0 if new_status == DNSStatus.DOWN else 100.0
+                uptime_pct = old_health.uptime_pct + self.UPTIME_EWMA_ALPHA * (check_up - old_health.uptime_pct)
+                
                 # Crear nuevo estado
                 new_health = DNSHealth(
                     dns_server=dns_server,
@@ -166,7 +178,8 @@ class DNSHealthChecker:
                     latency_ms=latency if latency is not None else 9999.0,
                     packet_loss=packet_loss,
                     last_check=datetime.now(),
-                    consecutive_failures=consecutive_failures
+                    consecutive_failures=consecutive_failures,
+                    uptime_pct=uptime_pct
                 )
                 
                 self.dns_servers[dns_server] = new_health
@@ -189,6 +202,8 @@ class DNSHealthChecker:
         try:
             # Windows ping command
             cmd = ["ping", "-n", str(count), "-w", "1000", server]
+            if self.source_address:
+                cmd[1:1] = ["-S", self.source_address]
             
             result = subprocess.run(
                 cmd,
@@ -270,6 +285,10 @@ class DNSHealthChecker:
         """
         domain = domain or self.TEST_DOMAINS[0]
         
+        if self.source_address:
+            # nslookup no permite elegir interfaz: consulta UDP propia
+            return self._query_dns_udp(dns_server, domain)
+        
         try:
             import time as t
             start = t.time()
@@ -298,6 +317,46 @@ class DNSHealthChecker:
             log_error(f"Error en verificación DNS {dns_server}: {e}")
             return False, 0.0
     
+    def _query_dns_udp(self, dns_server: str, domain: str, timeout: float = 2.0) -> tuple[bool, float]:
+        """
+        Consulta DNS tipo A por UDP desde source_address
+        
+        Returns:
+            (success, latency_ms)
+        """
+        query_id = random.randint(0, 0xFFFF)
+        header = struct.pack(">HHHHHH", query_id, 0x0100, 1, 0, 0, 0)  # RD=1, 1 pregunta
+        qname = b"".join(
+            bytes([len(label)]) + label.encode("ascii")
+            for label in domain.rstrip(".").split(".")
+        ) + b"\x00"
+        packet = header + qname + struct.pack(">HH", 1, 1)  # A, IN
+        
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.settimeout(timeout)
+            sock.bind((self.source_address or "0.0.0.0", 0))
+            
+            start = time.perf_counter()
+            sock.sendto(packet, (dns_server, 53))
+            while True:
+                response, _ = sock.recvfrom(512)
+                if len(response) >= 12 and struct.unpack(">H", response[:2])[0] == query_id:
+                    break
+            elapsed = (time.perf_counter() - start) * 1000
+            
+            flags, _, answers = struct.unpack(">HHH", response[2:8])
+            rcode = flags & 0x000F
+            return rcode == 0 and answers > 0, elapsed
+        
+        except socket.timeout:
+            return False, timeout * 1000
+        except OSError as e:
+            log_warning(f"Consulta DNS {dns_server} desde {self.source_address} falló: {e}")
+            return False, 0.0
+        finally:
+            sock.close()
+    
     def get_fastest_dns(self) -> Optional[str]:
         """Obtener el DNS más rápido actualmente"""
         with self._lock:
@@ -0,0 +1,489 @@
+"""
+NetBoozt - Lector Incremental del Event Log
+Lee el Event Log por cursor (EventRecordID) en lugar de por ventana de
+tiempo: cada consulta pide solo los registros posteriores al último leído,
+en lotes ordenados, así que una ráfaga de eventos no pierde ni duplica
+registros. El cursor se guarda en disco y sobrevive a reinicios.
+
+Los registros se leen como XML crudo (sin formatear el mensaje, que es lo
+caro: carga las DLL de recursos de cada proveedor). El mensaje completo
+se renderiza solo cuando alguien lo pide, y render_messages() formatea
+varios registros en una sola consulta.
+
+La fuente es intercambiable: WevtutilEventSource consulta el sistema y
+RecordedEventSource sirve registros grabados (XML de wevtutil o JSON) para
+verificar el parser fuera de Windows.
+
+By LOUST (www.loust.pro)
+"""
+
+import json
+import threading
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+try:
+    from ..utils.shell_host import get_shell_runner
+except ImportError:
+    # Fallback con src/ en sys.path (ejecución directa)
+    from utils.shell_host import get_shell_runner
+
+try:
+    from ..utils.logger import log_warning, log_error
+except ImportError:
+    def log_warning(msg): print(f"[WARN] {msg}")
+    def log_error(msg): print(f"[ERROR] {msg}")
+
+
+# Nombres de nivel de Windows (LevelDisplayName en inglés)
+LEVEL_NAMES = {
+    1: 'Critical',
+    2: 'Error',
+    3: 'Warning',
+    4: 'Information',
+    5: 'Verbose',
+}
+
+
+@dataclass
+class EventRecord:
+    """Registro del Event Log con el mensaje renderizado bajo demanda"""
+    record_id: int
+    event_id: int
+    provider: str
+    level: int
+    time_created: datetime
+    event_data: Dict[str, str] = field(default_factory=dict)
+    _message: Optional[str] = field(default=None, repr=False)
+    _renderer: Optional[Callable[['EventRecord'], Optional[str]]] = field(
+        default=None, repr=False, compare=False)
+
+    @property
+    def level_name(self) -> str:
+        return LEVEL_NAMES.get(self.level, str(self.level))
+
+    @property
+    def data_summary(self) -> str:
+        """Texto barato a partir de los datos del evento (sin renderizar)"""
+        return "; ".join(f"{key}: {value}" for key, value in self.event_data.items() if value)
+
+    @property
+    def message(self) -> str:
+        """Mensaje completo (se renderiza la primera vez que se pide)"""
+        if self._message is None:
+            rendered = None
+            if self._renderer is not None:
+                try:
+                    rendered = self._renderer(self)
+                except Exception as e:
+                    log_warning(f"No se pudo renderizar el evento {self.record_id}: {e}")
+            self._message = rendered or self.data_summary
+        return self._message
+
+    @property
+    def message_loaded(self) -> bool:
+        return self._message is not None
+
+
+# ----------------------------------------------------------------------
+# Parsers
+# ----------------------------------------------------------------------
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _child(element: ET.Element, name: str) -> Optional[ET.Element]:
+    for child in element:
+        if _local_name(child.tag) == name:
+            return child
+    return None
+
+
+def parse_system_time(value: str) -> datetime:
+    """SystemTime UTC de Windows (7 decimales) → hora local naive"""
+    value = value.strip().rstrip('Z')
+    if '.' in value:
+        base, fraction = value.split('.', 1)
+        value = f"{base}.{fraction[:6]}"
+    parsed = datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+    return parsed.astimezone().replace(tzinfo=None)
+
+
+def _parse_event_element(event: ET.Element) -> Optional[EventRecord]:
+    system = _child(event, 'System')
+    if system is None:
+        return None
+
+    provider = _child(system, 'Provider')
+    event_id = _child(system, 'EventID')
+    level = _child(system, 'Level')
+    time_created = _child(system, 'TimeCreated')
+    record_id = _child(system, 'EventRecordID')
+    if event_id is None or record_id is None or time_created is None:
+        return None
+
+    # EventData (Data con o sin Name) o UserData (un elemento con hijos)
+    event_data: Dict[str, str] = {}
+    data_root = _child(event, 'EventData')
+    if data_root is not None:
+        for index, data in enumerate(data_root):
+            event_data[data.get('Name') or f"Data{index}"] = (data.text or '').strip()
+    else:
+        user_data = _child(event, 'UserData')
+        if user_data is not None and len(user_data):
+            for data in user_data[0]:
+                event_data[_local_name(data.tag)] = (data.text or '').strip()
+
+    record = EventRecord(
+        record_id=int(record_id.text),
+        # Proveedores clásicos: <EventID Qualifiers='...'>; el ID son los 16 bits bajos
+        event_id=int(event_id.text) & 0xFFFF,
+        provider=provider.get('Name', '') if provider is not None else '',
+        level=int(level.text) if level is not None and level.text else 4,
+        time_created=parse_system_time(time_created.get('SystemTime', '')),
+        event_data=event_data,
+    )
+
+    # RenderedXml: el mensaje ya viene incluido
+    rendering = _child(event, 'RenderingInfo')
+    if rendering is not None:
+        message = _child(rendering, 'Message')
+        if message is not None and message.text:
+            record._message = message.text.strip()
+    return record
+
+
+def parse_event_xml(text: str) -> List[EventRecord]:
+    """
+    Registros de la salida de `wevtutil qe /f:xml` (o /f:RenderedXml).
+
+    wevtutil concatena elementos <Event> sin raíz común; se envuelven
+    antes de parsear.
+    """
+    text = text.strip()
+    if not text:
+        return []
+    if text.startswith('<?xml'):
+        text = text.split('?>', 1)[1]
+    root = ET.fromstring(f"<Events>{text}</Events>")
+
+    records = []
+    for element in root.iter():
+        if _local_name(element.tag) == 'Event':
+            record = _parse_event_element(element)
+            if record:
+                records.append(record)
+    return records
+
+
+def parse_event_json(data) -> List[EventRecord]:
+    """
+    Registros grabados como JSON (Get-WinEvent | ConvertTo-Json o lista
+    de dicts con RecordId, Id, ProviderName, Level, TimeCreated, Message).
+    """
+    if isinstance(data, str):
+        data = json.loads(data) if data.strip() else []
+    if isinstance(data, dict):
+        data = [data]
+
+    records = []
+    for item in data:
+        time_created = item['TimeCreated']
+        record = EventRecord(
+            record_id=int(item['RecordId']),
+            event_id=int(item['Id']),
+            provider=item.get('ProviderName', ''),
+            level=int(item.get('Level', 4)),
+            time_created=(parse_system_time(time_created) if time_created.endswith('Z')
+                          else datetime.fromisoformat(time_created)),
+            event_data=dict(item.get('EventData') or {}),
+        )
+        if item.get('Message'):
+            record._message = item['Message']
+        records.append(record)
+    return records
+
+
+# ----------------------------------------------------------------------
+# Fuentes
+# ----------------------------------------------------------------------
+
+class WevtutilEventSource:
+    """
+    Event Log de Windows vía `wevtutil qe` con filtro XPath.
+
+    wevtutil devuelve el XML del registro sin formatear el mensaje y en
+    orden cronológico, que es justo lo que necesita el cursor.
+    """
+
+    def __init__(self, log_name: str = 'System', providers: Iterable[str] = (),
+                 levels: Iterable[int] = (2, 3), runner=None):
+        self.log_name = log_name
+        self.providers = list(providers)
+        self.levels = list(levels)
+        self.runner = runner
+
+    def _run(self, args: str, timeout: float = 15) -> str:
+        result = (self.runner or get_shell_runner()).run(f"wevtutil qe {self.log_name} {args}", timeout=timeout)
+        if result.timed_out:
+            log_warning("Timeout consultando Event Log")
+        elif not result.ok and result.stderr:
+            log_warning(f"wevtutil: {result.stderr.strip()[:200]}")
+        return result.stdout
+
+    @staticmethod
+    def _quote(argument: str) -> str:
+        """Argumento literal para PowerShell (comillas simples duplicadas)"""
+        return "'" + argument.replace("'", "''") + "'"
+
+    def build_query(self, after_record_id: int = 0, since: Optional[datetime] = None) -> str:
+        """XPath sobre System: proveedores, niveles, cursor y ventana de tiempo"""
+        conditions = []
+        if self.providers:
+            conditions.append("(" + " or ".join(f"Provider[@Name='{p}']" for p in self.providers) + ")")
+        if self.levels:
+            conditions.append("(" + " or ".join(f"Level={level}" for level in self.levels) + ")")
+        if after_record_id:
+            conditions.append(f"EventRecordID > {after_record_id}")
+        if since is not None:
+            age_ms = max(int((datetime.now() - since).total_seconds() * 1000), 0)
+            conditions.append(f"TimeCreated[timediff(@SystemTime) <= {age_ms}]")
+        return "*[System[" + " and ".join(conditions) + "]]" if conditions else "*"
+
+    def fetch(self, after_record_id: int, max_records: int,
+              since: Optional[datetime] = None) -> List[EventRecord]:
+        """Registros posteriores al cursor, del más antiguo al más nuevo"""
+        query = self.build_query(after_record_id, since)
+        output = self._run(f"{self._quote('/q:' + query)} /f:xml /c:{max_records}")
+        records = parse_event_xml(output)
+        for record in records:
+            record._renderer = self.render_message
+        return records
+
+    def latest_record_id(self) -> int:
+        """EventRecordID más reciente del log (0 si está vacío)"""
+        records = parse_event_xml(self._run("/f:xml /c:1 /rd:true", timeout=10))
+        return records[0].record_id if records else 0
+
+    def render_message(self, record: EventRecord) -> Optional[str]:
+        """Mensaje formateado de un registro (una consulta por registro)"""
+        query = f"*[System[EventRecordID={record.record_id}]]"
+        rendered = parse_event_xml(self._run(f"{self._quote('/q:' + query)} /f:RenderedXml", timeout=10))
+        return rendered[0]._message if rendered else None
+
+    # IDs por consulta en render_messages (el XPath de wevtutil tiene límite)
+    RENDER_BATCH = 50
+
+    def render_messages(self, records: List[EventRecord]):
+        """Renderizar varios registros con una consulta /f:RenderedXml por lote"""
+        pending = [r for r in records if not r.message_loaded]
+        for start in range(0, len(pending), self.RENDER_BATCH):
+            batch = pending[start:start + self.RENDER_BATCH]
+            ids = " or ".join(f"EventRecordID={r.record_id}" for r in batch)
+            output = self._run(f"{self._quote(f'/q:*[System[({ids})]]')} /f:RenderedXml /c:{len(batch)}")
+            try:
+                messages = {r.record_id: r._message for r in parse_event_xml(output)}
+            except ET.ParseError as e:
+                log_warning(f"RenderedXml ilegible: {e}")
+                messages = {}
+            for record in batch:
+                # Sin mensaje: queda el resumen de datos (no se reintenta uno a uno)
+                record._message = messages.get(record.record_id) or record.data_summary
+
+
+class RecordedEventSource:
+    """Registros grabados (fixtures XML/JSON) servidos como un log real"""
+
+    def __init__(self, records: Iterable[EventRecord] = ()):
+        self.records: List[EventRecord] = sorted(records, key=lambda r: r.record_id)
+        self.render_count = 0
+        self._rendered: Dict[int, str] = {}
+        for record in self.records:
+            if record._message is not None:
+                # El mensaje grabado se sirve como "renderizado" bajo demanda
+                self._rendered[record.record_id] = record._message
+                record._message = None
+            record._renderer = self.render_message
+
+    @classmethod
+    def from_file(cls, path) -> 'RecordedEventSource':
+        """Cargar una grabación: .json o XML de wevtutil"""
+        text = Path(path).read_text(encoding='utf-8-sig')
+        if text.lstrip().startswith(('[', '{')):
+            return cls(parse_event_json(text))
+        return cls(parse_event_xml(text))
+
+    def append(self, record: EventRecord):
+        """Simular un evento nuevo"""
+        if record._message is not None:
+            self._rendered[record.record_id] = record._message
+            record._message = None
+        record._renderer = self.render_message
+        self.records.append(record)
+
+    def clear(self):
+        """Simular un log borrado"""
+        self.records = []
+
+    def fetch(self, after_record_id: int, max_records: int,
+              since: Optional[datetime] = None) -> List[EventRecord]:
+        selected = [r for r in self.records
+                    if r.record_id > after_record_id and (since is None or r.time_created >= since)]
+        return selected[:max_records]
+
+    def latest_record_id(self) -> int:
+        return self.records[-1].record_id if self.records else 0
+
+    def render_message(self, record: EventRecord) -> Optional[str]:
+        self.render_count += 1
+        return self._rendered.get(record.record_id)
+
+    def render_messages(self, records: List[EventRecord]):
+        """Un lote cuenta como una sola consulta de render"""
+        pending = [r for r in records if not r.message_loaded]
+        if pending:
+            self.render_count += 1
+        for record in pending:
+            record._message = self._rendered.get(record.record_id) or record.data_summary
+
+
+# ----------------------------------------------------------------------
+# Cursor
+# ----------------------------------------------------------------------
+
+class EventBookmark:
+    """Último EventRecordID leído por log, persistido en JSON"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else Path.home() / ".netboozt" / "event_bookmark.json"
+        self._positions: Dict[str, int] = {}
+        try:
+            if self.path.exists():
+                self._positions = {k: int(v) for k, v in json.loads(self.path.read_text()).items()}
+        except Exception as e:
+            log_warning(f"Bookmark de eventos ilegible, se reinicia: {e}")
+
+    def get(self, log_name: str) -> Optional[int]:
+        return self._positions.get(log_name)
+
+    def set(self, log_name: str, record_id: int):
+        self._positions[log_name] = record_id
+
+    def save(self):
+        """Escritura atómica (archivo temporal + reemplazo)"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix('.tmp')
+            tmp.write_text(json.dumps(self._positions))
+            tmp.replace(self.path)
+        except Exception as e:
+            log_error(f"Error guardando bookmark de eventos: {e}")
+
+
+class EventLogReader:
+    """
+    Lectura incremental por cursor.
+
+    read_new() pide los registros con EventRecordID mayor que el cursor en
+    lotes de BATCH_SIZE hasta vaciar la cola (máximo MAX_BATCHES por
+    llamada; lo que quede de una ráfaga se lee en la siguiente).
+    """
+
+    BATCH_SIZE = 200
+    MAX_BATCHES = 10
+
+    def __init__(self, source, bookmark: Optional[EventBookmark] = None, log_name: str = 'System'):
+        self.source = source
+        self.bookmark = bookmark
+        self.log_name = getattr(source, 'log_name', log_name)
+        self.position: Optional[int] = bookmark.get(self.log_name) if bookmark else None
+        self._lock = threading.Lock()
+
+    def _advance(self, records: List[EventRecord]):
+        if records:
+            self.position = max(self.position or 0, records[-1].record_id)
+        if self.bookmark is not None and self.position is not None:
+            self.bookmark.set(self.log_name, self.position)
+            self.bookmark.save()
+
+    def _drain(self, since: Optional[datetime] = None) -> List[EventRecord]:
+        records: List[EventRecord] = []
+        for _ in range(self.MAX_BATCHES):
+            batch = self.source.fetch(self.position or 0, self.BATCH_SIZE, since)
+            # Defensa ante fuentes que repiten el último registro
+            batch = [r for r in batch if r.record_id > (self.position or 0)]
+            records.extend(batch)
+            if batch:
+                self.position = batch[-1].record_id
+            if len(batch) < self.BATCH_SIZE:
+                break
+        return records
+
+    def read_since(self, since: datetime) -> List[EventRecord]:
+        """
+        Carga inicial: registros desde `since` y cursor al final.
+
+        Devuelve toda la ventana aunque el bookmark esté más adelante
+        (historial para la UI); el cursor nunca retrocede.
+        """
+        with self._lock:
+            saved = self.position
+            self.position = 0
+            records = self._drain(since)
+            self.position = max(saved or 0, self.position or 0)
+            if not records and saved is None:
+                # Log sin eventos recientes: arrancar desde el final
+                self.position = self.source.latest_record_id()
+            self._advance([])
+            return records
+
+    def read_new(self) -> List[EventRecord]:
+        """Registros nuevos desde el cursor"""
+        with self._lock:
+            if self.position is None:
+                self.position = self.source.latest_record_id()
+                self._advance([])
+                return []
+
+            records = self._drain()
+            if not records and self.position and self.source.latest_record_id() < self.position:
+                # El log se borró: los IDs vuelven a empezar
+                log_warning(f"Event Log {self.log_name} reiniciado, cursor a 0")
+                self.position = 0
+                records = self._drain()
+
+            self._advance(records)
+            return records
+
+    def render_messages(self, records: List[EventRecord]):
+        """Renderizar en lote si la fuente lo soporta (si no, uno a uno)"""
+        if not records:
+            return
+        render = getattr(self.source, 'render_messages', None)
+        if render is not None:
+            render(records)
+        else:
+            for record in records:
+                record.message
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        # Verificar el parser con una grabación
+        source = RecordedEventSource.from_file(sys.argv[1])
+        reader = EventLogReader(source)
+        reader.position = 0
+        for record in reader.read_new():
+            print(f"#{record.record_id} {record.time_created} {record.provider} "
+                  f"{record.event_id} {record.level_name}: {record.data_summary[:80]}")
+        print(f"Cursor: {reader.position} (mensajes renderizados: {source.render_count})")
+    else:
+        reader = EventLogReader(WevtutilEventSource(providers=['Microsoft-Windows-DNS-Client']))
+        reader.read_new()
+        print(f"Cursor inicial: {reader.position}")
@@ -0,0 +1,752 @@
+"""
+NetBoozt - Failover Policy Simulator
+Reproduce trazas de salud DNS (grabadas o sintéticas) sobre la lógica real
+de AutoFailoverManager usando adaptadores/health checkers falsos y tiempo virtual.
+
+Permite comparar cambios de política (cooldowns, orden de tiers, reglas de
+salud) sin tocar la red: cada simulación reporta tiempo hasta failover,
+número de cambios, flaps y tiempo pasado en tiers degradados.
+
+By LOUST (www.loust.pro)
+"""
+
+import json
+import logging
+import math
+import random
+import statistics
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field, asdict, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Callable, Iterable
+
+from .dns_health import DNSHealthChecker, DNSHealth, DNSStatus
+from .adapter_manager import AdapterManager, NetworkAdapter, AdapterStatus, DNSFallbackTier
+from .auto_failover import AutoFailoverManager, FailoverEvent
+
+
+# ============================================================================
+# Trazas de salud
+# ============================================================================
+
+@dataclass
+class TraceSample:
+    """Cambio de estado de un DNS en tiempo virtual"""
+    at: float               # Segundos desde el inicio de la traza
+    dns_server: str
+    status: DNSStatus
+    latency_ms: float = 0.0
+    packet_loss: float = 0.0
+
+    def to_dict(self) -> Dict:
+        """Serializar a dict JSON-compatible"""
+        data = asdict(self)
+        data['status'] = self.status.value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TraceSample':
+        """Crear desde dict (formato de to_dict)"""
+        return cls(
+            at=float(data['at']),
+            dns_server=data['dns_server'],
+            status=DNSStatus(data['status']),
+            latency_ms=float(data.get('latency_ms', 0.0)),
+            packet_loss=float(data.get('packet_loss', 0.0))
+        )
+
+
+@dataclass
+class HealthTrace:
+    """Secuencia ordenada de cambios de estado DNS"""
+    name: str
+    duration_s: float
+    samples: List[TraceSample] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.samples.sort(key=lambda s: s.at)
+
+    @property
+    def servers(self) -> List[str]:
+        """Servidores presentes en la traza"""
+        return sorted({s.dns_server for s in self.samples})
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'duration_s': self.duration_s,
+            'samples': [s.to_dict() for s in self.samples]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'HealthTrace':
+        return cls(
+            name=data.get('name', 'trace'),
+            duration_s=float(data['duration_s']),
+            samples=[TraceSample.from_dict(s) for s in data.get('samples', [])]
+        )
+
+    def save(self, path: Path):
+        """Guardar traza como JSON"""
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2), encoding='utf-8')
+
+    @classmethod
+    def load(cls, path: Path) -> 'HealthTrace':
+        """Cargar traza desde JSON"""
+        return cls.from_dict(json.loads(Path(path).read_text(encoding='utf-8')))
+
+
+class HealthTraceRecorder:
+    """
+    Graba una traza real a partir de un DNSHealthChecker en ejecución.
+
+    Se engancha a on_status_change, por lo que solo almacena transiciones
+    (el mismo formato que consume el simulador).
+    """
+
+    def __init__(self, checker: DNSHealthChecker, name: str = "recorded"):
+        self.name = name
+        self._start = time.monotonic()
+        self._samples: List[TraceSample] = []
+        self._lock = threading.Lock()
+
+        # Estado inicial de cada servidor
+        for dns_server, health in checker.get_all_status().items():
+            self._record(dns_server, health)
+
+        checker.on_status_change(self._record)
+
+    def _record(self, dns_server: str, health: DNSHealth):
+        sample = TraceSample(
+            at=time.monotonic() - self._start,
+            dns_server=dns_server,
+            status=health.status,
+            latency_ms=health.latency_ms,
+            packet_loss=health.packet_loss
+        )
+        with self._lock:
+            self._samples.append(sample)
+
+    def trace(self) -> HealthTrace:
+        """Obtener traza grabada hasta el momento"""
+        with self._lock:
+            samples = list(self._samples)
+        return HealthTrace(
+            name=self.name,
+            duration_s=time.monotonic() - self._start,
+            samples=samples
+        )
+
+
+def generate_synthetic_trace(
+    tiers: Optional[List[DNSFallbackTier]] = None,
+    duration_s: float = 3600,
+    outage_rate_per_hour: float = 1.0,
+    mean_outage_s: float = 120,
+    slow_rate_per_hour: float = 2.0,
+    mean_slow_s: float = 60,
+    correlated_outage_rate_per_hour: float = 0.1,
+    seed: Optional[int] = None,
+    name: Optional[str] = None
+) -> HealthTrace:
+    """
+    Generar traza sintética con caídas y episodios lentos por servidor
+    (procesos de Poisson) más caídas correlacionadas de todos los DNS
+    (simula un corte del ISP).
+    """
+    rng = random.Random(seed)
+    tiers = tiers or AdapterManager.DNS_FALLBACK_TIERS
+    servers = []
+    for tier in tiers:
+        for server in (tier.primary, tier.secondary):
+            if server and server != "Auto" and server not in servers:
+                servers.append(server)
+
+    samples: List[TraceSample] = []
+
+    def episodes(rate_per_hour: float, mean_s: float) -> List[tuple]:
+        """Intervalos (inicio, fin) de un proceso de Poisson"""
+        result = []
+        if rate_per_hour <= 0:
+            return result
+        t = rng.expovariate(rate_per_hour / 3600)
+        while t < duration_s:
+            length = rng.expovariate(1 / mean_s)
+            result.append((t, min(t + length, duration_s)))
+            t += length + rng.expovariate(rate_per_hour / 3600)
+        return result
+
+    shared_outages = episodes(correlated_outage_rate_per_hour, mean_outage_s)
+
+    for server in servers:
+        base_latency = rng.uniform(8, 45)
+
+        episodes_for_server = [(s, e, DNSStatus.DOWN, 9999.0) for s, e in episodes(outage_rate_per_hour, mean_outage_s)]
+        episodes_for_server += [(s, e, DNSStatus.DOWN, 9999.0) for s, e in shared_outages]
+        episodes_for_server += [
+            (s, e, DNSStatus.SLOW, base_latency + rng.uniform(40, 70))
+            for s, e in episodes(slow_rate_per_hour, mean_slow_s)
+        ]
+
+        samples.extend(_episodes_to_samples(server, base_latency, episodes_for_server))
+
+    return HealthTrace(
+        name=name or f"synthetic-{seed}",
+        duration_s=duration_s,
+        samples=samples
+    )
+
+
+def _episodes_to_samples(server: str, base_latency: float, episodes: List[tuple]) -> List[TraceSample]:
+    """
+    Convertir episodios (inicio, fin, estado, latencia), posiblemente
+    solapados, en transiciones limpias. El estado efectivo es el peor activo.
+    """
+    # Fines antes que inicios en empate
+    boundaries = []
+    for start, end, status, latency in episodes:
+        boundaries.append((start, 1, status, latency))
+        boundaries.append((end, 0, status, latency))
+    boundaries.sort(key=lambda b: (b[0], b[1]))
+
+    samples = [TraceSample(0.0, server, DNSStatus.UP, base_latency)]
+    down_active = 0
+    slow_active: List[float] = []
+    last_status = DNSStatus.UP
+
+    for at, is_start, status, latency in boundaries:
+        if status == DNSStatus.DOWN:
+            down_active += 1 if is_start else -1
+        elif is_start:
+            slow_active.append(latency)
+        else:
+            slow_active.remove(latency)
+
+        if down_active:
+            status_now, latency_now = DNSStatus.DOWN, 9999.0
+        elif slow_active:
+            status_now, latency_now = DNSStatus.SLOW, slow_active[-1]
+        else:
+            status_now, latency_now = DNSStatus.UP, base_latency
+
+        if status_now != last_status:
+            loss = 100.0 if status_now == DNSStatus.DOWN else 0.0
+            samples.append(TraceSample(at, server, status_now, latency_now, loss))
+            last_status = status_now
+
+    return samples
+
+
+# ============================================================================
+# Implementaciones falsas
+# ============================================================================
+
+class VirtualClock:
+    """Reloj controlado por el simulador"""
+
+    def __init__(self, start: Optional[datetime] = None):
+        self.start = start or datetime(2025, 1, 1)
+        self.elapsed_s = 0.0
+        self._now = self.start
+
+    def set(self, elapsed_s: float):
+        self.elapsed_s = elapsed_s
+        self._now = self.start + timedelta(seconds=elapsed_s)
+
+    def now(self) -> datetime:
+        return self._now
+
+
+class FakeDNSHealthChecker(DNSHealthChecker):
+    """
+    DNSHealthChecker alimentado por una traza en lugar de ping.
+
+    Igual que el checker real, solo observa cambios en cada check_interval
+    y suma un fallo consecutivo por cada check en DOWN. La verdad de la
+    traza (sin retraso de observación) queda en truth_status/changed_at.
+    """
+
+    def __init__(self, trace: HealthTrace, clock: VirtualClock, check_interval: int = 10):
+        super().__init__(check_interval=check_interval)
+        self.clock = clock
+        self._samples = trace.samples
+        self._cursor = 0
+        self._truth_cursor = 0
+        self._first_down_check: Dict[str, float] = {}
+        self._observed_at = 0.0
+        self._uptime_anchor: Dict[str, tuple] = {}
+
+        self.truth_status: Dict[str, DNSStatus] = {}
+        self.changed_at: Dict[str, float] = {}
+
+    def start(self):
+        """Sin hilo: el simulador avanza el estado con advance_to()"""
+        self.is_running = True
+
+    def stop(self):
+        self.is_running = False
+
+    def advance_to(self, elapsed_s: float):
+        """Avanzar la traza hasta elapsed_s"""
+        samples = self._samples
+
+        # Verdad de la traza
+        while self._truth_cursor < len(samples) and samples[self._truth_cursor].at <= elapsed_s:
+            sample = samples[self._truth_cursor]
+            self._truth_cursor += 1
+            if self.truth_status.get(sample.dns_server) != sample.status:
+                self.truth_status[sample.dns_server] = sample.status
+                self.changed_at[sample.dns_server] = sample.at
+
+        # Vista del checker: lo observado en el último check periódico
+        interval = self.check_interval
+        observed_at = (elapsed_s // interval) * interval
+        if observed_at == self._observed_at and (
+            self._cursor >= len(samples) or samples[self._cursor].at > observed_at
+        ):
+            return
+
+        now = self.clock.now()
+        changed = []
+
+        with self._lock:
+            self._observed_at = observed_at
+
+            while self._cursor < len(samples) and samples[self._cursor].at <= observed_at:
+                sample = samples[self._cursor]
+                self._cursor += 1
+
+                if sample.status == DNSStatus.DOWN:
+                    first_check = -(-sample.at // interval) * interval
+                    self._first_down_check.setdefault(sample.dns_server, first_check)
+                else:
+                    self._first_down_check.pop(sample.dns_server, None)
+
+                old = self.dns_servers.get(sample.dns_server)
+                if old is not None:
+                    self._refresh_uptime(old)
+                health = DNSHealth(
+                    dns_server=sample.dns_server,
+                    status=sample.status,
+                    latency_ms=sample.latency_ms,
+                    packet_loss=sample.packet_loss,
+                    last_check=now,
+                    consecutive_failures=0,
+                    uptime_pct=old.uptime_pct if old else 100.0
+                )
+                self.dns_servers[sample.dns_server] = health
+                self._uptime_anchor[sample.dns_server] = (health.uptime_pct, observed_at)
+
+                if old is None or old.status != sample.status:
+                    changed.append((sample.dns_server, health))
+
+            for dns_server, first_check in self._first_down_check.items():
+                health = self.dns_servers[dns_server]
+                health.consecutive_failures = int((observed_at - first_check) // interval) + 1
+
+        for dns_server, health in changed:
+            self._notify_callbacks(dns_server, health)
+
+    def next_change_at(self) -> Optional[float]:
+        """Próximo instante en que cambia la verdad o la vista observada"""
+        samples = self._samples
+        candidates = []
+        if self._truth_cursor < len(samples):
+            candidates.append(samples[self._truth_cursor].at)
+        if self._cursor < len(samples):
+            at = samples[self._cursor].at
+            candidates.append(-(-at // self.check_interval) * self.check_interval)
+        return min(candidates) if candidates else None
+
+    def _refresh_uptime(self, health: DNSHealth):
+        """uptime_pct perezoso: forma cerrada del EWMA tras k checks en el mismo estado"""
+        anchor_uptime, anchor_at = self._uptime_anchor[health.dns_server]
+        checks = int((self._observed_at - anchor_at) // self.check_interval)
+        target = 0.0 if health.status == DNSStatus.DOWN else 100.0
+        health.uptime_pct = target + (anchor_uptime - target) * (1 - self.UPTIME_EWMA_ALPHA) ** checks
+
+    def get_status(self, dns_server: str) -> Optional[DNSHealth]:
+        with self._lock:
+            health = self.dns_servers.get(dns_server)
+            if health is not None:
+                self._refresh_uptime(health)
+            return health
+
+    def get_all_status(self) -> Dict[str, DNSHealth]:
+        with self._lock:
+            for health in self.dns_servers.values():
+                self._refresh_uptime(health)
+            return dict(self.dns_servers)
+
+    def verify_dns_resolution(self, dns_server: str, domain: str = None) -> tuple[bool, float]:
+        """Resolución según la verdad de la traza (sin nslookup)"""
+        health = self.dns_servers.get(dns_server)
+        if health is None or self.truth_status.get(dns_server) in (None, DNSStatus.DOWN):
+            return False, float(self.THRESHOLD_TIMEOUT)
+        return True, health.latency_ms
+
+
+class FakeAdapterManager(AdapterManager):
+    """AdapterManager en memoria (sin PowerShell), uno o varios adaptadores"""
+
+    def __init__(
+        self,
+        tiers: List[DNSFallbackTier],
+        router_dns: str = "192.168.1.1",
+        initial_tier: int = 1,
+        adapter_names: Optional[List[str]] = None
+    ):
+        # No llamar a super().__init__(): evita la detección vía PowerShell
+        self.tiers = tiers
+        self._tiers_by_number = {t.tier: t for t in tiers}
+        self.router_dns = router_dns
+        self.apply_calls = 0
+        self.adapters: List[NetworkAdapter] = [
+            NetworkAdapter(
+                name=name,
+                interface_description="Simulated adapter",
+                status=AdapterStatus.UP,
+                metric=10 * (index + 1),
+                mac_address=f"00-00-00-00-00-{index:02X}",
+                speed_mbps=1000,
+                mtu=1500,
+                dns_servers=[],
+                ipv4_address=f"10.0.{index}.2",
+                default_gateway=router_dns
+            )
+            for index, name in enumerate(adapter_names or ["SimEthernet"])
+        ]
+        self.active_tiers: Dict[str, int] = {}
+        for adapter in self.adapters:
+            self._set_dns(adapter, initial_tier)
+
+    @property
+    def active_tier_number(self) -> int:
+        """Tier activo del adaptador prioritario"""
+        return self.active_tiers[self.get_priority_adapter().name]
+
+    def _tier(self, tier_number: int) -> Optional[DNSFallbackTier]:
+        return self._tiers_by_number.get(tier_number)
+
+    def _set_dns(self, adapter: NetworkAdapter, tier_number: int):
+        tier = self._tier(tier_number)
+        if tier is None or tier.primary == "Auto":
+            adapter.dns_servers = [self.router_dns]
+        else:
+            adapter.dns_servers = [tier.primary, tier.secondary]
+        self.active_tiers[adapter.name] = tier_number
+
+    def _detect_adapters(self):
+        """Los adaptadores simulados no se redetectan"""
+
+    def apply_dns_tier(self, tier_number: int, adapter_name: Optional[str] = None) -> bool:
+        self.apply_calls += 1
+        adapter = self.get_adapter_by_name(adapter_name) if adapter_name else self.get_priority_adapter()
+        if adapter is None or self._tier(tier_number) is None:
+            return False
+
+        self._set_dns(adapter, tier_number)
+        return True
+
+
+# ============================================================================
+# Simulador
+# ============================================================================
+
+@dataclass
+class SimulationReport:
+    """Resultado de reproducir una traza"""
+    trace_name: str
+    duration_s: float
+    switches: int = 0
+    failbacks: int = 0
+    failed_switches: int = 0
+    flaps: int = 0
+    spurious_switches: int = 0
+    time_to_failover_s: List[float] = field(default_factory=list)
+    unresolved_degradations: int = 0
+    degraded_s: float = 0.0
+    fallback_s: float = 0.0
+    mean_latency_ms: Optional[float] = None  # Latencia del tier activo, ponderada por tiempo
+    latency_saved_ms: float = 0.0            # Contabilidad del manager (get_stats)
+    final_tier: Optional[int] = None
+    events: List[FailoverEvent] = field(default_factory=list)
+
+    @property
+    def mean_time_to_failover_s(self) -> Optional[float]:
+        if not self.time_to_failover_s:
+            return None
+        return statistics.mean(self.time_to_failover_s)
+
+    def to_dict(self) -> Dict:
+        return {
+            'trace_name': self.trace_name,
+            'duration_s': self.duration_s,
+            'switches': self.switches,
+            'failbacks': self.failbacks,
+            'failed_switches': self.failed_switches,
+            'flaps': self.flaps,
+            'spurious_switches': self.spurious_switches,
+            'time_to_failover_s': list(self.time_to_failover_s),
+            'mean_time_to_failover_s': self.mean_time_to_failover_s,
+            'unresolved_degradations': self.unresolved_degradations,
+            'degraded_s': self.degraded_s,
+            'fallback_s': self.fallback_s,
+            'mean_latency_ms': self.mean_latency_ms,
+            'latency_saved_ms': self.latency_saved_ms,
+            'final_tier': self.final_tier
+        }
+
+
+@contextmanager
+def _quiet_logs():
+    """Silenciar el logger de NetBoozt durante simulaciones masivas"""
+    logger = logging.getLogger("NetBoozt")
+    previous = logger.disabled
+    logger.disabled = True
+    try:
+        yield
+    finally:
+        logger.disabled = previous
+
+
+class FailoverSimulator:
+    """
+    Reproduce trazas sobre AutoFailoverManager con tiempo virtual.
+
+    Métricas:
+    - time_to_failover: desde que el tier activo se degrada hasta el cambio
+    - switches / failed_switches: cambios exitosos / fallidos
+    - failbacks: cambios de regreso a un tier preferido (incluidos en switches)
+    - flaps: cambios hacia un tier abandonado hace menos de flap_window_s
+    - spurious_switches: cambios con el tier activo sano según la traza
+    - degraded_s: tiempo en un tier cuyo DNS primario no está UP/SLOW
+    - fallback_s: tiempo fuera del tier preferido (el de menor número)
+    - mean_latency_ms: latencia del DNS activo ponderada por tiempo (sin DHCP)
+    """
+
+    def __init__(
+        self,
+        tiers: Optional[List[DNSFallbackTier]] = None,
+        cooldown_seconds: Optional[float] = None,
+        check_interval: Optional[float] = None,
+        failback_dwell_seconds: Optional[float] = None,
+        health_check_interval: int = 10,
+        flap_window_s: float = 300,
+        router_dns: str = "192.168.1.1",
+        manager_factory: Optional[Callable[..., AutoFailoverManager]] = None,
+        quiet: bool = True
+    ):
+        """
+        Args:
+            tiers: Tiers a simular (default: AdapterManager.DNS_FALLBACK_TIERS)
+            cooldown_seconds: Sobrescribe AutoFailoverManager.COOLDOWN_SECONDS
+            check_interval: Sobrescribe AutoFailoverManager.CHECK_INTERVAL
+            failback_dwell_seconds: Sobrescribe FAILBACK_DWELL_SECONDS
+            health_check_interval: Intervalo del health checker simulado
+            flap_window_s: Ventana para considerar un regreso como flap
+            router_dns: DNS que reporta el adaptador en modo DHCP
+            manager_factory: Constructor alternativo (variantes de política)
+            quiet: Silenciar logs durante la simulación
+        """
+        self.tiers = tiers or AdapterManager.DNS_FALLBACK_TIERS
+        self.cooldown_seconds = cooldown_seconds
+        self.check_interval = check_interval
+        self.failback_dwell_seconds = failback_dwell_seconds
+        self.health_check_interval = health_check_interval
+        self.flap_window_s = flap_window_s
+        self.router_dns = router_dns
+        self.manager_factory = manager_factory or AutoFailoverManager
+        self.quiet = quiet
+
+    def _build(self, trace: HealthTrace):
+        """Crear reloj, fakes y manager frescos para una traza"""
+        # Copias: DNS_FALLBACK_TIERS es estado de clase compartido
+        tiers = [replace(t) for t in self.tiers]
+        clock = VirtualClock()
+        checker = FakeDNSHealthChecker(trace, clock, check_interval=self.health_check_interval)
+        adapters = FakeAdapterManager(tiers, router_dns=self.router_dns, initial_tier=min(t.tier for t in tiers))
+        manager = self.manager_factory(checker, adapters, tiers, clock=clock.now)
+
+        if self.cooldown_seconds is not None:
+            manager.COOLDOWN_SECONDS = self.cooldown_seconds
+        if self.check_interval is not None:
+            manager.CHECK_INTERVAL = self.check_interval
+        if self.failback_dwell_seconds is not None:
+            manager.FAILBACK_DWELL_SECONDS = self.failback_dwell_seconds
+        # Las resoluciones simuladas son instantáneas: pre-calentar sin hilos
+        manager.PREWARM_WORKERS = 1
+        manager.enabled = True
+
+        return tiers, clock, checker, adapters, manager
+
+    def _tier_is_up(self, checker: FakeDNSHealthChecker, tier: Optional[DNSFallbackTier]) -> bool:
+        """Verdad de la traza (no la opinión del manager)"""
+        if tier is None:
+            return False
+        if tier.primary == "Auto":
+            return True
+        return checker.truth_status.get(tier.primary) in (DNSStatus.UP, DNSStatus.SLOW)
+
+    def _is_quiescent(self, manager: AutoFailoverManager, tier: Optional[DNSFallbackTier], preferred: int) -> bool:
+        """En el tier preferido, sano y sin contabilidad pendiente: nada cambia hasta la próxima muestra"""
+        return (
+            tier is not None and
+            tier.tier == preferred and
+            not getattr(manager, '_unsettled_events', None) and
+            manager._is_tier_healthy(tier)
+        )
+
+    def run(self, trace: HealthTrace) -> SimulationReport:
+        """Reproducir una traza completa"""
+        with (_quiet_logs() if self.quiet else nullcontext()):
+            return self._run(trace)
+
+    def _run(self, trace: HealthTrace) -> SimulationReport:
+        tiers, clock, checker, adapters, manager = self._build(trace)
+        preferred = min(t.tier for t in tiers)
+        interval = float(manager.CHECK_INTERVAL)
+
+        events: List[FailoverEvent] = []
+        manager.on_failover(events.append)
+
+        report = SimulationReport(trace_name=trace.name, duration_s=trace.duration_s)
+        degraded_since: Optional[float] = None
+        arrived_at = 0.0
+        left_at: Dict[int, float] = {}
+        latency_sum = 0.0
+        latency_time = 0.0
+
+        t = 0.0
+        while t < trace.duration_s:
+            clock.set(t)
+            checker.advance_to(t)
+
+            tier_before = adapters._tier(adapters.active_tier_number)
+            was_up = self._tier_is_up(checker, tier_before)
+            if not was_up and degraded_since is None:
+                changed_at = checker.changed_at.get(tier_before.primary, t) if tier_before else t
+                degraded_since = max(changed_at, arrived_at)
+            elif was_up:
+                degraded_since = None
+
+            n_events = len(events)
+            manager._check_and_failover()
+
+            for event in events[n_events:]:
+                if not event.success:
+                    report.failed_switches += 1
+                    continue
+
+                report.switches += 1
+                if event.kind == "failback":
+                    report.failbacks += 1
+                else:
+                    if was_up:
+                        report.spurious_switches += 1
+                    if degraded_since is not None:
+                        report.time_to_failover_s.append(t - degraded_since)
+
+                if event.to_tier in left_at and t - left_at[event.to_tier] < self.flap_window_s:
+                    report.flaps += 1
+                left_at[event.from_tier] = t
+                arrived_at = t
+                degraded_since = None
+
+            # Avanzar un intervalo, o varios si el sistema está en reposo
+            # hasta el próximo cambio de la traza (mismo resultado, menos ticks)
+            tier_now = adapters._tier(adapters.active_tier_number)
+            ticks = 1
+            if self._is_quiescent(manager, tier_now, preferred):
+                next_change = checker.next_change_at()
+                horizon = trace.duration_s if next_change is None else min(next_change, trace.duration_s)
+                ticks = max(1, math.ceil((horizon - t) / interval))
+
+            # Contabilizar el tramo con el estado resultante del check
+            step = min(interval * ticks, trace.duration_s - t)
+            if not self._tier_is_up(checker, tier_now):
+                report.degraded_s += step
+            elif tier_now.primary in checker.dns_servers:
+                latency_sum += checker.dns_servers[tier_now.primary].latency_ms * step
+                latency_time += step
+            if adapters.active_tier_number != preferred:
+                report.fallback_s += step
+
+            t += interval * ticks
+
+        if degraded_since is not None:
+            report.unresolved_degradations += 1
+
+        manager.stop()
+
+        if latency_time:
+            report.mean_latency_ms = latency_sum / latency_time
+        report.latency_saved_ms = manager.get_stats()['latency_saved_ms']
+        report.final_tier = adapters.active_tier_number
+        report.events = events
+        return report
+
+    def sweep(self, traces: Iterable[HealthTrace]) -> Dict:
+        """
+        Ejecutar muchas trazas y agregar resultados.
+
+        Returns:
+            Dict con totales, percentiles de time-to-failover y tiempo de ejecución
+        """
+        start = time.perf_counter()
+        reports = []
+        with (_quiet_logs() if self.quiet else nullcontext()):
+            for trace in traces:
+                reports.append(self._run(trace))
+        elapsed = time.perf_counter() - start
+
+        return summarize_reports(reports, elapsed_s=elapsed)
+
+
+def summarize_reports(reports: List[SimulationReport], elapsed_s: float = 0.0) -> Dict:
+    """Agregar reportes individuales"""
+    ttf = sorted(v for r in reports for v in r.time_to_failover_s)
+    latencies = [r.mean_latency_ms for r in reports if r.mean_latency_ms is not None]
+    total_time = sum(r.duration_s for r in reports) or 1.0
+
+    def percentile(values: List[float], pct: float) -> Optional[float]:
+        if not values:
+            return None
+        index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+        return values[index]
+
+    return {
+        'traces': len(reports),
+        'switches': sum(r.switches for r in reports),
+        'failbacks': sum(r.failbacks for r in reports),
+        'failed_switches': sum(r.failed_switches for r in reports),
+        'flaps': sum(r.flaps for r in reports),
+        'spurious_switches': sum(r.spurious_switches for r in reports),
+        'unresolved_degradations': sum(r.unresolved_degradations for r in reports),
+        'time_to_failover_mean_s': statistics.mean(ttf) if ttf else None,
+        'time_to_failover_p50_s': percentile(ttf, 50),
+        'time_to_failover_p95_s': percentile(ttf, 95),
+        'degraded_pct': sum(r.degraded_s for r in reports) / total_time * 100,
+        'fallback_pct': sum(r.fallback_s for r in reports) / total_time * 100,
+        'mean_latency_ms': statistics.mean(latencies) if latencies else None,
+        'latency_saved_ms': sum(r.latency_saved_ms for r in reports),
+        'elapsed_s': elapsed_s
+    }
+
+
+if __name__ == "__main__":
+    # Benchmark: barrido de trazas sintéticas con la política actual
+    traces = [generate_synthetic_trace(duration_s=3600, seed=i) for i in range(2000)]
+
+    for cooldown in (10, 30, 60):
+        simulator = FailoverSimulator(cooldown_seconds=cooldown)
+        summary = simulator.sweep(traces)
+        print(f"\n--- Cooldown {cooldown}s ({summary['traces']} trazas, {summary['elapsed_s']:.2f}s) ---")
+        for key, value in summary.items():
+            if isinstance(value, float):
+                print(f"  {key}: {value:.2f}")
+            else:
+                print(f"  {key}: {value}")
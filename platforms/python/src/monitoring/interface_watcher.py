@@ -0,0 +1,402 @@
+"""
+NetBoozt - Vigilancia de Cambios de Interfaces
+Recibe del kernel los avisos de cambios de enlace, direcciones y rutas
+(rtnetlink en Linux) y actualiza solo los NetworkAdapter afectados en el
+AdapterManager, notificando a los suscriptores en milisegundos: un cable
+desconectado o un roaming WiFi llegan al failover y a la UI sin polling.
+
+En sistemas sin rtnetlink (Windows) se usa un fallback por polling que
+compara snapshots completos de adaptadores.
+
+By LOUST (www.loust.pro)
+"""
+
+import select
+import socket
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from .adapter_manager import AdapterManager, NetworkAdapter, get_adapter_manager
+
+try:
+    from ..utils.logger import log_info, log_warning, log_error
+except ImportError:
+    def log_info(msg): print(f"[INFO] {msg}")
+    def log_warning(msg): print(f"[WARN] {msg}")
+    def log_error(msg): print(f"[ERROR] {msg}")
+
+
+# Tipos de mensaje rtnetlink (linux/rtnetlink.h)
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+
+# Grupos multicast a los que se suscribe el socket
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_IFADDR = 0x100
+RTMGRP_IPV6_ROUTE = 0x400
+
+NLMSG_DONE = 3
+NLMSG_HDR = struct.Struct("=IHHII")         # len, type, flags, seq, pid
+IFINFOMSG = struct.Struct("=BxHiII")        # family, type, index, flags, change
+IFADDRMSG = struct.Struct("=BBBBi")         # family, prefixlen, flags, scope, index
+RTMSG = struct.Struct("=BBBBBBBBI")         # family, dst_len, src_len, tos, table, ...
+RTATTR = struct.Struct("=HH")               # len, type
+
+IFLA_IFNAME = 3
+RTA_OIF = 4
+
+# Tipo de mensaje → (categoría, eliminación)
+MESSAGE_KINDS = {
+    RTM_NEWLINK: ('link', False),
+    RTM_DELLINK: ('link', True),
+    RTM_NEWADDR: ('address', False),
+    RTM_DELADDR: ('address', True),
+    RTM_NEWROUTE: ('route', False),
+    RTM_DELROUTE: ('route', True),
+}
+
+
+@dataclass
+class LinkEvent:
+    """Aviso del kernel (o del polling) sobre una interfaz"""
+    kind: str                       # link | address | route | poll
+    ifindex: Optional[int] = None
+    ifname: Optional[str] = None
+    removed: bool = False
+
+
+@dataclass
+class InterfaceChange:
+    """Cambio aplicado a un adaptador del AdapterManager"""
+    name: str
+    change: str                     # added | removed | changed
+    adapter: Optional[NetworkAdapter] = None        # Estado nuevo (None si se eliminó)
+    previous: Optional[NetworkAdapter] = None       # Estado anterior (None si es nuevo)
+    changed_fields: List[str] = field(default_factory=list)
+    timestamp: datetime = field(default_factory=datetime.now)
+
+    @property
+    def status_changed(self) -> bool:
+        """Cambió el estado del enlace (cable, WiFi, habilitado)"""
+        return self.change != 'changed' or 'status' in self.changed_fields
+
+    def summary(self) -> str:
+        if self.change == 'changed':
+            def show(value):
+                return getattr(value, 'value', value)
+            details = ", ".join(
+                f"{name}: {show(getattr(self.previous, name))} → {show(getattr(self.adapter, name))}"
+                for name in self.changed_fields
+            )
+            return f"{self.name}: {details}"
+        return f"{self.name}: {'añadido' if self.change == 'added' else 'eliminado'}"
+
+
+def _attributes(data: bytes, offset: int, end: int) -> Dict[int, bytes]:
+    """rtattr tipo → valor (alineados a 4 bytes)"""
+    attrs = {}
+    while offset + RTATTR.size <= end:
+        length, attr_type = RTATTR.unpack_from(data, offset)
+        if length < RTATTR.size:
+            break
+        attrs[attr_type] = data[offset + RTATTR.size:offset + length]
+        offset += (length + 3) & ~3
+    return attrs
+
+
+def parse_netlink_messages(data: bytes) -> List[LinkEvent]:
+    """Decodificar un datagrama rtnetlink (puede traer varios mensajes)"""
+    events: List[LinkEvent] = []
+    offset = 0
+    while offset + NLMSG_HDR.size <= len(data):
+        length, msg_type, _flags, _seq, _pid = NLMSG_HDR.unpack_from(data, offset)
+        if length < NLMSG_HDR.size or msg_type == NLMSG_DONE:
+            break
+        body = offset + NLMSG_HDR.size
+        end = min(offset + length, len(data))
+
+        kind = MESSAGE_KINDS.get(msg_type)
+        if kind:
+            category, removed = kind
+            event = LinkEvent(kind=category, removed=removed)
+            if category == 'link' and body + IFINFOMSG.size <= end:
+                _family, _type, event.ifindex, _if_flags, _change = IFINFOMSG.unpack_from(data, body)
+                name = _attributes(data, body + IFINFOMSG.size, end).get(IFLA_IFNAME)
+                if name:
+                    event.ifname = name.rstrip(b"\0").decode(errors="replace")
+            elif category == 'address' and body + IFADDRMSG.size <= end:
+                event.ifindex = IFADDRMSG.unpack_from(data, body)[4]
+            elif category == 'route' and body + RTMSG.size <= end:
+                oif = _attributes(data, body + RTMSG.size, end).get(RTA_OIF)
+                if oif and len(oif) >= 4:
+                    event.ifindex = struct.unpack("=i", oif[:4])[0]
+            events.append(event)
+
+        offset += (length + 3) & ~3
+    return events
+
+
+class NetlinkEventSource:
+    """Suscripción rtnetlink: enlace, direcciones IPv4/IPv6 y rutas"""
+
+    GROUPS = RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV6_IFADDR | RTMGRP_IPV4_ROUTE | RTMGRP_IPV6_ROUTE
+    BUFFER_SIZE = 65536
+
+    def __init__(self):
+        self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+        # Un cambio de red genera ráfagas: buffer amplio para no perder avisos
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        self._sock.bind((0, self.GROUPS))
+
+    def read(self, timeout: float) -> List[LinkEvent]:
+        """Avisos pendientes (espera hasta timeout segundos)"""
+        ready, _, _ = select.select([self._sock], [], [], max(timeout, 0))
+        if not ready:
+            return []
+        try:
+            data = self._sock.recv(self.BUFFER_SIZE)
+        except OSError as e:
+            # ENOBUFS: se perdieron avisos, forzar una relectura completa
+            log_warning(f"rtnetlink: {e}")
+            return [LinkEvent(kind='poll')]
+        return parse_netlink_messages(data)
+
+    def close(self):
+        self._sock.close()
+
+
+class PollingEventSource:
+    """Fallback sin avisos del kernel: una relectura completa por intervalo"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next = time.monotonic()
+        self._closed = threading.Event()
+
+    def read(self, timeout: float) -> List[LinkEvent]:
+        wait = min(timeout, max(self._next - time.monotonic(), 0))
+        if self._closed.wait(wait) or time.monotonic() < self._next:
+            return []
+        self._next = time.monotonic() + self.interval
+        return [LinkEvent(kind='poll')]
+
+    def close(self):
+        self._closed.set()
+
+
+class InterfaceWatcher:
+    """
+    Mantiene AdapterManager.adapters al día a partir de avisos de cambio.
+
+    Con un backend que sabe releer una interfaz (LinuxAdapterBackend) solo
+    se relee la interfaz afectada; sin él, o ante avisos sin interfaz,
+    se relee todo y se compara. La lista de adaptadores se reemplaza de
+    forma atómica, como en la detección completa.
+    """
+
+    # Ventana para agrupar la ráfaga de avisos de un mismo cambio (segundos)
+    DEBOUNCE = 0.05
+    # Intervalo del fallback por polling (segundos). En Windows cada relectura
+    # es una detección completa por PowerShell: se espacia más
+    POLL_INTERVAL = 5.0
+    POLL_INTERVAL_WINDOWS = 30.0
+
+    def __init__(self, adapter_manager: Optional[AdapterManager] = None, source=None):
+        """
+        Args:
+            adapter_manager: Manager a mantener actualizado (default: el compartido)
+            source: Fuente de avisos con read(timeout) y close()
+                (default: rtnetlink en Linux, polling en el resto)
+        """
+        self.manager = adapter_manager or get_adapter_manager()
+        self._source = source
+        self._callbacks: List[Callable[[InterfaceChange], None]] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._index_names: Dict[int, str] = {}
+        self.is_running = False
+
+    def _create_source(self):
+        backend = self.manager.backend
+        if sys.platform.startswith('linux') and hasattr(backend, 'detect_adapter'):
+            try:
+                return NetlinkEventSource()
+            except OSError as e:
+                log_warning(f"rtnetlink no disponible, usando polling: {e}")
+        interval = self.POLL_INTERVAL_WINDOWS if sys.platform == 'win32' else self.POLL_INTERVAL
+        return PollingEventSource(interval)
+
+    @property
+    def push_based(self) -> bool:
+        return isinstance(self._source, NetlinkEventSource)
+
+    def start(self):
+        """Iniciar vigilancia"""
+        if self.is_running:
+            return
+        if self._source is None:
+            self._source = self._create_source()
+        self.is_running = True
+        self._thread = threading.Thread(target=self._watch_loop, daemon=True)
+        self._thread.start()
+        log_info(f"Interface watcher iniciado ({'rtnetlink' if self.push_based else 'polling'})")
+
+    def stop(self):
+        """Detener vigilancia"""
+        self.is_running = False
+        if self._source is not None:
+            self._source.close()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        self._source = None
+        log_info("Interface watcher detenido")
+
+    def on_change(self, callback: Callable[[InterfaceChange], None]):
+        """Registrar callback para cambios de adaptadores"""
+        self._callbacks.append(callback)
+
+    def _watch_loop(self):
+        source = self._source
+        while self.is_running:
+            try:
+                events = source.read(0.5)
+                if not events:
+                    continue
+                # Agrupar la ráfaga (link down + addr del + route del...)
+                deadline = time.monotonic() + self.DEBOUNCE
+                remaining = self.DEBOUNCE
+                while remaining > 0:
+                    events += source.read(remaining)
+                    remaining = deadline - time.monotonic()
+                self.apply(events)
+            except Exception as e:
+                if self.is_running:
+                    log_error(f"Error en interface watcher: {e}")
+                    time.sleep(1)
+
+    # ------------------------------------------------------------------
+    # Actualización incremental
+    # ------------------------------------------------------------------
+
+    def _resolve_name(self, event: LinkEvent) -> Optional[str]:
+        if event.ifname:
+            if event.ifindex is not None:
+                self._index_names[event.ifindex] = event.ifname
+            return event.ifname
+        if event.ifindex is None:
+            return None
+        name = self._index_names.get(event.ifindex)
+        if name is None and hasattr(self.manager.backend, 'interface_name'):
+            name = self.manager.backend.interface_name(event.ifindex)
+            if name:
+                self._index_names[event.ifindex] = name
+        return name
+
+    def _detect_all(self) -> List[NetworkAdapter]:
+        if self.manager.backend is not None:
+            return self.manager.backend.detect()
+        previous = self.manager.adapters
+        self.manager._detect_adapters()
+        # La detección por PowerShell deja la lista anterior si falla
+        return self.manager.adapters if self.manager.adapters is not previous else list(previous)
+
+    def apply(self, events: List[LinkEvent]) -> List[InterfaceChange]:
+        """
+        Aplicar un lote de avisos al AdapterManager.
+
+        Returns:
+            Cambios efectivos (los avisos sin efecto no se notifican)
+        """
+        with self._lock:
+            current = {adapter.name: adapter for adapter in self.manager.adapters}
+            names = set()
+            full = not hasattr(self.manager.backend, 'detect_adapter')
+            for event in events:
+                name = self._resolve_name(event)
+                if event.kind == 'poll' or name is None:
+                    full = True
+                else:
+                    names.add(name)
+
+            if full:
+                updated = {adapter.name: adapter for adapter in self._detect_all()}
+            else:
+                updated = dict(current)
+                for name in names:
+                    adapter = self.manager.backend.detect_adapter(name)
+                    if adapter is None:
+                        updated.pop(name, None)
+                    else:
+                        updated[name] = adapter
+
+            changes = self._diff(current, updated)
+            if changes:
+                # Mantener el orden existente; los nuevos al final
+                ordered = [updated[name] for name in current if name in updated]
+                ordered += [adapter for name, adapter in updated.items() if name not in current]
+                self.manager.adapters = ordered
+
+        for change in changes:
+            log_info(f"Interfaz {change.summary()}")
+            self._notify_change(change)
+        return changes
+
+    @staticmethod
+    def _diff(current: Dict[str, NetworkAdapter],
+              updated: Dict[str, NetworkAdapter]) -> List[InterfaceChange]:
+        changes = []
+        for name, adapter in updated.items():
+            previous = current.get(name)
+            if previous is None:
+                changes.append(InterfaceChange(name, 'added', adapter=adapter))
+                continue
+            changed = [f.name for f in fields(NetworkAdapter)
+                       if getattr(previous, f.name) != getattr(adapter, f.name)]
+            if changed:
+                changes.append(InterfaceChange(name, 'changed', adapter, previous, changed))
+        for name, previous in current.items():
+            if name not in updated:
+                changes.append(InterfaceChange(name, 'removed', previous=previous))
+        return changes
+
+    def _notify_change(self, change: InterfaceChange):
+        """Notificar callbacks de un cambio"""
+        for callback in self._callbacks:
+            try:
+                callback(change)
+            except Exception as e:
+                log_error(f"Error en callback de interfaz: {e}")
+
+
+# Singleton
+_interface_watcher_instance = None
+
+def get_interface_watcher() -> InterfaceWatcher:
+    """Obtener instancia única del interface watcher"""
+    global _interface_watcher_instance
+    if _interface_watcher_instance is None:
+        _interface_watcher_instance = InterfaceWatcher()
+    return _interface_watcher_instance
+
+
+if __name__ == "__main__":
+    watcher = get_interface_watcher()
+    watcher.on_change(lambda change: print(f"{change.timestamp:%H:%M:%S.%f} {change.summary()}"))
+    watcher.start()
+    print("Vigilando interfaces (Ctrl+C para salir)...")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        watcher.stop()
@@ -0,0 +1,262 @@
+"""
+NetBoozt - Backend de Adaptadores para Linux
+Construye los mismos registros NetworkAdapter que la detección por
+PowerShell, leyendo solo archivos del kernel y del resolver:
+
+- /sys/class/net/<if>/       estado, flags, MTU, MAC, velocidad, tipo
+- /proc/net/route            gateway y métrica de la ruta por defecto (IPv4)
+- /proc/net/if_inet6         direcciones IPv6
+- /etc/resolv.conf           servidores DNS (o los de systemd-resolved si
+                             resolv.conf apunta al stub 127.0.0.53)
+
+La IPv4 se obtiene con ioctl(SIOCGIFADDR). Sin subprocesos: la detección
+completa tarda milisegundos.
+
+By LOUST (www.loust.pro)
+"""
+
+import fcntl
+import os
+import socket
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .adapter_manager import AdapterStatus, NetworkAdapter
+
+try:
+    from ..utils.logger import log_warning
+except ImportError:
+    def log_warning(msg): print(f"[WARN] {msg}")
+
+
+SIOCGIFADDR = 0x8915
+IFF_UP = 0x1
+ARPHRD_ETHER = 1
+ARPHRD_NONE = 65534            # tun/wireguard
+ARPHRD_LOOPBACK = 772
+
+SYSTEMD_STUB = "127.0.0.53"
+
+
+class LinuxAdapterBackend:
+    """
+    Detección de adaptadores desde /sys y /proc.
+
+    root permite apuntar a una copia del árbol (/sys, /proc, /etc, /run)
+    para verificar con datos grabados; con root distinto de "/" no se
+    consulta la IPv4 por ioctl (pertenece al sistema real).
+    """
+
+    # Métrica para adaptadores sin ruta por defecto (nunca prioritarios)
+    NO_ROUTE_METRIC = 10000
+
+    def __init__(self, root: str = "/"):
+        self.root = Path(root)
+
+    def _path(self, *parts: str) -> Path:
+        return self.root.joinpath(*parts)
+
+    def _read(self, path: Path, default: Optional[str] = None) -> Optional[str]:
+        try:
+            return path.read_text().strip()
+        except (OSError, UnicodeDecodeError):
+            # Ej: speed de un enlace caído o inalámbrico devuelve EINVAL
+            return default
+
+    # ------------------------------------------------------------------
+    # Fuentes
+    # ------------------------------------------------------------------
+
+    def read_default_routes(self) -> Dict[str, Tuple[Optional[str], int]]:
+        """{interfaz: (gateway, métrica)} de las rutas por defecto IPv4"""
+        routes: Dict[str, Tuple[Optional[str], int]] = {}
+        content = self._read(self._path("proc", "net", "route"), "")
+        for line in content.splitlines()[1:]:
+            fields = line.split()
+            if len(fields) < 8:
+                continue
+            iface, destination, gateway, _flags, _refcnt, _use, metric, mask = fields[:8]
+            if destination != "00000000" or mask != "00000000":
+                continue
+            # Hex en orden de bytes del host (little-endian en x86/ARM)
+            # Gateway 0 = ruta de enlace (ej: túnel punto a punto), sin next hop
+            address = socket.inet_ntoa(struct.pack("=L", int(gateway, 16))) if int(gateway, 16) else None
+            metric_value = int(metric)
+            if iface not in routes or metric_value < routes[iface][1]:
+                routes[iface] = (address, metric_value)
+        return routes
+
+    def read_ipv6_addresses(self) -> Dict[str, str]:
+        """{interfaz: IPv6}, prefiriendo alcance global sobre link-local"""
+        best: Dict[str, Tuple[int, str]] = {}
+        content = self._read(self._path("proc", "net", "if_inet6"), "")
+        for line in content.splitlines():
+            fields = line.split()
+            if len(fields) < 6:
+                continue
+            raw, _index, _prefix, scope, _flags, iface = fields[:6]
+            address = socket.inet_ntop(socket.AF_INET6, bytes.fromhex(raw))
+            # scope 00 = global, 20 = link-local, 10 = host
+            rank = {"00": 0, "20": 1}.get(scope, 2)
+            if iface not in best or rank < best[iface][0]:
+                best[iface] = (rank, address)
+        return {iface: address for iface, (_, address) in best.items()}
+
+    @staticmethod
+    def _parse_nameservers(content: str) -> List[str]:
+        servers = []
+        for line in content.splitlines():
+            fields = line.split()
+            if len(fields) >= 2 and fields[0] == "nameserver" and fields[1] not in servers:
+                servers.append(fields[1])
+        return servers
+
+    def read_dns_servers(self) -> List[str]:
+        """DNS globales; con el stub de systemd-resolved, los servidores reales"""
+        servers = self._parse_nameservers(self._read(self._path("etc", "resolv.conf"), ""))
+        if servers == [SYSTEMD_STUB]:
+            upstream = self._parse_nameservers(
+                self._read(self._path("run", "systemd", "resolve", "resolv.conf"), ""))
+            if upstream:
+                return upstream
+        return servers
+
+    def read_link_dns(self, ifindex: Optional[str]) -> List[str]:
+        """DNS por enlace de systemd-resolved (/run/systemd/resolve/netif/<ifindex>)"""
+        if not ifindex:
+            return []
+        content = self._read(self._path("run", "systemd", "resolve", "netif", ifindex), "")
+        for line in content.splitlines():
+            key, _, value = line.partition("=")
+            if key in ("SERVERS", "DNS") and value:
+                return [server.split("#")[0] for server in value.split()]
+        return []
+
+    def read_ipv4_address(self, iface: str) -> Optional[str]:
+        """IPv4 de la interfaz vía ioctl (sin subprocesos)"""
+        if self.root != Path("/"):
+            return None
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            try:
+                packed = fcntl.ioctl(sock.fileno(), SIOCGIFADDR,
+                                     struct.pack("256s", iface.encode()[:15]))
+            except OSError:
+                return None
+        return socket.inet_ntoa(packed[20:24])
+
+    def uses_dhcp(self, iface: str, ifindex: Optional[str]) -> bool:
+        """Hay un lease DHCP (systemd-networkd, NetworkManager o dhclient)"""
+        if ifindex and self._path("run", "systemd", "netif", "leases", ifindex).exists():
+            return True
+        nm_state = self._read(self._path("run", "NetworkManager", "devices", ifindex or "-"), "")
+        if "[dhcp4]" in nm_state:
+            return True
+        for leases_dir in (self._path("var", "lib", "dhcp"), self._path("var", "lib", "dhclient")):
+            try:
+                if any(iface in name and name.endswith(".leases") for name in os.listdir(leases_dir)):
+                    return True
+            except OSError:
+                continue
+        return False
+
+    # ------------------------------------------------------------------
+    # Adaptadores
+    # ------------------------------------------------------------------
+
+    def _status(self, sys_dir: Path) -> AdapterStatus:
+        flags = int(self._read(sys_dir / "flags", "0x0"), 16)
+        if not flags & IFF_UP:
+            return AdapterStatus.DISABLED
+
+        operstate = self._read(sys_dir / "operstate", "unknown")
+        if operstate == "up":
+            return AdapterStatus.UP
+        # tun/wireguard informan "unknown" aunque funcionen: decide el carrier
+        if operstate == "unknown" and self._read(sys_dir / "carrier") == "1":
+            return AdapterStatus.UP
+        return AdapterStatus.DISCONNECTED
+
+    def _description(self, sys_dir: Path, link_type: int) -> str:
+        driver = ""
+        uevent = self._read(sys_dir / "device" / "uevent", "")
+        for line in uevent.splitlines():
+            if line.startswith("DRIVER="):
+                driver = line.split("=", 1)[1]
+
+        if (sys_dir / "wireless").exists() or (sys_dir / "phy80211").exists():
+            kind = "Wi-Fi"
+        elif (sys_dir / "bridge").exists():
+            kind = "Bridge"
+        elif link_type == ARPHRD_NONE:
+            kind = "Tunnel"
+        elif not (sys_dir / "device").exists():
+            kind = "Virtual"
+        else:
+            kind = "Ethernet"
+        return f"{driver} ({kind})" if driver else kind
+
+    def _build_adapter(self, name: str, routes: Dict[str, Tuple[Optional[str], int]],
+                       ipv6: Dict[str, str], global_dns: List[str]) -> Optional[NetworkAdapter]:
+        """Registro de una interfaz (None si no existe o es loopback)"""
+        sys_dir = self._path("sys", "class", "net", name)
+        if not sys_dir.exists():
+            return None
+        link_type = int(self._read(sys_dir / "type", "1") or 1)
+        if link_type == ARPHRD_LOOPBACK:
+            return None
+
+        ifindex = self._read(sys_dir / "ifindex")
+        status = self._status(sys_dir)
+        gateway, metric = routes.get(name, (None, self.NO_ROUTE_METRIC))
+        ipv4 = self.read_ipv4_address(name)
+
+        speed = self._read(sys_dir / "speed")
+        speed_mbps = int(speed) if speed and speed.lstrip("-").isdigit() else 0
+
+        mac = self._read(sys_dir / "address", "") or ""
+        dns = self.read_link_dns(ifindex) or (global_dns if (ipv4 or gateway) else [])
+
+        return NetworkAdapter(
+            name=name,
+            interface_description=self._description(sys_dir, link_type),
+            status=status,
+            metric=metric,
+            # Mismo formato que Get-NetAdapter
+            mac_address=mac.upper().replace(":", "-"),
+            speed_mbps=max(speed_mbps, 0),
+            mtu=int(self._read(sys_dir / "mtu", "1500") or 1500),
+            dns_servers=list(dns),
+            ipv4_address=ipv4,
+            ipv6_address=ipv6.get(name),
+            default_gateway=gateway,
+            dhcp_enabled=self.uses_dhcp(name, ifindex)
+        )
+
+    def detect(self) -> List[NetworkAdapter]:
+        """Todos los adaptadores (excepto loopback)"""
+        net_dir = self._path("sys", "class", "net")
+        try:
+            names = sorted(os.listdir(net_dir))
+        except OSError as e:
+            log_warning(f"No se pudo leer {net_dir}: {e}")
+            return []
+
+        routes = self.read_default_routes()
+        ipv6 = self.read_ipv6_addresses()
+        global_dns = self.read_dns_servers()
+
+        adapters = (self._build_adapter(name, routes, ipv6, global_dns) for name in names)
+        return [adapter for adapter in adapters if adapter is not None]
+
+    def detect_adapter(self, name: str) -> Optional[NetworkAdapter]:
+        """Releer una sola interfaz (None si ya no existe)"""
+        return self._build_adapter(name, self.read_default_routes(),
+                                   self.read_ipv6_addresses(), self.read_dns_servers())
+
+    def interface_name(self, ifindex: int) -> Optional[str]:
+        """Nombre de la interfaz con ese ifindex"""
+        try:
+            return socket.if_indextoname(ifindex) if self.root == Path("/") else None
+        except OSError:
+            return None
@@ -0,0 +1,261 @@
+"""
+NetBoozt - Descubrimiento de MTU de Ruta (PMTU)
+Sondas ICMP con bit DF (Don't Fragment) y búsqueda binaria del tamaño de
+paquete máximo que llega al destino sin fragmentarse, por adaptador y por
+destino.
+
+Detecta:
+- Desajustes por encapsulación (PPPoE, túneles, VPN): el adaptador anuncia
+  1500 pero la ruta solo admite menos, y TCP fragmenta o retransmite.
+- Agujeros negros de PMTU: los paquetes grandes se descartan sin el aviso
+  ICMP "fragmentation needed", y las conexiones se cuelgan tras el handshake.
+
+By LOUST (www.loust.pro)
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from .probe_backends import (
+    ProbeBackend, ProbeReply, PingProbeBackend, get_default_backend,
+    REPLY, TOO_BIG, TIMEOUT
+)
+
+try:
+    from ..utils.logger import log_info, log_warning
+except ImportError:
+    def log_info(msg): print(f"[INFO] {msg}")
+    def log_warning(msg): print(f"[WARN] {msg}")
+
+
+# Encapsulaciones habituales sobre Ethernet 1500: bytes de overhead → origen
+KNOWN_OVERHEADS = {
+    8: "PPPoE",
+    20: "túnel IP-in-IP / 6in4",
+    24: "GRE",
+    28: "PPPoE + L2TP/DS-Lite",
+    32: "PPPoE + GRE",
+    50: "VXLAN",
+    60: "WireGuard (IPv4)",
+    80: "WireGuard",
+}
+
+# Palabras clave de adaptadores virtuales de VPN
+VPN_ADAPTER_KEYWORDS = ("wireguard", "wintun", "tap-windows", "openvpn", "vpn", "tun", "ppp")
+
+
+@dataclass
+class MtuResult:
+    """Resultado de PMTU hacia un destino"""
+    target: str
+    adapter: Optional[str]
+    adapter_mtu: int
+    path_mtu: Optional[int] = None          # None si el destino no responde
+    probes: int = 0
+    too_big_from: Optional[str] = None      # Router que avisó "fragmentation needed"
+    reported_mtu: Optional[int] = None      # MTU anunciado en ese aviso
+    black_hole: bool = False
+    overhead_source: Optional[str] = None
+    recommended_mtu: Optional[int] = None
+    issues: List[str] = field(default_factory=list)
+
+    @property
+    def reachable(self) -> bool:
+        return self.path_mtu is not None
+
+    @property
+    def mismatch(self) -> bool:
+        """La ruta admite menos que el MTU configurado"""
+        return self.path_mtu is not None and self.path_mtu < self.adapter_mtu
+
+    @property
+    def mss(self) -> Optional[int]:
+        """MSS TCP correspondiente (cabeceras IPv4 + TCP = 40 bytes)"""
+        return self.path_mtu - 40 if self.path_mtu else None
+
+    def summary(self) -> str:
+        name = self.adapter or "default"
+        if not self.reachable:
+            return f"MTU {name} → {self.target}: sin respuesta"
+
+        lines = [f"MTU {name} → {self.target}: ruta {self.path_mtu} / adaptador {self.adapter_mtu} "
+                 f"(MSS {self.mss}, {self.probes} sondas)"]
+        lines += [f"  ⚠ {issue}" for issue in self.issues]
+        if self.recommended_mtu and self.recommended_mtu != self.adapter_mtu:
+            lines.append(f"  → MTU recomendado: {self.recommended_mtu}")
+        return "\n".join(lines)
+
+
+class MtuDiscovery:
+    """
+    Descubrimiento de PMTU por búsqueda binaria con sondas DF.
+
+    El rango de búsqueda es [MIN_PACKET, MTU del adaptador]: un paquete DF
+    mayor que el MTU local lo rechaza el propio sistema. Cuando un router
+    anuncia su MTU en el aviso "fragmentation needed" se prueba ese valor
+    directamente, así que una ruta con avisos correctos se resuelve en
+    3 sondas y sin avisos en ~11.
+    """
+
+    MIN_PACKET = 576            # Mínimo que todo host IPv4 debe aceptar
+    ATTEMPTS = 3                # Intentos por tamaño ante timeout (pérdida normal)
+    TIMEOUT_MS = 1500
+
+    def __init__(self, backend: Optional[ProbeBackend] = None):
+        self.backend = backend
+        self.results: Dict[tuple, MtuResult] = {}
+
+    # ------------------------------------------------------------------
+    # Sondas
+    # ------------------------------------------------------------------
+
+    def _probe_size(self, backend: ProbeBackend, target: str, size: int,
+                    result: MtuResult) -> ProbeReply:
+        """Sonda DF con un paquete IP de size bytes (reintenta timeouts)"""
+        payload = size - ProbeBackend.IP_ICMP_OVERHEAD
+        reply = ProbeReply(TIMEOUT)
+        for _ in range(self.ATTEMPTS):
+            result.probes += 1
+            reply = backend.probe(target, timeout_ms=self.TIMEOUT_MS,
+                                  payload_size=payload, dont_fragment=True)
+            if reply.status != TIMEOUT:
+                break
+        return reply
+
+    # ------------------------------------------------------------------
+    # Descubrimiento
+    # ------------------------------------------------------------------
+
+    def discover(self, target: str, adapter_mtu: int = 1500, adapter: Optional[str] = None,
+                 backend: Optional[ProbeBackend] = None, is_vpn: bool = False) -> MtuResult:
+        """
+        PMTU hacia un destino.
+
+        Args:
+            target: IP o host de destino
+            adapter_mtu: MTU configurado del adaptador (techo de la búsqueda)
+            adapter: Nombre del adaptador (solo para el reporte)
+            backend: Backend de sondas (default: el de la instancia o el del sistema)
+            is_vpn: El adaptador es un túnel/VPN (afecta a las recomendaciones)
+        """
+        backend = backend or self.backend or get_default_backend()
+        result = MtuResult(target=target, adapter=adapter, adapter_mtu=adapter_mtu)
+
+        # Alcanzabilidad con un paquete que cabe en cualquier ruta
+        reply = self._probe_size(backend, target, self.MIN_PACKET, result)
+        if reply.status != REPLY:
+            log_warning(f"PMTU: {target} no responde a sondas DF de {self.MIN_PACKET} bytes")
+            self._store(result)
+            return result
+
+        good, bad = self.MIN_PACKET, adapter_mtu + 1
+        silent_drops = False
+        candidate = adapter_mtu
+
+        while bad - good > 1:
+            size = candidate if good < candidate < bad else (good + bad) // 2
+            candidate = 0
+            reply = self._probe_size(backend, target, size, result)
+
+            if reply.status == REPLY:
+                good = size
+                if size == result.reported_mtu:
+                    break   # El valor anunciado por el router se confirma
+                continue
+
+            bad = size
+            if reply.status == TOO_BIG:
+                if reply.address and result.too_big_from is None:
+                    result.too_big_from = reply.address
+                if reply.mtu:
+                    result.reported_mtu = reply.mtu if result.reported_mtu is None else min(result.reported_mtu, reply.mtu)
+                    candidate = reply.mtu
+            elif reply.status == TIMEOUT:
+                silent_drops = True
+
+        result.path_mtu = good
+        # Descartes silenciosos sin ningún aviso ICMP: agujero negro
+        result.black_hole = result.mismatch and silent_drops and result.reported_mtu is None
+        self._analyze(result, is_vpn)
+        self._store(result)
+        return result
+
+    def _analyze(self, result: MtuResult, is_vpn: bool):
+        """Clasificar el desajuste y recomendar un MTU"""
+        result.recommended_mtu = result.adapter_mtu
+        if not result.mismatch:
+            return
+
+        overhead = result.adapter_mtu - result.path_mtu
+        if result.adapter_mtu == 1500:
+            result.overhead_source = KNOWN_OVERHEADS.get(overhead) or (
+                "VPN/túnel" if overhead >= 40 else "encapsulación desconocida"
+            )
+        source = f" ({result.overhead_source})" if result.overhead_source else ""
+
+        result.issues.append(
+            f"La ruta admite {result.path_mtu} bytes pero el adaptador usa {result.adapter_mtu}: "
+            f"{overhead} bytes de overhead{source}"
+        )
+        if result.black_hole:
+            result.issues.append(
+                "Agujero negro de PMTU: los paquetes grandes se descartan sin aviso ICMP "
+                "(conexiones que se cuelgan tras conectar)"
+            )
+        elif result.too_big_from:
+            result.issues.append(
+                f"{result.too_big_from} rechaza paquetes > {result.reported_mtu or result.path_mtu} bytes "
+                f"(aviso ICMP 'fragmentation needed')"
+            )
+        if is_vpn:
+            result.issues.append("Adaptador VPN con MTU mayor que la ruta: el túnel fragmenta cada paquete grande")
+
+        result.recommended_mtu = result.path_mtu
+
+    def _store(self, result: MtuResult):
+        self.results[(result.adapter, result.target)] = result
+
+    # ------------------------------------------------------------------
+    # Por adaptador
+    # ------------------------------------------------------------------
+
+    def discover_adapter(self, adapter, targets: Iterable[str]) -> Dict[str, MtuResult]:
+        """
+        PMTU desde un adaptador hacia varios destinos.
+
+        Si no hay backend inyectado, las sondas salen por la IP del
+        adaptador (ping -S / -I).
+
+        Args:
+            adapter: NetworkAdapter
+            targets: Destinos a sondear
+        """
+        backend = self.backend
+        if backend is None:
+            backend = PingProbeBackend(adapter.ipv4_address) if adapter.ipv4_address else get_default_backend()
+
+        description = f"{adapter.name} {adapter.interface_description}".lower()
+        is_vpn = any(keyword in description for keyword in VPN_ADAPTER_KEYWORDS)
+
+        results = {}
+        for target in targets:
+            results[target] = self.discover(target, adapter.mtu, adapter.name, backend, is_vpn)
+            log_info(results[target].summary())
+        return results
+
+    def discover_all(self, adapters: List, targets: Iterable[str]) -> Dict[str, Dict[str, MtuResult]]:
+        """PMTU para cada adaptador activo: {adaptador: {destino: resultado}}"""
+        targets = list(targets)
+        return {
+            adapter.name: self.discover_adapter(adapter, targets)
+            for adapter in adapters if adapter.is_active
+        }
+
+
+def recommend_mtu(results: Iterable[MtuResult]) -> Optional[int]:
+    """
+    MTU recomendado para un adaptador: el menor PMTU entre los destinos
+    que respondieron (el adaptador debe servir a todas las rutas).
+    """
+    path_mtus = [r.path_mtu for r in results if r.reachable]
+    return min(path_mtus) if path_mtus else None
@@ -16,11 +16,26 @@ import subprocess
 import threading
 import time
 import re
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 
+from .diagnostic_cache import DiagnosticCache
+
+if TYPE_CHECKING:
+    from .bufferbloat import BufferbloatConfig, BufferbloatResult
+    from .mtu_discovery import MtuResult
+    from .path_analyzer import HopDegradation, PathReport
+    from .probe_backends import ProbeBackend
+
+try:
+    from ..utils.shell_host import get_shell_runner
+except ImportError:
+    # Fallback con src/ en sys.path (ejecución directa)
+    from utils.shell_host import get_shell_runner
+
 try:
     from ..utils.logger import log_info, log_warning, log_error
 except ImportError:
@@ -73,6 +88,13 @@ class DiagnosticResult:
     
     message: str
     recommendation: str
+    
+    # Duración de cada fase en ms ('adapter_info', 'adapter', 'router', 'isp', 'dns', 'total')
+    phase_timings_ms: Dict[str, float] = field(default_factory=dict)
+    concurrent: bool = False
+    
+    # Capas respondidas desde la caché (sin volver a verificar)
+    cached_layers: List[str] = field(default_factory=list)
 
 
 class NetworkDiagnostics:
@@ -93,27 +115,188 @@ class NetworkDiagnostics:
         'cloudflare.com',
     ]
     
+    # Modo concurrente: router, ISP y DNS se prueban en paralelo. Las capas
+    # (que esperan a sus sondas) y las sondas (pings, nslookup) usan pools
+    # separados: una capa nunca ocupa el hilo que necesita una de sus sondas
+    CONCURRENT_MODE = True
+    LAYER_WORKERS = 4
+    PARALLEL_WORKERS = 8
+    
     def __init__(self):
         self.last_result: Optional[DiagnosticResult] = None
         self._lock = threading.Lock()
+        self.cache = DiagnosticCache()
     
-    def run_full_diagnostic(self, adapter_name: str = None) -> DiagnosticResult:
+    def run_full_diagnostic(self, adapter_name: str = None,
+                            concurrent: Optional[bool] = None,
+                            use_cache: bool = True) -> DiagnosticResult:
         """
         Ejecutar diagnóstico completo de red
         
+        Args:
+            adapter_name: Adaptador a diagnosticar (default: primer adaptador activo)
+            concurrent: Ejecutar sondas en paralelo (default: CONCURRENT_MODE)
+            use_cache: Reutilizar capas vigentes; False verifica todo (y
+                refresca la caché)
+        
         Returns:
             DiagnosticResult con punto de falla identificado
         """
-        log_info("Iniciando diagnóstico completo de red...")
+        if concurrent is None:
+            concurrent = self.CONCURRENT_MODE
+        
+        log_info(f"Iniciando diagnóstico completo de red{' (concurrente)' if concurrent else ''}...")
+        
+        start = time.perf_counter()
+        if concurrent:
+            probes = self._run_probes_concurrent(adapter_name, use_cache)
+        else:
+            probes = self._run_probes_sequential(adapter_name, use_cache)
+        
+        result = self._classify(**probes)
+        result.phase_timings_ms['total'] = (time.perf_counter() - start) * 1000
+        result.concurrent = concurrent
+        
+        with self._lock:
+            self.last_result = result
+        
+        return result
+    
+    def _timed(self, timings: Dict[str, float], phase: str, func: Callable, *args, **kwargs):
+        """Ejecutar sonda registrando su duración en timings[phase]"""
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings[phase] = (time.perf_counter() - start) * 1000
+    
+    def _cached_layer(self, probes: Dict, use_cache: bool, layer: str, key,
+                      func: Callable, *args, **kwargs):
+        """
+        Resultado de una capa: desde la caché si está vigente, o verificando
+        (con tiempo en timings[layer]) y guardando en la caché.
+        """
+        if use_cache:
+            found, value = self.cache.get(layer, key)
+            if found:
+                probes['cached_layers'].append(layer)
+                return value
+        
+        value = self._timed(probes['timings'], layer, func, *args, **kwargs)
+        self.cache.put(layer, value, self._layer_ok(layer, value), key)
+        return value
+    
+    def _submit_layer(self, executor: ThreadPoolExecutor, probes: Dict, use_cache: bool,
+                      layer: str, key, func: Callable, *args, **kwargs) -> Future:
+        """Como _cached_layer pero en el executor (Future ya resuelto si hay caché)"""
+        if use_cache:
+            found, value = self.cache.get(layer, key)
+            if found:
+                probes['cached_layers'].append(layer)
+                future = Future()
+                future.set_result(value)
+                return future
+        
+        return executor.submit(self._cached_layer, probes, False, layer, key, func, *args, **kwargs)
+    
+    @staticmethod
+    def _layer_ok(layer: str, value) -> bool:
+        """Si el resultado de una capa es un éxito (los fallos caducan antes)"""
+        if layer == 'adapter_info':
+            return bool(value[0])
+        if layer == 'adapter':
+            return bool(value)
+        return bool(value[1])
+    
+    def _run_probes_sequential(self, adapter_name: Optional[str], use_cache: bool = True) -> Dict:
+        """Fases en orden; se detiene en la primera que falla"""
+        probes = {'timings': {}, 'cached_layers': []}
         
         # Fase 0: Obtener info del adaptador
+        found_name, gateway_ip, dns_servers = self._cached_layer(
+            probes, use_cache, 'adapter_info', adapter_name or '', self._get_adapter_info, adapter_name)
+        adapter_name = adapter_name or found_name
+        probes.update(adapter_name=adapter_name, gateway_ip=gateway_ip, dns_servers=dns_servers)
         if not adapter_name:
-            adapter_name, gateway_ip, dns_servers = self._get_adapter_info()
-        else:
-            _, gateway_ip, dns_servers = self._get_adapter_info(adapter_name)
+            return probes
+        
+        # Fase 1: Verificar adaptador
+        probes['adapter_ok'] = self._cached_layer(
+            probes, use_cache, 'adapter', adapter_name, self._check_adapter, adapter_name)
+        if not probes['adapter_ok']:
+            return probes
+        
+        # Fase 2: Verificar router/gateway
+        probes['router'] = self._cached_layer(
+            probes, use_cache, 'router', gateway_ip, self._ping_target, gateway_ip, timeout=2)
+        if not probes['router'][1]:
+            return probes
+        
+        # Fase 3: Verificar ISP (ping a IPs externas)
+        probes['isp'] = self._cached_layer(probes, use_cache, 'isp', '', self._check_isp)
+        if not probes['isp'][1]:
+            return probes
+        
+        # Fase 4: Verificar DNS
+        probes['dns'] = self._cached_layer(
+            probes, use_cache, 'dns', tuple(dns_servers), self._check_dns, dns_servers)
+        return probes
+    
+    def _run_probes_concurrent(self, adapter_name: Optional[str], use_cache: bool = True) -> Dict:
+        """
+        Todas las sondas en paralelo: el ISP no depende del adaptador, así
+        que arranca junto con la consulta de info; router, DNS y estado del
+        adaptador arrancan en cuanto se conocen gateway y servidores DNS.
+        """
+        probes = {'timings': {}, 'cached_layers': []}
+        executor = ThreadPoolExecutor(max_workers=self.LAYER_WORKERS, thread_name_prefix="diag")
+        leaves = ThreadPoolExecutor(max_workers=self.PARALLEL_WORKERS, thread_name_prefix="diag-probe")
+        
+        try:
+            isp_future = self._submit_layer(
+                executor, probes, use_cache, 'isp', '', self._check_isp_concurrent, leaves)
+            
+            found_name, gateway_ip, dns_servers = self._cached_layer(
+                probes, use_cache, 'adapter_info', adapter_name or '', self._get_adapter_info, adapter_name)
+            adapter_name = adapter_name or found_name
+            probes.update(adapter_name=adapter_name, gateway_ip=gateway_ip, dns_servers=dns_servers)
+            if not adapter_name:
+                return probes
+            
+            adapter_future = self._submit_layer(
+                executor, probes, use_cache, 'adapter', adapter_name, self._check_adapter, adapter_name)
+            router_future = self._submit_layer(
+                executor, probes, use_cache, 'router', gateway_ip, self._ping_target, gateway_ip, timeout=2)
+            dns_future = self._submit_layer(
+                executor, probes, use_cache, 'dns', tuple(dns_servers), self._check_dns_concurrent, dns_servers, leaves)
+            
+            probes['adapter_ok'] = adapter_future.result()
+            probes['router'] = router_future.result()
+            probes['isp'] = isp_future.result()
+            probes['dns'] = dns_future.result()
+            return probes
+        finally:
+            # Sondas redundantes (ej: pings extra del ISP) terminan solas
+            executor.shutdown(wait=False)
+            leaves.shutdown(wait=False)
+    
+    def _classify(self, timings: Dict[str, float], cached_layers: List[str] = None,
+                  adapter_name: str = "", gateway_ip: str = "",
+                  dns_servers: List[str] = None, adapter_ok: bool = False,
+                  router: Tuple[Optional[float], bool] = (None, False),
+                  isp: Tuple[Optional[float], bool] = (None, False),
+                  dns: Tuple[Optional[float], bool] = (None, False)) -> DiagnosticResult:
+        """
+        Determinar el punto de falla: la primera fase que falla en la cadena
+        adaptador → router → ISP → DNS (igual en modo secuencial y concurrente).
+        """
+        dns_servers = dns_servers or []
+        router_latency, router_ok = router
+        isp_latency, isp_ok = isp
+        dns_latency, dns_ok = dns
         
         if not adapter_name:
-            return self._create_result(
+            result = self._create_result(
                 FailurePoint.ADAPTER,
                 NetworkHealth.DOWN,
                 adapter_ok=False,
@@ -123,11 +306,8 @@ class NetworkDiagnostics:
                 message="No se encontró adaptador de red activo",
                 recommendation="Verifica que tu WiFi o Ethernet esté conectado"
             )
-        
-        # Fase 1: Verificar adaptador
-        adapter_ok = self._check_adapter(adapter_name)
-        if not adapter_ok:
-            return self._create_result(
+        elif not adapter_ok:
+            result = self._create_result(
                 FailurePoint.ADAPTER,
                 NetworkHealth.DOWN,
                 adapter_ok=False,
@@ -137,11 +317,8 @@ class NetworkDiagnostics:
                 message=f"Problema con adaptador {adapter_name}",
                 recommendation="Reinicia el adaptador o actualiza drivers"
             )
-        
-        # Fase 2: Verificar router/gateway
-        router_latency, router_ok = self._ping_target(gateway_ip, timeout=2)
-        if not router_ok:
-            return self._create_result(
+        elif not router_ok:
+            result = self._create_result(
                 FailurePoint.ROUTER,
                 NetworkHealth.DOWN,
                 adapter_ok=True,
@@ -153,11 +330,8 @@ class NetworkDiagnostics:
                 message=f"No hay conexión con router ({gateway_ip})",
                 recommendation="Verifica tu conexión WiFi o cable Ethernet. Reinicia el router si es necesario."
             )
-        
-        # Fase 3: Verificar ISP (ping a IPs externas)
-        isp_latency, isp_ok = self._check_isp()
-        if not isp_ok:
-            return self._create_result(
+        elif not isp_ok:
+            result = self._create_result(
                 FailurePoint.ISP,
                 NetworkHealth.DOWN,
                 adapter_ok=True,
@@ -171,11 +345,8 @@ class NetworkDiagnostics:
                 message="Router OK pero sin conexión a Internet",
                 recommendation="El problema está en tu ISP o la configuración del router. Contacta a tu proveedor."
             )
-        
-        # Fase 4: Verificar DNS
-        dns_latency, dns_ok = self._check_dns(dns_servers)
-        if not dns_ok:
-            return self._create_result(
+        elif not dns_ok:
+            result = self._create_result(
                 FailurePoint.DNS,
                 NetworkHealth.POOR,
                 adapter_ok=True,
@@ -191,31 +362,93 @@ class NetworkDiagnostics:
                 message=f"Internet OK pero DNS ({dns_servers[0] if dns_servers else 'N/A'}) no responde",
                 recommendation="Cambia a DNS más rápido (Cloudflare 1.1.1.1 o Google 8.8.8.8)"
             )
+        else:
+            # Todo OK - calcular salud general
+            health = self._calculate_health(router_latency, isp_latency, dns_latency)
+            
+            result = self._create_result(
+                FailurePoint.NONE,
+                health,
+                adapter_ok=True,
+                router_latency_ms=router_latency,
+                router_ok=True,
+                isp_latency_ms=isp_latency,
+                isp_ok=True,
+                dns_latency_ms=dns_latency,
+                dns_ok=True,
+                adapter_name=adapter_name,
+                gateway_ip=gateway_ip,
+                dns_servers=dns_servers,
+                message=f"Conexión OK - {health.value.upper()}",
+                recommendation=self._get_health_recommendation(health, router_latency, dns_latency)
+            )
         
-        # Todo OK - calcular salud general
-        health = self._calculate_health(router_latency, isp_latency, dns_latency)
-        
-        result = self._create_result(
-            FailurePoint.NONE,
-            health,
-            adapter_ok=True,
-            router_latency_ms=router_latency,
-            router_ok=True,
-            isp_latency_ms=isp_latency,
-            isp_ok=True,
-            dns_latency_ms=dns_latency,
-            dns_ok=True,
-            adapter_name=adapter_name,
-            gateway_ip=gateway_ip,
-            dns_servers=dns_servers,
-            message=f"Conexión OK - {health.value.upper()}",
-            recommendation=self._get_health_recommendation(health, router_latency, dns_latency)
-        )
+        result.phase_timings_ms = timings
+        result.cached_layers = cached_layers or []
+        return result
+    
+    def analyze_path(self, target: str = None, cycles: int = 10,
+                     baseline: Optional['PathReport'] = None,
+                     backend: Optional['ProbeBackend'] = None) -> Tuple['PathReport', Optional['HopDegradation']]:
+        """
+        Análisis salto a salto (estilo MTR) hacia un destino externo.
         
-        with self._lock:
-            self.last_result = result
+        Complementa a run_full_diagnostic: en lugar de "el ISP está lento"
+        indica qué salto de la ruta añade la latencia o la pérdida.
         
-        return result
+        Args:
+            target: Destino (default: primer TEST_TARGET)
+            cycles: Sondas por salto
+            baseline: Reporte previo sano para comparar salto a salto
+            backend: Backend de sondas (default: el del sistema)
+        
+        Returns:
+            (reporte, degradación localizada o None)
+        """
+        from .path_analyzer import PathAnalyzer
+        
+        analyzer = PathAnalyzer(target or next(iter(self.TEST_TARGETS.values())), backend=backend)
+        try:
+            report = analyzer.run(cycles=cycles)
+            return report, analyzer.locate_degradation(baseline=baseline, report=report)
+        finally:
+            analyzer.stop()
+    
+    def check_mtu(self, target: str = None, adapter_name: str = None,
+                  backend: Optional['ProbeBackend'] = None) -> 'MtuResult':
+        """
+        Descubrimiento de MTU de ruta (sondas DF + búsqueda binaria).
+        
+        Args:
+            target: Destino (default: primer TEST_TARGET)
+            adapter_name: Adaptador a revisar (default: el de mayor prioridad)
+            backend: Backend de sondas (default: ping desde la IP del adaptador)
+        
+        Returns:
+            MtuResult con el MTU de la ruta, desajustes y MTU recomendado
+        """
+        from .adapter_manager import get_adapter_manager
+        from .mtu_discovery import MtuDiscovery
+        
+        target = target or next(iter(self.TEST_TARGETS.values()))
+        manager = get_adapter_manager()
+        adapter = manager.get_adapter_by_name(adapter_name) if adapter_name else manager.get_priority_adapter()
+        
+        discovery = MtuDiscovery(backend)
+        if adapter is None:
+            return discovery.discover(target, adapter=adapter_name)
+        return discovery.discover_adapter(adapter, [target])[target]
+    
+    def run_bufferbloat_test(self, config: Optional['BufferbloatConfig'] = None) -> 'BufferbloatResult':
+        """
+        Prueba de latencia bajo carga (bufferbloat), ~30s con la config por defecto.
+        
+        Args:
+            config: URLs de carga, streams y duraciones (permite un servidor local)
+        """
+        from .bufferbloat import BufferbloatTest
+        
+        return BufferbloatTest(config).run()
     
     def quick_check(self) -> Tuple[bool, str]:
         """
@@ -224,14 +457,34 @@ class NetworkDiagnostics:
         Returns:
             (is_connected, message)
         """
-        # Ping rápido a múltiples destinos
-        for name, ip in self.TEST_TARGETS.items():
-            latency, ok = self._ping_target(ip, timeout=1, count=1)
-            if ok:
-                return True, f"Conectado ({name}: {latency:.0f}ms)"
+        # Capa ISP de la caché (compartida con run_full_diagnostic) o ping
+        # a todos los destinos en paralelo
+        probes = {'timings': {}, 'cached_layers': []}
+        executor = ThreadPoolExecutor(max_workers=len(self.TEST_TARGETS), thread_name_prefix="quick")
+        try:
+            latency, ok = self._cached_layer(probes, True, 'isp', '', self._check_isp_concurrent, executor)
+        finally:
+            executor.shutdown(wait=False)
         
+        if ok:
+            return True, f"Conectado (Internet: {latency:.0f}ms)"
         return False, "Sin conexión a Internet"
     
+    def invalidate(self, *layers: str) -> List[str]:
+        """
+        Marcar capas como obsoletas (y las que dependen de ellas) para que el
+        próximo diagnóstico las vuelva a verificar. Sin argumentos: todas.
+        """
+        return self.cache.invalidate(*layers)
+    
+    def attach_event_monitor(self, event_monitor):
+        """Invalidar capas de la caché con los eventos de un WindowsEventMonitor"""
+        self.cache.attach(event_monitor)
+    
+    def attach_interface_watcher(self, interface_watcher):
+        """Invalidar la caché cuando cambian los adaptadores"""
+        interface_watcher.on_change(self.cache.on_interface_change)
+    
     def _get_adapter_info(self, adapter_name: str = None) -> Tuple[str, str, List[str]]:
         """Obtener información del adaptador activo"""
         try:
@@ -249,13 +502,7 @@ class NetworkDiagnostics:
             }
             """
             
-            result = subprocess.run(
-                ["powershell", "-Command", cmd],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
+            result = get_shell_runner().run(cmd, timeout=5)
             
             if result.stdout.strip():
                 import json
@@ -280,13 +527,7 @@ class NetworkDiagnostics:
         """Verificar estado del adaptador"""
         try:
             cmd = f"(Get-NetAdapter -Name '{adapter_name}').Status"
-            result = subprocess.run(
-                ["powershell", "-Command", cmd],
-                capture_output=True,
-                text=True,
-                timeout=3,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
+            result = get_shell_runner().run(cmd, timeout=3)
             
             return 'Up' in result.stdout
             
@@ -358,28 +599,74 @@ class NetworkDiagnostics:
         
         for domain in self.TEST_DOMAINS:
             for dns in dns_servers[:2]:  # Solo probar primeros 2
-                try:
-                    start = time.time()
-                    cmd = f"nslookup {domain} {dns}"
-                    
-                    result = subprocess.run(
-                        cmd,
-                        shell=True,
-                        capture_output=True,
-                        text=True,
-                        timeout=3,
-                        creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                    )
-                    
-                    elapsed = (time.time() - start) * 1000
-                    
-                    if result.returncode == 0 and 'Address' in result.stdout:
-                        return elapsed, True
-                        
-                except subprocess.TimeoutExpired:
-                    continue
-                except Exception:
-                    continue
+                latency, ok = self._nslookup(domain, dns)
+                if ok:
+                    return latency, True
+        
+        return None, False
+    
+    def _nslookup(self, domain: str, dns: str) -> Tuple[Optional[float], bool]:
+        """Resolver un dominio contra un servidor DNS con nslookup"""
+        try:
+            start = time.time()
+            cmd = f"nslookup {domain} {dns}"
+            
+            result = subprocess.run(
+                cmd,
+                shell=True,
+                capture_output=True,
+                text=True,
+                timeout=3,
+                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+            )
+            
+            elapsed = (time.time() - start) * 1000
+            
+            if result.returncode == 0 and 'Address' in result.stdout:
+                return elapsed, True
+                
+        except subprocess.TimeoutExpired:
+            pass
+        except Exception:
+            pass
+        
+        return None, False
+    
+    def _check_isp_concurrent(self, executor: ThreadPoolExecutor) -> Tuple[Optional[float], bool]:
+        """Como _check_isp pero pingando todos los destinos a la vez (basta con 2 OK)"""
+        futures = [
+            executor.submit(self._ping_target, ip, timeout=2, count=1)
+            for ip in self.TEST_TARGETS.values()
+        ]
+        
+        latencies = []
+        for future in as_completed(futures):
+            latency, ok = future.result()
+            if ok and latency is not None:
+                latencies.append(latency)
+                if len(latencies) >= 2:
+                    break
+        
+        if latencies:
+            return sum(latencies) / len(latencies), True
+        
+        return None, False
+    
+    def _check_dns_concurrent(self, dns_servers: List[str], executor: ThreadPoolExecutor) -> Tuple[Optional[float], bool]:
+        """Como _check_dns pero lanzando todas las consultas a la vez (gana la primera OK)"""
+        if not dns_servers:
+            dns_servers = ['8.8.8.8', '1.1.1.1']
+        
+        futures = [
+            executor.submit(self._nslookup, domain, dns)
+            for domain in self.TEST_DOMAINS
+            for dns in dns_servers[:2]
+        ]
+        
+        for future in as_completed(futures):
+            latency, ok = future.result()
+            if ok:
+                return latency, True
         
         return None, False
     
@@ -453,9 +740,9 @@ class NetworkDiagnostics:
             recommendation=recommendation
         )
     
-    def get_diagnostic_report(self) -> str:
+    def get_diagnostic_report(self, use_cache: bool = True) -> str:
         """Generar reporte de diagnóstico en texto"""
-        result = self.run_full_diagnostic()
+        result = self.run_full_diagnostic(use_cache=use_cache)
         
         lines = [
             "=" * 60,
@@ -481,6 +768,10 @@ class NetworkDiagnostics:
             "--- Recommendation ---",
             result.recommendation,
             "",
+            f"--- Timings ({'concurrent' if result.concurrent else 'sequential'}) ---",
+            "  ".join(f"{phase}: {ms:.0f}ms" for phase, ms in result.phase_timings_ms.items()),
+            f"Cached: {', '.join(result.cached_layers)}" if result.cached_layers else "Cached: none",
+            "",
             "=" * 60,
         ]
         
@@ -0,0 +1,411 @@
+"""
+NetBoozt - Análisis de Ruta Salto a Salto (estilo MTR)
+Envía sondas con TTL limitado a cada salto de la ruta de forma continua y
+acumula latencia, pérdida y jitter por salto en una ventana deslizante.
+
+Cuando la latencia se degrada, localiza el salto que la introduce: un
+aumento solo cuenta si persiste en todos los saltos posteriores (un router
+que responde lento a ICMP pero reenvía bien no es el culpable).
+
+By LOUST (www.loust.pro)
+"""
+
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from .probe_backends import ProbeBackend, ProbeReply, REPLY, TTL_EXPIRED, get_default_backend
+
+try:
+    from ..utils.logger import log_info, log_warning
+except ImportError:
+    def log_info(msg): print(f"[INFO] {msg}")
+    def log_warning(msg): print(f"[WARN] {msg}")
+
+
+class HopStats:
+    """Estadísticas de un salto en una ventana de N sondas"""
+
+    def __init__(self, ttl: int, window: int):
+        self.ttl = ttl
+        self.address: Optional[str] = None
+        self.addresses: Dict[str, int] = {}      # Balanceo de carga: varias IPs por TTL
+        self._results: Deque[Optional[float]] = deque(maxlen=window)  # RTT o None (perdida)
+
+    def record(self, reply: ProbeReply):
+        if reply.status in (REPLY, TTL_EXPIRED) and reply.rtt_ms is not None:
+            self._results.append(reply.rtt_ms)
+            if reply.address:
+                self.addresses[reply.address] = self.addresses.get(reply.address, 0) + 1
+                if self.address is None or self.addresses[reply.address] > self.addresses[self.address]:
+                    self.address = reply.address
+        else:
+            self._results.append(None)
+
+    @property
+    def rtts(self) -> List[float]:
+        return [rtt for rtt in self._results if rtt is not None]
+
+    @property
+    def sent(self) -> int:
+        return len(self._results)
+
+    @property
+    def received(self) -> int:
+        return len(self.rtts)
+
+    @property
+    def loss_pct(self) -> float:
+        return 100.0 * (self.sent - self.received) / self.sent if self.sent else 0.0
+
+    @property
+    def last_ms(self) -> Optional[float]:
+        rtts = self.rtts
+        return rtts[-1] if rtts else None
+
+    @property
+    def avg_ms(self) -> Optional[float]:
+        rtts = self.rtts
+        return sum(rtts) / len(rtts) if rtts else None
+
+    @property
+    def best_ms(self) -> Optional[float]:
+        rtts = self.rtts
+        return min(rtts) if rtts else None
+
+    @property
+    def worst_ms(self) -> Optional[float]:
+        rtts = self.rtts
+        return max(rtts) if rtts else None
+
+    @property
+    def stdev_ms(self) -> Optional[float]:
+        rtts = self.rtts
+        return statistics.pstdev(rtts) if len(rtts) > 1 else None
+
+    @property
+    def jitter_ms(self) -> Optional[float]:
+        """Media de diferencias absolutas entre RTTs consecutivos (Javg de MTR)"""
+        rtts = self.rtts
+        if len(rtts) < 2:
+            return None
+        return sum(abs(b - a) for a, b in zip(rtts, rtts[1:])) / (len(rtts) - 1)
+
+    def to_dict(self) -> Dict:
+        return {
+            'ttl': self.ttl,
+            'address': self.address,
+            'sent': self.sent,
+            'loss_pct': self.loss_pct,
+            'last_ms': self.last_ms,
+            'avg_ms': self.avg_ms,
+            'best_ms': self.best_ms,
+            'worst_ms': self.worst_ms,
+            'stdev_ms': self.stdev_ms,
+            'jitter_ms': self.jitter_ms,
+        }
+
+
+@dataclass
+class HopDegradation:
+    """Salto que introduce latencia o pérdida que persiste hasta el destino"""
+    ttl: int
+    address: Optional[str]
+    added_latency_ms: float     # Latencia que añade este salto (vs. el anterior)
+    added_loss_pct: float       # Pérdida que aparece en este salto y persiste
+    message: str
+
+
+@dataclass
+class PathReport:
+    """Instantánea del análisis de ruta"""
+    target: str
+    timestamp: datetime
+    reached: bool
+    hops: List[Dict]
+    cycles: int
+    # Latencia/pérdida atribuida a cada TTL (persistente hasta el destino)
+    added_latency_ms: Dict[int, float] = field(default_factory=dict)
+    added_loss_pct: Dict[int, float] = field(default_factory=dict)
+
+    def format_table(self) -> str:
+        """Tabla estilo MTR"""
+        lines = [f"Ruta a {self.target} ({self.cycles} ciclos)",
+                 f"{'#':>3}  {'Host':<16} {'Loss%':>6} {'Snt':>4} {'Last':>7} {'Avg':>7} "
+                 f"{'Best':>7} {'Wrst':>7} {'Jttr':>6}"]
+
+        def fmt(value):
+            return f"{value:7.1f}" if value is not None else f"{'-':>7}"
+
+        for hop in self.hops:
+            jitter = f"{hop['jitter_ms']:6.1f}" if hop['jitter_ms'] is not None else f"{'-':>6}"
+            lines.append(
+                f"{hop['ttl']:>3}. {hop['address'] or '???':<16} {hop['loss_pct']:6.1f} {hop['sent']:>4} "
+                f"{fmt(hop['last_ms'])} {fmt(hop['avg_ms'])} {fmt(hop['best_ms'])} {fmt(hop['worst_ms'])} {jitter}"
+            )
+        return "\n".join(lines)
+
+
+class PathAnalyzer:
+    """
+    Analizador de ruta continuo.
+
+    Cada ciclo sondea todos los TTL en paralelo (un ciclo ≈ un timeout en el
+    peor caso, no un timeout por salto).
+    """
+
+    MAX_HOPS = 30
+    PROBE_TIMEOUT_MS = 1000
+    WINDOW = 60                      # Sondas por salto en la ventana
+    CYCLE_INTERVAL = 1.0             # Segundos entre ciclos
+    PARALLEL_WORKERS = 16
+
+    # Atribución de degradación
+    MIN_ADDED_LATENCY_MS = 15.0
+    MIN_ADDED_LOSS_PCT = 5.0
+    # Un salto que responde más lento que el piso posterior en más de esto
+    # limita ICMP: su propia lectura no se usa para atribuir latencia
+    INFLATED_REPLY_SLACK_MS = 5.0
+
+    def __init__(self, target: str, backend: Optional[ProbeBackend] = None,
+                 max_hops: Optional[int] = None, window: Optional[int] = None):
+        self.target = target
+        self.backend = backend or get_default_backend()
+        self.max_hops = max_hops or self.MAX_HOPS
+        self.window = window or self.WINDOW
+
+        self.hops: List[HopStats] = []
+        self.path_length: Optional[int] = None   # TTL en que responde el destino
+        self.cycles = 0
+
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.PARALLEL_WORKERS, thread_name_prefix="mtr")
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._callbacks: List[Callable[[PathReport], None]] = []
+
+    # ------------------------------------------------------------------
+    # Sondeo
+    # ------------------------------------------------------------------
+
+    def _probe(self, ttl: int) -> ProbeReply:
+        return self.backend.probe(self.target, ttl=ttl, timeout_ms=self.PROBE_TIMEOUT_MS)
+
+    def run_cycle(self):
+        """Sondear cada salto una vez"""
+        # Hasta conocer la ruta se sondean todos los TTL; luego solo hasta el destino
+        last_ttl = self.path_length or self.max_hops
+        replies = list(self._executor.map(self._probe, range(1, last_ttl + 1)))
+
+        with self._lock:
+            # El destino es el primer TTL con eco (TTL mayores responden igual)
+            for ttl, reply in enumerate(replies, start=1):
+                if reply.status == REPLY:
+                    if self.path_length is None or ttl < self.path_length:
+                        self.path_length = ttl
+                    break
+
+            length = self.path_length or last_ttl
+            while len(self.hops) < length:
+                self.hops.append(HopStats(len(self.hops) + 1, self.window))
+            del self.hops[length:]
+
+            for hop, reply in zip(self.hops, replies):
+                hop.record(reply)
+            self.cycles += 1
+
+    def run(self, cycles: int = 10, interval: Optional[float] = None) -> PathReport:
+        """Ejecutar N ciclos de forma síncrona y devolver el reporte"""
+        interval = self.CYCLE_INTERVAL if interval is None else interval
+        for index in range(cycles):
+            start = time.monotonic()
+            self.run_cycle()
+            if index < cycles - 1 and interval > 0:
+                time.sleep(max(0.0, interval - (time.monotonic() - start)))
+        return self.get_report()
+
+    def start(self):
+        """Análisis continuo en background"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="PathAnalyzer")
+        self._thread.start()
+        log_info(f"Análisis de ruta iniciado: {self.target}")
+
+    def stop(self):
+        """Detener análisis continuo"""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=self.PROBE_TIMEOUT_MS / 1000 + self.CYCLE_INTERVAL + 1)
+            self._thread = None
+        self._executor.shutdown(wait=False)
+
+    def on_report(self, callback: Callable[[PathReport], None]):
+        """Registrar callback llamado tras cada ciclo"""
+        self._callbacks.append(callback)
+
+    def _loop(self):
+        while self._running:
+            start = time.monotonic()
+            try:
+                self.run_cycle()
+                if self._callbacks:
+                    report = self.get_report()
+                    for callback in self._callbacks:
+                        callback(report)
+            except Exception as e:
+                log_warning(f"Error en ciclo de análisis de ruta: {e}")
+            time.sleep(max(0.0, self.CYCLE_INTERVAL - (time.monotonic() - start)))
+
+    # ------------------------------------------------------------------
+    # Análisis
+    # ------------------------------------------------------------------
+
+    def get_report(self) -> PathReport:
+        """Instantánea actual con atribución de latencia/pérdida por salto"""
+        with self._lock:
+            hops = [hop.to_dict() for hop in self.hops]
+            report = PathReport(
+                target=self.target,
+                timestamp=datetime.now(),
+                reached=self.path_length is not None,
+                hops=hops,
+                cycles=self.cycles
+            )
+
+        report.added_latency_ms = self._persistent_increments(
+            [(h['ttl'], h['avg_ms']) for h in hops], self.INFLATED_REPLY_SLACK_MS)
+        report.added_loss_pct = self._persistent_increments(
+            [(h['ttl'], h['loss_pct'] if h['sent'] else None) for h in hops], self.MIN_ADDED_LOSS_PCT)
+        return report
+
+    @staticmethod
+    def _persistent_increments(values: List[Tuple[int, Optional[float]]],
+                               slack: float = float('inf')) -> Dict[int, float]:
+        """
+        Cuánto añade cada salto de forma persistente hasta el destino.
+
+        El "piso" de un salto es el mínimo de los valores desde él hasta el
+        final: un valor alto aislado (router lento generando ICMP, o que
+        limita respuestas) no sube el piso; un aumento real sí, porque lo
+        arrastran todos los saltos siguientes.
+
+        Un salto cuyo propio valor supera su piso en más de slack no es
+        fiable (responde lento a ICMP): no se le atribuye nada y el aumento
+        recae en el primer salto posterior que sí lo muestra.
+        """
+        floors = []
+        floor: Optional[float] = None
+        for ttl, value in reversed(values):
+            if value is not None:
+                floor = value if floor is None else min(floor, value)
+            floors.append((ttl, value, floor))
+        floors.reverse()
+
+        increments: Dict[int, float] = {}
+        previous = 0.0
+        for ttl, value, floor in floors:
+            if floor is None:
+                continue
+            if value is not None and value - floor > slack:
+                increments[ttl] = 0.0
+                continue
+            increments[ttl] = max(0.0, floor - previous)
+            previous = max(previous, floor)
+        return increments
+
+    def locate_degradation(self, baseline: Optional[PathReport] = None,
+                           report: Optional[PathReport] = None) -> Optional[HopDegradation]:
+        """
+        Localizar el salto que introduce la degradación.
+
+        Args:
+            baseline: Reporte de cuando la ruta estaba sana. Si se da, se
+                compara cada salto contra sí mismo (cancela los saltos que
+                siempre responden lento a ICMP) y se atribuye el aumento; si
+                no, se usa el aporte absoluto de cada salto.
+            report: Reporte a analizar (default: el actual)
+        """
+        report = report or self.get_report()
+        if not report.hops:
+            return None
+
+        if baseline and baseline.hops:
+            base_hops = {h['ttl']: h for h in baseline.hops}
+
+            def diff(hop: Dict, key: str) -> Optional[float]:
+                base = base_hops.get(hop['ttl'])
+                if base is None or hop[key] is None or base[key] is None:
+                    return None
+                return hop[key] - base[key]
+
+            added_latency = self._persistent_increments(
+                [(h['ttl'], diff(h, 'avg_ms')) for h in report.hops], self.INFLATED_REPLY_SLACK_MS)
+            added_loss = self._persistent_increments(
+                [(h['ttl'], diff(h, 'loss_pct')) for h in report.hops], self.MIN_ADDED_LOSS_PCT)
+        else:
+            added_latency = report.added_latency_ms
+            added_loss = report.added_loss_pct
+
+        ttl = None
+        if added_latency:
+            candidate = max(added_latency, key=added_latency.get)
+            if added_latency[candidate] >= self.MIN_ADDED_LATENCY_MS:
+                ttl = candidate
+        if ttl is None and added_loss:
+            candidate = max(added_loss, key=added_loss.get)
+            if added_loss[candidate] >= self.MIN_ADDED_LOSS_PCT:
+                ttl = candidate
+        if ttl is None:
+            return None
+
+        hop = report.hops[ttl - 1]
+        latency = added_latency.get(ttl, 0.0)
+        loss = added_loss.get(ttl, 0.0)
+
+        segment = "red local" if ttl == 1 else ("destino" if report.reached and ttl == len(report.hops) else "ruta")
+        parts = []
+        if latency >= self.MIN_ADDED_LATENCY_MS:
+            parts.append(f"+{latency:.0f}ms")
+        if loss >= self.MIN_ADDED_LOSS_PCT:
+            parts.append(f"+{loss:.0f}% pérdida")
+
+        return HopDegradation(
+            ttl=ttl,
+            address=hop['address'],
+            added_latency_ms=latency,
+            added_loss_pct=loss,
+            message=f"Salto {ttl} ({hop['address'] or '???'}, {segment}) añade {' y '.join(parts)}"
+        )
+
+
+if __name__ == "__main__":
+    # Demo con ruta simulada: el salto 4 (ISP) se congestiona a mitad de prueba
+    from .probe_backends import SimulatedHop, SimulatedPathBackend
+
+    path = [
+        SimulatedHop("192.168.1.1", latency_ms=0.5, jitter_ms=0.2),
+        SimulatedHop("10.20.0.1", latency_ms=3, jitter_ms=0.5),
+        SimulatedHop("100.64.1.1", latency_ms=2, jitter_ms=0.5, reply_delay_ms=40, reply_loss=0.3),
+        SimulatedHop("189.203.1.1", latency_ms=4, jitter_ms=1),
+        SimulatedHop("1.1.1.1", latency_ms=2, jitter_ms=0.5),
+    ]
+    analyzer = PathAnalyzer("1.1.1.1", backend=SimulatedPathBackend(path, seed=1), window=20)
+
+    healthy = analyzer.run(cycles=20, interval=0)
+    print(healthy.format_table())
+    print(f"Degradación (sana): {analyzer.locate_degradation()}")
+
+    path[3].latency_ms = 30
+    path[3].loss = 0.1
+    degraded = analyzer.run(cycles=20, interval=0)
+    print()
+    print(degraded.format_table())
+    print(analyzer.locate_degradation(baseline=healthy).message)
+    analyzer.stop()
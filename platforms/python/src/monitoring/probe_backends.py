@@ -0,0 +1,344 @@
+"""
+NetBoozt - Backends de Sondas ICMP
+Sondas con TTL limitado (análisis de ruta) y con bit DF (descubrimiento de MTU).
+
+Backends:
+- IcmpApiProbeBackend: Windows, IcmpSendEcho de iphlpapi.dll vía ctypes.
+  No requiere administrador y devuelve el RTT real también para
+  "TTL expirado", igual que WinMTR.
+- PingProbeBackend: comando ping del sistema (otras plataformas o si
+  falla la API). Si el ping no informa tiempo se usa el tiempo de pared.
+- SimulatedPathBackend: ruta simulada (latencia, jitter, pérdida, MTU por
+  salto) para pruebas y para reproducir escenarios sin red.
+
+By LOUST (www.loust.pro)
+"""
+
+import random
+import re
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+try:
+    from ..utils.logger import log_warning
+except ImportError:
+    def log_warning(msg): print(f"[WARN] {msg}")
+
+
+# Estados de respuesta
+REPLY = "reply"                # Eco del destino
+TTL_EXPIRED = "ttl_expired"    # Un salto intermedio descartó el paquete (TTL=0)
+TOO_BIG = "too_big"            # Fragmentación necesaria con DF activo
+UNREACHABLE = "unreachable"    # Destino/red inalcanzable
+TIMEOUT = "timeout"            # Sin respuesta
+
+
+@dataclass
+class ProbeReply:
+    """Resultado de una sonda"""
+    status: str
+    address: Optional[str] = None   # Quién respondió
+    rtt_ms: Optional[float] = None
+    mtu: Optional[int] = None       # MTU del siguiente salto (TOO_BIG, si se informa)
+
+    @property
+    def responded(self) -> bool:
+        return self.status not in (TIMEOUT,)
+
+
+class ProbeBackend:
+    """Interfaz de sondas: probe() debe ser thread-safe"""
+
+    # Cabeceras IPv4 (20) + ICMP (8): tamaño de paquete = payload + 28
+    IP_ICMP_OVERHEAD = 28
+
+    def probe(self, target: str, ttl: int = 64, timeout_ms: int = 1000,
+              payload_size: int = 32, dont_fragment: bool = False) -> ProbeReply:
+        raise NotImplementedError
+
+
+# ============================================================================
+# Windows: IcmpSendEcho
+# ============================================================================
+
+class IcmpApiProbeBackend(ProbeBackend):
+    """Sondas con IcmpSendEcho (Windows, sin privilegios de administrador)"""
+
+    IP_SUCCESS = 0
+    IP_DEST_NET_UNREACHABLE = 11002
+    IP_DEST_HOST_UNREACHABLE = 11003
+    IP_PACKET_TOO_BIG = 11009
+    IP_REQ_TIMED_OUT = 11010
+    IP_TTL_EXPIRED_TRANSIT = 11013
+    IP_FLAG_DF = 0x02
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        self._ctypes = ctypes
+
+        class IP_OPTION_INFORMATION(ctypes.Structure):
+            _fields_ = [
+                ("Ttl", ctypes.c_ubyte),
+                ("Tos", ctypes.c_ubyte),
+                ("Flags", ctypes.c_ubyte),
+                ("OptionsSize", ctypes.c_ubyte),
+                ("OptionsData", ctypes.c_void_p),
+            ]
+
+        class ICMP_ECHO_REPLY(ctypes.Structure):
+            _fields_ = [
+                ("Address", wintypes.ULONG),
+                ("Status", wintypes.ULONG),
+                ("RoundTripTime", wintypes.ULONG),
+                ("DataSize", wintypes.USHORT),
+                ("Reserved", wintypes.USHORT),
+                ("Data", ctypes.c_void_p),
+                ("Options", IP_OPTION_INFORMATION),
+            ]
+
+        self._option_type = IP_OPTION_INFORMATION
+        self._reply_type = ICMP_ECHO_REPLY
+
+        iphlpapi = ctypes.windll.iphlpapi
+        self._create = iphlpapi.IcmpCreateFile
+        self._create.restype = wintypes.HANDLE
+        self._close = iphlpapi.IcmpCloseHandle
+        self._close.argtypes = [wintypes.HANDLE]
+        self._send = iphlpapi.IcmpSendEcho
+        self._send.argtypes = [
+            wintypes.HANDLE, wintypes.ULONG, ctypes.c_void_p, wintypes.WORD,
+            ctypes.POINTER(IP_OPTION_INFORMATION), ctypes.c_void_p, wintypes.DWORD, wintypes.DWORD
+        ]
+        self._send.restype = wintypes.DWORD
+
+    def probe(self, target: str, ttl: int = 64, timeout_ms: int = 1000,
+              payload_size: int = 32, dont_fragment: bool = False) -> ProbeReply:
+        ctypes = self._ctypes
+
+        try:
+            address = socket.gethostbyname(target)
+        except OSError:
+            return ProbeReply(UNREACHABLE)
+        dest = struct.unpack('<L', socket.inet_aton(address))[0]
+
+        payload = ctypes.create_string_buffer(b'N' * payload_size, payload_size)
+        options = self._option_type(Ttl=ttl, Flags=self.IP_FLAG_DF if dont_fragment else 0)
+        reply_size = ctypes.sizeof(self._reply_type) + payload_size + 8
+        reply_buffer = ctypes.create_string_buffer(reply_size)
+
+        # Un handle por sonda: IcmpSendEcho es bloqueante y las sondas van en paralelo
+        handle = self._create()
+        try:
+            start = time.perf_counter()
+            count = self._send(handle, dest, payload, payload_size, ctypes.byref(options),
+                               reply_buffer, reply_size, timeout_ms)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        finally:
+            self._close(handle)
+
+        reply = self._reply_type.from_buffer_copy(reply_buffer)
+        if count == 0 and reply.Status in (0, self.IP_REQ_TIMED_OUT):
+            return ProbeReply(TIMEOUT)
+
+        responder = socket.inet_ntoa(struct.pack('<L', reply.Address)) if reply.Address else None
+        # RoundTripTime tiene resolución de 1ms: usar el tiempo de pared si es 0
+        rtt = float(reply.RoundTripTime) if reply.RoundTripTime else round(elapsed_ms, 2)
+
+        if reply.Status == self.IP_SUCCESS:
+            return ProbeReply(REPLY, responder, rtt)
+        if reply.Status == self.IP_TTL_EXPIRED_TRANSIT:
+            return ProbeReply(TTL_EXPIRED, responder, rtt)
+        if reply.Status == self.IP_PACKET_TOO_BIG:
+            return ProbeReply(TOO_BIG, responder, rtt)
+        if reply.Status in (self.IP_DEST_NET_UNREACHABLE, self.IP_DEST_HOST_UNREACHABLE):
+            return ProbeReply(UNREACHABLE, responder, rtt)
+        return ProbeReply(TIMEOUT)
+
+
+# ============================================================================
+# Comando ping (multiplataforma)
+# ============================================================================
+
+class PingProbeBackend(ProbeBackend):
+    """Sondas con el comando ping del sistema"""
+
+    WINDOWS = sys.platform == 'win32'
+
+    _ADDRESS = r'(\d{1,3}(?:\.\d{1,3}){3})'
+    _TTL_EXPIRED = re.compile(
+        r'(?:Reply from|Respuesta desde|From)\s+' + _ADDRESS + r'.*?(?:TTL expired|TTL caduc|Time to live exceeded)',
+        re.IGNORECASE)
+    _REPLY = re.compile(
+        r'(?:Reply from|Respuesta desde|bytes from)\s+' + _ADDRESS + r'.*?(?:time|tiempo)[=<]\s*([\d.]+)\s*ms',
+        re.IGNORECASE)
+    _TOO_BIG = re.compile(
+        r'(?:needs to be fragmented|necesario fragmentar|Frag needed|message too long)', re.IGNORECASE)
+    _MTU = re.compile(r'mtu\s*=\s*(\d+)', re.IGNORECASE)
+    _FROM = re.compile(r'From\s+' + _ADDRESS, re.IGNORECASE)
+    _UNREACHABLE = re.compile(r'(?:unreachable|inaccesible)', re.IGNORECASE)
+
+    def __init__(self, source_address: Optional[str] = None):
+        """
+        Args:
+            source_address: IP local de salida (sondas por adaptador)
+        """
+        self.source_address = source_address
+
+    def build_command(self, target: str, ttl: int, timeout_ms: int,
+                      payload_size: int, dont_fragment: bool) -> List[str]:
+        if self.WINDOWS:
+            cmd = ["ping", "-n", "1", "-i", str(ttl), "-w", str(timeout_ms), "-l", str(payload_size)]
+            if dont_fragment:
+                cmd.append("-f")
+            if self.source_address:
+                cmd += ["-S", self.source_address]
+        else:
+            cmd = ["ping", "-n", "-c", "1", "-t", str(ttl),
+                   "-W", str(max(1, round(timeout_ms / 1000))), "-s", str(payload_size)]
+            if dont_fragment:
+                cmd += ["-M", "do"]
+            if self.source_address:
+                cmd += ["-I", self.source_address]
+        cmd.append(target)
+        return cmd
+
+    def probe(self, target: str, ttl: int = 64, timeout_ms: int = 1000,
+              payload_size: int = 32, dont_fragment: bool = False) -> ProbeReply:
+        cmd = self.build_command(target, ttl, timeout_ms, payload_size, dont_fragment)
+        try:
+            start = time.perf_counter()
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=timeout_ms / 1000 + 2,
+                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+            )
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        except (subprocess.TimeoutExpired, OSError):
+            return ProbeReply(TIMEOUT)
+
+        return self.parse_output(result.stdout + result.stderr, elapsed_ms)
+
+    def parse_output(self, output: str, elapsed_ms: float) -> ProbeReply:
+        """Interpretar salida de ping (español/inglés, Windows/Linux)"""
+        match = self._REPLY.search(output)
+        if match:
+            return ProbeReply(REPLY, match.group(1), float(match.group(2)))
+
+        match = self._TTL_EXPIRED.search(output)
+        if match:
+            return ProbeReply(TTL_EXPIRED, match.group(1), round(elapsed_ms, 2))
+
+        if self._TOO_BIG.search(output):
+            mtu = self._MTU.search(output)
+            responder = self._FROM.search(output)
+            return ProbeReply(TOO_BIG, responder.group(1) if responder else None,
+                              round(elapsed_ms, 2), int(mtu.group(1)) if mtu else None)
+
+        if self._UNREACHABLE.search(output):
+            responder = self._FROM.search(output)
+            return ProbeReply(UNREACHABLE, responder.group(1) if responder else None, round(elapsed_ms, 2))
+
+        return ProbeReply(TIMEOUT)
+
+
+# ============================================================================
+# Ruta simulada
+# ============================================================================
+
+@dataclass
+class SimulatedHop:
+    """
+    Salto de una ruta simulada.
+
+    latency_ms (un sentido; cuenta doble en el RTT), jitter_ms y loss se
+    aplican a todo lo que atraviesa el salto;
+    reply_delay_ms/reply_loss afectan solo a las respuestas que genera el
+    propio router (limitación de ICMP: no indican un problema real).
+    """
+    address: str
+    latency_ms: float = 1.0
+    jitter_ms: float = 0.0
+    loss: float = 0.0
+    reply_delay_ms: float = 0.0
+    reply_loss: float = 0.0
+    responds: bool = True            # False: no responde a TTL expirado ("* * *")
+    mtu: int = 1500                  # MTU del enlace de salida del salto
+    sends_too_big: bool = True       # False: agujero negro de PMTU
+
+
+class SimulatedPathBackend(ProbeBackend):
+    """Ruta simulada determinista (semilla) para pruebas del analizador"""
+
+    def __init__(self, hops: List[SimulatedHop], seed: int = 0, source_mtu: int = 1500):
+        """
+        Args:
+            hops: Saltos hasta el destino (el último es el destino)
+            seed: Semilla del generador aleatorio
+            source_mtu: MTU del adaptador local
+        """
+        self.hops = hops
+        self.source_mtu = source_mtu
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.sent = 0
+
+    def probe(self, target: str, ttl: int = 64, timeout_ms: int = 1000,
+              payload_size: int = 32, dont_fragment: bool = False) -> ProbeReply:
+        with self._lock:
+            self.sent += 1
+            return self._probe(ttl, timeout_ms, payload_size, dont_fragment)
+
+    def _probe(self, ttl: int, timeout_ms: int, payload_size: int, dont_fragment: bool) -> ProbeReply:
+        packet_size = payload_size + self.IP_ICMP_OVERHEAD
+        if dont_fragment and packet_size > self.source_mtu:
+            # Rechazo local (como "message too long" de ping)
+            return ProbeReply(TOO_BIG, None, 0.0, self.source_mtu)
+
+        rng = self._random
+        rtt = 0.0
+        last = min(ttl, len(self.hops))
+
+        for index in range(last):
+            hop = self.hops[index]
+            rtt += 2 * hop.latency_ms + (rng.uniform(-hop.jitter_ms, hop.jitter_ms) if hop.jitter_ms else 0.0)
+            if hop.loss and rng.random() < hop.loss:
+                return ProbeReply(TIMEOUT)
+
+            is_destination = index == len(self.hops) - 1
+            reached_ttl = index == ttl - 1
+
+            # El enlace de salida hacia el siguiente salto no admite el paquete
+            if not is_destination and dont_fragment and packet_size > hop.mtu:
+                if not hop.sends_too_big:
+                    return ProbeReply(TIMEOUT)
+                return ProbeReply(TOO_BIG, hop.address, round(max(rtt, 0.1), 2), hop.mtu)
+
+            if is_destination or reached_ttl:
+                if not hop.responds or (hop.reply_loss and rng.random() < hop.reply_loss):
+                    return ProbeReply(TIMEOUT)
+                rtt = max(rtt + hop.reply_delay_ms, 0.1)
+                if rtt > timeout_ms:
+                    return ProbeReply(TIMEOUT)
+                return ProbeReply(REPLY if is_destination else TTL_EXPIRED, hop.address, round(rtt, 2))
+
+        return ProbeReply(TIMEOUT)
+
+
+def get_default_backend() -> ProbeBackend:
+    """IcmpSendEcho en Windows, comando ping en el resto (o si ctypes falla)"""
+    if sys.platform == 'win32':
+        try:
+            return IcmpApiProbeBackend()
+        except (OSError, AttributeError) as e:
+            log_warning(f"IcmpSendEcho no disponible, usando ping: {e}")
+    return PingProbeBackend()
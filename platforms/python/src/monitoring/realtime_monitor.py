@@ -17,7 +17,9 @@ from collections import deque
 
 
 class LatencyMonitor:
-    """Monitor de latencia usando ping"""
+    """Monitor de latencia usando ping (con jitter y pérdida de paquetes)"""
+    
+    LOSS_WINDOW = 30  # Pings recientes para calcular la pérdida
     
     def __init__(self, target: str = "8.8.8.8"):
         """
@@ -26,6 +28,9 @@ class LatencyMonitor:
         """
         self.target = target
         self._last_latency_ms = 0.0
+        self._jitter_ms = 0.0
+        self._previous_ok: Optional[float] = None
+        self._results: deque = deque(maxlen=self.LOSS_WINDOW)
         self._lock = threading.Lock()
     
     def measure_latency(self) -> float:
@@ -58,8 +63,7 @@ class LatencyMonitor:
                     match = re.search(r'tiempo[=<](\d+)ms|time[=<](\d+)ms', output, re.IGNORECASE)
                     if match:
                         latency = float(match.group(1) or match.group(2))
-                        with self._lock:
-                            self._last_latency_ms = latency
+                        self._record(latency)
                         return latency
                 else:
                     # Linux/Mac: buscar "time=XX.X ms"
@@ -67,22 +71,46 @@ class LatencyMonitor:
                     match = re.search(r'time=(\d+\.?\d*)\s*ms', output)
                     if match:
                         latency = float(match.group(1))
-                        with self._lock:
-                            self._last_latency_ms = latency
+                        self._record(latency)
                         return latency
         
         except Exception as e:
             # Silenciar errores de ping (red caída, timeout, etc.)
             pass
         
-        # Retornar último valor conocido si falla
+        # Ping perdido: retornar último valor conocido
+        self._record(None)
         with self._lock:
             return self._last_latency_ms
     
+    def _record(self, latency: Optional[float]):
+        """Registrar resultado de un ping (None = perdido)"""
+        with self._lock:
+            self._results.append(latency is not None)
+            if latency is None:
+                return
+            # Jitter RFC 3550: media móvil de |ΔRTT| con ganancia 1/16
+            if self._previous_ok is not None:
+                self._jitter_ms += (abs(latency - self._previous_ok) - self._jitter_ms) / 16
+            self._previous_ok = latency
+            self._last_latency_ms = latency
+    
     def get_last_latency(self) -> float:
         """Obtener última latencia medida"""
         with self._lock:
             return self._last_latency_ms
+    
+    def get_jitter(self) -> float:
+        """Jitter suavizado en ms"""
+        with self._lock:
+            return self._jitter_ms
+    
+    def get_packet_loss(self) -> float:
+        """Porcentaje de pings perdidos en los últimos LOSS_WINDOW"""
+        with self._lock:
+            if not self._results:
+                return 0.0
+            return 100.0 * self._results.count(False) / len(self._results)
 
 
 @dataclass
@@ -107,6 +135,11 @@ class NetworkSnapshot:
     packets_recv_per_sec: float = 0.0
     errors_per_sec: float = 0.0
     drops_per_sec: float = 0.0
+    
+    # Última latencia medida por el thread de ping
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    packet_loss: float = 0.0  # % de pings recientes perdidos
 
 
 class NetworkMonitor:
@@ -276,6 +309,10 @@ class NetworkMonitor:
                 snapshot.errors_per_sec = errors_delta / time_delta
                 snapshot.drops_per_sec = drops_delta / time_delta
         
+        snapshot.latency_ms = self._current_latency_ms
+        snapshot.jitter_ms = self.latency_monitor.get_jitter()
+        snapshot.packet_loss = self.latency_monitor.get_packet_loss()
+        
         self._last_snapshot = snapshot
         return snapshot
     
@@ -389,6 +426,14 @@ class NetworkMonitor:
         with self._lock:
             return self._current_latency_ms
     
+    def get_current_jitter(self) -> float:
+        """Obtener jitter actual en ms"""
+        return self.latency_monitor.get_jitter()
+    
+    def get_packet_loss(self) -> float:
+        """Obtener pérdida de paquetes reciente en %"""
+        return self.latency_monitor.get_packet_loss()
+    
     def get_average_latency(self, seconds: int = 10) -> float:
         """
         Calcular latencia promedio (aproximada basada en lecturas actuales)
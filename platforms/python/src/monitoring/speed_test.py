@@ -0,0 +1,378 @@
+"""
+NetBoozt - Motor de Pruebas de Throughput
+Descarga y subida con N streams TCP paralelos, exclusión del arranque
+(slow start) y muestras por intervalo. Reporta descarga, subida, latencia
+y jitter, y guarda el resultado con SpeedTestStorage.save_test para
+comparar antes/después de cada perfil de optimización.
+
+Los destinos son URLs HTTP configurables (por defecto speed.cloudflare.com);
+LocalSpeedTestServer ofrece los mismos endpoints para pruebas offline y CI.
+
+By LOUST (www.loust.pro)
+"""
+
+import http.client
+import socket
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+try:
+    from ..storage.speed_test_storage import SpeedTestResult, SpeedTestStorage
+except ImportError:
+    # Fallback con src/ en sys.path (ejecución directa)
+    from storage.speed_test_storage import SpeedTestResult, SpeedTestStorage
+
+try:
+    from ..utils.logger import log_info, log_warning
+except ImportError:
+    def log_info(msg): print(f"[INFO] {msg}")
+    def log_warning(msg): print(f"[WARN] {msg}")
+
+
+DEFAULT_DOWNLOAD_URL = "https://speed.cloudflare.com/__down?bytes=100000000"
+DEFAULT_UPLOAD_URL = "https://speed.cloudflare.com/__up"
+
+
+def open_connection(url: str, timeout: float) -> Tuple[http.client.HTTPConnection, str]:
+    """Conexión HTTP(S) y path para una URL"""
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    if parts.scheme == "https":
+        conn = http.client.HTTPSConnection(parts.hostname, parts.port, timeout=timeout)
+    else:
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+    return conn, path
+
+
+def tcp_connect_rtt(host: str, port: int, timeout: float = 2.0) -> Optional[float]:
+    """RTT aproximado: tiempo del handshake TCP (sin ICMP ni privilegios)"""
+    start = time.perf_counter()
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return (time.perf_counter() - start) * 1000
+    except OSError:
+        return None
+
+
+class StreamLoad:
+    """
+    N streams HTTP en paralelo en una dirección ("download" o "upload").
+
+    bytes_transferred crece mientras corre; stop() cierra los sockets para
+    desbloquear lecturas/escrituras pendientes.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    UPLOAD_REQUEST_BYTES = 25_000_000
+
+    def __init__(self, direction: str, url: str, streams: int = 4,
+                 upload_request_bytes: Optional[int] = None):
+        if direction not in ("download", "upload"):
+            raise ValueError(f"Dirección no soportada: {direction}")
+        self.direction = direction
+        self.url = url
+        self.streams = streams
+        self.upload_request_bytes = upload_request_bytes or self.UPLOAD_REQUEST_BYTES
+
+        self._stop = threading.Event()
+        self._bytes = 0
+        self._bytes_lock = threading.Lock()
+        self._connections: List[http.client.HTTPConnection] = []
+        self._threads: List[threading.Thread] = []
+        self.errors = 0
+
+    @property
+    def bytes_transferred(self) -> int:
+        with self._bytes_lock:
+            return self._bytes
+
+    def start(self) -> 'StreamLoad':
+        worker = self._download_worker if self.direction == "download" else self._upload_worker
+        self._threads = [
+            threading.Thread(target=worker, daemon=True, name=f"load-{self.direction}-{i}")
+            for i in range(self.streams)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._bytes_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                if conn.sock:
+                    conn.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+        for thread in self._threads:
+            thread.join(timeout=2)
+
+    def _connect(self):
+        conn, path = open_connection(self.url, timeout=10)
+        with self._bytes_lock:
+            self._connections.append(conn)
+        return conn, path
+
+    def _release(self, conn):
+        conn.close()
+        with self._bytes_lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+
+    def _count(self, amount: int):
+        with self._bytes_lock:
+            self._bytes += amount
+
+    def _download_worker(self):
+        while not self._stop.is_set():
+            try:
+                conn, path = self._connect()
+                conn.request("GET", path)
+                response = conn.getresponse()
+                while not self._stop.is_set():
+                    chunk = response.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    self._count(len(chunk))
+                self._release(conn)
+            except (OSError, http.client.HTTPException, AttributeError):
+                # AttributeError: http.client tras cerrar el socket desde stop()
+                if not self._stop.is_set():
+                    self.errors += 1
+                    time.sleep(0.2)
+
+    def _upload_worker(self):
+        payload = bytes(self.CHUNK_SIZE)
+        total = self.upload_request_bytes
+        while not self._stop.is_set():
+            try:
+                conn, path = self._connect()
+                conn.putrequest("POST", path)
+                conn.putheader("Content-Type", "application/octet-stream")
+                conn.putheader("Content-Length", str(total))
+                conn.endheaders()
+
+                sent = 0
+                while sent < total and not self._stop.is_set():
+                    size = min(self.CHUNK_SIZE, total - sent)
+                    conn.send(payload if size == self.CHUNK_SIZE else payload[:size])
+                    sent += size
+                    self._count(size)
+
+                if sent >= total:
+                    conn.getresponse().read()
+                self._release(conn)
+            except (OSError, http.client.HTTPException, AttributeError):
+                if not self._stop.is_set():
+                    self.errors += 1
+                    time.sleep(0.2)
+
+
+@dataclass
+class ThroughputConfig:
+    """Configuración del motor de throughput"""
+    download_url: str = DEFAULT_DOWNLOAD_URL
+    upload_url: str = DEFAULT_UPLOAD_URL
+    latency_host: Optional[str] = None    # Default: host de download_url
+    latency_port: Optional[int] = None
+    streams: int = 4
+    duration_seconds: float = 10.0        # Por dirección, sin contar el arranque
+    warmup_seconds: float = 2.0           # Excluido de la medición (slow start)
+    interval_seconds: float = 0.5         # Granularidad de las muestras
+    latency_samples: int = 10
+    server_name: Optional[str] = None     # Etiqueta guardada (default: host)
+
+
+@dataclass
+class ThroughputSample:
+    """Muestra de un intervalo"""
+    elapsed_s: float        # Desde el inicio de la fase (incluye arranque)
+    mbps: float
+    warmup: bool
+
+
+@dataclass
+class ThroughputReport:
+    """Detalle de una prueba (el resumen es SpeedTestResult)"""
+    result: SpeedTestResult
+    download_samples: List[ThroughputSample] = field(default_factory=list)
+    upload_samples: List[ThroughputSample] = field(default_factory=list)
+    latency_samples: List[float] = field(default_factory=list)
+    profile: Optional[str] = None
+    test_id: Optional[int] = None
+
+
+class SpeedTestEngine:
+    """
+    Motor de throughput.
+
+    Ejemplo (offline):
+        with LocalSpeedTestServer() as server:
+            config = ThroughputConfig(download_url=server.download_url,
+                                      upload_url=server.upload_url)
+            report = SpeedTestEngine(config).run(adapter="Ethernet")
+    """
+
+    def __init__(self, config: Optional[ThroughputConfig] = None,
+                 storage: Optional[SpeedTestStorage] = None,
+                 rtt_probe: Optional[Callable[[], Optional[float]]] = None):
+        """
+        Args:
+            config: URLs, streams y duraciones
+            storage: Donde guardar los resultados (None = no guardar)
+            rtt_probe: Sonda de latencia (default: handshake TCP al servidor)
+        """
+        self.config = config or ThroughputConfig()
+        self.storage = storage
+
+        parts = urlsplit(self.config.download_url)
+        self._host = parts.hostname
+        port = self.config.latency_port or parts.port or (443 if parts.scheme == "https" else 80)
+        latency_host = self.config.latency_host or parts.hostname
+        self.rtt_probe = rtt_probe or (lambda: tcp_connect_rtt(latency_host, port))
+
+    def measure_latency(self) -> Tuple[List[float], int]:
+        """Muestras de RTT en reposo y cantidad de sondas perdidas"""
+        samples, lost = [], 0
+        for _ in range(self.config.latency_samples):
+            rtt = self.rtt_probe()
+            if rtt is None:
+                lost += 1
+            else:
+                samples.append(rtt)
+            time.sleep(0.05)
+        return samples, lost
+
+    def measure_direction(self, direction: str,
+                          progress: Optional[Callable[[str, float], None]] = None) -> Tuple[float, List[ThroughputSample]]:
+        """
+        Throughput de una dirección.
+
+        Returns:
+            (Mbps medidos tras el arranque, muestras por intervalo)
+        """
+        config = self.config
+        url = config.download_url if direction == "download" else config.upload_url
+        load = StreamLoad(direction, url, config.streams).start()
+
+        samples: List[ThroughputSample] = []
+        start = time.monotonic()
+        last_time, last_bytes = start, 0
+        measure_start_bytes: Optional[int] = None
+        measure_start_time = start
+        end = start + config.warmup_seconds + config.duration_seconds
+
+        try:
+            next_tick = start
+            while True:
+                next_tick += config.interval_seconds
+                time.sleep(max(0.0, next_tick - time.monotonic()))
+
+                now = time.monotonic()
+                transferred = load.bytes_transferred
+                elapsed = now - start
+                warmup = elapsed <= config.warmup_seconds + 1e-6
+
+                if now > last_time:
+                    mbps = (transferred - last_bytes) * 8 / (now - last_time) / 1_000_000
+                    samples.append(ThroughputSample(round(elapsed, 3), mbps, warmup))
+                    if progress:
+                        progress(direction, mbps)
+                last_time, last_bytes = now, transferred
+
+                # Inicio de la ventana de medición: primer tick tras el arranque
+                if warmup or measure_start_bytes is None:
+                    measure_start_bytes, measure_start_time = transferred, now
+                if now >= end:
+                    break
+        finally:
+            load.stop()
+
+        measured = last_bytes - (measure_start_bytes or 0)
+        duration = last_time - measure_start_time
+        mbps = measured * 8 / duration / 1_000_000 if duration > 0 else 0.0
+        if load.errors and not mbps:
+            log_warning(f"Prueba de {direction} sin datos ({load.errors} errores de conexión)")
+        return mbps, samples
+
+    def run(self, adapter: str = "", profile: Optional[str] = None, save: bool = True,
+            progress: Optional[Callable[[str, float], None]] = None) -> ThroughputReport:
+        """
+        Ejecutar latencia → descarga → subida.
+
+        Args:
+            adapter: Adaptador usado (se guarda con el resultado)
+            profile: Perfil de optimización activo (para comparar antes/después)
+            save: Guardar con SpeedTestStorage si hay storage
+            progress: Callback (fase, Mbps del último intervalo)
+        """
+        started = time.monotonic()
+        log_info(f"Speed test iniciado ({self.config.streams} streams)")
+
+        latency_samples, lost = self.measure_latency()
+        download_mbps, download_samples = self.measure_direction("download", progress)
+        upload_mbps, upload_samples = self.measure_direction("upload", progress)
+
+        latency = statistics.median(latency_samples) if latency_samples else 0.0
+        jitter = (
+            statistics.fmean(abs(b - a) for a, b in zip(latency_samples, latency_samples[1:]))
+            if len(latency_samples) > 1 else 0.0
+        )
+        probes = len(latency_samples) + lost
+
+        server = self.config.server_name or self._host or ""
+
+        result = SpeedTestResult(
+            timestamp=datetime.now(),
+            download_mbps=round(download_mbps, 2),
+            upload_mbps=round(upload_mbps, 2),
+            latency_ms=round(latency, 2),
+            jitter_ms=round(jitter, 2),
+            packet_loss=round(100.0 * lost / probes, 1) if probes else 0.0,
+            adapter=adapter,
+            server=server,
+            test_duration_s=round(time.monotonic() - started, 2),
+            profile=profile or ""
+        )
+
+        report = ThroughputReport(
+            result=result,
+            download_samples=download_samples,
+            upload_samples=upload_samples,
+            latency_samples=latency_samples,
+            profile=profile
+        )
+
+        if save and self.storage:
+            report.test_id = self.storage.save_test(result)
+
+        return report
+
+
+if __name__ == "__main__":
+    # Prueba offline contra el servidor local
+    from .speed_test_server import LocalSpeedTestServer
+
+    with LocalSpeedTestServer() as server:
+        config = ThroughputConfig(
+            download_url=server.download_url,
+            upload_url=server.upload_url,
+            duration_seconds=3,
+            warmup_seconds=1
+        )
+        report = SpeedTestEngine(config).run(adapter="loopback", profile="demo", save=False)
+
+    r = report.result
+    print(f"↓ {r.download_mbps:.0f} Mbps  ↑ {r.upload_mbps:.0f} Mbps  "
+          f"latencia {r.latency_ms:.2f}ms  jitter {r.jitter_ms:.2f}ms")
+    print(f"Muestras descarga: {[round(s.mbps) for s in report.download_samples]}")
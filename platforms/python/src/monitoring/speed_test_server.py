@@ -0,0 +1,161 @@
+"""
+NetBoozt - Servidor Local de Pruebas de Velocidad
+Servidor HTTP mínimo compatible con los endpoints de speed.cloudflare.com:
+
+    GET  /__down?bytes=N   → N bytes de payload
+    POST /__up             → descarta el cuerpo y responde 200
+
+Permite ejecutar el motor de throughput y la prueba de bufferbloat sin
+Internet (CI, pruebas offline, o contra otra máquina de la LAN para medir
+solo el WiFi/Ethernet).
+
+Uso:
+    python -m src.monitoring.speed_test_server --host 0.0.0.0 --port 8080
+
+By LOUST (www.loust.pro)
+"""
+
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    from ..utils.logger import log_info
+except ImportError:
+    def log_info(msg): print(f"[INFO] {msg}")
+
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_DOWNLOAD_BYTES = 100_000_000
+MAX_DOWNLOAD_BYTES = 10_000_000_000
+_PAYLOAD = bytes(CHUNK_SIZE)
+
+
+class _SpeedTestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "NetBooztSpeedTest/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path not in ("/__down", "/down"):
+            self.send_error(404)
+            return
+
+        try:
+            size = int(parse_qs(parts.query).get('bytes', [DEFAULT_DOWNLOAD_BYTES])[0])
+        except ValueError:
+            self.send_error(400)
+            return
+        size = max(0, min(size, MAX_DOWNLOAD_BYTES))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(size))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+
+        remaining = size
+        try:
+            while remaining > 0:
+                count = min(remaining, CHUNK_SIZE)
+                self.wfile.write(_PAYLOAD[:count] if count < CHUNK_SIZE else _PAYLOAD)
+                remaining -= count
+        except OSError:
+            # El cliente cierra al terminar su ventana de medición
+            self.close_connection = True
+
+    def do_POST(self):
+        if urlsplit(self.path).path not in ("/__up", "/up"):
+            self.send_error(404)
+            return
+
+        remaining = int(self.headers.get("Content-Length", 0))
+        try:
+            while remaining > 0:
+                chunk = self.rfile.read(min(remaining, CHUNK_SIZE))
+                if not chunk:
+                    self.close_connection = True
+                    return
+                remaining -= len(chunk)
+        except OSError:
+            self.close_connection = True
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class LocalSpeedTestServer:
+    """Servidor de pruebas en un hilo de background"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            host: Interfaz de escucha (0.0.0.0 para la LAN)
+            port: Puerto (0 = uno libre asignado por el sistema)
+        """
+        self._server = ThreadingHTTPServer((host, port), _SpeedTestHandler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    @property
+    def download_url(self) -> str:
+        host, port = self.address
+        return f"http://{host}:{port}/__down?bytes={DEFAULT_DOWNLOAD_BYTES}"
+
+    @property
+    def upload_url(self) -> str:
+        host, port = self.address
+        return f"http://{host}:{port}/__up"
+
+    def start(self) -> 'LocalSpeedTestServer':
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, daemon=True,
+                                            name="SpeedTestServer")
+            self._thread.start()
+            log_info(f"Servidor de pruebas en {self.address[0]}:{self.address[1]}")
+        return self
+
+    def serve_forever(self):
+        """Servir en el hilo actual (bloqueante, para uso como script)"""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        if self._thread:
+            self._server.shutdown()
+            self._thread.join(timeout=2)
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> 'LocalSpeedTestServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local de pruebas de velocidad NetBoozt")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    server = LocalSpeedTestServer(args.host, args.port)
+    print(f"Sirviendo en http://{args.host}:{args.port} (/__down?bytes=N, /__up) - Ctrl+C para salir")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -5,15 +5,15 @@ Lee y monitorea eventos de red del sistema operativo
 By LOUST (www.loust.pro)
 """
 
-import subprocess
 import threading
 import time
-import json
 from typing import Dict, List, Optional, Callable
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
 
+from .event_log_reader import EventBookmark, EventLogReader, EventRecord, WevtutilEventSource
+
 try:
     from ..utils.logger import log_info, log_warning, log_error
 except ImportError:
@@ -45,6 +45,12 @@ class WindowsNetworkEvent:
     message: str
     event_id: int
     details: Dict = None
+    record: Optional[EventRecord] = None
+    
+    @property
+    def full_message(self) -> str:
+        """Mensaje formateado por Windows (se renderiza al pedirlo)"""
+        return self.record.message if self.record else self.message
 
 
 class WindowsEventMonitor:
@@ -79,22 +85,27 @@ class WindowsEventMonitor:
         1002: NetworkEventType.DHCP_FAILURE,     # DHCP timeout
     }
     
-    def __init__(self, lookback_hours: int = 1, poll_interval: int = 30):
+    def __init__(self, lookback_hours: int = 1, poll_interval: int = 30,
+                 reader: Optional[EventLogReader] = None):
         """
         Args:
             lookback_hours: Horas hacia atrás para buscar eventos iniciales
             poll_interval: Segundos entre verificaciones de nuevos eventos
+            reader: Lector por cursor (default: wevtutil sobre el log System
+                con bookmark en ~/.netboozt)
         """
         self.lookback_hours = lookback_hours
         self.poll_interval = poll_interval
+        self.reader = reader or EventLogReader(
+            WevtutilEventSource('System', self.NETWORK_PROVIDERS, levels=(2, 3)),
+            EventBookmark()
+        )
         
         self.events: List[WindowsNetworkEvent] = []
         self.is_running = False
         self._thread: Optional[threading.Thread] = None
         self._callbacks: List[Callable[[WindowsNetworkEvent], None]] = []
         self._lock = threading.Lock()
-        
-        self._last_check = datetime.now() - timedelta(hours=lookback_hours)
     
     def start(self):
         """Iniciar monitoreo de eventos"""
@@ -137,7 +148,7 @@ class WindowsEventMonitor:
         """Cargar eventos recientes del Event Log"""
         try:
             start_time = datetime.now() - timedelta(hours=self.lookback_hours)
-            events = self._query_events(start_time)
+            events = self._to_events(self.reader.read_since(start_time))
             
             with self._lock:
                 self.events = events
@@ -148,10 +159,9 @@ class WindowsEventMonitor:
             log_error(f"Error cargando eventos recientes: {e}")
     
     def _check_new_events(self):
-        """Verificar eventos nuevos desde última verificación"""
+        """Leer los registros nuevos desde el cursor"""
         try:
-            new_events = self._query_events(self._last_check)
-            self._last_check = datetime.now()
+            new_events = self._to_events(self.reader.read_new())
             
             if new_events:
                 with self._lock:
@@ -167,95 +177,70 @@ class WindowsEventMonitor:
         except Exception as e:
             log_error(f"Error verificando nuevos eventos: {e}")
     
-    def _query_events(self, since: datetime) -> List[WindowsNetworkEvent]:
-        """Consultar Event Log de Windows"""
-        events = []
+    def _to_events(self, records: List[EventRecord]) -> List[WindowsNetworkEvent]:
+        """Convertir registros del Event Log en eventos de red"""
+        types = {record.record_id: self._classify_event(record) for record in records}
         
-        try:
-            # Formatear fecha para PowerShell
-            since_str = since.strftime("%Y-%m-%dT%H:%M:%S")
-            
-            # Query PowerShell
-            providers_filter = "','".join(self.NETWORK_PROVIDERS)
-            
-            cmd = f"""
-            $events = Get-WinEvent -FilterHashtable @{{
-                LogName='System';
-                ProviderName='{providers_filter}'.Split(',');
-                Level=2,3;
-                StartTime='{since_str}'
-            }} -MaxEvents 100 -ErrorAction SilentlyContinue
-            
-            $events | ForEach-Object {{
-                [PSCustomObject]@{{
-                    TimeCreated = $_.TimeCreated.ToString('yyyy-MM-ddTHH:mm:ss')
-                    ProviderName = $_.ProviderName
-                    Level = $_.LevelDisplayName
-                    Id = $_.Id
-                    Message = $_.Message.Substring(0, [Math]::Min(500, $_.Message.Length))
-                }}
-            }} | ConvertTo-Json -Compress
-            """
-            
-            result = subprocess.run(
-                ["powershell", "-Command", cmd],
-                capture_output=True,
-                text=True,
-                timeout=15,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
-            
-            if result.stdout.strip():
-                data = json.loads(result.stdout)
-                
-                # Asegurar que sea lista
-                if isinstance(data, dict):
-                    data = [data]
-                
-                for item in data:
-                    event_type = self._classify_event(item)
-                    if event_type:
-                        events.append(WindowsNetworkEvent(
-                            event_type=event_type,
-                            timestamp=datetime.fromisoformat(item['TimeCreated']),
-                            provider=item['ProviderName'],
-                            level=item['Level'],
-                            message=item['Message'],
-                            event_id=item['Id']
-                        ))
-                        
-        except json.JSONDecodeError:
-            pass  # Sin eventos
-        except subprocess.TimeoutExpired:
-            log_warning("Timeout consultando Event Log")
-        except Exception as e:
-            log_error(f"Error en query de eventos: {e}")
+        # DNS/WLAN sin ID conocido ni pistas en los datos: se renderizan
+        # todos juntos (una consulta) y se clasifican por el mensaje
+        pending = [r for r in records if types[r.record_id] is None and self._is_candidate(r)]
+        if pending:
+            self.reader.render_messages(pending)
+            for record in pending:
+                types[record.record_id] = self._classify_text(record, record.message.lower())
         
+        events = []
+        for record in records:
+            event_type = types[record.record_id]
+            if event_type:
+                events.append(WindowsNetworkEvent(
+                    event_type=event_type,
+                    timestamp=record.time_created,
+                    provider=record.provider,
+                    level=record.level_name,
+                    # Sin renderizar: el mensaje completo queda en full_message
+                    message=(record.message if record.message_loaded else record.data_summary)[:500],
+                    event_id=record.event_id,
+                    details=record.event_data,
+                    record=record
+                ))
         return events
     
-    def _classify_event(self, event_data: dict) -> Optional[NetworkEventType]:
-        """Clasificar evento por ID o contenido"""
-        event_id = event_data.get('Id', 0)
-        message = event_data.get('Message', '').lower()
-        provider = event_data.get('ProviderName', '')
-        
+    @staticmethod
+    def _data_text(record: EventRecord) -> str:
+        """Valores de EventData/UserData (sin nombres de campo) en minúsculas"""
+        return " ".join(value for value in record.event_data.values() if value).lower()
+    
+    def _is_candidate(self, record: EventRecord) -> bool:
+        """Proveedor DNS o WLAN (los únicos que se clasifican por contenido)"""
+        provider = record.provider.lower()
+        return 'dns' in provider or 'wlan' in provider or 'dns' in self._data_text(record)
+    
+    def _classify_event(self, record: EventRecord) -> Optional[NetworkEventType]:
+        """Clasificar evento por ID o por sus datos (nunca renderiza el mensaje)"""
         # Por Event ID conocido
-        if event_id in self.IMPORTANT_EVENTS:
-            return self.IMPORTANT_EVENTS[event_id]
+        if record.event_id in self.IMPORTANT_EVENTS:
+            return self.IMPORTANT_EVENTS[record.event_id]
         
-        # Por contenido del mensaje
-        if 'dns' in provider.lower() or 'dns' in message:
-            if 'timeout' in message or 'agotó' in message or 'tiempo de espera' in message:
+        if not self._is_candidate(record):
+            return None
+        return self._classify_text(record, self._data_text(record))
+    
+    def _classify_text(self, record: EventRecord, text: str) -> Optional[NetworkEventType]:
+        """Clasificar un evento DNS/WLAN por palabras clave en `text`"""
+        provider = record.provider.lower()
+        if 'dns' in provider or 'dns' in self._data_text(record):
+            if 'timeout' in text or 'agotó' in text or 'tiempo de espera' in text:
                 return NetworkEventType.DNS_TIMEOUT
-            if 'fail' in message or 'error' in message:
+            if 'fail' in text or 'error' in text:
                 return NetworkEventType.DNS_FAILURE
         
-        if 'wlan' in provider.lower():
-            if 'disconnect' in message or 'desconect' in message:
+        if 'wlan' in provider:
+            if 'disconnect' in text or 'desconect' in text:
                 return NetworkEventType.WLAN_DISCONNECT
-            if 'limited' in message or 'limitado' in message or 'limitada' in message:
+            if 'limited' in text or 'limitado' in text or 'limitada' in text:
                 return NetworkEventType.WLAN_LIMITED
-            if 'connect' in message or 'conectado' in message:
+            if 'connect' in text or 'conectado' in text:
                 return NetworkEventType.WLAN_CONNECT
         
         return None
@@ -6,11 +6,16 @@ By LOUST (www.loust.pro)
 """
 
 import winreg
-import subprocess
 import re
 from typing import Dict, Optional, Any
 from dataclasses import dataclass
 
+try:
+    from ..utils.shell_host import get_shell_runner
+except ImportError:
+    # Fallback con src/ en sys.path (ejecución directa)
+    from utils.shell_host import get_shell_runner
+
 
 @dataclass
 class OptimizationState:
@@ -100,20 +105,9 @@ class OptimizationDetector:
             return None
     
     def _run_netsh_command(self, command: str) -> str:
-        """Ejecutar comando netsh sin ventana visible"""
-        try:
-            result = subprocess.run(
-                f"netsh {command}",
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=5,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
-            return result.stdout
-        except Exception as e:
-            # Silently ignore netsh errors (puede no estar disponible)
-            return ""
+        """Ejecutar comando netsh en el host persistente compartido"""
+        # Errores de netsh se ignoran (puede no estar disponible): stdout vacío
+        return get_shell_runner().run(f"netsh {command}", timeout=5).stdout
     
     def _detect_tcp_congestion_control(self):
         """Detectar algoritmo de control de congestión TCP"""
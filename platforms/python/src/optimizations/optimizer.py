@@ -5,12 +5,17 @@ Ejecuta cambios reales en el sistema (PowerShell + Registry)
 By LOUST (www.loust.pro)
 """
 
-import subprocess
 import winreg
 from typing import Dict, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+try:
+    from ..utils.shell_host import get_shell_runner
+except ImportError:
+    # Fallback con src/ en sys.path (ejecución directa)
+    from utils.shell_host import get_shell_runner
+
 try:
     from ..utils.logger import log_info, log_error, log_warning
 except ImportError:
@@ -47,26 +52,15 @@ class NetworkOptimizer:
         self.reboot_required = False
     
     def _run_powershell(self, command: str, timeout: int = 10) -> Tuple[bool, str]:
-        """Ejecutar comando PowerShell"""
-        try:
-            result = subprocess.run(
-                ["powershell", "-NoProfile", "-ExecutionPolicy", "Bypass", "-Command", command],
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
-            
-            success = result.returncode == 0
-            output = result.stdout if success else result.stderr
-            return success, output.strip()
-            
-        except subprocess.TimeoutExpired:
+        """Ejecutar comando PowerShell en el host persistente compartido"""
+        result = get_shell_runner().run(command, timeout=timeout)
+        
+        if result.timed_out:
             log_error(f"PowerShell timeout: {command[:50]}...")
             return False, "Timeout"
-        except Exception as e:
-            log_error(f"PowerShell error: {e}")
-            return False, str(e)
+        
+        output = result.stdout if result.ok else result.stderr
+        return result.ok, output.strip()
     
     def _set_registry_dword(self, path: str, key: str, value: int) -> bool:
         """Establecer valor DWORD en registro"""
@@ -1,8 +1,14 @@
 """
 NetBoozt - Storage Module
-Base de datos local con TinyDB
+Base de datos local (SQLite WAL o TinyDB)
 """
 
-from .db_manager import NetBooztStorage
+from .db_manager import NetBooztStorage, open_storage, get_storage
+from .sqlite_storage import SQLiteStorage, migrate_from_tinydb
+from .metric_writer import MetricWriter
+from .rollups import RollupEngine, RollupPoint, get_rollup_engine
+from .metric_archive import MetricArchive, get_metric_archive
 
-__all__ = ['NetBooztStorage']
+__all__ = ['NetBooztStorage', 'SQLiteStorage', 'open_storage', 'get_storage', 'migrate_from_tinydb', 'MetricWriter',
+           'RollupEngine', 'RollupPoint', 'get_rollup_engine',
+           'MetricArchive', 'get_metric_archive']
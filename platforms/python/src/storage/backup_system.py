@@ -9,9 +9,14 @@ from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 import json
-import subprocess
 from pathlib import Path
 
+try:
+    from ..utils.shell_host import get_shell_runner
+except ImportError:
+    # Fallback con src/ en sys.path (ejecución directa)
+    from utils.shell_host import get_shell_runner
+
 try:
     from ..utils.logger import log_info, log_warning, log_error
     from ..utils.notifications import get_notification_manager
@@ -113,14 +118,9 @@ class BackupSystem:
         """Obtener servidores DNS actuales"""
         try:
             cmd = f'Get-DnsClientServerAddress -InterfaceAlias "{adapter_name}" -AddressFamily IPv4 | Select-Object -ExpandProperty ServerAddresses'
-            result = subprocess.run(
-                ["powershell", "-Command", cmd],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = get_shell_runner().run(cmd, timeout=5)
             
-            if result.returncode == 0:
+            if result.ok:
                 dns_list = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
                 return dns_list
             
@@ -134,14 +134,9 @@ class BackupSystem:
         """Obtener configuración IP"""
         try:
             cmd = f'Get-NetIPAddress -InterfaceAlias "{adapter_name}" -AddressFamily IPv4 | Select-Object IPAddress, PrefixLength | ConvertTo-Json'
-            result = subprocess.run(
-                ["powershell", "-Command", cmd],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = get_shell_runner().run(cmd, timeout=5)
             
-            if result.returncode == 0 and result.stdout.strip():
+            if result.ok and result.stdout.strip():
                 return json.loads(result.stdout)
             
             return {}
@@ -154,14 +149,9 @@ class BackupSystem:
         """Obtener configuración TCP global"""
         try:
             cmd = 'Get-NetTCPSetting -SettingName Internet | Select-Object AutoTuningLevelLocal, CongestionProvider, EcnCapability | ConvertTo-Json'
-            result = subprocess.run(
-                ["powershell", "-Command", cmd],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = get_shell_runner().run(cmd, timeout=5)
             
-            if result.returncode == 0 and result.stdout.strip():
+            if result.ok and result.stdout.strip():
                 return json.loads(result.stdout)
             
             return {}
@@ -283,21 +273,19 @@ class BackupSystem:
     def _restore_dns(self, adapter_name: str, dns_servers: List[str]):
         """Restaurar servidores DNS"""
         try:
+            runner = get_shell_runner()
+            
             # Limpiar DNS actual
-            subprocess.run(
-                ["powershell", "-Command", f'Set-DnsClientServerAddress -InterfaceAlias "{adapter_name}" -ResetServerAddresses'],
-                timeout=5,
-                check=True
-            )
+            result = runner.run(f'Set-DnsClientServerAddress -InterfaceAlias "{adapter_name}" -ResetServerAddresses', timeout=5)
+            if not result.ok:
+                raise RuntimeError(result.stderr or "Reset de DNS falló")
             
             # Aplicar DNS del backup
             if dns_servers:
                 dns_str = ','.join(dns_servers)
-                subprocess.run(
-                    ["powershell", "-Command", f'Set-DnsClientServerAddress -InterfaceAlias "{adapter_name}" -ServerAddresses {dns_str}'],
-                    timeout=5,
-                    check=True
-                )
+                result = runner.run(f'Set-DnsClientServerAddress -InterfaceAlias "{adapter_name}" -ServerAddresses {dns_str}', timeout=5)
+                if not result.ok:
+                    raise RuntimeError(result.stderr or "Configuración de DNS falló")
             
             log_info(f"DNS restaurado: {dns_servers}")
         
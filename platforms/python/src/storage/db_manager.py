@@ -9,19 +9,33 @@ Perfecto para:
 - Logs de optimizaciones aplicadas
 - Métricas en tiempo real
 
+open_storage() elige el backend: SQLite en modo WAL por defecto (ver
+sqlite_storage.py, mismo API), con migración única desde el JSON.
+
 By LOUST (www.loust.pro)
 """
 
 from tinydb import TinyDB, Query
+from tinydb.table import Document
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
 import json
 
+from .network_test_index import NetworkTestIndex
+
+try:
+    from ..utils.logger import log_warning
+except ImportError:
+    def log_warning(msg): print(f"[WARN] {msg}")
+
 
 class NetBooztStorage:
     """Gestor de almacenamiento local para NetBoozt"""
     
+    # Métricas en tiempo real conservadas
+    MAX_METRICS = 1000
+    
     def __init__(self, db_path: Optional[Path] = None):
         """
         Inicializar almacenamiento
@@ -43,6 +57,9 @@ class NetBooztStorage:
         self.optimizations = self.db.table('optimizations')
         self.settings = self.db.table('settings')
         self.metrics = self.db.table('metrics')
+        
+        # Índice de tests por timestamp (se construye en la primera consulta)
+        self._test_index: Optional[NetworkTestIndex] = None
     
     def __del__(self):
         """Cleanup al destruir el objeto"""
@@ -54,6 +71,23 @@ class NetBooztStorage:
     
     # ==================== Tests de Red ====================
     
+    @property
+    def test_index(self) -> NetworkTestIndex:
+        """
+        Índice en memoria de network_tests.
+        
+        TinyDB relee y parsea todo el JSON en cada consulta; el índice lo
+        lee una vez y se mantiene en cada alta/baja hecha por esta clase.
+        """
+        if self._test_index is None:
+            self._test_index = NetworkTestIndex(self.tests.all())
+        return self._test_index
+    
+    def _indexed_tests(self, doc_ids: List[int]) -> List[Dict]:
+        """Copias de los tests indexados (los del índice no se exponen)"""
+        index = self.test_index
+        return [Document(dict(index.get(doc_id)), doc_id) for doc_id in doc_ids]
+    
     def save_network_test(self, test_data: Dict) -> int:
         """
         Guardar resultado de prueba de red
@@ -75,53 +109,34 @@ class NetBooztStorage:
             ID del test guardado
         """
         test_data['timestamp'] = datetime.now().isoformat()
-        return self.tests.insert(test_data)
+        doc_id = self.tests.insert(test_data)
+        if self._test_index is not None:
+            self._test_index.add(Document(dict(test_data), doc_id))
+        return doc_id
     
     def get_recent_tests(self, limit: int = 10) -> List[Dict]:
-        """Obtener tests recientes"""
-        all_tests = self.tests.all()
-        # Ordenar por timestamp desc
-        sorted_tests = sorted(
-            all_tests, 
-            key=lambda x: x.get('timestamp', ''), 
-            reverse=True
-        )
-        return sorted_tests[:limit]
+        """Obtener tests recientes (más nuevo primero)"""
+        return self._indexed_tests(self.test_index.recent_ids(limit))
     
     def get_tests_by_date_range(self, start: datetime, end: datetime) -> List[Dict]:
-        """Obtener tests en rango de fechas"""
-        Test = Query()
-        return self.tests.search(
-            (Test.timestamp >= start.isoformat()) & 
-            (Test.timestamp <= end.isoformat())
-        )
+        """Obtener tests en rango de fechas (orden cronológico)"""
+        return self._indexed_tests(self.test_index.range_ids(start.isoformat(), end.isoformat()))
+    
+    def get_all_tests(self) -> List[Dict]:
+        """Todos los tests (con doc_id)"""
+        return self.tests.all()
+    
+    def remove_tests(self, doc_ids) -> int:
+        """Eliminar tests por id"""
+        removed = self.tests.remove(doc_ids=list(doc_ids))
+        if self._test_index is not None:
+            for doc_id in removed:
+                self._test_index.remove(doc_id)
+        return len(removed)
     
     def get_test_stats(self) -> Dict:
-        """Estadísticas de todos los tests"""
-        all_tests = self.tests.all()
-        
-        if not all_tests:
-            return {
-                'total_tests': 0,
-                'avg_download': 0,
-                'avg_upload': 0,
-                'avg_latency': 0,
-                'best_download': 0,
-                'worst_latency': 999
-            }
-        
-        downloads = [t.get('download_mbps', 0) for t in all_tests]
-        uploads = [t.get('upload_mbps', 0) for t in all_tests]
-        latencies = [t.get('latency_ms', 0) for t in all_tests]
-        
-        return {
-            'total_tests': len(all_tests),
-            'avg_download': sum(downloads) / len(downloads),
-            'avg_upload': sum(uploads) / len(uploads),
-            'avg_latency': sum(latencies) / len(latencies),
-            'best_download': max(downloads),
-            'worst_latency': max(latencies)
-        }
+        """Estadísticas de todos los tests (incrementales, ver NetworkTestStats)"""
+        return self.test_index.stats.as_dict()
     
     # ==================== Optimizaciones ====================
     
@@ -256,22 +271,42 @@ class NetBooztStorage:
         
         # Guardar
         metric_id = self.metrics.insert(metric_data)
-        
-        # Limpiar métricas viejas (solo mantener últimas 1000)
-        all_metrics = self.metrics.all()
-        if len(all_metrics) > 1000:
-            # Eliminar las más antiguas
-            sorted_metrics = sorted(
-                all_metrics,
-                key=lambda x: x.get('timestamp', ''),
-                reverse=True
-            )
-            to_delete = sorted_metrics[1000:]
-            for metric in to_delete:
-                self.metrics.remove(doc_ids=[metric.doc_id])
+        self._enforce_metric_retention()
         
         return metric_id
     
+    def save_metrics(self, metrics: List[Dict]) -> int:
+        """
+        Guardar un lote de métricas (write-behind, ver MetricWriter)
+        
+        Cada métrica conserva su timestamp de captura. Una escritura para el
+        lote y otra para la retención, en lugar de una por documento.
+        
+        Returns:
+            Métricas guardadas
+        """
+        if not metrics:
+            return 0
+        now = datetime.now().isoformat()
+        for metric in metrics:
+            metric.setdefault('timestamp', now)
+        self.metrics.insert_multiple(metrics)
+        self._enforce_metric_retention()
+        return len(metrics)
+    
+    def _enforce_metric_retention(self):
+        """Mantener solo las últimas MAX_METRICS (un solo remove)"""
+        if len(self.metrics) <= self.MAX_METRICS:
+            return
+        # Eliminar las más antiguas
+        sorted_metrics = sorted(
+            self.metrics.all(),
+            key=lambda x: x.get('timestamp', ''),
+            reverse=True
+        )
+        to_delete = [metric.doc_id for metric in sorted_metrics[self.MAX_METRICS:]]
+        self.metrics.remove(doc_ids=to_delete)
+    
     def get_recent_metrics(self, limit: int = 100) -> List[Dict]:
         """Obtener métricas recientes para gráficas"""
         all_metrics = self.metrics.all()
@@ -304,7 +339,10 @@ class NetBooztStorage:
         
         # Insertar datos
         if 'tests' in data:
-            self.tests.insert_multiple(data['tests'])
+            doc_ids = self.tests.insert_multiple(data['tests'])
+            if self._test_index is not None:
+                for doc_id, test in zip(doc_ids, data['tests']):
+                    self._test_index.add(Document(dict(test), doc_id))
         if 'optimizations' in data:
             self.optimizations.insert_multiple(data['optimizations'])
         if 'settings' in data:
@@ -319,7 +357,7 @@ class NetBooztStorage:
         cutoff = (datetime.now() - timedelta(days=days)).isoformat()
         
         Test = Query()
-        self.tests.remove(Test.timestamp < cutoff)
+        self.remove_tests(self.test_index.older_than(cutoff))
         self.metrics.remove(Test.timestamp < cutoff)
     
     def get_db_stats(self) -> Dict:
@@ -338,12 +376,52 @@ class NetBooztStorage:
         self.db.close()
 
 
+DEFAULT_BACKEND = 'sqlite'
+
+
+def open_storage(db_path: Optional[Path] = None, backend: Optional[str] = None):
+    """
+    Abrir el almacenamiento con el backend indicado.
+    
+    Con SQLite, si existe la base TinyDB (mismo nombre con .json) y la
+    migración no está registrada (setting 'storage_migration'), se migra;
+    el JSON queda como respaldo. Si la migración falla se registra en el
+    log y se reintenta en la próxima apertura, sin impedir el arranque.
+    
+    Args:
+        db_path: Ruta de la base (default: %APPDATA%/NetBoozt/netboozt_data.db o .json)
+        backend: 'sqlite' o 'tinydb' (default: DEFAULT_BACKEND)
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend == 'tinydb':
+        return NetBooztStorage(db_path)
+    if backend != 'sqlite':
+        raise ValueError(f"Backend de storage desconocido: {backend}")
+    
+    from .sqlite_storage import SQLiteStorage, migrate_from_tinydb
+    
+    if db_path is None:
+        appdata = Path.home() / "AppData" / "Roaming" / "NetBoozt"
+        appdata.mkdir(parents=True, exist_ok=True)
+        db_path = appdata / "netboozt_data.db"
+    db_path = Path(db_path)
+    legacy_json = db_path.with_suffix('.json')
+    
+    storage = SQLiteStorage(db_path)
+    if legacy_json.exists():
+        try:
+            migrate_from_tinydb(legacy_json, storage)
+        except Exception as e:
+            log_warning(f"Migración TinyDB → SQLite fallida (se reintentará): {e}")
+    return storage
+
+
 # Singleton global
 _storage_instance = None
 
-def get_storage() -> NetBooztStorage:
+def get_storage():
     """Obtener instancia única del storage"""
     global _storage_instance
     if _storage_instance is None:
-        _storage_instance = NetBooztStorage()
+        _storage_instance = open_storage()
     return _storage_instance
@@ -0,0 +1,471 @@
+"""
+NetBoozt - Archivo Binario de Métricas por Segundo
+Contadores de interfaz a 1 Hz en registros de ancho fijo (24 bytes), un
+archivo por adaptador y día (UTC) mapeado en memoria. Leer un rango es
+bisecar la columna de tiempo y devolver una vista NumPy sobre el mmap, sin
+copiar ni parsear; 30 días de un adaptador ocupan ~62 MB (los mismos datos
+como documentos JSON en NetBooztStorage.metrics serían >1 GB).
+
+Formato de cada archivo (little-endian):
+    cabecera de 256 bytes: magic, versión, tamaño de registro, inicio del
+    día, registros confirmados, adaptador, últimos contadores acumulados e
+    índice por hora (primer registro de cada hora)
+    registros: ms desde el inicio del día + incrementos del segundo
+
+Append seguro ante caídas: el registro se escribe antes que el contador
+de la cabecera, y al reabrir se descarta cualquier cola inconsistente.
+
+By LOUST (www.loust.pro)
+"""
+
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from ..utils.logger import log_warning
+except ImportError:
+    def log_warning(msg): print(f"[WARN] {msg}")
+
+
+MAGIC = b'NBZMET01'
+VERSION = 1
+HEADER_SIZE = 256
+# magic, versión, tamaño de registro, tamaño de cabecera, inicio del día,
+# registros confirmados, reservado, adaptador, últimos contadores, índice por hora
+HEADER_FORMAT = '<8sHHIqII64s8Q24I'
+COUNT_OFFSET = struct.calcsize('<8sHHIq')
+COUNTERS_OFFSET = struct.calcsize('<8sHHIqII64s')
+HOUR_INDEX_OFFSET = struct.calcsize('<8sHHIqII64s8Q')
+HOUR_UNSET = 0xFFFFFFFF
+
+# Contadores acumulados de psutil / NetworkSnapshot, en orden de cabecera
+COUNTER_FIELDS = ('bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv',
+                  'errors_in', 'errors_out', 'drops_in', 'drops_out')
+
+# Incrementos por segundo: bytes/paquetes en u4 (hasta ~34 Gbps), errores y
+# descartes en u1 (saturan en 255/s, suficiente para señalar el problema)
+RECORD_DTYPE = np.dtype([
+    ('t', '<u4'),                   # ms desde el inicio del día (UTC)
+    ('bytes_sent', '<u4'),
+    ('bytes_recv', '<u4'),
+    ('packets_sent', '<u4'),
+    ('packets_recv', '<u4'),
+    ('errors_in', 'u1'),
+    ('errors_out', 'u1'),
+    ('drops_in', 'u1'),
+    ('drops_out', 'u1'),
+])
+RECORD_FORMAT = '<IIIIIBBBB'
+RECORD_SIZE = RECORD_DTYPE.itemsize
+_FIELD_MAX = [np.iinfo(RECORD_DTYPE[name]).max for name in COUNTER_FIELDS]
+
+DAY_SECONDS = 86400
+DAY_MS = DAY_SECONDS * 1000
+
+assert struct.calcsize(HEADER_FORMAT) == HEADER_SIZE
+assert struct.calcsize(RECORD_FORMAT) == RECORD_SIZE == 24
+
+
+def _ts(value) -> float:
+    return value.timestamp() if isinstance(value, datetime) else float(value)
+
+
+def day_start(timestamp: float) -> int:
+    """Inicio (epoch) del día UTC que contiene timestamp"""
+    return int(timestamp // DAY_SECONDS) * DAY_SECONDS
+
+
+def safe_name(adapter: str) -> str:
+    """Nombre de directorio para un adaptador ("Wi-Fi 2" -> "Wi-Fi_2")"""
+    return re.sub(r'[^\w.-]', '_', adapter) or '_'
+
+
+class DayFile:
+    """
+    Un archivo (adaptador, día) abierto para escritura.
+
+    Crece de a GROW_RECORDS registros; el espacio preasignado sin confirmar
+    se ignora (count en cabecera manda).
+    """
+
+    GROW_RECORDS = 3600             # 1 hora a 1 Hz (~84 KB)
+
+    def __init__(self, path: Path, adapter: str, start: int):
+        self.path = path
+        self.adapter = adapter
+        self.day_start = start
+        self.count = 0
+        self.last_counters: List[int] = [0] * len(COUNTER_FIELDS)
+        self.hour_index: List[int] = [HOUR_UNSET] * 24
+        self._file = None
+        self._mm: Optional[mmap.mmap] = None
+        self.capacity = 0
+        self.recovered = 0          # Registros descartados al reabrir
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists() and path.stat().st_size >= HEADER_SIZE:
+            self._file = open(path, 'r+b')
+            self._map()
+            self._recover()
+        else:
+            self._file = open(path, 'w+b')
+            self._file.truncate(HEADER_SIZE + self.GROW_RECORDS * RECORD_SIZE)
+            self._map()
+            self._write_header()
+
+    # ------------------------------------------------------------------
+
+    def _map(self):
+        size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), size)
+        self.capacity = (size - HEADER_SIZE) // RECORD_SIZE
+
+    def _grow(self):
+        """Agrandar el archivo y re-mapear (las vistas de lectura usan su propio mmap)"""
+        self._mm.flush()
+        self._mm.close()
+        self._file.truncate(HEADER_SIZE + (self.capacity + self.GROW_RECORDS) * RECORD_SIZE)
+        self._map()
+
+    def _write_header(self):
+        struct.pack_into(HEADER_FORMAT, self._mm, 0, MAGIC, VERSION, RECORD_SIZE, HEADER_SIZE,
+                         self.day_start, self.count, 0, self.adapter.encode('utf-8')[:64],
+                         *self.last_counters, *self.hour_index)
+
+    def _recover(self):
+        """Validar cabecera y descartar registros incompletos o fuera de orden"""
+        header = read_header(self._mm)
+        if header is None:
+            raise ValueError(f"Archivo de métricas inválido: {self.path}")
+        count = min(header['count'], self.capacity)
+        self.last_counters = list(header['last_counters'])
+
+        t = np.frombuffer(self._mm, dtype=RECORD_DTYPE, count=count, offset=HEADER_SIZE)['t'].astype(np.int64)
+        bad = np.flatnonzero((np.diff(t) < 0) | (t[1:] >= DAY_MS))
+        valid = int(bad[0]) + 1 if len(bad) else count
+        if count and t[0] >= DAY_MS:
+            valid = 0
+        self.recovered = header['count'] - valid
+        self.count = valid
+
+        # Reconstruir el índice por hora desde los tiempos válidos
+        hours = np.searchsorted(t[:valid], np.arange(24, dtype=np.int64) * 3_600_000)
+        self.hour_index = [int(h) if h < valid else HOUR_UNSET for h in hours]
+        self._write_header()
+
+    # ------------------------------------------------------------------
+
+    def last_time_ms(self) -> Optional[int]:
+        if not self.count:
+            return None
+        return struct.unpack_from('<I', self._mm, HEADER_SIZE + (self.count - 1) * RECORD_SIZE)[0]
+
+    def append(self, t_ms: int, deltas: List[int], counters: List[int]):
+        if self.count >= self.capacity:
+            self._grow()
+        last = self.last_time_ms()
+        if last is not None and t_ms < last:
+            t_ms = last                 # Reloj hacia atrás: mantener el orden
+        struct.pack_into(RECORD_FORMAT, self._mm, HEADER_SIZE + self.count * RECORD_SIZE,
+                         t_ms, *deltas)
+
+        # Recién ahora confirmar: índice por hora, contadores y count
+        hour = t_ms // 3_600_000
+        for h in range(hour, -1, -1):
+            if self.hour_index[h] != HOUR_UNSET:
+                break
+            self.hour_index[h] = self.count
+            struct.pack_into('<I', self._mm, HOUR_INDEX_OFFSET + 4 * h, self.count)
+        self.last_counters = counters
+        struct.pack_into('<8Q', self._mm, COUNTERS_OFFSET, *counters)
+        self.count += 1
+        struct.pack_into('<I', self._mm, COUNT_OFFSET, self.count)
+
+    def flush(self):
+        if self._mm is not None:
+            self._mm.flush()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_header(buffer) -> Optional[Dict]:
+    """Cabecera de un archivo de métricas (None si no es válido)"""
+    if len(buffer) < HEADER_SIZE:
+        return None
+    fields = struct.unpack_from(HEADER_FORMAT, buffer, 0)
+    if fields[0] != MAGIC or fields[2] != RECORD_SIZE:
+        return None
+    return {
+        'version': fields[1],
+        'day_start': fields[4],
+        'count': fields[5],
+        'adapter': fields[7].rstrip(b'\0').decode('utf-8', 'replace'),
+        'last_counters': fields[8:16],
+        'hour_index': fields[16:40],
+    }
+
+
+def open_day_view(path: Path, start_ms: int = 0, end_ms: int = DAY_MS) -> Tuple[Optional[Dict], np.ndarray]:
+    """
+    Registros de un archivo con t en [start_ms, end_ms) como vista de solo
+    lectura sobre su propio mmap (cero copias; se libera con la vista).
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < HEADER_SIZE:
+            return None, np.empty(0, dtype=RECORD_DTYPE)
+        mm = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+    header = read_header(mm)
+    if header is None:
+        return None, np.empty(0, dtype=RECORD_DTYPE)
+
+    count = min(header['count'], (size - HEADER_SIZE) // RECORD_SIZE)
+    records = np.frombuffer(mm, dtype=RECORD_DTYPE, count=count, offset=HEADER_SIZE)
+
+    # Acotar con el índice por hora y bisecar dentro
+    hours = header['hour_index']
+    first_hour = max(0, start_ms // 3_600_000)
+    lo = hours[first_hour] if first_hour < 24 and hours[first_hour] != HOUR_UNSET else count
+    next_hour = end_ms // 3_600_000 + 1
+    hi = hours[next_hour] if next_hour < 24 and hours[next_hour] != HOUR_UNSET else count
+    lo, hi = min(lo, count), min(max(hi, lo), count)
+    t = records['t'][lo:hi]
+    return header, records[lo + np.searchsorted(t, start_ms): lo + np.searchsorted(t, end_ms)]
+
+
+class MetricArchive:
+    """
+    Archivo de contadores por segundo, particionado por adaptador y día.
+
+    append() recibe contadores acumulados (como NetworkSnapshot) y guarda
+    el incremento respecto de la muestra anterior.
+    """
+
+    DEFAULT_DIR = Path.home() / ".netboozt" / "metrics"
+    FILE_SUFFIX = ".nbm"
+    MAX_GAP = 5.0               # Segundos: si la muestra anterior es más vieja, incremento 0
+    FLUSH_INTERVAL = 30.0       # msync periódico (la caída del proceso no pierde datos)
+    KEEP_DAYS = 30
+
+    def __init__(self, base_dir: Optional[Path] = None):
+        self.base_dir = Path(base_dir or self.DEFAULT_DIR)
+        self._open: Dict[str, DayFile] = {}
+        self._last_sample: Dict[str, Tuple[float, List[int]]] = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.appended = 0
+
+    def _path(self, adapter: str, start: int) -> Path:
+        name = datetime.fromtimestamp(start, timezone.utc).strftime('%Y-%m-%d')
+        return self.base_dir / safe_name(adapter) / f"{name}{self.FILE_SUFFIX}"
+
+    def _day_file(self, adapter: str, start: int) -> DayFile:
+        day = self._open.get(adapter)
+        if day is not None and day.day_start == start:
+            return day
+        if day is not None:
+            day.close()
+        day = DayFile(self._path(adapter, start), adapter, start)
+        if day.recovered:
+            log_warning(f"Métricas {day.path.name}: {day.recovered} registros incompletos descartados")
+        self._open[adapter] = day
+        return day
+
+    def _previous_sample(self, adapter: str, day: DayFile) -> Optional[Tuple[float, List[int]]]:
+        """Última muestra conocida (memoria o cabecera del archivo, tras reiniciar)"""
+        sample = self._last_sample.get(adapter)
+        if sample is None and day.count:
+            sample = (day.day_start + day.last_time_ms() / 1000, day.last_counters)
+        return sample
+
+    def append(self, adapter: str, timestamp, counters: Dict[str, int]):
+        """Agregar una muestra de contadores acumulados"""
+        ts = _ts(timestamp)
+        values = [int(counters.get(name) or 0) for name in COUNTER_FIELDS]
+        with self._lock:
+            day = self._day_file(adapter, day_start(ts))
+            previous = self._previous_sample(adapter, day)
+
+            if previous is not None and 0 <= ts - previous[0] <= self.MAX_GAP:
+                # Contador reiniciado (reboot, driver) -> incremento 0
+                deltas = [d if 0 <= d <= limit else (0 if d < 0 else limit)
+                          for d, limit in zip(map(int.__sub__, values, previous[1]), _FIELD_MAX)]
+            else:
+                deltas = [0] * len(COUNTER_FIELDS)
+
+            day.append(int((ts - day.day_start) * 1000), deltas, values)
+            self._last_sample[adapter] = (ts, values)
+            self.appended += 1
+
+            if time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL:
+                self._flush_locked()
+
+    def append_snapshot(self, snapshot):
+        """Callback para NetworkMonitor.register_callback"""
+        self.append(snapshot.adapter, snapshot.timestamp,
+                    {name: getattr(snapshot, name, 0) for name in COUNTER_FIELDS})
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def views(self, adapter: str, start, end) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        (inicio del día, vista de registros) por cada día del rango, sin copiar.
+
+        t de cada registro es relativo a su día (ms); ver timestamps().
+        """
+        start, end = _ts(start), _ts(end)
+        day = day_start(start)
+        while day <= end:
+            path = self._path(adapter, day)
+            if path.exists():
+                lo = max(0, int((start - day) * 1000))
+                hi = min(DAY_MS, int((end - day) * 1000) + 1)
+                header, records = open_day_view(path, lo, hi)
+                if header is not None and len(records):
+                    yield day, records
+            day += DAY_SECONDS
+
+    def read(self, adapter: str, start, end) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Registros del rango y sus timestamps (epoch).
+
+        Un solo día devuelve la vista tal cual; varios días se concatenan (copia).
+        """
+        parts = list(self.views(adapter, start, end))
+        if not parts:
+            return np.empty(0, dtype=np.float64), np.empty(0, dtype=RECORD_DTYPE)
+        stamps = np.concatenate([timestamps(records, day) for day, records in parts])
+        records = parts[0][1] if len(parts) == 1 else np.concatenate([r for _, r in parts])
+        return stamps, records
+
+    def totals(self, adapter: str, start, end) -> Dict[str, int]:
+        """Suma de incrementos del rango (recorre las vistas sin copiarlas)"""
+        result = {name: 0 for name in COUNTER_FIELDS}
+        samples = 0
+        for _, records in self.views(adapter, start, end):
+            samples += len(records)
+            for name in COUNTER_FIELDS:
+                result[name] += int(records[name].sum(dtype=np.uint64))
+        result['samples'] = samples
+        return result
+
+    def adapters(self) -> List[str]:
+        """Adaptadores con archivos (nombre real desde la cabecera)"""
+        names = []
+        if not self.base_dir.exists():
+            return names
+        for directory in sorted(p for p in self.base_dir.iterdir() if p.is_dir()):
+            for path in sorted(directory.glob(f"*{self.FILE_SUFFIX}")):
+                with open(path, 'rb') as f:
+                    header = read_header(f.read(HEADER_SIZE))
+                if header:
+                    names.append(header['adapter'])
+                    break
+        return names
+
+    def days(self, adapter: str) -> List[str]:
+        directory = self.base_dir / safe_name(adapter)
+        return sorted(p.stem for p in directory.glob(f"*{self.FILE_SUFFIX}"))
+
+    def prune(self, keep_days: Optional[int] = None) -> int:
+        """Borrar días más viejos que keep_days (default: KEEP_DAYS). Returns: archivos eliminados"""
+        keep_days = keep_days or self.KEEP_DAYS
+        cutoff = datetime.fromtimestamp(day_start(time.time()) - keep_days * DAY_SECONDS,
+                                        timezone.utc).strftime('%Y-%m-%d')
+        removed = 0
+        with self._lock:
+            active = {day.path for day in self._open.values()}
+            for path in self.base_dir.glob(f"*/*{self.FILE_SUFFIX}"):
+                if path.stem < cutoff and path not in active:
+                    try:
+                        path.unlink()
+                        removed += 1
+                    except OSError as e:
+                        log_warning(f"No se pudo borrar {path}: {e}")
+        return removed
+
+    def get_stats(self) -> Dict:
+        files = list(self.base_dir.glob(f"*/*{self.FILE_SUFFIX}")) if self.base_dir.exists() else []
+        return {
+            'files': len(files),
+            'size_mb': sum(p.stat().st_size for p in files) / 1e6,
+            'appended': self.appended,
+            'open_files': len(self._open),
+        }
+
+    # ------------------------------------------------------------------
+
+    def _flush_locked(self):
+        for day in self._open.values():
+            day.flush()
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        with self._lock:
+            for day in self._open.values():
+                day.close()
+            self._open.clear()
+
+
+def timestamps(records: np.ndarray, start: int) -> np.ndarray:
+    """Epoch (float) de cada registro de un día"""
+    return start + records['t'] / 1000.0
+
+
+# Singleton
+_metric_archive_instance = None
+
+def get_metric_archive() -> MetricArchive:
+    """Obtener instancia única del archivo de métricas"""
+    global _metric_archive_instance
+    if _metric_archive_instance is None:
+        _metric_archive_instance = MetricArchive()
+    return _metric_archive_instance
+
+
+if __name__ == "__main__":
+    import random
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = MetricArchive(Path(tmp))
+        end = day_start(time.time())
+        start = end - 30 * DAY_SECONDS
+
+        t0 = time.perf_counter()
+        counters = dict.fromkeys(COUNTER_FIELDS, 0)
+        for second in range(30 * DAY_SECONDS):
+            counters['bytes_recv'] += random.randint(0, 5_000_000)
+            counters['bytes_sent'] += random.randint(0, 500_000)
+            counters['packets_recv'] += random.randint(0, 4000)
+            archive.append("Ethernet", start + second, counters)
+        archive.close()
+        print(f"Ethernet, 30 días a 1 Hz: {time.perf_counter() - t0:.1f}s de escritura, "
+              f"{archive.get_stats()['size_mb']:.1f} MB")
+
+        t0 = time.perf_counter()
+        totals = archive.totals("Ethernet", start, end)
+        print(f"Scan de 30 días: {(time.perf_counter() - t0) * 1000:.0f}ms "
+              f"({totals['samples']:,} muestras, {totals['bytes_recv'] / 1e12:.1f} TB recibidos)")
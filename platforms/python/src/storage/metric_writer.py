@@ -0,0 +1,147 @@
+"""
+NetBoozt - Ingesta de Métricas Write-Behind
+El monitor produce una métrica por segundo; guardarla en el momento
+cuesta una escritura a disco (y con TinyDB, reescribir todo el JSON) en el
+thread de muestreo. MetricWriter solo la encola (O(1)) y un thread aparte
+la persiste por lotes cuando el buffer llega a BATCH_SIZE o pasan
+FLUSH_INTERVAL segundos, con la retención aplicada una vez por lote.
+
+By LOUST (www.loust.pro)
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List
+
+try:
+    from ..utils.logger import log_info, log_error
+except ImportError:
+    def log_info(msg): print(f"[INFO] {msg}")
+    def log_error(msg): print(f"[ERROR] {msg}")
+
+
+class MetricWriter:
+    """
+    Buffer en memoria delante de storage.save_metrics().
+
+    Si el disco se atasca, la cola se limita a MAX_QUEUE métricas y se
+    descartan las más antiguas (el muestreo nunca se bloquea).
+    """
+
+    BATCH_SIZE = 60             # ~1 minuto a 1 Hz
+    FLUSH_INTERVAL = 10.0       # Segundos máximos en memoria
+    MAX_QUEUE = 10_000
+
+    def __init__(self, storage, batch_size: int = None, flush_interval: float = None):
+        """
+        Args:
+            storage: NetBooztStorage o SQLiteStorage (con save_metrics)
+            batch_size: Métricas por lote (default: BATCH_SIZE)
+            flush_interval: Segundos entre flushes (default: FLUSH_INTERVAL)
+        """
+        self.storage = storage
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.flush_interval = flush_interval or self.FLUSH_INTERVAL
+
+        self._queue: Deque[Dict] = deque(maxlen=self.MAX_QUEUE)
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self.is_running = False
+
+        # Métricas de la propia ingesta
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    def start(self):
+        """Iniciar el thread de escritura"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+        log_info(f"MetricWriter iniciado (lote {self.batch_size}, cada {self.flush_interval:.0f}s)")
+
+    def stop(self):
+        """Detener y persistir lo pendiente"""
+        self.is_running = False
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5.0)
+        self.flush()
+        log_info(f"MetricWriter detenido ({self.written} métricas escritas en {self.batches} lotes)")
+
+    def submit(self, metric_data: Dict):
+        """Encolar una métrica (no toca el disco)"""
+        metric_data.setdefault('timestamp', datetime.now().isoformat())
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append(metric_data)
+        self.submitted += 1
+        if len(self._queue) >= self.batch_size:
+            self._wake.set()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def _writer_loop(self):
+        while self.is_running:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Persistir todo lo encolado (en lotes de batch_size).
+
+        Returns:
+            Métricas escritas
+        """
+        written = 0
+        with self._flush_lock:
+            while self._queue:
+                batch: List[Dict] = []
+                while self._queue and len(batch) < self.batch_size:
+                    batch.append(self._queue.popleft())
+
+                start = time.perf_counter()
+                try:
+                    self.storage.save_metrics(batch)
+                except Exception as e:
+                    # Devolver el lote a la cola para el próximo intento
+                    self.failed_batches += 1
+                    self._queue.extendleft(reversed(batch))
+                    log_error(f"Error escribiendo lote de métricas: {e}")
+                    break
+
+                elapsed = (time.perf_counter() - start) * 1000
+                self.last_flush_ms = elapsed
+                self.max_flush_ms = max(self.max_flush_ms, elapsed)
+                self._total_flush_ms += elapsed
+                self.batches += 1
+                self.written += len(batch)
+                written += len(batch)
+        return written
+
+    def get_stats(self) -> Dict:
+        """Profundidad de cola y latencia de flush"""
+        return {
+            'queue_depth': self.queue_depth,
+            'submitted': self.submitted,
+            'written': self.written,
+            'dropped': self.dropped,
+            'batches': self.batches,
+            'failed_batches': self.failed_batches,
+            'last_flush_ms': self.last_flush_ms,
+            'avg_flush_ms': self._total_flush_ms / self.batches if self.batches else 0.0,
+            'max_flush_ms': self.max_flush_ms,
+        }
@@ -0,0 +1,162 @@
+"""
+NetBoozt - Índice de Tests de Red por Timestamp
+Índice secundario ordenado (timestamp, doc_id) y estadísticas incrementales
+para el historial de tests. Con decenas de miles de tests, "últimos N" y
+"rango de fechas" pasan de recorrer (y ordenar) toda la tabla a bisecar
+el índice: O(log n + k). Las estadísticas se actualizan en cada alta/baja.
+
+By LOUST (www.loust.pro)
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def network_test_values(test: Dict) -> Tuple[float, float, float]:
+    """(descarga, subida, latencia) de un test (faltantes = 0)"""
+    return (test.get('download_mbps') or 0, test.get('upload_mbps') or 0, test.get('latency_ms') or 0)
+
+
+class NetworkTestStats:
+    """
+    Agregados de get_test_stats() mantenidos en O(1) por alta/baja.
+
+    Los máximos no se pueden "restar": si se elimina el test que los
+    define, se recalculan con recompute_max() en la próxima consulta.
+    """
+
+    def __init__(self, recompute_max: Callable[[], Tuple[float, float]]):
+        """
+        Args:
+            recompute_max: Devuelve (mejor descarga, peor latencia) de todos los tests
+        """
+        self._recompute_max = recompute_max
+        self.reset()
+
+    def reset(self, count: int = 0, sums: Tuple[float, float, float] = (0.0, 0.0, 0.0),
+              best_download: float = 0, worst_latency: float = 0):
+        self.count = count
+        self.sum_download, self.sum_upload, self.sum_latency = sums
+        self.best_download = best_download
+        self.worst_latency = worst_latency
+        self._max_stale = False
+
+    def add(self, values: Tuple[float, float, float]):
+        download, upload, latency = values
+        if not self.count:
+            self.best_download, self.worst_latency = download, latency
+        self.count += 1
+        self.sum_download += download
+        self.sum_upload += upload
+        self.sum_latency += latency
+        if not self._max_stale:
+            self.best_download = max(self.best_download, download)
+            self.worst_latency = max(self.worst_latency, latency)
+
+    def remove(self, values: Tuple[float, float, float]):
+        download, upload, latency = values
+        self.count -= 1
+        if not self.count:
+            self.reset()
+            return
+        self.sum_download -= download
+        self.sum_upload -= upload
+        self.sum_latency -= latency
+        if download >= self.best_download or latency >= self.worst_latency:
+            self._max_stale = True
+
+    def as_dict(self) -> Dict:
+        """Mismo formato que get_test_stats()"""
+        if not self.count:
+            return {
+                'total_tests': 0,
+                'avg_download': 0,
+                'avg_upload': 0,
+                'avg_latency': 0,
+                'best_download': 0,
+                'worst_latency': 999
+            }
+
+        if self._max_stale:
+            self.best_download, self.worst_latency = self._recompute_max()
+            self._max_stale = False
+
+        return {
+            'total_tests': self.count,
+            'avg_download': self.sum_download / self.count,
+            'avg_upload': self.sum_upload / self.count,
+            'avg_latency': self.sum_latency / self.count,
+            'best_download': self.best_download,
+            'worst_latency': self.worst_latency
+        }
+
+
+class NetworkTestIndex:
+    """
+    Tests en memoria con índice ordenado por (timestamp, doc_id).
+
+    Los timestamps son ISO 8601 (como los guarda save_network_test), así
+    que el orden de strings es el cronológico.
+    """
+
+    def __init__(self, documents: Iterable[Dict] = ()):
+        """
+        Args:
+            documents: Tests existentes con doc_id (una sola pasada al abrir)
+        """
+        self._docs: Dict[int, Dict] = {}
+        self._keys: List[Tuple[str, int]] = []
+        self.stats = NetworkTestStats(self._recompute_max)
+
+        for doc in documents:
+            self._docs[doc.doc_id] = doc
+            self._keys.append(self._key(doc, doc.doc_id))
+            self.stats.add(network_test_values(doc))
+        self._keys.sort()
+
+    @staticmethod
+    def _key(test: Dict, doc_id: int) -> Tuple[str, int]:
+        return (test.get('timestamp') or '', doc_id)
+
+    def _recompute_max(self) -> Tuple[float, float]:
+        values = [network_test_values(doc) for doc in self._docs.values()]
+        return max(v[0] for v in values), max(v[2] for v in values)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, doc):
+        """Registrar un test recién insertado (Document con doc_id)"""
+        self.remove(doc.doc_id)
+        self._docs[doc.doc_id] = doc
+        insort(self._keys, self._key(doc, doc.doc_id))
+        self.stats.add(network_test_values(doc))
+
+    def remove(self, doc_id: int) -> bool:
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return False
+        key = self._key(doc, doc_id)
+        del self._keys[bisect_left(self._keys, key)]
+        self.stats.remove(network_test_values(doc))
+        return True
+
+    def get(self, doc_id: int) -> Optional[Dict]:
+        return self._docs.get(doc_id)
+
+    def recent_ids(self, limit: int) -> List[int]:
+        """doc_ids de los `limit` tests más nuevos, del más nuevo al más viejo"""
+        if limit <= 0:
+            return []
+        return [doc_id for _, doc_id in reversed(self._keys[-limit:])]
+
+    def range_ids(self, start: str, end: str) -> List[int]:
+        """doc_ids con start <= timestamp <= end, en orden cronológico"""
+        lo = bisect_left(self._keys, (start,))
+        hi = bisect_right(self._keys, (end, float('inf')))
+        return [doc_id for _, doc_id in self._keys[lo:hi]]
+
+    def older_than(self, cutoff: str) -> List[int]:
+        """doc_ids con timestamp < cutoff (los tests sin timestamp no cuentan)"""
+        lo = bisect_right(self._keys, ('', float('inf')))
+        return [doc_id for _, doc_id in self._keys[lo:bisect_left(self._keys, (cutoff,))]]
@@ -0,0 +1,437 @@
+"""
+NetBoozt - Rollups de Series Temporales por Niveles
+Agregados incrementales 1s → 1m → 15m → 1h (min/media/máx/p95 y conteo)
+por métrica y adaptador, cada nivel con su propia retención. Así las
+gráficas de "24 horas", "7 días" o un mes se sirven con unos cientos de
+puntos sin guardar millones de muestras crudas.
+
+Cada nivel mantiene solo un bucket abierto; al cerrarse, su resumen queda
+en el nivel y su contenido se fusiona en el bucket abierto del nivel
+siguiente. El p95 es fusionable gracias a un histograma logarítmico
+disperso (error relativo ~2.5%), que solo existe en los buckets abiertos.
+
+By LOUST (www.loust.pro)
+"""
+
+import json
+import math
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from ..utils.logger import log_info, log_warning
+except ImportError:
+    def log_info(msg): print(f"[INFO] {msg}")
+    def log_warning(msg): print(f"[WARN] {msg}")
+
+
+# Histograma logarítmico: bin k cubre (GAMMA^(k-1), GAMMA^k]
+GAMMA = 1.05
+_LOG_GAMMA = math.log(GAMMA)
+ZERO_BIN = -(10 ** 6)           # Valores <= MIN_POSITIVE
+MIN_POSITIVE = 1e-9
+
+
+def _ts(value) -> float:
+    return value.timestamp() if isinstance(value, datetime) else float(value)
+
+
+@dataclass
+class RollupPoint:
+    """Resumen de un bucket"""
+    start: float                # Epoch del inicio del bucket
+    count: int
+    min: float
+    mean: float
+    max: float
+    p95: float
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self.start)
+
+    def to_list(self) -> list:
+        return [self.start, self.count, self.min, self.mean, self.max, self.p95]
+
+
+class _Bucket:
+    """Bucket abierto: acumuladores + histograma para el p95"""
+
+    __slots__ = ('start', 'count', 'total', 'min', 'max', 'sketch')
+
+    def __init__(self, start: float):
+        self.start = start
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch: Dict[int, int] = {}
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        key = math.ceil(math.log(value) / _LOG_GAMMA) if value > MIN_POSITIVE else ZERO_BIN
+        self.sketch[key] = self.sketch.get(key, 0) + 1
+
+    def merge(self, other: '_Bucket'):
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for key, count in other.sketch.items():
+            self.sketch[key] = self.sketch.get(key, 0) + count
+
+    def quantile(self, q: float) -> float:
+        if self.min == self.max:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.sketch):
+            seen += self.sketch[key]
+            if seen > rank:
+                value = 0.0 if key == ZERO_BIN else 2 * GAMMA ** key / (GAMMA + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_point(self) -> RollupPoint:
+        return RollupPoint(self.start, self.count, self.min, self.total / self.count,
+                           self.max, self.quantile(0.95))
+
+    def to_dict(self) -> Dict:
+        return {'start': self.start, 'count': self.count, 'total': self.total,
+                'min': self.min, 'max': self.max, 'sketch': list(self.sketch.items())}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> '_Bucket':
+        bucket = cls(data['start'])
+        bucket.count = data['count']
+        bucket.total = data['total']
+        bucket.min = data['min']
+        bucket.max = data['max']
+        bucket.sketch = {int(k): int(v) for k, v in data['sketch']}
+        return bucket
+
+
+class RollupTier:
+    """Un nivel: resolución, retención, puntos cerrados y bucket abierto"""
+
+    def __init__(self, name: str, resolution: int, retention: int):
+        self.name = name
+        self.resolution = resolution
+        self.retention = retention
+        self.points: List[RollupPoint] = []
+        self._starts: List[float] = []
+        self._expired = 0               # Puntos vencidos aún en la lista
+        self.open: Optional[_Bucket] = None
+        self.closed = 0                 # Buckets cerrados (dispara el autoguardado)
+
+    def bucket_start(self, timestamp: float) -> float:
+        return timestamp - timestamp % self.resolution
+
+    def close(self) -> _Bucket:
+        """Cerrar el bucket abierto y aplicar la retención"""
+        bucket, self.open = self.open, None
+        self.closed += 1
+        point = bucket.to_point()
+        self.points.append(point)
+        self._starts.append(point.start)
+
+        # Retención por bisección; recortar la lista cada tanto (no en cada punto)
+        cutoff = point.start - self.retention
+        self._expired = bisect_left(self._starts, cutoff)
+        if self._expired > max(64, len(self.points) // 8):
+            del self.points[:self._expired]
+            del self._starts[:self._expired]
+            self._expired = 0
+        return bucket
+
+    def range(self, start: float, end: float) -> List[RollupPoint]:
+        """Puntos cerrados con inicio en [start, end]"""
+        lo = max(bisect_left(self._starts, start), self._expired)
+        hi = bisect_right(self._starts, end)
+        return self.points[lo:hi]
+
+    @property
+    def oldest(self) -> Optional[float]:
+        if len(self.points) > self._expired:
+            return self._starts[self._expired]
+        return self.open.start if self.open else None
+
+
+class RollupSeries:
+    """Niveles encadenados de una métrica en un adaptador"""
+
+    def __init__(self, tiers: Tuple[Tuple[str, int, int], ...]):
+        self.tiers = [RollupTier(*spec) for spec in tiers]
+        self.last_timestamp: Optional[float] = None
+
+    def add(self, value: float, timestamp: float):
+        base = self.tiers[0]
+        start = base.bucket_start(timestamp)
+        if base.open is not None and start > base.open.start:
+            self._promote(1, base.close())
+        if base.open is None:
+            base.open = _Bucket(start)
+        # Muestras atrasadas caen en el bucket abierto (no se reabren cerrados)
+        base.open.add(value)
+        self.last_timestamp = timestamp if self.last_timestamp is None else max(self.last_timestamp, timestamp)
+
+    def _promote(self, level: int, bucket: _Bucket):
+        """Fusionar un bucket cerrado en el nivel siguiente (en cascada)"""
+        if level >= len(self.tiers):
+            return
+        tier = self.tiers[level]
+        start = tier.bucket_start(bucket.start)
+        if tier.open is not None and start > tier.open.start:
+            self._promote(level + 1, tier.close())
+        if tier.open is None:
+            tier.open = _Bucket(start)
+        tier.open.merge(bucket)
+
+    def pending(self, level: int) -> List[_Bucket]:
+        """
+        Bucket abierto del nivel junto con lo que aún no subió desde los
+        niveles más finos (sus buckets abiertos son disjuntos entre sí),
+        agrupado por bucket del nivel.
+        """
+        tier = self.tiers[level]
+        merged: Dict[float, _Bucket] = {}
+        for bucket in (t.open for t in self.tiers[:level + 1]):
+            if bucket is None:
+                continue
+            start = tier.bucket_start(bucket.start)
+            if start not in merged:
+                merged[start] = _Bucket(start)
+            merged[start].merge(bucket)
+        return [merged[start] for start in sorted(merged)]
+
+    def range(self, level: int, start: float, end: float) -> List[RollupPoint]:
+        points = self.tiers[level].range(start, end)
+        points.extend(b.to_point() for b in self.pending(level) if start <= b.start <= end)
+        return points
+
+    def to_dict(self) -> Dict:
+        return {
+            'last': self.last_timestamp,
+            'tiers': [{
+                'points': [p.to_list() for p in tier.points[tier._expired:]],
+                'open': tier.open.to_dict() if tier.open else None,
+            } for tier in self.tiers]
+        }
+
+    def load_dict(self, data: Dict):
+        self.last_timestamp = data.get('last')
+        for tier, saved in zip(self.tiers, data['tiers']):
+            tier.points = [RollupPoint(*values) for values in saved['points']]
+            tier._starts = [p.start for p in tier.points]
+            tier._expired = 0
+            tier.open = _Bucket.from_dict(saved['open']) if saved.get('open') else None
+
+
+class RollupEngine:
+    """
+    Rollups por (métrica, adaptador).
+
+    query() elige el nivel más fino que cubre el rango pedido sin pasar
+    del presupuesto de puntos: con 500, 5 min se ven a 1s, 8 h a 1m,
+    5 días a 15m y rangos mayores a 1h.
+    """
+
+    # (nombre, resolución en segundos, retención en segundos)
+    TIERS = (
+        ('1s', 1, 3600),                # 1 hora de crudo
+        ('1m', 60, 2 * 86400),          # 2 días
+        ('15m', 900, 31 * 86400),       # 1 mes
+        ('1h', 3600, 400 * 86400),      # ~13 meses
+    )
+
+    # Métricas de NetworkSnapshot agregadas por add_snapshot()
+    SNAPSHOT_METRICS = {
+        'download_mbps': 'download_rate_mbps',
+        'upload_mbps': 'upload_rate_mbps',
+        'latency_ms': 'latency_ms',
+        'errors_per_sec': 'errors_per_sec',
+        'drops_per_sec': 'drops_per_sec',
+    }
+
+    DEFAULT_MAX_POINTS = 500
+    DEFAULT_PATH = Path.home() / ".netboozt" / "rollups.json"
+
+    # Con autosave, guardar en segundo plano cada vez que cierra un bucket
+    # de este nivel (y por lo tanto también al cerrar uno de 1h)
+    AUTOSAVE_TIER = '15m'
+
+    def __init__(self, tiers: Optional[Tuple[Tuple[str, int, int], ...]] = None,
+                 path: Optional[Path] = None, autosave: bool = False):
+        """
+        Args:
+            tiers: Niveles (default: TIERS)
+            path: Archivo de persistencia (default: DEFAULT_PATH)
+            autosave: Guardar al cerrarse cada bucket de AUTOSAVE_TIER
+        """
+        self.tier_specs = tiers or self.TIERS
+        self.path = Path(path) if path else self.DEFAULT_PATH
+        self.series: Dict[Tuple[str, str], RollupSeries] = {}
+        self._lock = threading.Lock()
+        names = [spec[0] for spec in self.tier_specs]
+        self._autosave_level = names.index(self.AUTOSAVE_TIER) if autosave and self.AUTOSAVE_TIER in names else None
+        self._save_thread: Optional[threading.Thread] = None
+        self._save_lock = threading.Lock()      # Autosave y save() final no se pisan
+
+    def add_sample(self, metric: str, value: float, timestamp, adapter: str = "default"):
+        """Incorporar una muestra (O(1) amortizado)"""
+        key = (metric, adapter)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = RollupSeries(self.tier_specs)
+            if self._autosave_level is None:
+                series.add(float(value), _ts(timestamp))
+                return
+            watched = series.tiers[self._autosave_level]
+            closed = watched.closed
+            series.add(float(value), _ts(timestamp))
+            closed = watched.closed != closed
+        if closed:
+            self._save_in_background()
+
+    def _save_in_background(self):
+        """Un solo guardado a la vez; los cierres simultáneos de varias series se agrupan"""
+        with self._lock:
+            if self._save_thread is not None and self._save_thread.is_alive():
+                return
+            self._save_thread = threading.Thread(target=self.save, daemon=True, name="rollups-save")
+            self._save_thread.start()
+
+    def add_snapshot(self, snapshot):
+        """
+        Callback para NetworkMonitor.register_callback.
+
+        Las series quedan bajo snapshot.adapter (el adaptador realmente
+        medido: coincidencia parcial del nombre o "All"); la UI consulta
+        con ese mismo valor.
+        """
+        for metric, attribute in self.SNAPSHOT_METRICS.items():
+            value = getattr(snapshot, attribute, None)
+            if value is not None:
+                self.add_sample(metric, value, snapshot.timestamp, snapshot.adapter)
+
+    def choose_tier(self, metric: str, start, end, max_points: int = DEFAULT_MAX_POINTS,
+                    adapter: str = "default") -> Optional[RollupTier]:
+        """
+        Nivel más fino que cubre [start, end] con <= max_points puntos.
+
+        Si ninguno conserva datos desde start (serie joven o rango más viejo
+        que la retención), el que más historia tenga; si ninguno entra en el
+        presupuesto, el más grueso.
+        """
+        series = self.series.get((metric, adapter))
+        if series is None:
+            return None
+        span = max(_ts(end) - _ts(start), 0)
+
+        candidates = [t for t in series.tiers if span / t.resolution <= max_points]
+        if not candidates:
+            return series.tiers[-1]
+        for tier in candidates:
+            if tier.oldest is not None and tier.oldest <= _ts(start):
+                return tier
+        return min(candidates, key=lambda t: math.inf if t.oldest is None else t.oldest)
+
+    def query(self, metric: str, start, end=None, max_points: int = DEFAULT_MAX_POINTS,
+              adapter: str = "default") -> Tuple[Optional[str], List[RollupPoint]]:
+        """
+        Puntos de [start, end] en el nivel adecuado.
+
+        Returns:
+            (nombre del nivel, puntos ordenados)
+        """
+        end = datetime.now() if end is None else end
+        with self._lock:
+            tier = self.choose_tier(metric, start, end, max_points, adapter)
+            if tier is None:
+                return None, []
+            series = self.series[(metric, adapter)]
+            level = series.tiers.index(tier)
+            return tier.name, series.range(level, _ts(start) - tier.resolution + 1, _ts(end))
+
+    def get_summary(self) -> List[Dict]:
+        """Puntos por nivel de cada serie (para UI/diagnóstico)"""
+        with self._lock:
+            return [{
+                'metric': metric,
+                'adapter': adapter,
+                'tiers': {t.name: len(t.points) - t._expired + (1 if t.open else 0) for t in series.tiers},
+            } for (metric, adapter), series in self.series.items()]
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+
+    def save(self, path: Optional[Path] = None):
+        """Guardar rollups a disco (JSON, escritura atómica)"""
+        path = Path(path or self.path)
+        with self._save_lock:
+            with self._lock:
+                data = [{'metric': metric, 'adapter': adapter, 'series': series.to_dict()}
+                        for (metric, adapter), series in self.series.items()]
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix('.tmp')
+                tmp_path.write_text(json.dumps(data))
+                tmp_path.replace(path)
+            except OSError as e:
+                log_warning(f"No se pudieron guardar rollups: {e}")
+
+    def load(self, path: Optional[Path] = None):
+        """Cargar rollups desde disco"""
+        path = Path(path or self.path)
+        if not path.exists():
+            return
+        try:
+            for entry in json.loads(path.read_text()):
+                series = RollupSeries(self.tier_specs)
+                series.load_dict(entry['series'])
+                self.series[(entry['metric'], entry['adapter'])] = series
+            log_info(f"Rollups cargados: {len(self.series)} series")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            log_warning(f"Rollups descartados: {e}")
+
+
+# Singleton
+_rollup_engine_instance = None
+
+def get_rollup_engine() -> RollupEngine:
+    """Obtener instancia única del motor de rollups (cargada de DEFAULT_PATH, con autosave)"""
+    global _rollup_engine_instance
+    if _rollup_engine_instance is None:
+        _rollup_engine_instance = RollupEngine(autosave=True)
+        _rollup_engine_instance.load()
+    return _rollup_engine_instance
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    engine = RollupEngine()
+    now = time.time()
+    start = now - 30 * 86400
+    t0 = time.perf_counter()
+    for second in range(30 * 86400):
+        engine.add_sample("latency_ms", 20 + random.random() * 10 + (80 if second % 3600 < 60 else 0),
+                          start + second)
+    print(f"30 días a 1 Hz: {time.perf_counter() - t0:.1f}s de ingesta, {engine.get_summary()}")
+
+    for label, span in (("30 min", 1800), ("24 horas", 86400), ("7 días", 7 * 86400), ("30 días", 30 * 86400)):
+        t0 = time.perf_counter()
+        tier, points = engine.query("latency_ms", now - span, now)
+        print(f"{label:>8}: nivel {tier:>3}, {len(points)} puntos en {(time.perf_counter() - t0) * 1000:.2f}ms")
@@ -31,6 +31,7 @@ class SpeedTestResult:
     adapter: str
     server: str
     test_duration_s: float
+    profile: str = ""  # Perfil de optimización activo (vacío en registros antiguos)
 
 
 class SpeedTestStorage:
@@ -66,7 +67,7 @@ class SpeedTestStorage:
         """Limpieza inteligente según estrategia 3-2-1"""
         try:
             now = datetime.now()
-            all_tests = self.storage.tests.all()
+            all_tests = self.storage.get_all_tests()
             
             if not all_tests:
                 return
@@ -118,8 +119,7 @@ class SpeedTestStorage:
             to_delete = all_ids - keep_ids
             
             if to_delete:
-                for doc_id in to_delete:
-                    self.storage.tests.remove(doc_ids=[doc_id])
+                self.storage.remove_tests(to_delete)
                 
                 log_info(f"Cleanup: {len(to_delete)} tests antiguos eliminados, {len(keep_ids)} mantenidos")
         
@@ -0,0 +1,475 @@
+"""
+NetBoozt - Storage SQLite (WAL)
+Mismo API público que NetBooztStorage, sobre SQLite en modo WAL.
+
+TinyDB reescribe todo el JSON en cada insert, así que el costo de guardar
+crece con el tamaño de la base; aquí cada insert es una fila nueva en el
+log WAL y las consultas por fecha usan índices sobre timestamp.
+
+Cada documento se guarda completo como JSON en la columna `data`; las
+columnas por las que se filtra u ordena (timestamp, adapter, name...) se
+duplican e indexan.
+
+By LOUST (www.loust.pro)
+"""
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .network_test_index import NetworkTestStats, network_test_values
+
+try:
+    from ..utils.logger import log_info
+except ImportError:
+    def log_info(msg): print(f"[INFO] {msg}")
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS network_tests (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    adapter TEXT,
+    download_mbps REAL,
+    upload_mbps REAL,
+    latency_ms REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tests_timestamp ON network_tests(timestamp);
+
+CREATE TABLE IF NOT EXISTS optimizations (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    enabled INTEGER,
+    applied_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_optimizations_name ON optimizations(name);
+
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT,
+    updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS metrics (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    adapter TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_metrics_timestamp ON metrics(timestamp);
+"""
+
+
+class StoredDocument(dict):
+    """Documento con su id (equivalente a tinydb.table.Document)"""
+
+    def __init__(self, value: Dict, doc_id: int):
+        super().__init__(value)
+        self.doc_id = doc_id
+
+
+class SQLiteStorage:
+    """Gestor de almacenamiento local sobre SQLite en modo WAL"""
+
+    # Métricas en tiempo real conservadas (igual que NetBooztStorage)
+    MAX_METRICS = 1000
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Args:
+            db_path: Ruta de la base. Por defecto: %APPDATA%/NetBoozt/netboozt_data.db
+        """
+        if db_path is None:
+            appdata = Path.home() / "AppData" / "Roaming" / "NetBoozt"
+            appdata.mkdir(parents=True, exist_ok=True)
+            db_path = appdata / "netboozt_data.db"
+
+        self.db_path = Path(db_path)
+        self._lock = threading.RLock()
+        self._in_transaction = False
+        # El GUI guarda métricas desde el thread del monitor
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # En WAL, NORMAL solo sincroniza en checkpoints: seguro ante caídas del proceso
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+        # Estadísticas de tests: un agregado al abrir, luego incrementales
+        self.test_stats = NetworkTestStats(self._recompute_test_max)
+        self._load_test_stats()
+
+    def __del__(self):
+        """Cleanup al destruir el objeto"""
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _commit(self):
+        """Confirmar, salvo dentro de transaction() (confirma al salir)"""
+        if not self._in_transaction:
+            self._conn.commit()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Agrupar varias escrituras en una sola transacción: si algo falla
+        dentro del bloque no queda ningún cambio aplicado.
+        """
+        with self._lock:
+            if self._in_transaction:
+                yield
+                return
+            self._in_transaction = True
+            try:
+                yield
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                self._load_test_stats()
+                raise
+            finally:
+                self._in_transaction = False
+
+    def _execute(self, sql: str, params: Iterable = ()) -> sqlite3.Cursor:
+        with self._lock:
+            cursor = self._conn.execute(sql, tuple(params))
+            self._commit()
+            return cursor
+
+    def _query(self, sql: str, params: Iterable = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    @staticmethod
+    def _documents(rows: List[tuple]) -> List[StoredDocument]:
+        """Filas (id, data) → documentos"""
+        return [StoredDocument(json.loads(data), doc_id) for doc_id, data in rows]
+
+    @staticmethod
+    def _dumps(value) -> str:
+        return json.dumps(value, ensure_ascii=False, default=str)
+
+    # ==================== Tests de Red ====================
+
+    def _test_row(self, test_data: Dict) -> tuple:
+        return (test_data.get('timestamp', ''), test_data.get('adapter'),
+                test_data.get('download_mbps'), test_data.get('upload_mbps'),
+                test_data.get('latency_ms'), self._dumps(test_data))
+
+    def _load_test_stats(self):
+        total, sum_down, sum_up, sum_lat, best_down, worst_lat = self._query(
+            "SELECT COUNT(*), TOTAL(download_mbps), TOTAL(upload_mbps), TOTAL(latency_ms), "
+            "MAX(COALESCE(download_mbps, 0)), MAX(COALESCE(latency_ms, 0)) FROM network_tests")[0]
+        self.test_stats.reset(total, (sum_down, sum_up, sum_lat), best_down or 0, worst_lat or 0)
+
+    def _recompute_test_max(self) -> Tuple[float, float]:
+        return tuple(self._query(
+            "SELECT MAX(COALESCE(download_mbps, 0)), MAX(COALESCE(latency_ms, 0)) FROM network_tests")[0])
+
+    def _test_values(self, where: str, params: Iterable = ()) -> List[tuple]:
+        """(descarga, subida, latencia) de los tests que cumplen where"""
+        return self._query(
+            "SELECT COALESCE(download_mbps, 0), COALESCE(upload_mbps, 0), COALESCE(latency_ms, 0) "
+            f"FROM network_tests WHERE {where}", params)
+
+    def save_network_test(self, test_data: Dict) -> int:
+        """Guardar resultado de prueba de red (ver NetBooztStorage.save_network_test)"""
+        test_data['timestamp'] = datetime.now().isoformat()
+        with self._lock:
+            cursor = self._execute(
+                "INSERT INTO network_tests (timestamp, adapter, download_mbps, upload_mbps, latency_ms, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)", self._test_row(test_data))
+            self.test_stats.add(network_test_values(test_data))
+        return cursor.lastrowid
+
+    def get_recent_tests(self, limit: int = 10) -> List[Dict]:
+        """Obtener tests recientes"""
+        return self._documents(self._query(
+            "SELECT id, data FROM network_tests ORDER BY timestamp DESC, id DESC LIMIT ?", (limit,)))
+
+    def get_tests_by_date_range(self, start: datetime, end: datetime) -> List[Dict]:
+        """Obtener tests en rango de fechas"""
+        return self._documents(self._query(
+            "SELECT id, data FROM network_tests WHERE timestamp >= ? AND timestamp <= ? ORDER BY timestamp, id",
+            (start.isoformat(), end.isoformat())))
+
+    def get_all_tests(self) -> List[Dict]:
+        """Todos los tests (con doc_id)"""
+        return self._documents(self._query("SELECT id, data FROM network_tests ORDER BY id"))
+
+    def remove_tests(self, doc_ids: Iterable[int]) -> int:
+        """Eliminar tests por id"""
+        ids = [(doc_id,) for doc_id in doc_ids]
+        with self._lock:
+            for doc_id, in ids:
+                for values in self._test_values("id = ?", (doc_id,)):
+                    self.test_stats.remove(values)
+            self._conn.executemany("DELETE FROM network_tests WHERE id = ?", ids)
+            self._commit()
+        return len(ids)
+
+    def get_test_stats(self) -> Dict:
+        """Estadísticas de todos los tests (incrementales, ver NetworkTestStats)"""
+        with self._lock:
+            return self.test_stats.as_dict()
+
+    # ==================== Optimizaciones ====================
+
+    def _insert_optimization(self, opt_data: Dict) -> int:
+        cursor = self._execute(
+            "INSERT INTO optimizations (name, enabled, applied_at, data) VALUES (?, ?, ?, ?)",
+            (opt_data.get('name'), int(bool(opt_data.get('enabled'))), opt_data.get('applied_at'),
+             self._dumps(opt_data)))
+        return cursor.lastrowid
+
+    def save_optimization(self, opt_data: Dict) -> int:
+        """Guardar optimización aplicada (ver NetBooztStorage.save_optimization)"""
+        opt_data['applied_at'] = datetime.now().isoformat()
+        return self._insert_optimization(opt_data)
+
+    def get_active_optimizations(self) -> List[Dict]:
+        """Obtener optimizaciones actualmente activas"""
+        return self._documents(self._query("SELECT id, data FROM optimizations WHERE enabled = 1 ORDER BY id"))
+
+    def get_optimization_history(self, name: str) -> List[Dict]:
+        """Historial de una optimización específica"""
+        return self._documents(self._query("SELECT id, data FROM optimizations WHERE name = ? ORDER BY id", (name,)))
+
+    def toggle_optimization(self, name: str, enabled: bool):
+        """Marcar optimización como activada/desactivada"""
+        updated_at = datetime.now().isoformat()
+        with self._lock:
+            for doc in self.get_optimization_history(name):
+                doc.update({'enabled': enabled, 'last_updated': updated_at})
+                self._conn.execute("UPDATE optimizations SET enabled = ?, data = ? WHERE id = ?",
+                                   (int(enabled), self._dumps(doc), doc.doc_id))
+            self._commit()
+
+    def save_optimization_state(self, state_dict: Dict[str, bool]):
+        """Guardar estado completo de optimizaciones (cache local)"""
+        self.save_setting('optimization_state_cache', {
+            'state': state_dict,
+            'detected_at': datetime.now().isoformat()
+        })
+
+    def load_optimization_state(self) -> Optional[Dict[str, bool]]:
+        """Cargar estado cacheado de optimizaciones (máximo 1 hora)"""
+        cache = self.get_setting('optimization_state_cache')
+
+        if cache and isinstance(cache, dict) and cache.get('detected_at'):
+            try:
+                age = datetime.now() - datetime.fromisoformat(cache['detected_at'])
+                if age < timedelta(hours=1):
+                    return cache.get('state', {})
+            except ValueError:
+                pass
+
+        return None
+
+    # ==================== Configuración ====================
+
+    def save_setting(self, key: str, value):
+        """Guardar configuración"""
+        self._execute(
+            "INSERT INTO settings (key, value, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+            (key, self._dumps(value), datetime.now().isoformat()))
+
+    def get_setting(self, key: str, default=None):
+        """Obtener configuración"""
+        rows = self._query("SELECT value FROM settings WHERE key = ?", (key,))
+        return json.loads(rows[0][0]) if rows else default
+
+    def get_all_settings(self) -> Dict:
+        """Todas las configuraciones como dict"""
+        return {key: json.loads(value) for key, value in self._query("SELECT key, value FROM settings")}
+
+    # ==================== Métricas Real-Time ====================
+
+    def save_metric(self, metric_data: Dict) -> int:
+        """Guardar métrica de red en tiempo real (ver NetBooztStorage.save_metric)"""
+        metric_data['timestamp'] = datetime.now().isoformat()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO metrics (timestamp, adapter, data) VALUES (?, ?, ?)",
+                (metric_data['timestamp'], metric_data.get('adapter'), self._dumps(metric_data)))
+            # Retención en una sola sentencia (usa el índice de timestamp)
+            self._conn.execute(
+                "DELETE FROM metrics WHERE timestamp < "
+                "(SELECT timestamp FROM metrics ORDER BY timestamp DESC LIMIT 1 OFFSET ?)",
+                (self.MAX_METRICS - 1,))
+            self._commit()
+            return cursor.lastrowid
+
+    def save_metrics(self, metrics: List[Dict]) -> int:
+        """Guardar un lote de métricas en una transacción (ver NetBooztStorage.save_metrics)"""
+        if not metrics:
+            return 0
+        now = datetime.now().isoformat()
+        for metric in metrics:
+            metric.setdefault('timestamp', now)
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO metrics (timestamp, adapter, data) VALUES (?, ?, ?)",
+                [(m['timestamp'], m.get('adapter'), self._dumps(m)) for m in metrics])
+            self._conn.execute(
+                "DELETE FROM metrics WHERE timestamp < "
+                "(SELECT timestamp FROM metrics ORDER BY timestamp DESC LIMIT 1 OFFSET ?)",
+                (self.MAX_METRICS - 1,))
+            self._commit()
+        return len(metrics)
+
+    def get_recent_metrics(self, limit: int = 100) -> List[Dict]:
+        """Obtener métricas recientes para gráficas"""
+        return self._documents(self._query(
+            "SELECT id, data FROM metrics ORDER BY timestamp DESC LIMIT ?", (limit,)))
+
+    # ==================== Utilidades ====================
+
+    def export_to_json(self, filepath: Path):
+        """Exportar toda la DB a JSON"""
+        data = {
+            'tests': self.get_all_tests(),
+            'optimizations': self._documents(self._query("SELECT id, data FROM optimizations ORDER BY id")),
+            'settings': [{'key': key, 'value': value} for key, value in self.get_all_settings().items()],
+            'metrics': self.get_recent_metrics(self.MAX_METRICS),
+            'exported_at': datetime.now().isoformat()
+        }
+
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    def import_from_json(self, filepath: Path):
+        """Importar datos desde JSON (formato de export_to_json)"""
+        with open(filepath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        self.insert_documents(
+            tests=data.get('tests', []),
+            optimizations=data.get('optimizations', []),
+            metrics=data.get('metrics', [])
+        )
+        for setting in data.get('settings', []):
+            self.save_setting(setting['key'], setting['value'])
+
+    def insert_documents(self, tests: Iterable[Dict] = (), optimizations: Iterable[Dict] = (),
+                         metrics: Iterable[Dict] = (), keep_ids: bool = False):
+        """
+        Inserción masiva en una transacción (importación y migración).
+
+        Args:
+            keep_ids: Conservar los ids de origen (doc_id de TinyDB); un id ya
+                presente se reemplaza, así reintentar una migración es idempotente
+        """
+        def rows(documents, row):
+            for doc in documents:
+                values = row(doc)
+                yield ((getattr(doc, 'doc_id', None),) + values) if keep_ids else values
+
+        id_column = "id, " if keep_ids else ""
+        id_param = "?, " if keep_ids else ""
+        insert = "INSERT OR REPLACE" if keep_ids else "INSERT"
+        with self._lock:
+            self._conn.executemany(
+                f"{insert} INTO network_tests ({id_column}timestamp, adapter, download_mbps, upload_mbps, "
+                f"latency_ms, data) VALUES ({id_param}?, ?, ?, ?, ?, ?)", rows(tests, self._test_row))
+            self._conn.executemany(
+                f"{insert} INTO optimizations ({id_column}name, enabled, applied_at, data) "
+                f"VALUES ({id_param}?, ?, ?, ?)",
+                rows(optimizations, lambda d: (d.get('name'), int(bool(d.get('enabled'))),
+                                               d.get('applied_at'), self._dumps(d))))
+            self._conn.executemany(
+                f"{insert} INTO metrics ({id_column}timestamp, adapter, data) VALUES ({id_param}?, ?, ?)",
+                rows(metrics, lambda d: (d.get('timestamp', ''), d.get('adapter'), self._dumps(d))))
+            self._commit()
+            if tests:
+                self._load_test_stats()
+
+    def clear_old_data(self, days: int = 30):
+        """Eliminar datos más antiguos que X días"""
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        with self._lock:
+            # Los tests sin timestamp no cuentan como viejos (igual que NetworkTestIndex.older_than)
+            for values in self._test_values("timestamp != '' AND timestamp < ?", (cutoff,)):
+                self.test_stats.remove(values)
+            self._conn.execute("DELETE FROM network_tests WHERE timestamp != '' AND timestamp < ?", (cutoff,))
+            self._conn.execute("DELETE FROM metrics WHERE timestamp < ?", (cutoff,))
+            self._commit()
+
+    def _count(self, table: str) -> int:
+        return self._query(f"SELECT COUNT(*) FROM {table}")[0][0]
+
+    def get_db_stats(self) -> Dict:
+        """Estadísticas de la base de datos"""
+        size = sum(p.stat().st_size for p in (self.db_path, Path(f"{self.db_path}-wal")) if p.exists())
+        return {
+            'db_path': str(self.db_path),
+            'db_size_bytes': size,
+            'total_tests': self._count('network_tests'),
+            'total_optimizations': self._count('optimizations'),
+            'total_settings': self._count('settings'),
+            'total_metrics': self._count('metrics')
+        }
+
+    def close(self):
+        """Cerrar DB (checkpoint del WAL incluido)"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# ==================== Migración ====================
+
+TINYDB_TABLES = ('network_tests', 'optimizations', 'settings', 'metrics')
+
+
+def read_tinydb_file(json_path: Path) -> Dict[str, List[StoredDocument]]:
+    """Leer un archivo TinyDB sin TinyDB: {tabla: {doc_id: documento}}"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        raw = json.load(f) if json_path.stat().st_size else {}
+    return {
+        table: [StoredDocument(doc, int(doc_id)) for doc_id, doc in sorted(
+            raw.get(table, {}).items(), key=lambda item: int(item[0]))]
+        for table in TINYDB_TABLES
+    }
+
+
+def migrate_from_tinydb(json_path: Path, target: SQLiteStorage) -> Dict[str, int]:
+    """
+    Copiar una base TinyDB a SQLite conservando ids. El JSON original no
+    se modifica (queda como respaldo) y la migración se registra en el
+    setting 'storage_migration' para no repetirla.
+
+    Documentos, settings y marca van en una sola transacción: si algo
+    falla no queda nada a medias y la próxima apertura lo reintenta.
+
+    Returns:
+        Documentos migrados por tabla
+    """
+    if target.get_setting('storage_migration'):
+        return {}
+
+    tables = read_tinydb_file(Path(json_path))
+    counts = {table: len(docs) for table, docs in tables.items()}
+    with target.transaction():
+        target.insert_documents(tests=tables['network_tests'], optimizations=tables['optimizations'],
+                                metrics=tables['metrics'], keep_ids=True)
+        for setting in tables['settings']:
+            if 'key' in setting:
+                target.save_setting(setting['key'], setting.get('value'))
+        target.save_setting('storage_migration', {
+            'source': str(json_path),
+            'migrated_at': datetime.now().isoformat(),
+            'counts': counts
+        })
+    log_info(f"Migración TinyDB → SQLite: {counts}")
+    return counts
@@ -0,0 +1,129 @@
+"""
+NetBoozt - Benchmark de Backends de Storage
+Compara TinyDB (JSON) y SQLite (WAL) con bases de N tests de red:
+tiempo de apertura, costo por insert y consultas habituales.
+
+Uso:
+    python -m src.storage.storage_benchmark [--sizes 10000 100000 1000000]
+                                            [--tinydb-max 1000000]
+
+By LOUST (www.loust.pro)
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from .db_manager import NetBooztStorage
+from .sqlite_storage import SQLiteStorage
+
+
+INSERTS = 20        # Inserts medidos por backend y tamaño
+QUERY_REPEATS = 5
+
+
+def synthetic_tests(count: int) -> List[Dict]:
+    """Tests de red repartidos en el último año"""
+    rng = random.Random(42)
+    start = datetime.now() - timedelta(days=365)
+    step = 365 * 86400 / max(count, 1)
+    return [{
+        'timestamp': (start + timedelta(seconds=i * step)).isoformat(),
+        'adapter': rng.choice(('Ethernet', 'Wi-Fi')),
+        'download_mbps': round(rng.uniform(50, 900), 2),
+        'upload_mbps': round(rng.uniform(10, 300), 2),
+        'latency_ms': round(rng.uniform(5, 80), 2),
+        'jitter_ms': round(rng.uniform(0, 10), 2),
+        'packet_loss': 0.0,
+        'mtu': 1500,
+        'dns_servers': ['1.1.1.1', '8.8.8.8'],
+    } for i in range(count)]
+
+
+def populate_tinydb(path: Path, tests: List[Dict]):
+    """Escribir el archivo TinyDB directamente (insert_multiple sería O(n) escrituras)"""
+    data = {'network_tests': {str(i + 1): test for i, test in enumerate(tests)}}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def populate_sqlite(path: Path, tests: List[Dict]):
+    storage = SQLiteStorage(path)
+    storage.insert_documents(tests=tests)
+    storage.close()
+
+
+def _timed(fn: Callable, repeats: int = 1) -> float:
+    """Milisegundos promedio por llamada"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeats
+
+
+def _file_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in (path, Path(f"{path}-wal")) if p.exists())
+
+
+def run_backend(name: str, path: Path, open_fn: Callable, size: int) -> Dict:
+    result = {'backend': name, 'size': size}
+
+    start = time.perf_counter()
+    storage = open_fn(path)
+    # TinyDB carga el JSON en el primer acceso a una tabla
+    storage.get_recent_tests(1)
+    result['open_ms'] = (time.perf_counter() - start) * 1000
+
+    sample = synthetic_tests(1)[0]
+    result['insert_ms'] = _timed(lambda: storage.save_network_test(dict(sample)), INSERTS)
+    result['recent_ms'] = _timed(lambda: storage.get_recent_tests(10), QUERY_REPEATS)
+
+    day_end = datetime.now() - timedelta(days=100)
+    result['range_ms'] = _timed(
+        lambda: storage.get_tests_by_date_range(day_end - timedelta(days=1), day_end), QUERY_REPEATS)
+    result['stats_ms'] = _timed(storage.get_test_stats, QUERY_REPEATS)
+
+    storage.close()
+    result['size_mb'] = _file_size(path) / 1e6
+    return result
+
+
+def run(sizes: List[int], tinydb_max: int) -> List[Dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            tests = synthetic_tests(size)
+
+            sqlite_path = Path(tmp) / f"bench_{size}.db"
+            populate_sqlite(sqlite_path, tests)
+            results.append(run_backend('sqlite', sqlite_path, SQLiteStorage, size))
+            print(format_result(results[-1]))
+
+            if size <= tinydb_max:
+                json_path = Path(tmp) / f"bench_{size}.json"
+                populate_tinydb(json_path, tests)
+                results.append(run_backend('tinydb', json_path, NetBooztStorage, size))
+                print(format_result(results[-1]))
+            else:
+                print(f"{'tinydb':>7} {size:>9,}  omitido (--tinydb-max {tinydb_max:,})")
+    return results
+
+
+def format_result(r: Dict) -> str:
+    return (f"{r['backend']:>7} {r['size']:>9,}  abrir {r['open_ms']:9.1f}ms  insert {r['insert_ms']:9.2f}ms  "
+            f"recientes {r['recent_ms']:8.2f}ms  rango {r['range_ms']:8.2f}ms  "
+            f"stats {r['stats_ms']:8.2f}ms  {r['size_mb']:7.1f}MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark TinyDB vs SQLite")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--tinydb-max', type=int, default=100_000,
+                        help="Tamaño máximo a medir con TinyDB (cada insert reescribe todo el JSON)")
+    args = parser.parse_args()
+    run(args.sizes, args.tinydb_max)
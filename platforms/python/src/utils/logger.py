@@ -20,9 +20,9 @@ else:
     # Modo desarrollo - logs en windows/logs/
     APP_DIR = Path(__file__).parent.parent.parent
 
-# Directorio de logs
-LOGS_DIR = APP_DIR / "logs"
-LOGS_DIR.mkdir(exist_ok=True)
+# Directorio de logs (NETBOOZT_LOGS_DIR lo reemplaza, ej: en los tests)
+LOGS_DIR = Path(os.environ.get("NETBOOZT_LOGS_DIR") or APP_DIR / "logs")
+LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
 # Nombre del archivo de log (por sesión)
 SESSION_START = datetime.now()
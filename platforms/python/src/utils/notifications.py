@@ -84,13 +84,24 @@ class NotificationManager:
             log_warning(f"Error mostrando notificación: {e}")
             return False
     
-    def notify_dns_failover(self, from_tier: int, to_tier: int, tier_name: str):
+    def notify_dns_failover(self, from_tier: int, to_tier: int, tier_name: str, adapter: Optional[str] = None):
         """Notificación específica de DNS failover"""
         title = "🔄 DNS Failover Ejecutado"
         message = f"Cambiado de Tier {from_tier} a Tier {to_tier}\n{tier_name}"
+        if adapter:
+            message += f"\nAdaptador: {adapter}"
         
         self.show(title, message, duration="long", sound=True)
     
+    def notify_dns_failback(self, from_tier: int, to_tier: int, tier_name: str, adapter: Optional[str] = None):
+        """Notificación de regreso a un tier DNS preferido"""
+        title = "↩️ DNS Restaurado"
+        message = f"De vuelta en Tier {to_tier} (desde Tier {from_tier})\n{tier_name}"
+        if adapter:
+            message += f"\nAdaptador: {adapter}"
+        
+        self.show(title, message, duration="short", sound=False)
+    
     def notify_optimization_applied(self, count: int, reboot_required: bool = False):
         """Notificación de optimizaciones aplicadas"""
         title = "✅ Optimizaciones Aplicadas"
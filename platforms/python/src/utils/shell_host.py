@@ -0,0 +1,482 @@
+"""
+NetBoozt - Ejecutor de Comandos con Shell Persistente
+Mantiene procesos de shell (PowerShell en Windows) vivos y les envía los
+comandos por stdin; las respuestas vuelven por stdout como JSON enmarcado.
+Arrancar powershell.exe cuesta cientos de ms por comando: con un host
+persistente solo se paga una vez.
+
+Protocolo (una línea por mensaje):
+    → {"id": 7, "command": "Get-NetAdapter | ConvertTo-Json"}
+    ← @@NBZ@@{"id": 7, "ok": true, "stdout": "...", "stderr": "", "exit_code": 0}
+
+Las líneas sin el prefijo (salida suelta del host) se ignoran.
+
+Hosts:
+- PowerShellHost: powershell.exe / pwsh con un bucle de lectura.
+- PythonShellHost: intérprete Python que ejecuta comandos con sh; sirve
+  para probar el protocolo con un proceso real. No es el default: todos
+  los comandos del proyecto son PowerShell, y sin PowerShell (Linux sin
+  pwsh) el ejecutor responde "no disponible" sin lanzar nada.
+- FakeShellHost: en proceso, con un handler; para pruebas sin Windows
+  (permite simular cuelgues y caídas).
+
+By LOUST (www.loust.pro)
+"""
+
+import base64
+import itertools
+import json
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Union
+
+try:
+    from .logger import log_info, log_warning, log_error
+except ImportError:
+    def log_info(msg): print(f"[INFO] {msg}")
+    def log_warning(msg): print(f"[WARN] {msg}")
+    def log_error(msg): print(f"[ERROR] {msg}")
+
+
+FRAME_PREFIX = "@@NBZ@@"
+POWERSHELL_UNAVAILABLE = "PowerShell no disponible en esta plataforma"
+
+
+class ShellHostError(Exception):
+    """El host murió o respondió algo no interpretable"""
+
+
+@dataclass
+class ShellResult:
+    """Resultado de un comando"""
+    ok: bool
+    stdout: str = ""
+    stderr: str = ""
+    exit_code: int = 0
+    duration_ms: float = 0.0
+    timed_out: bool = False
+
+
+# ============================================================================
+# Hosts
+# ============================================================================
+
+class ShellHost:
+    """
+    Un intérprete vivo que ejecuta un comando a la vez.
+
+    request() bloquea hasta la respuesta; lanza TimeoutError si se agota el
+    tiempo y ShellHostError si el host muere.
+    """
+
+    def start(self):
+        raise NotImplementedError
+
+    @property
+    def alive(self) -> bool:
+        raise NotImplementedError
+
+    def request(self, request_id: int, command: str, timeout: float) -> dict:
+        raise NotImplementedError
+
+    def stop(self):
+        raise NotImplementedError
+
+
+class ProcessShellHost(ShellHost):
+    """Host en un proceso hijo que habla el protocolo enmarcado por stdin/stdout"""
+
+    def __init__(self, argv: List[str]):
+        self.argv = argv
+        self._process: Optional[subprocess.Popen] = None
+        self._responses: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._reader: Optional[threading.Thread] = None
+
+    def start(self):
+        self._process = subprocess.Popen(
+            self.argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1,
+            creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+        )
+        self._responses = queue.Queue()
+        self._reader = threading.Thread(target=self._read_loop, args=(self._process, self._responses),
+                                        daemon=True, name="ShellHostReader")
+        self._reader.start()
+
+    @staticmethod
+    def _read_loop(process: subprocess.Popen, responses: queue.Queue):
+        """Pasar a la cola solo las líneas enmarcadas; None = host terminado"""
+        try:
+            for line in process.stdout:
+                if not line.startswith(FRAME_PREFIX):
+                    continue
+                try:
+                    responses.put(json.loads(line[len(FRAME_PREFIX):]))
+                except ValueError:
+                    log_warning(f"Respuesta de shell no interpretable: {line[:100]}")
+        except (OSError, ValueError):
+            pass
+        responses.put(None)
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def request(self, request_id: int, command: str, timeout: float) -> dict:
+        if not self.alive:
+            raise ShellHostError("Host no iniciado o terminado")
+
+        try:
+            self._process.stdin.write(json.dumps({'id': request_id, 'command': command}) + "\n")
+            self._process.stdin.flush()
+        except (OSError, ValueError) as e:
+            raise ShellHostError(f"No se pudo escribir al host: {e}")
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(command[:80])
+            try:
+                response = self._responses.get(timeout=remaining)
+            except queue.Empty:
+                raise TimeoutError(command[:80])
+            if response is None:
+                raise ShellHostError("El host terminó durante el comando")
+            # Respuestas atrasadas de un comando anterior se descartan
+            if response.get('id') == request_id:
+                return response
+
+    def stop(self):
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait(timeout=2)
+
+
+class PowerShellHost(ProcessShellHost):
+    """powershell.exe (o pwsh) leyendo peticiones JSON en un bucle"""
+
+    # Las respuestas se escriben en UTF-8 sin tocar [Console]::OutputEncoding,
+    # que PowerShell usa para decodificar la salida de netsh/ping (OEM)
+    LOOP_SCRIPT = r"""
+    $writer = New-Object IO.StreamWriter([Console]::OpenStandardOutput(), (New-Object Text.UTF8Encoding $false))
+    $ProgressPreference = 'SilentlyContinue'
+    while ($true) {
+        $line = [Console]::In.ReadLine()
+        if ($line -eq $null) { break }
+        $request = $line | ConvertFrom-Json
+        $global:LASTEXITCODE = 0
+        $ok = $true
+        $stdout = ''
+        $stderr = ''
+        try {
+            $items = @(& ([ScriptBlock]::Create($request.command)) 2>&1)
+            $errors = @($items | Where-Object { $_ -is [System.Management.Automation.ErrorRecord] })
+            $stdout = ($items | Where-Object { $_ -isnot [System.Management.Automation.ErrorRecord] } |
+                Out-String -Width 4096)
+            if ($errors.Count -gt 0) {
+                $ok = $false
+                $stderr = ($errors | ForEach-Object { $_.ToString() }) -join "`n"
+            }
+        } catch {
+            $ok = $false
+            $stderr = $_.ToString()
+        }
+        $code = 0
+        if ($LASTEXITCODE) { $code = [int]$LASTEXITCODE; $ok = $false }
+        $response = @{ id = $request.id; ok = $ok; stdout = $stdout; stderr = $stderr; exit_code = $code }
+        $writer.WriteLine('@@NBZ@@' + ($response | ConvertTo-Json -Compress))
+        $writer.Flush()
+    }
+    """
+
+    def __init__(self, executable: str = "powershell"):
+        encoded = base64.b64encode(self.LOOP_SCRIPT.encode('utf-16-le')).decode('ascii')
+        super().__init__([executable, "-NoLogo", "-NoProfile", "-NonInteractive",
+                          "-ExecutionPolicy", "Bypass", "-EncodedCommand", encoded])
+
+
+class PythonShellHost(ProcessShellHost):
+    """Intérprete Python que ejecuta cada comando con sh (plataformas sin PowerShell)"""
+
+    LOOP_SCRIPT = r"""
+import json, subprocess, sys
+for line in sys.stdin:
+    request = json.loads(line)
+    try:
+        proc = subprocess.run(request['command'], shell=True, capture_output=True, text=True)
+        response = {'id': request['id'], 'ok': proc.returncode == 0, 'stdout': proc.stdout,
+                    'stderr': proc.stderr, 'exit_code': proc.returncode}
+    except Exception as e:
+        response = {'id': request['id'], 'ok': False, 'stdout': '', 'stderr': str(e), 'exit_code': -1}
+    sys.stdout.write('@@NBZ@@' + json.dumps(response) + '\n')
+    sys.stdout.flush()
+"""
+
+    def __init__(self, executable: str = None):
+        super().__init__([executable or sys.executable, "-u", "-c", self.LOOP_SCRIPT])
+
+
+class FakeShellHost(ShellHost):
+    """
+    Host en proceso para pruebas.
+
+    handler(command) devuelve el stdout (str) o un ShellResult; si lanza
+    una excepción el comando falla con ese mensaje en stderr. crash() simula
+    la muerte del proceso (también a mitad de un comando).
+    """
+
+    def __init__(self, handler: Callable[[str], Union[str, ShellResult]]):
+        self.handler = handler
+        self._alive = False
+        self._crashed = threading.Event()
+        self.commands: List[str] = []
+
+    def start(self):
+        self._alive = True
+        self._crashed = threading.Event()
+
+    @property
+    def alive(self) -> bool:
+        return self._alive
+
+    def crash(self):
+        self._alive = False
+        self._crashed.set()
+
+    def request(self, request_id: int, command: str, timeout: float) -> dict:
+        if not self._alive:
+            raise ShellHostError("Host no iniciado o terminado")
+        self.commands.append(command)
+
+        outcome = {}
+
+        def execute():
+            try:
+                result = self.handler(command)
+                if isinstance(result, ShellResult):
+                    outcome.update(ok=result.ok, stdout=result.stdout,
+                                   stderr=result.stderr, exit_code=result.exit_code)
+                else:
+                    outcome.update(ok=True, stdout=result or "", stderr="", exit_code=0)
+            except Exception as e:
+                outcome.update(ok=False, stdout="", stderr=str(e), exit_code=1)
+
+        worker = threading.Thread(target=execute, daemon=True)
+        worker.start()
+
+        deadline = time.monotonic() + timeout
+        while worker.is_alive():
+            if self._crashed.wait(0.005):
+                raise ShellHostError("El host terminó durante el comando")
+            if time.monotonic() >= deadline:
+                raise TimeoutError(command[:80])
+        if not self._alive:
+            raise ShellHostError("El host terminó durante el comando")
+        return dict(outcome, id=request_id)
+
+    def stop(self):
+        self._alive = False
+
+
+# ============================================================================
+# Ejecutor
+# ============================================================================
+
+class ShellRunner:
+    """
+    Pool de hosts persistentes compartido por todos los subsistemas.
+
+    Cada host ejecuta un comando a la vez; las peticiones concurrentes usan
+    hosts distintos (hasta POOL_SIZE, creados bajo demanda) y el resto
+    espera uno libre. Un host que agota el timeout o muere se descarta y se
+    reemplaza en la siguiente petición. Un comando interrumpido por la caída
+    no se reintenta (puede tener efectos).
+
+    Sin host_factory (plataforma sin PowerShell) cada comando falla al
+    instante con POWERSHELL_UNAVAILABLE.
+    """
+
+    POOL_SIZE = 3
+    DEFAULT_TIMEOUT = 10.0
+
+    def __init__(self, host_factory: Optional[Callable[[], ShellHost]], pool_size: Optional[int] = None):
+        self.host_factory = host_factory
+        self.pool_size = pool_size or self.POOL_SIZE
+
+        self._idle: List[ShellHost] = []
+        self._created = 0
+        self._condition = threading.Condition()
+        self._ids = itertools.count(1)
+        self._closed = False
+
+        # Estadísticas
+        self.commands_run = 0
+        self.restarts = 0
+        self.timeouts = 0
+        self.unavailable = 0
+
+    @property
+    def available(self) -> bool:
+        """¿Hay un shell donde ejecutar comandos?"""
+        return self.host_factory is not None
+
+    def _acquire(self) -> ShellHost:
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise ShellHostError("Ejecutor cerrado")
+                while self._idle:
+                    host = self._idle.pop()
+                    if host.alive:
+                        return host
+                    # Murió estando libre
+                    self._created -= 1
+                    self.restarts += 1
+                if self._created < self.pool_size:
+                    self._created += 1
+                    break
+                self._condition.wait()
+
+        try:
+            host = self.host_factory()
+            host.start()
+            return host
+        except Exception:
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, host: ShellHost, healthy: bool):
+        with self._condition:
+            keep = healthy and host.alive and not self._closed
+            if keep:
+                self._idle.append(host)
+            else:
+                self._created -= 1
+                if not self._closed:
+                    self.restarts += 1
+            self._condition.notify()
+        if not keep:
+            host.stop()
+
+    def run(self, command: str, timeout: Optional[float] = None) -> ShellResult:
+        """
+        Ejecutar un comando (thread-safe). Nunca lanza: errores, caídas y
+        timeouts vuelven como ShellResult(ok=False).
+        """
+        timeout = timeout or self.DEFAULT_TIMEOUT
+        start = time.perf_counter()
+
+        if self.host_factory is None:
+            self.unavailable += 1
+            return ShellResult(ok=False, stderr=POWERSHELL_UNAVAILABLE, exit_code=-1)
+
+        try:
+            host = self._acquire()
+        except Exception as e:
+            log_error(f"No se pudo iniciar el host de shell: {e}")
+            return ShellResult(ok=False, stderr=str(e), exit_code=-1)
+
+        healthy = False
+        try:
+            response = host.request(next(self._ids), command, timeout)
+            healthy = True
+            self.commands_run += 1
+            return ShellResult(
+                ok=bool(response.get('ok')),
+                stdout=response.get('stdout') or "",
+                stderr=response.get('stderr') or "",
+                exit_code=int(response.get('exit_code') or 0),
+                duration_ms=(time.perf_counter() - start) * 1000
+            )
+        except TimeoutError:
+            # El host sigue ocupado con el comando: se descarta
+            self.timeouts += 1
+            log_warning(f"Timeout ({timeout}s) en comando de shell: {command[:80]}")
+            return ShellResult(ok=False, stderr="Timeout", exit_code=-1, timed_out=True,
+                               duration_ms=(time.perf_counter() - start) * 1000)
+        except ShellHostError as e:
+            log_warning(f"Host de shell caído, se reiniciará: {e}")
+            return ShellResult(ok=False, stderr=str(e), exit_code=-1,
+                               duration_ms=(time.perf_counter() - start) * 1000)
+        finally:
+            self._release(host, healthy)
+
+    def shutdown(self):
+        """Detener todos los hosts libres (los ocupados se detienen al terminar)"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._condition.notify_all()
+        for host in idle:
+            host.stop()
+
+    def get_stats(self) -> dict:
+        with self._condition:
+            return {
+                'hosts': self._created,
+                'idle': len(self._idle),
+                'commands_run': self.commands_run,
+                'restarts': self.restarts,
+                'timeouts': self.timeouts,
+                'unavailable': self.unavailable,
+            }
+
+
+def default_host_factory() -> Optional[Callable[[], ShellHost]]:
+    """PowerShell en Windows; pwsh si existe; si no, None (comandos "no disponible")"""
+    if sys.platform == 'win32':
+        return PowerShellHost
+    pwsh = shutil.which('pwsh')
+    if pwsh:
+        return lambda: PowerShellHost(pwsh)
+    return None
+
+
+# Singleton
+_runner_instance: Optional[ShellRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_shell_runner() -> ShellRunner:
+    """Obtener el ejecutor compartido"""
+    global _runner_instance
+    with _runner_lock:
+        if _runner_instance is None:
+            _runner_instance = ShellRunner(default_host_factory())
+            if _runner_instance.available:
+                log_info("Ejecutor de shell persistente iniciado")
+            else:
+                log_warning(f"{POWERSHELL_UNAVAILABLE}: los comandos de shell fallarán")
+        return _runner_instance
+
+
+def set_shell_runner(runner: Optional[ShellRunner]) -> Optional[ShellRunner]:
+    """Reemplazar el ejecutor compartido (ej: uno con FakeShellHost); devuelve el anterior"""
+    global _runner_instance
+    with _runner_lock:
+        previous, _runner_instance = _runner_instance, runner
+        return previous
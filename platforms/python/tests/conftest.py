@@ -0,0 +1,27 @@
+"""
+Configuración de pytest: hace importable el paquete src/ desde platforms/python.
+
+Ejecutar desde platforms/python:
+    python -m pytest -q tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Los logs de sesión de src.utils.logger van a un directorio temporal, no a
+# platforms/python/logs (se fija antes de que los tests importen src)
+LOGS_DIR = Path(tempfile.mkdtemp(prefix="netboozt-test-logs-"))
+os.environ["NETBOOZT_LOGS_DIR"] = str(LOGS_DIR)
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(LOGS_DIR, ignore_errors=True)
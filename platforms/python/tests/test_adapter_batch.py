@@ -0,0 +1,126 @@
+"""
+Tests de AdapterManager.parse_adapter_batch con salidas grabadas de
+BATCH_DETECTION_QUERY (tests/fixtures/adapter_batch/*.json).
+"""
+
+import pytest
+
+from conftest import FIXTURES
+from src.monitoring.adapter_manager import AdapterManager, AdapterStatus
+
+BATCH_FIXTURES = FIXTURES / "adapter_batch"
+
+
+def parse_fixture(name):
+    return AdapterManager.parse_adapter_batch((BATCH_FIXTURES / name).read_text(encoding="utf-8"))
+
+
+def test_multiple_adapters():
+    ethernet, wifi = parse_fixture("ethernet_and_wifi.json")
+
+    assert ethernet.name == "Ethernet" and ethernet.is_active
+    assert ethernet.metric == 25 and ethernet.mtu == 1500 and ethernet.speed_mbps == 1000
+    # La APIPA no gana a la dirección real
+    assert ethernet.ipv4_address == "192.168.1.50"
+    assert ethernet.ipv6_address == "2001:db8::50"
+    assert ethernet.default_gateway == "192.168.1.254"
+    assert ethernet.dns_servers == ["1.1.1.1", "1.0.0.1"]
+    assert ethernet.dns_provider == "Cloudflare"
+
+    assert wifi.speed_mbps == 866
+    # 0.0.0.0 (ruta on-link) no es un gateway
+    assert wifi.default_gateway == "192.168.1.254"
+    assert wifi.ipv6_address is None
+    assert wifi.dns_provider == "Custom"
+
+
+def test_single_adapter_serialized_as_object():
+    adapters = parse_fixture("single_adapter_object.json")
+
+    assert len(adapters) == 1
+    adapter = adapters[0]
+    # ConvertTo-Json también aplana los arrays de un elemento a escalares
+    assert adapter.ipv4_address == "10.0.0.5"
+    assert adapter.ipv6_address == "2001:db8:1::5"
+    assert adapter.default_gateway == "10.0.0.1"
+    assert adapter.dns_servers == ["9.9.9.9"]
+    assert adapter.speed_mbps == 2500 and adapter.mtu == 9000
+    assert adapter.dhcp_enabled is False
+
+
+def test_null_gateway_and_dns():
+    adapter, = parse_fixture("null_gateway.json")
+
+    assert adapter.default_gateway is None
+    assert adapter.dns_servers == []
+    assert adapter.dns_provider == "DHCP/Router"
+    assert adapter.ipv4_address == "172.24.160.1"
+    assert adapter.speed_mbps == 10000
+
+
+def test_ipv6_only_adapter():
+    adapter, = parse_fixture("ipv6_only.json")
+
+    assert adapter.ipv4_address is None
+    assert adapter.ipv6_address == "2001:db8:abcd::1234"
+    assert adapter.default_gateway is None
+    assert adapter.is_active
+
+
+def test_disabled_and_missing_adapters():
+    ethernet, wifi, bluetooth = parse_fixture("disabled_adapter.json")
+
+    assert ethernet.is_active
+    # Sin interfaz IP: métrica y MTU por defecto, velocidad 0
+    assert wifi.status == AdapterStatus.DISABLED and not wifi.is_active
+    assert wifi.metric == 100 and wifi.mtu == 1500 and wifi.speed_mbps == 0
+    assert wifi.ipv4_address is None and wifi.default_gateway is None
+    # 'Not Present' no es un estado conocido: cuenta como Down
+    assert bluetooth.status == AdapterStatus.DOWN
+    assert bluetooth.speed_mbps == 3
+
+
+def test_bare_array_without_wrapper():
+    adapters = AdapterManager.parse_adapter_batch('[{"Name": "Ethernet", "Status": "Up"}]')
+
+    assert [a.name for a in adapters] == ["Ethernet"]
+    assert adapters[0].speed_mbps == 1000 and adapters[0].dns_servers == []
+
+
+def test_missing_adapters_key_is_rejected():
+    with pytest.raises(ValueError):
+        AdapterManager.parse_adapter_batch('{"Error": "Get-NetAdapter falló"}')
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1 Gbps", 1000),
+    ("2.5 Gbps", 2500),
+    ("866.7 Mbps", 866),
+    ("100 Mbps", 100),
+    ("0 bps", 0),
+    ("", 1000),
+    (None, 1000),
+])
+def test_parse_link_speed(value, expected):
+    assert AdapterManager._parse_link_speed(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, []),
+    ("1.1.1.1", ["1.1.1.1"]),
+    (["1.1.1.1", "1.0.0.1"], ["1.1.1.1", "1.0.0.1"]),
+    ([], []),
+])
+def test_as_list(value, expected):
+    assert AdapterManager._as_list(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Up", AdapterStatus.UP),
+    ("Disconnected", AdapterStatus.DISCONNECTED),
+    ("Disabled", AdapterStatus.DISABLED),
+    ("Not Present", AdapterStatus.DOWN),
+    (None, AdapterStatus.DOWN),
+])
+def test_parse_status(value, expected):
+    assert AdapterManager._parse_status(value) == expected
@@ -0,0 +1,130 @@
+"""
+Tests de AlertDispatcher (agrupación de alertas en incidentes) y del
+TokenBucket que limita las notificaciones, con reloj inyectado.
+"""
+
+import threading
+from datetime import datetime
+
+import pytest
+
+from src.monitoring.alert_dispatch import AlertDispatcher, TokenBucket
+from src.monitoring.alert_system import Alert, AlertSeverity, AlertType
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def alert(alert_type=AlertType.LATENCY_HIGH, severity=AlertSeverity.WARNING, message="latencia alta"):
+    return Alert(alert_type=alert_type, severity=severity, timestamp=datetime.now(),
+                 message=message, current_value=150.0, threshold_value=100.0)
+
+
+@pytest.fixture
+def dispatched():
+    clock = FakeClock()
+    alerts, notifications = [], []
+    dispatcher = AlertDispatcher(
+        on_alert=alerts.append,
+        on_incident=lambda incident, summary: notifications.append((incident.incident_id, summary, len(incident.alerts))),
+        clock=clock
+    )
+    yield dispatcher, clock, alerts, notifications
+    dispatcher.stop()
+
+
+def submit(dispatcher, *items):
+    for item in items:
+        dispatcher.submit(item)
+    assert dispatcher.flush(2.0)
+
+
+def test_token_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    bucket = TokenBucket(rate_per_minute=4, burst=2, clock=clock)
+
+    assert bucket.try_take() and bucket.try_take()
+    assert not bucket.try_take()
+    assert bucket.wait_time() == pytest.approx(15.0)
+
+    clock.now += 10
+    assert not bucket.try_take()
+    assert bucket.wait_time() == pytest.approx(5.0)
+
+    clock.now += 5
+    assert bucket.try_take()
+
+    clock.now += 3600                 # No acumula más que la ráfaga
+    assert bucket.try_take() and bucket.try_take()
+    assert not bucket.try_take()
+
+
+def test_alerts_within_the_window_share_an_incident(dispatched):
+    dispatcher, clock, alerts, notifications = dispatched
+
+    submit(dispatcher, alert())
+    clock.now += 30
+    submit(dispatcher, alert(AlertType.DNS_FAILURE, AlertSeverity.CRITICAL, "DNS caído"),
+           alert(AlertType.SPEED_LOW, message="velocidad baja"))
+
+    assert len(alerts) == 3
+    assert len(dispatcher.incidents) == 1
+    incident = dispatcher.incidents[0]
+    assert incident.alert_types == ["latency_high", "dns_failure", "speed_low"]
+    assert incident.severity == AlertSeverity.CRITICAL
+    assert incident.message.startswith("3 alertas relacionadas")
+    # Solo la primera alerta se notificó de inmediato
+    assert notifications == [(1, False, 1)]
+
+
+def test_closed_incident_sends_one_summary_and_a_new_one_opens(dispatched):
+    dispatcher, clock, alerts, notifications = dispatched
+
+    submit(dispatcher, alert())
+    clock.now += 10
+    submit(dispatcher, alert(AlertType.PACKET_LOSS_HIGH, message="pérdida"))
+    clock.now += AlertDispatcher.INCIDENT_WINDOW_SECONDS + 1
+    submit(dispatcher, alert())
+
+    assert [i.incident_id for i in dispatcher.incidents] == [1, 2]
+    assert dispatcher.incidents[0].closed
+    assert notifications == [(1, False, 1), (1, True, 2), (2, False, 1)]
+
+
+def test_pending_notifications_wait_for_a_token(dispatched):
+    dispatcher, clock, alerts, notifications = dispatched
+    dispatcher._bucket = TokenBucket(rate_per_minute=0.5, burst=1, clock=clock)
+
+    # Dos incidentes seguidos: el segundo espera a que se recargue el token
+    submit(dispatcher, alert())
+    clock.now += AlertDispatcher.INCIDENT_WINDOW_SECONDS + 0.5
+    submit(dispatcher, alert())
+    assert [n[0] for n in notifications] == [1]
+
+    clock.now += 60
+    submit(dispatcher, alert())
+    assert [n[0] for n in notifications] == [1, 2]
+    assert len(dispatcher.incidents) == 2
+
+
+def test_queue_overflow_is_counted_and_flush_waits_for_the_backlog():
+    release = threading.Event()
+    dispatcher = AlertDispatcher(on_alert=lambda a: release.wait(2.0), clock=FakeClock())
+    dispatcher._queue.maxsize = 2
+    try:
+        # La primera alerta bloquea al hilo; caben 2 más en la cola
+        for _ in range(6):
+            dispatcher.submit(alert())
+        assert dispatcher.dropped >= 3
+        assert not dispatcher.flush(0.05)
+
+        release.set()
+        assert dispatcher.flush(2.0)
+    finally:
+        release.set()
+        dispatcher.stop()
@@ -0,0 +1,94 @@
+"""
+Tests del historial indexado de alertas (src/monitoring/alert_store.py):
+ids estables, índice por tipo y journal escrito en segundo plano.
+"""
+
+import threading
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+from src.monitoring.alert_store import AlertStore
+from src.monitoring.alert_system import Alert, AlertSeverity, AlertType
+
+START = datetime(2026, 10, 19, 12, 0)
+
+
+def new_alert(alert_type=AlertType.LATENCY_HIGH, minutes=0, rule_name=None):
+    return Alert(alert_type=alert_type, severity=AlertSeverity.WARNING,
+                 timestamp=START + timedelta(minutes=minutes), message="test",
+                 current_value=1.0, threshold_value=0.5, rule_name=rule_name)
+
+
+def journaled_store(path, capacity=1000):
+    return AlertStore(capacity=capacity, journal_path=path,
+                      to_dict=Alert.to_dict, from_dict=Alert.from_dict)
+
+
+def test_ids_are_stable_and_copies_resolve():
+    store = AlertStore()
+    alert = new_alert()
+    alert_id = store.add(alert)
+
+    assert alert.alert_id == alert_id
+    # Una copia (misma alerta, otro objeto) resuelve la almacenada
+    assert store.resolve(replace(alert))
+    assert alert.resolved and store.active() == []
+    assert not store.resolve(alert)
+
+
+def test_by_type_index_follows_eviction():
+    store = AlertStore(capacity=3)
+    for minute, alert_type in enumerate([AlertType.LATENCY_HIGH, AlertType.SPEED_LOW,
+                                         AlertType.LATENCY_HIGH, AlertType.SPEED_LOW]):
+        store.add(new_alert(alert_type, minute))
+
+    assert [a.timestamp.minute for a in store.by_type(AlertType.LATENCY_HIGH)] == [2]
+    assert [a.timestamp.minute for a in store.by_type(AlertType.SPEED_LOW)] == [1, 3]
+    store.clear()
+    assert store.by_type(AlertType.SPEED_LOW) == []
+
+
+def test_journal_written_off_thread_and_reloaded(tmp_path):
+    path = tmp_path / "alerts.jsonl"
+    store = journaled_store(path)
+    writer_threads = []
+    original = store._append_lines
+
+    def recording_append(records):
+        writer_threads.append(threading.current_thread())
+        original(records)
+
+    store._append_lines = recording_append
+    first = new_alert()
+    store.add(first)
+    store.add(new_alert(AlertType.SPEED_LOW, 1, rule_name="threshold:speed_low"))
+    store.resolve(first)
+    assert store.flush()
+
+    assert writer_threads and threading.main_thread() not in writer_threads
+    restored = journaled_store(path)
+    assert [a.alert_id for a in restored.all()] == [1, 2]
+    assert [a.rule_name for a in restored.active()] == ["threshold:speed_low"]
+    assert restored.by_type(AlertType.LATENCY_HIGH)[0].resolved
+
+
+def test_journal_compaction_keeps_retained_alerts(tmp_path, monkeypatch):
+    monkeypatch.setattr(AlertStore, 'JOURNAL_COMPACT_FACTOR', 1)
+    path = tmp_path / "alerts.jsonl"
+    store = journaled_store(path, capacity=3)
+    for minute in range(10):
+        store.add(new_alert(minutes=minute))
+    assert store.flush()
+
+    assert len(path.read_text(encoding='utf-8').splitlines()) <= 6
+    restored = journaled_store(path, capacity=3)
+    assert [a.timestamp.minute for a in restored.all()] == [7, 8, 9]
+    assert restored.add(new_alert(minutes=10)) == 11
+
+
+def test_failed_write_does_not_raise(tmp_path):
+    store = journaled_store(tmp_path / "missing" / "alerts.jsonl")
+    store.add(new_alert())
+    # El error se registra en el hilo escritor; la alerta queda en memoria
+    assert store.flush()
+    assert len(store) == 1
@@ -0,0 +1,68 @@
+"""
+Tests de los thresholds configurables evaluados como reglas con ventana
+(AlertSystem.THRESHOLD_RULES) y de jitter/pérdida del LatencyMonitor.
+"""
+
+from src.monitoring.alert_system import AlertSystem, AlertType
+from src.monitoring.realtime_monitor import LatencyMonitor
+
+START = 1_760_000_000.0
+
+
+def feed(alerts, metric, value, seconds, start=START):
+    triggered = []
+    for second in range(seconds):
+        triggered += alerts.record_sample(metric, value, start + second)
+    return triggered
+
+
+def threshold_alerts(triggered, alert_type):
+    name = AlertSystem.threshold_rule_name(alert_type)
+    return [a for a in triggered if a.rule_name == name]
+
+
+def test_speed_low_fires_only_when_sustained():
+    alerts = AlertSystem(persist=False)
+    alerts.anomaly_detection_enabled = False
+
+    assert threshold_alerts(feed(alerts, 'download_mbps', 2.0, 30), AlertType.SPEED_LOW) == []
+    fired = threshold_alerts(feed(alerts, 'download_mbps', 2.0, 40, START + 30), AlertType.SPEED_LOW)
+    assert len(fired) == 1
+    assert fired[0].message.startswith("Velocidad baja")
+
+
+def test_set_threshold_updates_rule_without_touching_defaults():
+    alerts = AlertSystem(persist=False)
+    alerts.anomaly_detection_enabled = False
+    alerts.set_threshold(AlertType.PACKET_LOSS_HIGH, 20.0)
+
+    rule = alerts.rule_engine.rules[AlertSystem.threshold_rule_name(AlertType.PACKET_LOSS_HIGH)]
+    assert rule.threshold == 20.0
+    assert AlertSystem.DEFAULT_THRESHOLDS[AlertType.PACKET_LOSS_HIGH].threshold_value == 2.0
+    # 10% sostenido ya no supera el límite configurado
+    assert threshold_alerts(feed(alerts, 'packet_loss', 10.0, 120), AlertType.PACKET_LOSS_HIGH) == []
+
+
+def test_disabled_type_silences_its_threshold_rule():
+    alerts = AlertSystem(persist=False)
+    alerts.anomaly_detection_enabled = False
+    alerts.enable_alert(AlertType.LATENCY_HIGH, False)
+
+    assert feed(alerts, 'latency_ms', 300.0, 200) == []
+
+
+def test_check_metric_speed_low_is_a_minimum():
+    alerts = AlertSystem(persist=False)
+
+    assert alerts.check_metric(AlertType.SPEED_LOW, 500.0) is None
+    assert alerts.check_metric(AlertType.SPEED_LOW, 2.0) is not None
+
+
+def test_latency_monitor_jitter_and_loss():
+    monitor = LatencyMonitor()
+    for latency in (20.0, 36.0, None, 20.0):
+        monitor._record(latency)
+
+    assert monitor.get_packet_loss() == 25.0
+    assert monitor.get_jitter() == 1.9375     # 16/16 → 1, luego + (16 - 1)/16
+    assert monitor.get_last_latency() == 20.0
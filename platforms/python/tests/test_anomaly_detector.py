@@ -0,0 +1,104 @@
+"""
+Tests de AnomalyDetector: aprendizaje mínimo, líneas base por hora del día,
+histéresis fire/clear y guardado periódico desde AlertSystem.
+"""
+
+from datetime import datetime
+
+from src.monitoring.alert_system import AlertSystem
+from src.monitoring.anomaly_detector import AnomalyDetector
+
+NIGHT = datetime(2025, 1, 6, 3, 0).timestamp()
+EVENING = datetime(2025, 1, 6, 20, 0).timestamp()
+
+
+def train(detector, value, samples, start, metric='latency_ms'):
+    """Muestras a 1 Hz alrededor de value (±1, deterministas)"""
+    transitions = []
+    for i in range(samples):
+        transitions.append(detector.record(metric, value + (i % 3) - 1, start + i))
+    return [t for t in transitions if t]
+
+
+def test_no_alerts_while_learning():
+    detector = AnomalyDetector()
+
+    assert train(detector, 20, AnomalyDetector.MIN_SAMPLES_OVERALL - 1, NIGHT) == []
+    assert detector.expected('latency_ms', timestamp=NIGHT) is None
+    # Muy por encima de la media, pero aún sin línea base
+    assert detector.record('latency_ms', 500, NIGHT + 200) is None
+    assert detector.expected('latency_ms', timestamp=NIGHT) is not None
+
+
+def test_fire_and_clear_need_sustained_runs():
+    detector = AnomalyDetector()
+    train(detector, 20, AnomalyDetector.MIN_SAMPLES_OVERALL, NIGHT)
+    t = NIGHT + AnomalyDetector.MIN_SAMPLES_OVERALL
+
+    # Una muestra normal a mitad de la racha la reinicia
+    assert train(detector, 80, AnomalyDetector.SUSTAIN_SAMPLES - 1, t) == []
+    assert detector.record('latency_ms', 20, t + 100) is None
+    t += 200
+
+    transitions = train(detector, 80, AnomalyDetector.SUSTAIN_SAMPLES, t)
+    assert transitions == ["fire"]
+    assert "anómalo" in detector.describe('latency_ms', 80, timestamp=t)
+
+    t += 100
+    assert train(detector, 20, AnomalyDetector.CLEAR_SAMPLES - 1, t) == []
+    assert detector.record('latency_ms', 20, t + 50) == "clear"
+
+
+def test_upward_speed_is_not_anomalous():
+    detector = AnomalyDetector()
+    train(detector, 100, AnomalyDetector.MIN_SAMPLES_OVERALL, NIGHT, metric='download_mbps')
+
+    t = NIGHT + 1000
+    assert train(detector, 400, 60, t, metric='download_mbps') == []
+    assert train(detector, 10, AnomalyDetector.SUSTAIN_SAMPLES, t + 100, metric='download_mbps') == ["fire"]
+
+
+def test_hourly_baselines_learn_daily_seasonality():
+    detector = AnomalyDetector()
+    train(detector, 20, AnomalyDetector.MIN_SAMPLES_HOURLY, NIGHT)
+    train(detector, 200, AnomalyDetector.MIN_SAMPLES_HOURLY, EVENING)
+
+    night_mean, _ = detector.expected('latency_ms', timestamp=NIGHT)
+    evening_mean, _ = detector.expected('latency_ms', timestamp=EVENING)
+    assert abs(night_mean - 20) < 1
+    assert abs(evening_mean - 200) < 1
+
+    # 200ms es normal por la tarde pero anómalo de madrugada
+    # (el aprendizaje de la tarde contra la línea base global pudo dispararla)
+    evening = EVENING + 3600 * 24
+    assert "fire" not in train(detector, 200, AnomalyDetector.SUSTAIN_SAMPLES, evening)
+    assert not detector.baselines[('latency_ms', 'default')].active
+    night = NIGHT + 3600 * 24
+    assert train(detector, 200, AnomalyDetector.SUSTAIN_SAMPLES, night) == ["fire"]
+
+
+def test_baselines_round_trip_through_disk(tmp_path):
+    detector = AnomalyDetector()
+    train(detector, 20, AnomalyDetector.MIN_SAMPLES_OVERALL, NIGHT)
+    detector.save(tmp_path / "baselines.json")
+
+    restored = AnomalyDetector()
+    restored.load(tmp_path / "baselines.json")
+    assert restored.expected('latency_ms', timestamp=NIGHT) == detector.expected('latency_ms', timestamp=NIGHT)
+
+
+def test_alert_system_saves_baselines_periodically(tmp_path):
+    alerts = AlertSystem(data_dir=tmp_path)
+    path = tmp_path / "alert_baselines.json"
+    start = alerts._baselines_saved_at
+
+    alerts.record_sample('latency_ms', 20, start + 1)
+    assert not path.exists()
+
+    alerts.record_sample('latency_ms', 20, start + AlertSystem.BASELINE_SAVE_INTERVAL)
+    assert path.exists()
+
+    restored = AnomalyDetector()
+    restored.load(path)
+    assert restored.baselines[('latency_ms', 'default')].overall.count == 2
+    alerts.flush_journal()
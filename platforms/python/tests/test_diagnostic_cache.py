@@ -0,0 +1,111 @@
+"""
+Tests de DiagnosticCache con reloj inyectado: TTL por capa, TTL de fallos,
+invalidación en cascada y capas afectadas por eventos del monitor.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from src.monitoring.diagnostic_cache import EVENT_LAYERS, LAYERS, DiagnosticCache
+from src.monitoring.windows_events import NetworkEventType, WindowsNetworkEvent
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 500.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    return DiagnosticCache(clock=clock)
+
+
+def fill(cache):
+    for layer in LAYERS:
+        cache.put(layer, f"{layer}-ok", ok=True)
+
+
+@pytest.mark.parametrize("layer", LAYERS)
+def test_ok_results_live_for_their_layer_ttl(cache, clock, layer):
+    cache.put(layer, "ok", ok=True, key="Ethernet")
+    ttl = DiagnosticCache.LAYER_TTLS[layer]
+
+    clock.now += ttl - 0.1
+    assert cache.get(layer, "Ethernet") == (True, "ok")
+    assert cache.get(layer, "Wi-Fi") == (False, None)    # Otra clave: fallo de caché
+
+    clock.now += 0.1
+    assert cache.get(layer, "Ethernet") == (False, None)
+
+
+def test_failures_are_rechecked_after_failure_ttl(cache, clock):
+    cache.put('adapter_info', "sin adaptador", ok=False)
+
+    clock.now += DiagnosticCache.FAILURE_TTL - 0.1
+    assert cache.get('adapter_info') == (True, "sin adaptador")
+    clock.now += 0.1
+    assert cache.get('adapter_info') == (False, None)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_fresh_layers_follow_expiry(cache, clock):
+    fill(cache)
+    assert cache.fresh_layers() == list(LAYERS)
+
+    clock.now += DiagnosticCache.LAYER_TTLS['router']
+    assert 'router' not in cache.fresh_layers()
+    assert 'adapter_info' in cache.fresh_layers()
+
+
+@pytest.mark.parametrize("layer, expected", [
+    ('adapter_info', ['adapter_info', 'adapter', 'router', 'isp', 'dns']),
+    ('adapter', ['adapter', 'router', 'isp', 'dns']),
+    ('router', ['router']),
+    ('isp', ['isp', 'dns']),
+    ('dns', ['dns']),
+])
+def test_invalidation_cascades_to_dependent_layers(cache, layer, expected):
+    fill(cache)
+
+    assert cache.invalidate(layer) == expected
+    assert cache.fresh_layers() == [l for l in LAYERS if l not in expected]
+
+
+def test_invalidate_without_layers_clears_everything(cache):
+    fill(cache)
+    assert cache.invalidate() == list(LAYERS)
+    assert cache.fresh_layers() == []
+
+
+def event(event_type):
+    return WindowsNetworkEvent(event_type=event_type, timestamp=datetime.now(), provider="test",
+                               level="Warning", message="", event_id=0)
+
+
+@pytest.mark.parametrize("event_type, layer", sorted(EVENT_LAYERS.items(), key=lambda item: item[0].value))
+def test_network_events_invalidate_their_layer(cache, event_type, layer):
+    fill(cache)
+    cache.on_network_event(event(event_type))
+
+    assert cache.get(layer) == (False, None)
+
+
+def test_every_event_type_maps_to_a_layer():
+    assert set(EVENT_LAYERS) == set(NetworkEventType)
+    assert set(EVENT_LAYERS.values()) <= set(LAYERS)
+
+
+def test_dns_events_keep_lower_layers(cache):
+    fill(cache)
+    cache.on_network_event(event(NetworkEventType.DNS_TIMEOUT))
+
+    assert cache.fresh_layers() == ['adapter_info', 'adapter', 'router', 'isp']
@@ -0,0 +1,233 @@
+"""
+Tests del lector incremental del Event Log con registros grabados
+(tests/fixtures/events): parser, cursor, bookmark, log borrado y
+clasificación sin renderizar un mensaje por registro.
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from conftest import FIXTURES
+from src.monitoring.event_log_reader import (
+    EventBookmark, EventLogReader, EventRecord, RecordedEventSource, WevtutilEventSource,
+    parse_event_xml,
+)
+from src.monitoring.windows_events import NetworkEventType, WindowsEventMonitor
+from src.utils.shell_host import FakeShellHost, ShellRunner
+
+EVENTS = FIXTURES / "events"
+
+
+def recorded(name="system_network.json"):
+    return RecordedEventSource.from_file(EVENTS / name)
+
+
+def new_record(record_id, event_id=1014, provider='Microsoft-Windows-DNS-Client', message=None):
+    record = EventRecord(record_id=record_id, event_id=event_id, provider=provider, level=3,
+                         time_created=datetime.now())
+    record._message = message
+    return record
+
+
+# ============================================================================
+# Parsers
+# ============================================================================
+
+def test_parse_wevtutil_xml():
+    records = parse_event_xml((EVENTS / "system_network.xml").read_text(encoding="utf-8"))
+
+    assert [r.record_id for r in records] == [48211, 48212, 48215, 48220, 48221, 48230]
+    dns, tcpip, _, wlan, _, dhcp = records
+    assert dns.provider == 'Microsoft-Windows-DNS-Client' and dns.event_id == 1014
+    assert dns.level_name == 'Warning'
+    assert dns.event_data['QueryName'] == 'updates.example.com'
+    # EventID con Qualifiers: 16 bits bajos
+    assert tcpip.event_id == 4227
+    # Data sin Name
+    assert tcpip.event_data == {'Data0': 'TCP/IP', 'Data1': '0'}
+    assert wlan.event_data['Reason'] == 'The network is disconnected by the driver.'
+    # UserData
+    assert dhcp.event_data == {'AdapterName': 'Ethernet', 'ErrorCode': '1460'}
+    # /f:xml no trae mensaje
+    assert not any(r.message_loaded for r in records)
+
+
+def test_parse_rendered_xml_includes_message():
+    record, = parse_event_xml((EVENTS / "rendered_48215.xml").read_text(encoding="utf-8"))
+
+    assert record.message_loaded
+    assert record.message.startswith("The system failed to register host")
+
+
+def test_recorded_json_messages_render_on_demand():
+    source = recorded()
+
+    assert [r.record_id for r in source.records] == [1201, 1202, 1203, 1205]
+    record = source.records[0]
+    assert not record.message_loaded
+    assert "timed out" in record.message
+    assert source.render_count == 1
+
+
+# ============================================================================
+# Cursor y bookmark
+# ============================================================================
+
+def test_read_new_in_batches_from_cursor():
+    source = recorded()
+    reader = EventLogReader(source)
+    reader.BATCH_SIZE = 2
+
+    # Primer arranque sin bookmark: empieza desde el final
+    assert reader.read_new() == []
+    assert reader.position == 1205
+
+    reader.position = 0
+    assert [r.record_id for r in reader.read_new()] == [1201, 1202, 1203, 1205]
+    assert reader.read_new() == []
+
+
+def test_bookmark_resume_across_restarts(tmp_path):
+    bookmark_path = tmp_path / "event_bookmark.json"
+    source = recorded()
+
+    reader = EventLogReader(source, EventBookmark(bookmark_path))
+    reader.read_new()
+    assert json.loads(bookmark_path.read_text()) == {'System': 1205}
+
+    # Eventos mientras la app estaba cerrada
+    source.append(new_record(1206))
+    source.append(new_record(1207, message="Name resolution timed out"))
+
+    resumed = EventLogReader(source, EventBookmark(bookmark_path))
+    assert resumed.position == 1205
+    assert [r.record_id for r in resumed.read_new()] == [1206, 1207]
+    assert json.loads(bookmark_path.read_text()) == {'System': 1207}
+
+
+def test_read_since_never_moves_cursor_back(tmp_path):
+    bookmark = EventBookmark(tmp_path / "event_bookmark.json")
+    bookmark.set('System', 1203)
+    reader = EventLogReader(recorded(), bookmark)
+
+    history = reader.read_since(datetime(2026, 10, 18))
+    assert [r.record_id for r in history] == [1201, 1202, 1203, 1205]
+    assert reader.position == 1205
+
+
+def test_cleared_log_resets_cursor(tmp_path):
+    bookmark_path = tmp_path / "event_bookmark.json"
+    source = recorded()
+    reader = EventLogReader(source, EventBookmark(bookmark_path))
+    reader.read_new()
+    assert reader.position == 1205
+
+    # wevtutil cl System: los IDs vuelven a empezar
+    source.clear()
+    source.append(new_record(1))
+    source.append(new_record(2))
+
+    assert [r.record_id for r in reader.read_new()] == [1, 2]
+    assert reader.position == 2
+    assert EventBookmark(bookmark_path).get('System') == 2
+
+
+def test_unreadable_bookmark_starts_over(tmp_path):
+    bookmark_path = tmp_path / "event_bookmark.json"
+    bookmark_path.write_text("{roto")
+
+    assert EventBookmark(bookmark_path).get('System') is None
+
+
+# ============================================================================
+# Clasificación y render en lote
+# ============================================================================
+
+def xml_monitor():
+    records = parse_event_xml((EVENTS / "system_network.xml").read_text(encoding="utf-8"))
+    rendered = parse_event_xml((EVENTS / "rendered_48215.xml").read_text(encoding="utf-8"))[0]
+    source = RecordedEventSource(records)
+    source._rendered[rendered.record_id] = rendered._message
+    return WindowsEventMonitor(reader=EventLogReader(source)), source
+
+
+def test_classification_renders_only_unknown_candidates_in_one_batch():
+    monitor, source = xml_monitor()
+    events = monitor._to_events(source.records)
+
+    by_id = {e.record.record_id: e.event_type for e in events}
+    assert by_id == {
+        48211: NetworkEventType.DNS_TIMEOUT,      # por Event ID
+        48215: NetworkEventType.DNS_FAILURE,      # por el mensaje renderizado
+        48220: NetworkEventType.WLAN_DISCONNECT,  # por EventData (Reason)
+        48221: NetworkEventType.NCSI_FAILURE,
+        48230: NetworkEventType.DHCP_FAILURE,
+    }
+    # Solo el DNS 8020 necesitaba mensaje: una consulta, un registro renderizado
+    assert source.render_count == 1
+    assert [r.record_id for r in source.records if r.message_loaded] == [48215]
+
+
+def test_classification_without_candidates_renders_nothing():
+    monitor, source = xml_monitor()
+    records = [r for r in source.records if r.record_id != 48215]
+
+    # Tcpip 4227 no es un evento de red conocido
+    assert len(monitor._to_events(records)) == 4
+    assert source.render_count == 0
+    # El mensaje del evento usa los datos, sin renderizar
+    assert not any(r.message_loaded for r in records)
+
+
+def test_missing_rendered_message_falls_back_to_data_summary():
+    source = RecordedEventSource([new_record(10, event_id=9999)])
+    monitor = WindowsEventMonitor(reader=EventLogReader(source))
+
+    assert monitor._to_events(source.records) == []
+    assert source.render_count == 1
+    assert source.records[0].message_loaded
+    # Pedirlo otra vez no vuelve a consultar
+    source.records[0].message
+    assert source.render_count == 1
+
+
+# ============================================================================
+# wevtutil (comandos, sin Windows)
+# ============================================================================
+
+@pytest.fixture
+def wevtutil_commands():
+    rendered = (EVENTS / "rendered_48215.xml").read_text(encoding="utf-8")
+    commands = []
+
+    def handler(command):
+        commands.append(command)
+        return rendered if "/f:RenderedXml" in command else ""
+
+    return ShellRunner(lambda: FakeShellHost(handler), pool_size=1), commands
+
+
+def test_wevtutil_render_messages_is_one_query_per_batch(wevtutil_commands):
+    runner, commands = wevtutil_commands
+    source = WevtutilEventSource('System', runner=runner)
+    records = [new_record(48215), new_record(48216), new_record(48217)]
+
+    source.render_messages(records)
+
+    assert len(commands) == 1
+    assert "EventRecordID=48215 or EventRecordID=48216 or EventRecordID=48217" in commands[0]
+    assert "/f:RenderedXml /c:3" in commands[0]
+    assert records[0].message.startswith("The system failed")
+    # Sin mensaje en la respuesta: resumen de datos, sin consulta extra
+    assert records[1].message_loaded and len(commands) == 1
+
+
+def test_wevtutil_render_messages_splits_large_batches(wevtutil_commands):
+    runner, commands = wevtutil_commands
+    source = WevtutilEventSource('System', runner=runner)
+    source.RENDER_BATCH = 2
+
+    source.render_messages([new_record(i) for i in range(1, 6)])
+    assert len(commands) == 3
@@ -0,0 +1,84 @@
+"""
+Tests de la política de failover/failback reproduciendo trazas sobre
+AutoFailoverManager con FailoverSimulator (tiempo virtual, sin red).
+"""
+
+from src.monitoring.adapter_manager import DNSFallbackTier
+from src.monitoring.dns_health import DNSStatus
+from src.monitoring.failover_simulator import FailoverSimulator, HealthTrace, TraceSample
+
+
+TIERS = [
+    DNSFallbackTier(1, "Cloudflare", "1.1.1.1", "1.0.0.1"),
+    DNSFallbackTier(2, "Google", "8.8.8.8", "8.8.4.4"),
+    DNSFallbackTier(3, "Quad9", "9.9.9.9", "149.112.112.112"),
+    DNSFallbackTier(7, "Router DHCP", "Auto", "Auto"),
+]
+
+
+def up(server, latency_ms, at=0.0):
+    return TraceSample(at, server, DNSStatus.UP, latency_ms)
+
+
+def down(server, at):
+    return TraceSample(at, server, DNSStatus.DOWN, 9999.0, 100.0)
+
+
+def test_no_failback_to_a_healthy_tier_skipped_by_score():
+    # Tier 1 cae; tier 2 sano pero lento, tier 3 rápido → failover por score a 3.
+    # Tier 2 sigue sano toda la traza: no debe haber failback hacia él.
+    trace = HealthTrace("skip-healthy", duration_s=1800, samples=[
+        up("1.1.1.1", 10), up("1.0.0.1", 10),
+        up("8.8.8.8", 90), up("8.8.4.4", 90),
+        up("9.9.9.9", 12), up("149.112.112.112", 12),
+        down("1.1.1.1", 60), down("1.0.0.1", 60),
+    ])
+
+    report = FailoverSimulator(tiers=TIERS, failback_dwell_seconds=120).run(trace)
+
+    assert [(e.from_tier, e.to_tier, e.kind) for e in report.events] == [(1, 3, "failover")]
+    assert report.failbacks == 0
+    assert report.final_tier == 3
+
+
+def test_failback_returns_to_the_tier_the_failover_left():
+    trace = HealthTrace("recover", duration_s=1800, samples=[
+        up("1.1.1.1", 10), up("1.0.0.1", 10),
+        up("8.8.8.8", 90), up("8.8.4.4", 90),
+        up("9.9.9.9", 12), up("149.112.112.112", 12),
+        down("1.1.1.1", 60), down("1.0.0.1", 60),
+        up("1.1.1.1", 10, at=600), up("1.0.0.1", 10, at=600),
+    ])
+
+    report = FailoverSimulator(tiers=TIERS, failback_dwell_seconds=120).run(trace)
+
+    assert [(e.from_tier, e.to_tier, e.kind) for e in report.events] == [
+        (1, 3, "failover"), (3, 1, "failback")
+    ]
+    assert report.final_tier == 1
+
+
+def margin_trace(tier2_latency_ms):
+    # Failover 1 → 3 con 2 caído; luego 2 vuelve (nunca lo dejó un failover)
+    return HealthTrace("margin", duration_s=1800, samples=[
+        up("1.1.1.1", 10), up("1.0.0.1", 10),
+        down("8.8.8.8", 0), down("8.8.4.4", 0),
+        up("9.9.9.9", 60), up("149.112.112.112", 60),
+        down("1.1.1.1", 60), down("1.0.0.1", 60),
+        up("8.8.8.8", tier2_latency_ms, at=300), up("8.8.4.4", tier2_latency_ms, at=300),
+    ])
+
+
+def test_failback_to_a_tier_that_beats_the_current_score_by_the_margin():
+    report = FailoverSimulator(tiers=TIERS, failback_dwell_seconds=120).run(margin_trace(10))
+
+    assert [(e.from_tier, e.to_tier, e.kind) for e in report.events] == [
+        (1, 3, "failover"), (3, 2, "failback")
+    ]
+
+
+def test_no_failback_within_the_score_margin():
+    report = FailoverSimulator(tiers=TIERS, failback_dwell_seconds=120).run(margin_trace(50))
+
+    assert report.failbacks == 0
+    assert report.final_tier == 3
@@ -0,0 +1,98 @@
+"""
+Tests de MultiAdapterFailoverManager siguiendo los cambios de un
+InterfaceWatcher (sin red: los managers no se inician).
+"""
+
+from dataclasses import replace
+
+from src.monitoring.adapter_manager import AdapterManager, AdapterStatus, NetworkAdapter
+from src.monitoring.auto_failover import MultiAdapterFailoverManager
+from src.monitoring.interface_watcher import InterfaceWatcher, LinkEvent
+
+
+def adapter(name, ipv4, status=AdapterStatus.UP):
+    return NetworkAdapter(name=name, interface_description=name, status=status, metric=25,
+                          mac_address="00-00-00-00-00-00", speed_mbps=1000, mtu=1500,
+                          dns_servers=["1.1.1.1"], ipv4_address=ipv4)
+
+
+class FakeBackend:
+    def __init__(self, adapters):
+        self.adapters = adapters
+
+    def detect(self):
+        return list(self.adapters)
+
+
+def watched_failover(adapters):
+    backend = FakeBackend(adapters)
+    manager = AdapterManager(backend=backend)
+    watcher = InterfaceWatcher(manager, source=object())
+    failover = MultiAdapterFailoverManager(manager)
+    failover.attach_interface_watcher(watcher)
+    return backend, watcher, failover
+
+
+def test_adapters_added_and_removed_follow_the_watcher():
+    backend, watcher, failover = watched_failover([adapter("Ethernet", "192.168.1.50")])
+    assert set(failover.managers) == {"Ethernet"}
+
+    backend.adapters = [adapter("Ethernet", "192.168.1.50"), adapter("Wi-Fi", "192.168.1.51")]
+    watcher.apply([LinkEvent(kind='poll')])
+    assert set(failover.managers) == {"Ethernet", "Wi-Fi"}
+    assert failover.checkers["Wi-Fi"].source_address == "192.168.1.51"
+
+    backend.adapters = [adapter("Wi-Fi", "192.168.1.51")]
+    watcher.apply([LinkEvent(kind='poll')])
+    assert set(failover.managers) == {"Wi-Fi"}
+
+
+def test_link_down_and_roaming_resync():
+    backend, watcher, failover = watched_failover([adapter("Wi-Fi", "192.168.1.51")])
+    original = failover.managers["Wi-Fi"]
+
+    # Roaming: misma interfaz, IP nueva → manager nuevo con la IP de origen nueva
+    backend.adapters = [adapter("Wi-Fi", "10.0.0.7")]
+    watcher.apply([LinkEvent(kind='poll')])
+    assert failover.managers["Wi-Fi"] is not original
+    assert failover.checkers["Wi-Fi"].source_address == "10.0.0.7"
+
+    backend.adapters = [adapter("Wi-Fi", "10.0.0.7", AdapterStatus.DISCONNECTED)]
+    watcher.apply([LinkEvent(kind='poll')])
+    assert failover.managers == {}
+
+
+def test_unrelated_changes_keep_managers():
+    backend, watcher, failover = watched_failover([adapter("Ethernet", "192.168.1.50")])
+    original = failover.managers["Ethernet"]
+
+    backend.adapters = [replace(adapter("Ethernet", "192.168.1.50"), dns_servers=["8.8.8.8"])]
+    changes = watcher.apply([LinkEvent(kind='poll')])
+    assert [c.changed_fields for c in changes] == [["dns_servers"]]
+    assert failover.managers["Ethernet"] is original
+
+
+def test_dns_change_wakes_only_the_affected_manager():
+    backend, watcher, failover = watched_failover([adapter("Ethernet", "192.168.1.50"),
+                                                   adapter("Wi-Fi", "192.168.1.51")])
+    ethernet, wifi = failover.managers["Ethernet"], failover.managers["Wi-Fi"]
+    ethernet._healthy_since[1] = wifi._healthy_since[1] = object()
+
+    backend.adapters = [replace(adapter("Ethernet", "192.168.1.50"), dns_servers=["8.8.8.8"]),
+                        adapter("Wi-Fi", "192.168.1.51")]
+    watcher.apply([LinkEvent(kind='poll')])
+
+    # El manager sigue siendo el mismo, pero verifica ya con el seguimiento limpio
+    assert failover.managers["Ethernet"] is ethernet
+    assert ethernet._wake.is_set() and ethernet._interface_changed
+    assert not wifi._wake.is_set() and not wifi._interface_changed
+    ethernet._reset_tracking()
+    assert ethernet._healthy_since == {} and wifi._healthy_since
+
+
+def test_windows_polls_less_often(monkeypatch):
+    from src.monitoring import interface_watcher
+
+    monkeypatch.setattr(interface_watcher.sys, 'platform', 'win32')
+    watcher = InterfaceWatcher(AdapterManager(backend=FakeBackend([])))
+    assert watcher._create_source().interval == InterfaceWatcher.POLL_INTERVAL_WINDOWS
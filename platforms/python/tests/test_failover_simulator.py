@@ -0,0 +1,75 @@
+"""
+Tests de FailoverSimulator: métricas de una traza construida a mano y
+determinismo de las trazas sintéticas con semilla.
+"""
+
+from src.monitoring.adapter_manager import DNSFallbackTier
+from src.monitoring.dns_health import DNSStatus
+from src.monitoring.failover_simulator import (
+    FailoverSimulator, HealthTrace, TraceSample, generate_synthetic_trace,
+)
+
+TIERS = [
+    DNSFallbackTier(1, "Cloudflare", "1.1.1.1", "1.0.0.1"),
+    DNSFallbackTier(2, "Google", "8.8.8.8", "8.8.4.4"),
+    DNSFallbackTier(3, "Quad9", "9.9.9.9", "149.112.112.112"),
+    DNSFallbackTier(7, "Router DHCP", "Auto", "Auto"),
+]
+
+
+def cascade_trace():
+    """Tier 1 cae a los 300s, tier 2 a los 310s (en cooldown) y tier 1 vuelve a los 900s"""
+    up, down = DNSStatus.UP, DNSStatus.DOWN
+    return HealthTrace("cascade", duration_s=1800, samples=[
+        TraceSample(0, "1.1.1.1", up, 10), TraceSample(0, "1.0.0.1", up, 10),
+        TraceSample(0, "8.8.8.8", up, 20), TraceSample(0, "8.8.4.4", up, 20),
+        TraceSample(0, "9.9.9.9", up, 30), TraceSample(0, "149.112.112.112", up, 30),
+        TraceSample(300, "1.1.1.1", down, 9999, 100),
+        TraceSample(310, "8.8.8.8", down, 9999, 100),
+        TraceSample(900, "1.1.1.1", up, 10),
+    ])
+
+
+def test_cascade_trace_metrics():
+    simulator = FailoverSimulator(tiers=TIERS, cooldown_seconds=30, check_interval=10,
+                                  failback_dwell_seconds=180)
+
+    report = simulator.run(cascade_trace())
+
+    assert [(e.from_tier, e.to_tier, e.kind) for e in report.events] == [
+        (1, 2, "failover"), (2, 3, "failover"), (3, 1, "failback")
+    ]
+    assert (report.switches, report.failbacks, report.failed_switches) == (3, 1, 0)
+    assert (report.flaps, report.spurious_switches, report.unresolved_degradations) == (0, 0, 0)
+    # Tier 2 cae dentro del cooldown del primer failover: 20s en un tier caído
+    assert report.time_to_failover_s == [0.0, 20.0]
+    assert report.degraded_s == 20.0
+    # Fuera del tier 1 desde 300s hasta el failback (900s + 180s de estabilidad)
+    assert report.fallback_s == 780.0
+    assert report.final_tier == 1
+
+
+def test_seeded_synthetic_trace_is_reproducible():
+    trace = generate_synthetic_trace(tiers=TIERS, duration_s=3600, outage_rate_per_hour=2, seed=7)
+    again = generate_synthetic_trace(tiers=TIERS, duration_s=3600, outage_rate_per_hour=2, seed=7)
+    assert trace.to_dict() == again.to_dict()
+
+    report = FailoverSimulator(tiers=TIERS).run(trace)
+    assert report.to_dict() == FailoverSimulator(tiers=TIERS).run(again).to_dict()
+
+    assert [(e.from_tier, e.to_tier, e.kind) for e in report.events] == [
+        (1, 3, "failover"), (3, 1, "failback"), (1, 3, "failover")
+    ]
+    assert (report.switches, report.failbacks, report.flaps) == (3, 1, 1)
+    assert report.unresolved_degradations == 0
+    assert [round(t, 2) for t in report.time_to_failover_s] == [5.51, 4.78]
+    assert report.degraded_s == 0.0
+    assert report.fallback_s == 500.0
+    assert report.final_tier == 3
+
+
+def test_trace_round_trips_through_json(tmp_path):
+    trace = cascade_trace()
+    trace.save(tmp_path / "trace.json")
+
+    assert HealthTrace.load(tmp_path / "trace.json").to_dict() == trace.to_dict()
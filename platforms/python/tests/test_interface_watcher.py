@@ -0,0 +1,129 @@
+"""
+Tests de InterfaceWatcher: decodificación de datagramas rtnetlink y
+aplicación incremental de avisos con un backend falso (sin sockets).
+"""
+
+import struct
+
+from src.monitoring.adapter_manager import AdapterManager, AdapterStatus, NetworkAdapter
+from src.monitoring.interface_watcher import (
+    IFADDRMSG, IFINFOMSG, IFLA_IFNAME, NLMSG_DONE, NLMSG_HDR, RTA_OIF, RTATTR, RTMSG,
+    RTM_DELADDR, RTM_NEWLINK, RTM_NEWROUTE, InterfaceWatcher, LinkEvent, parse_netlink_messages,
+)
+
+
+def rtattr(attr_type, value):
+    data = RTATTR.pack(RTATTR.size + len(value), attr_type) + value
+    return data + b"\0" * (-len(data) % 4)
+
+
+def nlmsg(msg_type, body):
+    body += b"\0" * (-len(body) % 4)
+    return NLMSG_HDR.pack(NLMSG_HDR.size + len(body), msg_type, 0, 0, 0) + body
+
+
+def newlink(index, name):
+    return nlmsg(RTM_NEWLINK, IFINFOMSG.pack(0, 1, index, 0, 0) + rtattr(IFLA_IFNAME, name.encode() + b"\0"))
+
+
+def deladdr(index):
+    return nlmsg(RTM_DELADDR, IFADDRMSG.pack(2, 24, 0, 0, index))
+
+
+def newroute(oif):
+    return nlmsg(RTM_NEWROUTE, RTMSG.pack(2, 0, 0, 0, 254, 3, 0, 1, 0) + rtattr(RTA_OIF, struct.pack("=i", oif)))
+
+
+def test_parse_link_address_and_route_messages():
+    datagram = newlink(3, "wlan0") + deladdr(3) + newroute(2)
+
+    events = parse_netlink_messages(datagram)
+
+    assert [(e.kind, e.ifindex, e.ifname, e.removed) for e in events] == [
+        ('link', 3, "wlan0", False),
+        ('address', 3, None, True),
+        ('route', 2, None, False),
+    ]
+
+
+def test_parse_stops_at_done_and_truncated_headers():
+    datagram = newlink(1, "lo") + nlmsg(NLMSG_DONE, b"") + newlink(2, "eth0")
+    assert [e.ifname for e in parse_netlink_messages(datagram)] == ["lo"]
+
+    assert parse_netlink_messages(newlink(1, "lo")[:NLMSG_HDR.size - 1]) == []
+
+
+def adapter(name, ipv4, status=AdapterStatus.UP):
+    return NetworkAdapter(name=name, interface_description=name, status=status, metric=25,
+                          mac_address="00-00-00-00-00-00", speed_mbps=1000, mtu=1500,
+                          dns_servers=["1.1.1.1"], ipv4_address=ipv4)
+
+
+class FakeLinuxBackend:
+    """Backend con relectura por interfaz (como LinuxAdapterBackend)"""
+
+    def __init__(self, adapters, names):
+        self.adapters = {a.name: a for a in adapters}
+        self.names = names
+        self.detect_calls = 0
+        self.detected = []
+
+    def detect(self):
+        self.detect_calls += 1
+        return list(self.adapters.values())
+
+    def detect_adapter(self, name):
+        self.detected.append(name)
+        return self.adapters.get(name)
+
+    def interface_name(self, ifindex):
+        return self.names.get(ifindex)
+
+
+def linux_watcher(adapters, names):
+    backend = FakeLinuxBackend(adapters, names)
+    manager = AdapterManager(backend=backend)
+    return backend, manager, InterfaceWatcher(manager, source=object())
+
+
+def test_apply_rereads_only_the_affected_interface():
+    backend, manager, watcher = linux_watcher(
+        [adapter("eth0", "192.168.1.50"), adapter("wlan0", "192.168.1.51")], {2: "eth0", 3: "wlan0"})
+    backend.detect_calls = 0
+    notified = []
+    watcher.on_change(notified.append)
+
+    backend.adapters["wlan0"] = adapter("wlan0", "10.0.0.7")
+    changes = watcher.apply(parse_netlink_messages(deladdr(3) + newroute(3)))
+
+    assert backend.detect_calls == 0
+    assert backend.detected == ["wlan0"]
+    assert [(c.name, c.change, c.changed_fields) for c in changes] == [("wlan0", "changed", ["ipv4_address"])]
+    assert notified == changes
+    assert [a.name for a in manager.adapters] == ["eth0", "wlan0"]
+
+
+def test_apply_adds_and_removes_interfaces_and_skips_no_ops():
+    backend, manager, watcher = linux_watcher([adapter("eth0", "192.168.1.50")], {2: "eth0"})
+
+    backend.adapters["tun0"] = adapter("tun0", "10.8.0.2")
+    changes = watcher.apply([LinkEvent(kind='link', ifindex=9, ifname="tun0")])
+    assert [(c.name, c.change) for c in changes] == [("tun0", "added")]
+
+    del backend.adapters["tun0"]
+    changes = watcher.apply([LinkEvent(kind='link', ifindex=9, removed=True)])
+    assert [(c.name, c.change) for c in changes] == [("tun0", "removed")]
+    assert [a.name for a in manager.adapters] == ["eth0"]
+
+    assert watcher.apply(parse_netlink_messages(newroute(2))) == []
+
+
+def test_apply_falls_back_to_full_detection_for_unknown_interfaces():
+    backend, manager, watcher = linux_watcher([adapter("eth0", "192.168.1.50")], {2: "eth0"})
+    backend.detect_calls = 0
+
+    backend.adapters["eth0"] = adapter("eth0", "192.168.1.50", AdapterStatus.DISCONNECTED)
+    changes = watcher.apply([LinkEvent(kind='address', ifindex=42)])
+
+    assert backend.detect_calls == 1
+    assert changes[0].status_changed
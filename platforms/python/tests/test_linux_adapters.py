@@ -0,0 +1,73 @@
+"""
+Tests de LinuxAdapterBackend sobre un árbol /sys, /proc, /etc y /run grabado
+(tests/fixtures/linux_tree), sin tocar las interfaces del sistema.
+"""
+
+import sys
+
+import pytest
+
+from conftest import FIXTURES
+from src.monitoring.adapter_manager import AdapterStatus
+from src.monitoring.linux_adapters import LinuxAdapterBackend
+
+# /proc/net/route está en orden de bytes del host: el árbol se grabó en x86
+pytestmark = pytest.mark.skipif(sys.byteorder != "little", reason="fixture grabado en little-endian")
+
+
+@pytest.fixture
+def backend():
+    return LinuxAdapterBackend(root=str(FIXTURES / "linux_tree"))
+
+
+def test_default_routes_keep_the_lowest_metric_per_interface(backend):
+    assert backend.read_default_routes() == {
+        "eth0": ("192.168.1.1", 100),
+        "tun0": (None, 50),           # Ruta de enlace del túnel, sin next hop
+    }
+
+
+def test_systemd_stub_resolves_to_upstream_servers(backend):
+    assert backend.read_dns_servers() == ["1.1.1.1", "9.9.9.9"]
+
+
+def test_detect_builds_adapters_and_skips_loopback(backend):
+    adapters = {adapter.name: adapter for adapter in backend.detect()}
+    assert sorted(adapters) == ["eth0", "tun0", "wlan0"]
+
+    eth0 = adapters["eth0"]
+    assert eth0.status == AdapterStatus.UP
+    assert eth0.interface_description == "e1000e (Ethernet)"
+    assert eth0.mac_address == "3C-52-82-1A-2B-3C"
+    assert (eth0.speed_mbps, eth0.mtu, eth0.metric) == (1000, 1500, 100)
+    assert eth0.default_gateway == "192.168.1.1"
+    assert eth0.ipv4_address is None            # Sin ioctl fuera del sistema real
+    assert eth0.ipv6_address == "2001:db8::10"
+    assert eth0.dns_servers == ["1.1.1.1", "9.9.9.9"]
+    assert eth0.dhcp_enabled
+
+
+def test_tunnel_with_unknown_operstate_is_up_with_link_dns(backend):
+    tun0 = backend.detect_adapter("tun0")
+
+    assert tun0.status == AdapterStatus.UP
+    assert tun0.interface_description == "Tunnel"
+    assert (tun0.mtu, tun0.metric, tun0.default_gateway) == (1420, 50, None)
+    assert tun0.dns_servers == ["10.8.0.1"]
+    assert not tun0.dhcp_enabled
+
+
+def test_down_interface_is_disconnected_without_route_or_dns(backend):
+    wlan0 = backend.detect_adapter("wlan0")
+
+    assert wlan0.status == AdapterStatus.DISCONNECTED
+    assert wlan0.interface_description == "iwlwifi (Wi-Fi)"
+    assert wlan0.metric == LinuxAdapterBackend.NO_ROUTE_METRIC
+    assert wlan0.dns_servers == []
+    assert wlan0.speed_mbps == 0
+
+
+def test_missing_interface_and_index_lookup_outside_the_real_root(backend):
+    assert backend.detect_adapter("eth9") is None
+    assert backend.detect_adapter("lo") is None
+    assert backend.interface_name(2) is None
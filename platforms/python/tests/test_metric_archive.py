@@ -0,0 +1,117 @@
+"""
+Tests de MetricArchive: recuperación tras una caída a mitad de append,
+cambio de día UTC, reinicio de contadores y lecturas de varios días.
+"""
+
+import struct
+
+import numpy as np
+import pytest
+
+from src.storage.metric_archive import (
+    COUNT_OFFSET, DAY_SECONDS, HEADER_SIZE, RECORD_SIZE, DayFile, MetricArchive, day_start,
+)
+
+DAY = day_start(1_760_000_000)
+
+
+def counters(recv, sent=0):
+    return {'bytes_recv': recv, 'bytes_sent': sent, 'packets_recv': recv // 1000}
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = MetricArchive(tmp_path)
+    yield archive
+    archive.close()
+
+
+def feed(archive, start, seconds, step=1000, first=0, adapter="Ethernet"):
+    for i in range(seconds):
+        archive.append(adapter, start + i, counters(first + i * step))
+
+
+def test_torn_count_and_zeroed_tail_are_discarded_on_reopen(tmp_path):
+    archive = MetricArchive(tmp_path)
+    feed(archive, DAY + 3600, 5)
+    path = archive._open["Ethernet"].path
+    archive.close()
+
+    # Caída tras confirmar un count mayor que los registros escritos: la
+    # cola preasignada queda en ceros (t = 0 < último t)
+    with open(path, 'r+b') as f:
+        f.seek(COUNT_OFFSET)
+        f.write(struct.pack('<I', 8))
+
+    day = DayFile(path, "Ethernet", DAY)
+    try:
+        assert (day.count, day.recovered) == (5, 3)
+        assert day.last_time_ms() == 3604 * 1000
+    finally:
+        day.close()
+
+
+def test_torn_record_past_the_day_is_discarded(tmp_path):
+    archive = MetricArchive(tmp_path)
+    feed(archive, DAY + 10, 3)
+    path = archive._open["Ethernet"].path
+    archive.close()
+
+    # Registro a medio escribir con basura en t y count ya confirmado
+    with open(path, 'r+b') as f:
+        f.seek(HEADER_SIZE + 3 * RECORD_SIZE)
+        f.write(b'\xff' * RECORD_SIZE)
+        f.seek(COUNT_OFFSET)
+        f.write(struct.pack('<I', 4))
+
+    reopened = MetricArchive(tmp_path)
+    try:
+        # La muestra siguiente sigue desde los contadores confirmados
+        reopened.append("Ethernet", DAY + 13, counters(3000))
+        stamps, records = reopened.read("Ethernet", DAY, DAY + 60)
+        assert list(stamps) == [DAY + 10, DAY + 11, DAY + 12, DAY + 13]
+        assert list(records['bytes_recv']) == [0, 1000, 1000, 1000]
+    finally:
+        reopened.close()
+
+
+def test_day_rollover_opens_a_new_file_and_keeps_deltas(archive):
+    midnight = DAY + DAY_SECONDS
+    feed(archive, midnight - 2, 4)
+
+    assert len(archive.days("Ethernet")) == 2
+
+    stamps, records = archive.read("Ethernet", midnight - 2, midnight + 1)
+    assert list(stamps) == [midnight - 2, midnight - 1, midnight, midnight + 1]
+    # El primer registro del día nuevo conserva el incremento del segundo
+    assert list(records['bytes_recv']) == [0, 1000, 1000, 1000]
+
+
+def test_counter_reset_and_gaps_record_zero(archive):
+    archive.append("Ethernet", DAY + 0, counters(50_000))
+    archive.append("Ethernet", DAY + 1, counters(60_000))
+    archive.append("Ethernet", DAY + 2, counters(500))            # Reinicio del contador
+    archive.append("Ethernet", DAY + 3, counters(1500))
+    archive.append("Ethernet", DAY + 3 + MetricArchive.MAX_GAP + 1, counters(9500))  # Hueco
+
+    _, records = archive.read("Ethernet", DAY, DAY + 60)
+    assert list(records['bytes_recv']) == [0, 10_000, 0, 1000, 0]
+
+
+def test_multi_day_read_and_totals(archive):
+    feed(archive, DAY + DAY_SECONDS - 10, 20, step=2000)
+    feed(archive, DAY + 2 * DAY_SECONDS, 5, step=2000, first=100_000)
+
+    stamps, records = archive.read("Ethernet", DAY, DAY + 3 * DAY_SECONDS)
+    assert len(records) == 25
+    assert np.all(np.diff(stamps) > 0)
+
+    totals = archive.totals("Ethernet", DAY, DAY + 3 * DAY_SECONDS)
+    assert totals['samples'] == 25
+    assert totals['bytes_recv'] == int(records['bytes_recv'].sum())
+    # El primero de cada tramo (tras un hueco) no tiene incremento
+    assert totals['bytes_recv'] == 2000 * (19 + 4)
+
+    partial = archive.totals("Ethernet", DAY + DAY_SECONDS, DAY + DAY_SECONDS + 4)
+    assert (partial['samples'], partial['bytes_recv']) == (5, 10_000)
+    assert archive.adapters() == ["Ethernet"]
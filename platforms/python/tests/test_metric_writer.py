@@ -0,0 +1,113 @@
+"""
+Tests de MetricWriter con un storage falso: flush por tamaño y por tiempo,
+reintento de lotes fallidos, descarte con la cola llena y drenado en stop().
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.storage.metric_writer import MetricWriter
+
+
+class FakeStorage:
+    def __init__(self):
+        self.batches = []
+        self.fail = 0               # Próximos save_metrics que fallan
+        self.saved = threading.Event()
+
+    def save_metrics(self, batch):
+        if self.fail:
+            self.fail -= 1
+            raise OSError("disco lleno")
+        self.batches.append([m['latency'] for m in batch])
+        self.saved.set()
+
+    @property
+    def written(self):
+        return [value for batch in self.batches for value in batch]
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def storage():
+    return FakeStorage()
+
+
+def test_full_batch_wakes_the_writer(storage):
+    writer = MetricWriter(storage, batch_size=5, flush_interval=60)
+    writer.start()
+    try:
+        for i in range(4):
+            writer.submit({'latency': i})
+        assert not storage.saved.wait(0.1)
+
+        writer.submit({'latency': 4})
+        assert storage.saved.wait(2.0)
+        assert storage.batches == [[0, 1, 2, 3, 4]]
+    finally:
+        writer.stop()
+
+
+def test_partial_batch_is_written_after_the_interval(storage):
+    writer = MetricWriter(storage, batch_size=100, flush_interval=0.05)
+    writer.start()
+    try:
+        first = {'latency': 1}
+        writer.submit(first)
+        writer.submit({'latency': 2})
+        assert wait_for(lambda: storage.written == [1, 2])
+        assert writer.get_stats()['batches'] == 1
+        assert 'timestamp' in first
+    finally:
+        writer.stop()
+
+
+def test_failed_batch_is_requeued_in_order(storage):
+    writer = MetricWriter(storage, batch_size=2)
+    for i in range(5):
+        writer.submit({'latency': i})
+
+    storage.fail = 1
+    assert writer.flush() == 0
+    assert writer.queue_depth == 5
+    assert writer.failed_batches == 1
+
+    assert writer.flush() == 5
+    assert storage.batches == [[0, 1], [2, 3], [4]]
+    stats = writer.get_stats()
+    assert (stats['written'], stats['batches'], stats['queue_depth']) == (5, 3, 0)
+
+
+def test_full_queue_drops_the_oldest(storage, monkeypatch):
+    monkeypatch.setattr(MetricWriter, 'MAX_QUEUE', 3)
+    writer = MetricWriter(storage, batch_size=10)
+
+    for i in range(5):
+        writer.submit({'latency': i})
+
+    assert (writer.submitted, writer.dropped, writer.queue_depth) == (5, 2, 3)
+    writer.flush()
+    assert storage.written == [2, 3, 4]
+
+
+def test_stop_drains_the_queue(storage):
+    writer = MetricWriter(storage, batch_size=4, flush_interval=60)
+    writer.start()
+    for i in range(3):
+        writer.submit({'latency': i})
+
+    writer.stop()
+
+    assert storage.written == [0, 1, 2]
+    assert writer.queue_depth == 0
+    assert not writer.is_running
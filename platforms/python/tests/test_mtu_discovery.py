@@ -0,0 +1,82 @@
+"""
+Tests de MtuDiscovery sobre SimulatedPathBackend: PPPoE con avisos ICMP,
+agujero negro de PMTU detrás de una VPN y recomendación por adaptador.
+"""
+
+from src.monitoring.adapter_manager import AdapterStatus, NetworkAdapter
+from src.monitoring.mtu_discovery import MtuDiscovery, recommend_mtu
+from src.monitoring.probe_backends import SimulatedHop, SimulatedPathBackend
+
+
+def pppoe_backend():
+    """PPPoE con avisos ICMP 'fragmentation needed' correctos"""
+    return SimulatedPathBackend([
+        SimulatedHop("192.168.1.1"),
+        SimulatedHop("100.64.0.1", mtu=1492),
+        SimulatedHop("1.1.1.1"),
+    ])
+
+
+def black_hole_backend():
+    """VPN detrás de un router que descarta sin avisar"""
+    return SimulatedPathBackend([
+        SimulatedHop("10.8.0.1"),
+        SimulatedHop("203.0.113.1", mtu=1420, sends_too_big=False),
+        SimulatedHop("8.8.8.8"),
+    ])
+
+
+def test_pppoe_path_mtu_uses_the_reported_value():
+    result = MtuDiscovery(pppoe_backend()).discover("1.1.1.1", adapter="Ethernet")
+
+    assert result.path_mtu == 1492
+    assert result.mss == 1452
+    assert result.probes == 3           # Alcance, 1500 rechazado, 1492 confirmado
+    assert (result.too_big_from, result.reported_mtu) == ("100.64.0.1", 1492)
+    assert not result.black_hole
+    assert result.overhead_source == "PPPoE"
+    assert result.recommended_mtu == 1492
+    assert "MTU recomendado: 1492" in result.summary()
+
+
+def test_black_hole_is_detected_by_binary_search():
+    result = MtuDiscovery(black_hole_backend()).discover("8.8.8.8", adapter="WireGuard", is_vpn=True)
+
+    assert result.path_mtu == 1420
+    assert result.black_hole
+    assert result.reported_mtu is None
+    assert result.overhead_source == "WireGuard"
+    assert any("Agujero negro" in issue for issue in result.issues)
+    assert any("VPN" in issue for issue in result.issues)
+    assert result.recommended_mtu == 1420
+
+
+def test_clean_path_keeps_the_adapter_mtu():
+    backend = SimulatedPathBackend([SimulatedHop("192.168.1.1"), SimulatedHop("1.1.1.1")])
+    result = MtuDiscovery(backend).discover("1.1.1.1")
+
+    assert result.path_mtu == 1500
+    assert not result.mismatch and not result.issues
+    assert result.recommended_mtu == 1500
+
+
+def test_unreachable_target_has_no_path_mtu():
+    backend = SimulatedPathBackend([SimulatedHop("192.168.1.1"), SimulatedHop("1.1.1.1", responds=False)])
+    result = MtuDiscovery(backend).discover("1.1.1.1")
+
+    assert not result.reachable
+    assert result.recommended_mtu is None
+    assert "sin respuesta" in result.summary()
+
+
+def test_adapter_recommendation_is_the_smallest_path_mtu():
+    adapter = NetworkAdapter(name="WireGuard", interface_description="WireGuard Tunnel", status=AdapterStatus.UP,
+                             metric=5, mac_address="", speed_mbps=0, mtu=1500, dns_servers=[])
+    discovery = MtuDiscovery(black_hole_backend())
+
+    results = discovery.discover_adapter(adapter, ["8.8.8.8"])
+    results["1.1.1.1"] = discovery.discover("1.1.1.1", adapter="WireGuard", backend=pppoe_backend())
+
+    assert any("VPN" in issue for issue in results["8.8.8.8"].issues)
+    assert recommend_mtu(results.values()) == 1420
+    assert set(discovery.results) == {("WireGuard", "8.8.8.8"), ("WireGuard", "1.1.1.1")}
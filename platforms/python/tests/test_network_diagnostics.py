@@ -0,0 +1,46 @@
+"""
+Tests del diagnóstico concurrente (sin red: sondas reemplazadas).
+"""
+
+import threading
+import time
+
+from src.monitoring.network_diagnostics import NetworkDiagnostics
+
+
+class OfflineDiagnostics(NetworkDiagnostics):
+    def _get_adapter_info(self, adapter_name=None):
+        return "Ethernet", "192.168.1.1", ["1.1.1.1", "8.8.8.8"]
+
+    def _check_adapter(self, adapter_name):
+        return True
+
+    def _ping_target(self, target, timeout=2, count=2):
+        time.sleep(0.01)
+        return 5.0, True
+
+    def _nslookup(self, domain, dns):
+        time.sleep(0.01)
+        return 12.0, True
+
+
+def test_layers_do_not_starve_their_probes():
+    diagnostics = OfflineDiagnostics()
+    # Un solo hilo de sondas: con un pool compartido, ISP y DNS ocuparían
+    # los hilos esperando sondas que nunca arrancan
+    diagnostics.PARALLEL_WORKERS = 1
+    diagnostics.LAYER_WORKERS = 2
+    done = {}
+
+    def run():
+        done['probes'] = diagnostics._run_probes_concurrent(None, use_cache=False)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(5)
+
+    assert 'probes' in done
+    probes = done['probes']
+    assert probes['isp'] == (5.0, True)
+    assert probes['dns'] == (12.0, True)
+    assert probes['router'] == (5.0, True)
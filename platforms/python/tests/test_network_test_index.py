@@ -0,0 +1,103 @@
+"""
+Tests del índice de tests de red, contra ambos backends (TinyDB y SQLite).
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from src.storage.db_manager import NetBooztStorage
+from src.storage.network_test_index import NetworkTestIndex
+from src.storage.sqlite_storage import SQLiteStorage
+
+SAME = '2026-10-10T12:00:00'
+
+
+def _test(timestamp, download=100, latency=20):
+    return {'timestamp': timestamp, 'adapter': 'Ethernet', 'download_mbps': download,
+            'upload_mbps': 10, 'latency_ms': latency}
+
+
+@pytest.fixture(params=['tinydb', 'sqlite'])
+def storage(request, tmp_path):
+    if request.param == 'tinydb':
+        backend = NetBooztStorage(tmp_path / "netboozt_data.json")
+    else:
+        backend = SQLiteStorage(tmp_path / "netboozt_data.db")
+    yield backend
+    backend.close()
+
+
+def _import(storage, tmp_path, tests):
+    """Los tests importados conservan su timestamp (save_network_test usa now())"""
+    path = tmp_path / "import.json"
+    path.write_text(json.dumps({'tests': tests}), encoding='utf-8')
+    storage.import_from_json(path)
+    return [t.doc_id for t in storage.get_all_tests()]
+
+
+def test_equal_timestamps_are_ordered_by_id(storage, tmp_path):
+    ids = _import(storage, tmp_path, [_test('2026-10-09T08:00:00'), _test(SAME), _test(SAME),
+                                      _test(SAME), _test('2026-10-11T08:00:00')])
+    older, a, b, c, newer = ids
+
+    assert [t.doc_id for t in storage.get_recent_tests(3)] == [newer, c, b]
+    assert [t.doc_id for t in storage.get_recent_tests(10)] == [newer, c, b, a, older]
+    in_range = storage.get_tests_by_date_range(datetime.fromisoformat(SAME), datetime.fromisoformat(SAME))
+    assert [t.doc_id for t in in_range] == [a, b, c]
+
+
+def test_removing_best_test_recomputes_max(storage, tmp_path):
+    ids = _import(storage, tmp_path, [_test(SAME, download=900, latency=15),
+                                      _test(SAME, download=300, latency=80),
+                                      _test(SAME, download=500, latency=40)])
+    stats = storage.get_test_stats()
+    assert (stats['best_download'], stats['worst_latency']) == (900, 80)
+
+    storage.remove_tests([ids[0]])
+    stats = storage.get_test_stats()
+    assert stats['total_tests'] == 2
+    assert stats['best_download'] == 500
+    assert stats['avg_download'] == pytest.approx(400)
+
+    storage.remove_tests([ids[1]])
+    stats = storage.get_test_stats()
+    assert (stats['best_download'], stats['worst_latency']) == (500, 40)
+
+    # Un alta tras el recálculo vuelve a actualizar los máximos
+    storage.save_network_test(_test(None, download=1000, latency=5))
+    assert storage.get_test_stats()['best_download'] == 1000
+
+
+def test_clear_old_data_keeps_tests_without_timestamp(storage, tmp_path):
+    recent = datetime.now().isoformat()
+    _import(storage, tmp_path, [_test(''), _test('2020-01-01T00:00:00'), _test(recent)])
+    untimed = {'adapter': 'Wi-Fi', 'download_mbps': 50, 'upload_mbps': 5, 'latency_ms': 30}
+    _import(storage, tmp_path, [untimed])
+
+    storage.clear_old_data(days=30)
+
+    kept = storage.get_all_tests()
+    assert [t.get('timestamp') for t in kept] == ['', recent, None]
+    assert storage.get_test_stats()['total_tests'] == 3
+
+
+class _Doc(dict):
+    def __init__(self, data, doc_id):
+        super().__init__(data)
+        self.doc_id = doc_id
+
+
+def test_index_older_than_skips_missing_timestamps():
+    index = NetworkTestIndex([
+        _Doc(_test('2026-10-01T00:00:00'), 1),
+        _Doc({'adapter': 'Wi-Fi'}, 2),
+        _Doc(_test(''), 3),
+        _Doc(_test('2026-10-05T00:00:00'), 4),
+        _Doc(_test('2026-10-20T00:00:00'), 5),
+    ])
+
+    assert index.older_than('2026-10-10T00:00:00') == [1, 4]
+    assert index.older_than('') == []
+    assert index.range_ids('', '2026-10-02T00:00:00') == [2, 3, 1]
@@ -0,0 +1,95 @@
+"""
+Tests de PathAnalyzer sobre SimulatedPathBackend (ruta determinista, sin red).
+"""
+
+import pytest
+
+from src.monitoring.path_analyzer import PathAnalyzer
+from src.monitoring.probe_backends import SimulatedHop, SimulatedPathBackend
+
+
+def simulated_path():
+    return [
+        SimulatedHop("192.168.1.1", latency_ms=0.5, jitter_ms=0.2),
+        SimulatedHop("10.20.0.1", latency_ms=3, jitter_ms=0.5),
+        # Limita ICMP: responde lento y pierde respuestas, pero reenvía bien
+        SimulatedHop("100.64.1.1", latency_ms=2, jitter_ms=0.5, reply_delay_ms=40, reply_loss=0.3),
+        SimulatedHop("189.203.1.1", latency_ms=4, jitter_ms=1),
+        SimulatedHop("1.1.1.1", latency_ms=2, jitter_ms=0.5),
+    ]
+
+
+@pytest.fixture
+def analyzer_for():
+    analyzers = []
+
+    def build(path):
+        analyzer = PathAnalyzer("1.1.1.1", backend=SimulatedPathBackend(path, seed=1), window=40)
+        analyzers.append(analyzer)
+        return analyzer
+
+    yield build
+    for analyzer in analyzers:
+        analyzer.stop()
+
+
+def test_rate_limiting_hop_that_forwards_cleanly_is_not_blamed(analyzer_for):
+    analyzer = analyzer_for(simulated_path())
+
+    report = analyzer.run(cycles=40, interval=0)
+
+    assert report.reached and len(report.hops) == 5
+    rate_limited = report.hops[2]
+    assert rate_limited['avg_ms'] > 40 and rate_limited['loss_pct'] > 10
+    assert report.added_latency_ms[3] == 0.0
+    assert report.added_loss_pct[3] == 0.0
+    assert analyzer.locate_degradation(report=report) is None
+
+
+def test_locate_degradation_finds_the_injected_hop(analyzer_for):
+    path = simulated_path()
+    path[2] = SimulatedHop("100.64.1.1", latency_ms=2, jitter_ms=0.5)
+    path[3].latency_ms = 30
+    path[3].loss = 0.15
+
+    analyzer = analyzer_for(path)
+    degradation = analyzer.locate_degradation(report=analyzer.run(cycles=40, interval=0))
+
+    assert degradation is not None
+    assert degradation.ttl == 4
+    assert degradation.address == "189.203.1.1"
+    assert 40 <= degradation.added_latency_ms <= 65   # ~2 × 26ms de ida y vuelta
+    assert degradation.added_loss_pct >= PathAnalyzer.MIN_ADDED_LOSS_PCT
+
+
+def test_degradation_behind_a_rate_limiting_hop_is_located_against_the_baseline(analyzer_for):
+    path = simulated_path()
+    healthy = analyzer_for(path).run(cycles=40, interval=0)
+
+    path[3].latency_ms = 30
+    path[3].loss = 0.15
+    analyzer = analyzer_for(path)
+    degradation = analyzer.locate_degradation(baseline=healthy, report=analyzer.run(cycles=40, interval=0))
+
+    assert degradation.ttl == 4
+    assert 40 <= degradation.added_latency_ms <= 65
+    assert degradation.added_loss_pct >= PathAnalyzer.MIN_ADDED_LOSS_PCT
+
+
+def test_baseline_cancels_hops_that_were_always_slow(analyzer_for):
+    # El salto 2 siempre añade ~40ms (enlace lejano): sin baseline se le
+    # atribuye; contra un baseline sano solo cuenta lo que empeoró
+    path = simulated_path()
+    path[1].latency_ms = 20
+    analyzer = analyzer_for(path)
+    healthy = analyzer.run(cycles=40, interval=0)
+
+    assert analyzer.locate_degradation(report=healthy).ttl == 2
+    assert analyzer.locate_degradation(baseline=healthy, report=healthy) is None
+
+    path[3].latency_ms = 20
+    degraded = analyzer_for(path).run(cycles=40, interval=0)
+    degradation = analyzer.locate_degradation(baseline=healthy, report=degraded)
+
+    assert degradation.ttl == 4
+    assert 25 <= degradation.added_latency_ms <= 40   # ~2 × 16ms
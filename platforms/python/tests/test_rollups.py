@@ -0,0 +1,61 @@
+"""
+Tests de persistencia y claves del motor de rollups (src/storage/rollups.py).
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+from src.storage.rollups import RollupEngine
+
+START = 1_760_000_400.0     # Múltiplo de 15 min
+
+
+def wait_for_save(engine):
+    thread = engine._save_thread
+    if thread is not None:
+        thread.join(5)
+
+
+def test_autosave_when_15m_bucket_closes(tmp_path):
+    path = tmp_path / "rollups.json"
+    engine = RollupEngine(path=path, autosave=True)
+
+    # El cierre sube en cascada (1s → 1m → 15m): el bucket de 15m se cierra
+    # cuando cierra el primer minuto del bucket siguiente (+900..+959), que
+    # a su vez cierra al llegar el primer segundo posterior a +960
+    for second in range(0, 970, 10):
+        engine.add_sample('latency_ms', 20, START + second)
+    wait_for_save(engine)
+    assert not path.exists()
+
+    engine.add_sample('latency_ms', 25, START + 970)
+    wait_for_save(engine)
+    assert path.exists()
+
+    restored = RollupEngine(path=path)
+    restored.load()
+    quarter = restored.series[('latency_ms', 'default')].tiers[2]
+    assert [(p.start, p.count) for p in quarter.points] == [(START, 90)]
+
+
+def test_no_autosave_by_default(tmp_path):
+    path = tmp_path / "rollups.json"
+    engine = RollupEngine(path=path)
+    for second in range(0, 2000, 10):
+        engine.add_sample('latency_ms', 20, START + second)
+
+    assert engine._save_thread is None and not path.exists()
+    engine.save()
+    assert path.exists()
+
+
+def test_snapshots_are_keyed_by_measured_adapter():
+    engine = RollupEngine()
+    # NetworkMonitor("Ethernet") cayó a los contadores totales
+    snapshot = SimpleNamespace(timestamp=datetime.fromtimestamp(START), adapter="All",
+                               download_rate_mbps=80.0, upload_rate_mbps=8.0, latency_ms=15.0,
+                               errors_per_sec=0.0, drops_per_sec=0.0)
+    engine.add_snapshot(snapshot)
+
+    assert engine.query('download_mbps', START - 60, START + 60, adapter="All")[1]
+    assert engine.query('download_mbps', START - 60, START + 60, adapter="Ethernet") == (None, [])
@@ -0,0 +1,281 @@
+"""
+Tests del ejecutor de shell persistente (src/utils/shell_host.py).
+
+Corren en Linux: FakeShellHost simula cuelgues y caídas en proceso, y
+PythonShellHost / ProcessShellHost ejercitan el protocolo enmarcado con un
+proceso hijo real.
+"""
+
+import sys
+import threading
+import time
+
+import pytest
+
+from src.utils import shell_host
+from src.utils.shell_host import (
+    FRAME_PREFIX, POWERSHELL_UNAVAILABLE, FakeShellHost, ProcessShellHost,
+    PythonShellHost, ShellResult, ShellRunner, set_shell_runner,
+)
+
+
+def fake_runner(handler, pool_size=3):
+    """Runner con FakeShellHost; devuelve (runner, hosts creados)"""
+    hosts = []
+
+    def factory():
+        host = FakeShellHost(handler)
+        hosts.append(host)
+        return host
+
+    return ShellRunner(factory, pool_size=pool_size), hosts
+
+
+# ============================================================================
+# Protocolo enmarcado
+# ============================================================================
+
+# Host que ensucia stdout: líneas sueltas, un frame inválido y la respuesta
+# atrasada de otro id antes de la respuesta real
+NOISY_HOST = r"""
+import json, sys
+for line in sys.stdin:
+    request = json.loads(line)
+    print("WARNING: salida suelta del host")
+    print("@@NBZ@@{no es json")
+    stale = {'id': request['id'] - 1, 'ok': True, 'stdout': 'atrasada', 'stderr': '', 'exit_code': 0}
+    print("@@NBZ@@" + json.dumps(stale))
+    response = {'id': request['id'], 'ok': True, 'stdout': request['command'].upper(),
+                'stderr': '', 'exit_code': 0}
+    print("@@NBZ@@" + json.dumps(response), flush=True)
+"""
+
+
+def test_framing_ignores_noise_and_stale_responses():
+    runner = ShellRunner(lambda: ProcessShellHost([sys.executable, "-u", "-c", NOISY_HOST]), pool_size=1)
+    try:
+        first = runner.run("uno", timeout=5)
+        second = runner.run("dos", timeout=5)
+    finally:
+        runner.shutdown()
+
+    assert first.ok and first.stdout == "UNO"
+    assert second.ok and second.stdout == "DOS"
+    # El mismo proceso atendió ambos comandos
+    assert runner.get_stats()['restarts'] == 0
+
+
+def test_python_host_roundtrip_and_exit_codes():
+    runner = ShellRunner(PythonShellHost, pool_size=1)
+    try:
+        ok = runner.run("echo hola", timeout=5)
+        failed = runner.run("echo error >&2; exit 3", timeout=5)
+        framed = runner.run(f"echo '{FRAME_PREFIX}no-es-respuesta'", timeout=5)
+    finally:
+        runner.shutdown()
+
+    assert ok.ok and ok.stdout == "hola\n"
+    assert not failed.ok and failed.exit_code == 3 and failed.stderr == "error\n"
+    # La salida del comando viaja dentro del JSON: el prefijo no la confunde
+    assert framed.ok and framed.stdout == f"{FRAME_PREFIX}no-es-respuesta\n"
+
+
+# ============================================================================
+# Timeouts
+# ============================================================================
+
+def test_timeout_is_per_call_and_discards_the_busy_host():
+    release = threading.Event()
+
+    def handler(command):
+        if command == "lento":
+            release.wait(5)
+        return command
+
+    runner, hosts = fake_runner(handler, pool_size=1)
+    start = time.monotonic()
+    slow = runner.run("lento", timeout=0.1)
+    elapsed = time.monotonic() - start
+    fast = runner.run("rapido", timeout=5)
+    release.set()
+
+    assert slow.timed_out and not slow.ok and slow.stderr == "Timeout"
+    assert elapsed < 1.0
+    assert fast.ok and fast.stdout == "rapido"
+    # El host ocupado con "lento" se descartó y se creó otro
+    assert len(hosts) == 2 and not hosts[0].alive
+    stats = runner.get_stats()
+    assert stats['timeouts'] == 1 and stats['restarts'] == 1
+
+
+def test_timeout_with_real_process():
+    runner = ShellRunner(PythonShellHost, pool_size=1)
+    try:
+        slow = runner.run("sleep 5", timeout=0.3)
+        after = runner.run("echo sigue", timeout=5)
+    finally:
+        runner.shutdown()
+
+    assert slow.timed_out and slow.duration_ms < 2000
+    assert after.ok and after.stdout == "sigue\n"
+
+
+# ============================================================================
+# Concurrencia
+# ============================================================================
+
+def test_concurrent_calls_run_on_separate_hosts_up_to_pool_size():
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+
+    def handler(command):
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        time.sleep(0.2)
+        with lock:
+            state['running'] -= 1
+        return command
+
+    runner, hosts = fake_runner(handler, pool_size=3)
+    results = {}
+
+    def call(i):
+        results[i] = runner.run(f"cmd-{i}", timeout=5)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(6)]
+    start = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - start
+
+    assert all(results[i].ok and results[i].stdout == f"cmd-{i}" for i in range(6))
+    # 6 comandos de 0.2s en 3 hosts: dos tandas, nunca más de 3 a la vez
+    assert state['peak'] == 3
+    assert len(hosts) == 3
+    assert 0.35 < elapsed < 1.0
+    assert runner.get_stats()['idle'] == 3
+
+
+def test_concurrent_calls_with_real_processes():
+    runner = ShellRunner(PythonShellHost, pool_size=3)
+    results = []
+    try:
+        threads = [threading.Thread(target=lambda i=i: results.append(runner.run(f"sleep 0.3; echo {i}", timeout=5)))
+                   for i in range(3)]
+        start = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.monotonic() - start
+    finally:
+        runner.shutdown()
+
+    assert sorted(r.stdout for r in results) == ["0\n", "1\n", "2\n"]
+    assert elapsed < 0.85
+
+
+# ============================================================================
+# Caídas
+# ============================================================================
+
+def test_restart_after_crash_mid_command():
+    hosts = []
+
+    def handler(command):
+        if command == "caer":
+            hosts[-1].crash()
+            time.sleep(0.5)
+        return command
+
+    def factory():
+        host = FakeShellHost(handler)
+        hosts.append(host)
+        return host
+
+    runner = ShellRunner(factory, pool_size=1)
+    crashed = runner.run("caer", timeout=5)
+    after = runner.run("normal", timeout=5)
+
+    assert not crashed.ok and not crashed.timed_out
+    assert "terminó" in crashed.stderr
+    assert after.ok and after.stdout == "normal"
+    assert len(hosts) == 2
+    assert runner.get_stats()['restarts'] == 1
+
+
+def test_restart_after_idle_host_dies():
+    runner, hosts = fake_runner(lambda command: command, pool_size=1)
+    assert runner.run("uno").ok
+    hosts[0].crash()
+
+    result = runner.run("dos")
+    assert result.ok and result.stdout == "dos"
+    assert len(hosts) == 2 and runner.get_stats()['restarts'] == 1
+
+
+def test_restart_after_real_process_is_killed():
+    runner = ShellRunner(PythonShellHost, pool_size=1)
+    try:
+        killed = runner.run("kill -9 $PPID", timeout=5)
+        after = runner.run("echo vivo", timeout=5)
+    finally:
+        runner.shutdown()
+
+    assert not killed.ok and not killed.timed_out
+    assert after.ok and after.stdout == "vivo\n"
+    assert runner.get_stats()['restarts'] == 1
+
+
+def test_handler_errors_and_results_are_passed_through():
+    def handler(command):
+        if command == "error":
+            raise RuntimeError("cmdlet falló")
+        return ShellResult(ok=False, stdout="parcial", stderr="aviso", exit_code=2)
+
+    runner, _ = fake_runner(handler)
+    error = runner.run("error")
+    partial = runner.run("otro")
+
+    assert not error.ok and error.stderr == "cmdlet falló"
+    assert (partial.ok, partial.stdout, partial.stderr, partial.exit_code) == (False, "parcial", "aviso", 2)
+
+
+# ============================================================================
+# Plataformas sin PowerShell
+# ============================================================================
+
+def test_default_factory_without_powershell(monkeypatch):
+    monkeypatch.setattr(shell_host.sys, 'platform', 'linux')
+    monkeypatch.setattr(shell_host.shutil, 'which', lambda name: None)
+    assert shell_host.default_host_factory() is None
+
+    monkeypatch.setattr(shell_host.shutil, 'which', lambda name: '/usr/bin/pwsh')
+    assert shell_host.default_host_factory() is not None
+
+
+def test_unavailable_runner_fails_fast():
+    runner = ShellRunner(None)
+    start = time.monotonic()
+    result = runner.run("Set-DnsClientServerAddress -InterfaceAlias 'eth0' -ServerAddresses '1.1.1.1'")
+
+    assert not runner.available
+    assert not result.ok and result.stderr == POWERSHELL_UNAVAILABLE and result.exit_code == -1
+    assert time.monotonic() - start < 0.05
+    assert runner.get_stats()['unavailable'] == 1
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="backend Linux de adaptadores")
+def test_adapter_changes_report_failure_without_powershell():
+    from src.monitoring.adapter_manager import AdapterManager
+
+    previous = set_shell_runner(ShellRunner(None))
+    try:
+        manager = AdapterManager()
+        assert manager.set_dns_servers("eth0", ["1.1.1.1", "1.0.0.1"]) is False
+        assert manager.set_adapter_metric("eth0", 5) is False
+    finally:
+        set_shell_runner(previous)
@@ -0,0 +1,29 @@
+"""
+Tests del motor de speed test contra el servidor local (sin Internet).
+"""
+
+from datetime import datetime
+
+from src.monitoring.speed_test import SpeedTestEngine, ThroughputConfig
+from src.monitoring.speed_test_server import LocalSpeedTestServer
+from src.storage.speed_test_storage import SpeedTestResult
+
+
+def test_profile_is_its_own_field():
+    with LocalSpeedTestServer() as server:
+        config = ThroughputConfig(download_url=server.download_url, upload_url=server.upload_url,
+                                  duration_seconds=1, warmup_seconds=0)
+        report = SpeedTestEngine(config).run(adapter="loopback", profile="aggressive", save=False)
+
+    result = report.result
+    assert result.profile == "aggressive"
+    assert "[" not in result.server
+    assert result.download_mbps > 0
+
+
+def test_old_records_without_profile_load():
+    record = {'timestamp': datetime(2026, 10, 1, 10), 'download_mbps': 500.0, 'upload_mbps': 50.0,
+              'latency_ms': 12.0, 'jitter_ms': 1.0, 'packet_loss': 0.0, 'adapter': 'Ethernet',
+              'server': 'speed.example.com', 'test_duration_s': 20.0}
+
+    assert SpeedTestResult(**record).profile == ""
@@ -0,0 +1,115 @@
+"""
+Tests de la migración TinyDB → SQLite de open_storage().
+"""
+
+import json
+
+import pytest
+
+from src.storage import sqlite_storage
+from src.storage.db_manager import open_storage
+from src.storage.sqlite_storage import SQLiteStorage
+
+LEGACY = {
+    'network_tests': {
+        '1': {'timestamp': '2026-10-01T10:00:00', 'adapter': 'Ethernet', 'download_mbps': 500,
+              'upload_mbps': 50, 'latency_ms': 12},
+        '3': {'timestamp': '2026-10-02T10:00:00', 'adapter': 'Wi-Fi', 'download_mbps': 200,
+              'upload_mbps': 20, 'latency_ms': 30},
+    },
+    'optimizations': {'1': {'name': 'rss', 'enabled': True, 'applied_at': '2026-10-01T09:00:00'}},
+    'settings': {'1': {'key': 'theme', 'value': 'dark'}},
+    'metrics': {},
+}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "netboozt_data.db"
+    path.with_suffix('.json').write_text(json.dumps(LEGACY), encoding='utf-8')
+    return path
+
+
+def test_migrates_once_and_keeps_ids(db_path):
+    storage = open_storage(db_path)
+    try:
+        assert [t.doc_id for t in storage.get_all_tests()] == [1, 3]
+        assert storage.get_setting('theme') == 'dark'
+        assert storage.get_setting('storage_migration')['counts']['network_tests'] == 2
+        assert storage.get_test_stats()['total_tests'] == 2
+    finally:
+        storage.close()
+
+    # Reabrir no duplica
+    storage = open_storage(db_path)
+    try:
+        assert len(storage.get_all_tests()) == 2
+    finally:
+        storage.close()
+
+
+def test_existing_database_without_marker_is_migrated(db_path):
+    # La base SQLite ya existe (p. ej. un intento anterior que falló)
+    SQLiteStorage(db_path).close()
+
+    storage = open_storage(db_path)
+    try:
+        assert len(storage.get_all_tests()) == 2
+        assert storage.get_setting('storage_migration')
+    finally:
+        storage.close()
+
+
+def test_failed_migration_rolls_back_and_retries(db_path, monkeypatch):
+    original = SQLiteStorage.save_setting
+
+    def failing_save_setting(self, key, value):
+        if key == 'storage_migration':
+            raise OSError("disco lleno")
+        return original(self, key, value)
+
+    monkeypatch.setattr(SQLiteStorage, 'save_setting', failing_save_setting)
+    # El fallo no impide el arranque
+    storage = open_storage(db_path)
+    try:
+        # Nada a medias: ni documentos, ni settings, ni estadísticas
+        assert storage.get_all_tests() == []
+        assert storage.get_setting('theme') is None
+        assert storage.get_test_stats()['total_tests'] == 0
+    finally:
+        storage.close()
+
+    monkeypatch.setattr(SQLiteStorage, 'save_setting', original)
+    storage = open_storage(db_path)
+    try:
+        assert [t.doc_id for t in storage.get_all_tests()] == [1, 3]
+        assert storage.get_setting('storage_migration')
+    finally:
+        storage.close()
+
+
+def test_retry_over_partial_rows_is_idempotent(db_path):
+    # Filas con los mismos ids de un intento previo sin transacción
+    storage = SQLiteStorage(db_path)
+    tables = sqlite_storage.read_tinydb_file(db_path.with_suffix('.json'))
+    storage.insert_documents(tests=tables['network_tests'][:1], keep_ids=True)
+    storage.close()
+
+    storage = open_storage(db_path)
+    try:
+        assert [t.doc_id for t in storage.get_all_tests()] == [1, 3]
+        assert storage.get_test_stats()['total_tests'] == 2
+    finally:
+        storage.close()
+
+
+def test_corrupt_legacy_json_does_not_block_startup(tmp_path):
+    db_path = tmp_path / "netboozt_data.db"
+    db_path.with_suffix('.json').write_text("{no es json", encoding='utf-8')
+
+    storage = open_storage(db_path)
+    try:
+        assert storage.get_all_tests() == []
+        assert storage.get_setting('storage_migration') is None
+    finally:
+        storage.close()